@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark of community detection.
+
+Generates a graph with planted communities, detects communities with the
+built-in Louvain implementation and with networkx.community.louvain_communities
+on the same weighted undirected graph, and reports the time and modularity
+of each next to the modularity of the planted partition.
+"""
+
+import argparse
+import sys
+import time
+
+import networkx as nx
+import numpy as np
+
+from src.knowledge_graph_synth.models import GraphCore
+from src.knowledge_graph_synth.graph.community import louvain_communities, modularity
+
+
+def make_core(nodes: int, edges: int, community_size: int, mixing: float, seed: int) -> tuple:
+    """Generate the core of a graph with planted communities.
+    
+    A fraction `mixing` of the edges connects random nodes; the others
+    connect two nodes of the same planted community.
+    """
+    rng = np.random.default_rng(seed)
+    planted = rng.integers(0, max(nodes // community_size, 1), nodes)
+    
+    order = np.argsort(planted, kind="stable")
+    sizes = np.bincount(planted)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    
+    internal = int(edges * (1 - mixing))
+    communities = planted[rng.integers(0, nodes, internal)]
+    sources = order[starts[communities] + rng.integers(0, sizes[communities])]
+    targets = order[starts[communities] + rng.integers(0, sizes[communities])]
+    sources = np.concatenate([sources, rng.integers(0, nodes, edges - internal)]).astype(np.int32)
+    targets = np.concatenate([targets, rng.integers(0, nodes, edges - internal)]).astype(np.int32)
+    
+    core = GraphCore(
+        node_ids=list(range(nodes)),
+        node_names=[""] * nodes,
+        node_types=np.zeros(nodes, dtype=np.int32),
+        node_confidence=np.ones(nodes, dtype=np.float32),
+        type_names=["concept"],
+        edge_ids=list(range(edges)),
+        edge_sources=sources,
+        edge_targets=targets,
+        edge_types=np.zeros(edges, dtype=np.int32),
+        edge_confidence=np.ones(edges, dtype=np.float32),
+        edge_type_names=["related_to"]
+    )
+    return core, planted
+
+
+def to_networkx(core: GraphCore) -> nx.Graph:
+    """Build the weighted undirected NetworkX graph that Louvain runs on."""
+    graph = nx.Graph()
+    graph.add_nodes_from(range(core.num_nodes))
+    pairs, counts = np.unique(np.stack([core.edge_sources, core.edge_targets], axis=1), axis=0, return_counts=True)
+    weights = {}
+    for (source, target), count in zip(pairs.tolist(), counts.tolist()):
+        key = (min(source, target), max(source, target))
+        weights[key] = weights.get(key, 0) + count
+    graph.add_weighted_edges_from((source, target, weight) for (source, target), weight in weights.items())
+    return graph
+
+
+def measure(label: str, function) -> tuple:
+    """Run a function once and print its time."""
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed:>8.2f}s", end="")
+    return result, elapsed
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark community detection")
+    parser.add_argument("--nodes", type=int, default=200000, help="Number of nodes")
+    parser.add_argument("--edges", type=int, default=1000000, help="Number of edges")
+    parser.add_argument("--community-size", type=int, default=100, help="Average planted community size")
+    parser.add_argument("--mixing", type=float, default=0.2, help="Fraction of edges between random nodes")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--skip-networkx", action="store_true", help="Only run the built-in implementation")
+    args = parser.parse_args()
+    
+    core, planted = make_core(args.nodes, args.edges, args.community_size, args.mixing, args.seed)
+    print(f"{args.nodes} nodes, {args.edges} edges, mixing {args.mixing}")
+    print(f"{'Planted partition':<36} {'':>9} modularity {modularity(core, planted):.4f}, "
+          f"{len(np.unique(planted))} communities")
+    
+    labels, builtin = measure("Built-in Louvain", lambda: louvain_communities(core, seed=args.seed))
+    print(f" modularity {modularity(core, labels):.4f}, {labels.max() + 1} communities")
+    
+    if not args.skip_networkx:
+        graph = to_networkx(core)
+        partition, reference = measure("networkx louvain_communities",
+                                       lambda: nx.community.louvain_communities(graph, seed=args.seed))
+        labels = np.empty(args.nodes, dtype=np.int64)
+        for community_id, members in enumerate(partition):
+            labels[list(members)] = community_id
+        print(f" modularity {modularity(core, labels):.4f}, {len(partition)} communities")
+        print(f"Speed-up: {reference / builtin:.1f}x")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the sentence segmentation backends.
+
+Splits the paragraphs of a text file with the regex and the spaCy backend
+and reports the time, the number of sentences and how many boundaries the
+backends agree on.
+"""
+
+import argparse
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+from src.knowledge_graph_synth.text.sentences import SentenceSplitter
+from src.knowledge_graph_synth.text.webvtt import WebVTTParser
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def load_paragraphs(file_path: str) -> list:
+    """Load the paragraphs of a text or WebVTT file."""
+    text = Path(file_path).read_text(encoding="utf-8")
+    if text.startswith("WEBVTT"):
+        text = WebVTTParser().clean(text)
+        return [line for line in text.split("\n") if line.strip()]
+    return [p for p in re.split(r'\n\s*\n', text) if p.strip()]
+
+
+def run_backend(splitter: SentenceSplitter, paragraphs: list, language: str) -> tuple:
+    """Split the paragraphs and measure the time."""
+    start = time.perf_counter()
+    boundaries = splitter.sentence_ends(paragraphs, language)
+    return boundaries, time.perf_counter() - start
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark sentence segmentation backends")
+    parser.add_argument("file_path", help="Path to text file")
+    parser.add_argument("--language", "-l", default="en", choices=["en", "ru"],
+                        help="Language of the text (default: en)")
+    parser.add_argument("--batch-size", type=int, default=64, help="spaCy batch size")
+    parser.add_argument("--n-process", type=int, default=1, help="spaCy processes")
+    args = parser.parse_args()
+    
+    paragraphs = load_paragraphs(args.file_path)
+    characters = sum(len(p) for p in paragraphs)
+    logger.info(f"{len(paragraphs)} paragraphs, {characters} characters")
+    
+    regex_splitter = SentenceSplitter("regex")
+    spacy_splitter = SentenceSplitter("spacy", args.batch_size, args.n_process)
+    if spacy_splitter.backend != "spacy":
+        logger.error("spaCy is not installed")
+        return 1
+    
+    # Load the pipeline outside of the measurement
+    load_start = time.perf_counter()
+    spacy_splitter.get_pipeline(args.language)
+    load_time = time.perf_counter() - load_start
+    
+    regex_boundaries, regex_time = run_backend(regex_splitter, paragraphs, args.language)
+    spacy_boundaries, spacy_time = run_backend(spacy_splitter, paragraphs, args.language)
+    
+    regex_count = sum(len(b) + 1 for b in regex_boundaries)
+    spacy_count = sum(len(b) + 1 for b in spacy_boundaries)
+    common = sum(len(set(r) & set(s)) for r, s in zip(regex_boundaries, spacy_boundaries))
+    
+    print(f"{'backend':<8} {'seconds':>10} {'chars/s':>14} {'sentences':>10}")
+    print(f"{'regex':<8} {regex_time:>10.3f} {characters / max(regex_time, 1e-9):>14,.0f} {regex_count:>10}")
+    print(f"{'spacy':<8} {spacy_time:>10.3f} {characters / max(spacy_time, 1e-9):>14,.0f} {spacy_count:>10}")
+    print(f"spaCy pipeline load: {load_time:.3f}s")
+    print(f"Boundaries found by both: {common}; regex only: {regex_count - len(paragraphs) - common}; "
+          f"spaCy only: {spacy_count - len(paragraphs) - common}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ Improved script to create a meaningful HTML visualization for a processed direct
 
 import os
 import sys
+import gzip
 import json
 import logging
 import re
@@ -21,9 +22,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def load_json_file(file_path):
-    """Safely load a JSON file and return its contents."""
+    """Safely load a JSON or JSON Lines file and return its contents."""
     try:
         if os.path.exists(file_path):
+            if file_path.endswith(('.jsonl', '.jsonl.gz')):
+                opener = gzip.open if file_path.endswith('.gz') else open
+                with opener(file_path, 'rt', encoding='utf-8') as f:
+                    return [json.loads(line) for line in f if line.strip()]
             with open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         else:
@@ -33,6 +38,19 @@ def load_json_file(file_path):
     
     return None
 
+def find_intermediate_file(directory, names):
+    """Find the first intermediate results file of the given names.
+    
+    Runs write JSON Lines (optionally gzip-compressed); older runs wrote JSON.
+    """
+    for name in names:
+        for suffix in ('.jsonl', '.jsonl.gz', '.json'):
+            file_path = os.path.join(directory, name + suffix)
+            if os.path.exists(file_path):
+                return file_path
+    
+    return os.path.join(directory, names[-1] + '.jsonl')
+
 def create_improved_report(output_dir, original_file="Unknown source"):
     """Create an improved HTML report from the processed data."""
     logger.info(f"Creating improved HTML report for {output_dir}")
@@ -51,16 +69,14 @@ def create_improved_report(output_dir, original_file="Unknown source"):
             graph_report_content = f"Error loading graph report: {str(e)}"
     
     # Load entities
-    entities_file = os.path.join(output_dir, "entities", "resolved_entities.json")
-    if not os.path.exists(entities_file):
-        entities_file = os.path.join(output_dir, "entities", "all_entities.json")
+    entities_file = find_intermediate_file(os.path.join(output_dir, "entities"),
+                                           ["resolved_entities", "all_entities"])
     
     entities = load_json_file(entities_file) or []
     
     # Load relationships
-    relationships_file = os.path.join(output_dir, "relationships", "grounded_relationships.json")
-    if not os.path.exists(relationships_file):
-        relationships_file = os.path.join(output_dir, "relationships", "all_relationships.json")
+    relationships_file = find_intermediate_file(os.path.join(output_dir, "relationships"),
+                                                ["grounded_relationships", "all_relationships"])
     
     relationships = load_json_file(relationships_file) or []
     
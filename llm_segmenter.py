@@ -29,20 +29,34 @@ from src.knowledge_graph_synth.models.segment import TextSegment, SegmentCollect
 from src.knowledge_graph_synth.llm.gemini_reasoning import GeminiReasoningProvider
 from src.knowledge_graph_synth.text.segmenter import TextSegmenter
 from src.knowledge_graph_synth.text.loader import TextLoader
+from src.knowledge_graph_synth.text.webvtt import WebVTTParser
+from src.knowledge_graph_synth.text.language import language_detector
 from src.knowledge_graph_synth.cli.utils import setup_output_dir
 
+# Параметры оконной (map-reduce) сегментации
+WINDOW_UNITS = 300  # Реплик или абзацев в одном окне
+WINDOW_OVERLAP = 60  # Перекрытие соседних окон
+WINDOW_CONCURRENCY = 4  # Окон, обрабатываемых одновременно
+BOUNDARY_TOLERANCE = 3  # Расстояние, на котором границы из соседних окон считаются одной
+MIN_TOPIC_UNITS = 5  # Минимальный размер темы
+
 class LLMSegmenter:
     """LLM-based text segmenter for large context understanding."""
     
-    def __init__(self, provider="gemini"):
+    def __init__(self, provider="gemini", mode="tiling"):
         """Initialize the LLM-based segmenter.
         
         Args:
             provider: LLM provider to use (default: gemini)
+            mode: "tiling" to find topics locally and only title them with the
+                LLM, or "windows" to let the LLM find topic boundaries in
+                overlapping windows processed in parallel
         """
         self.provider_name = provider
+        self.mode = mode
         self.llm = GeminiReasoningProvider()
         self.standard_segmenter = TextSegmenter()
+        self.webvtt_parser = WebVTTParser()
         
     async def segment_text(self, text: str, document_id: str, language: str = None) -> SegmentCollection:
         """Segment text using LLM for a semantic understanding.
@@ -57,7 +71,7 @@ class LLMSegmenter:
         """
         # Auto-detect language if not provided
         if language is None:
-            language = self._detect_language(text)
+            language = language_detector.detect(text)
             logger.info(f"Определен язык текста: {language}")
         
         # Create root segment
@@ -65,6 +79,8 @@ class LLMSegmenter:
             id=uuid4(),
             document_id=document_id,
             text=text,
+            start_position=0,
+            end_position=len(text),
             language=language,
             metadata={"segment_type": "document"}
         )
@@ -73,8 +89,11 @@ class LLMSegmenter:
         collection = SegmentCollection()
         collection.add_segment(root_segment)
         
+        if self.mode == "windows":
+            logger.info("Оконная сегментация: границы тем ищутся LLM в перекрывающихся окнах")
+            await self._segment_with_llm_windows(collection, root_segment)
         # Check if WEBVTT format
-        if text.startswith("WEBVTT"):
+        elif text.startswith("WEBVTT"):
             logger.info("Обнаружен формат WEBVTT, выполняем смысловое разбиение с помощью LLM")
             await self._segment_transcript_with_llm(collection, root_segment)
         else:
@@ -83,28 +102,12 @@ class LLMSegmenter:
         
         return collection
     
-    def _detect_language(self, text: str) -> str:
-        """Detect language of the text.
-        
-        Args:
-            text: Text to detect language for
-            
-        Returns:
-            ISO 639-1 language code (e.g., "en", "ru")
-        """
-        # Простая эвристика для определения русского языка
-        # В продакшен-системе лучше использовать специализированные библиотеки
-        cyrillic_count = sum(1 for c in text if 'а' <= c.lower() <= 'я')
-        total_chars = sum(1 for c in text if c.isalpha())
-        
-        if total_chars == 0:
-            return "en"
-        
-        cyrillic_ratio = cyrillic_count / total_chars
-        return "ru" if cyrillic_ratio > 0.3 else "en"
-    
     async def _segment_transcript_with_llm(self, collection: SegmentCollection, root_segment: TextSegment):
-        """Segment transcript using LLM for understanding conversational dynamics.
+        """Segment transcript into topics and title them using LLM.
+        
+        Topic boundaries come from the local lexical cohesion segmenter
+        (TextTiling), so the transcript is never sent in full. The LLM only
+        receives a short excerpt of every topic and returns its title.
         
         Args:
             collection: SegmentCollection to add segments to
@@ -113,107 +116,288 @@ class LLMSegmenter:
         Returns:
             Modified SegmentCollection
         """
-        text = root_segment.text
         language = root_segment.language
         
-        # Remove WEBVTT header and timestamps
-        clean_text = self._clean_webvtt(text)
+        segments = self.standard_segmenter._segment_transcript(root_segment)
+        for segment in segments:
+            collection.add_segment(segment)
         
-        # Define segmentation prompt based on language
+        if not segments:
+            return collection
+        
+        logger.info(f"Транскрипт разбит на {len(segments)} тем, запрашиваем заголовки у LLM...")
+        excerpts = "\n\n".join(
+            f"[{i + 1}] {self._excerpt(segment.text)}" for i, segment in enumerate(segments)
+        )
+        
+        # Define titling prompt based on language
         if language == "ru":
             prompt = f"""
-            Разбей следующий текст транскрипта на 5-10 логических частей (сегментов), 
-            группируя реплики по смыслу и тематике. Каждый сегмент должен представлять 
-            связанную мысль или подтему. Для каждого сегмента укажи:
-            
-            1. Номер сегмента
-            2. Заголовок сегмента (отражающий его основное содержание)
-            3. Начало сегмента (первые несколько слов)
-            4. Конец сегмента (последние несколько слов)
-            5. Текст сегмента полностью
+            Ниже приведены фрагменты последовательных частей транскрипта (начало и конец каждой части).
+            Для каждой части придумай короткий заголовок, отражающий её основное содержание.
+            Верни номер части и заголовок, текст частей повторять не нужно.
             
-            Вот транскрипт:
-            
-            {clean_text}
+            {excerpts}
             """
         else:
             prompt = f"""
-            Divide the following transcript into 5-10 logical segments,
-            grouping utterances by meaning and topic. Each segment should 
-            represent a related thought or subtopic. For each segment, provide:
-            
-            1. Segment number
-            2. Segment title (reflecting its main content)
-            3. Start of segment (first few words)
-            4. End of segment (last few words)
-            5. Full segment text
+            Below are excerpts of consecutive parts of a transcript (the start and end of each part).
+            For each part, write a short title reflecting its main content.
+            Return the part number and title only, do not repeat the text.
             
-            Here's the transcript:
-            
-            {clean_text}
+            {excerpts}
             """
         
         # Define the expected response schema
         schema = {
             "type": "object",
             "properties": {
-                "segments": {
+                "titles": {
                     "type": "array",
                     "items": {
                         "type": "object",
                         "properties": {
                             "number": {"type": "number"},
-                            "title": {"type": "string"},
-                            "start_text": {"type": "string"},
-                            "end_text": {"type": "string"},
-                            "full_text": {"type": "string"}
+                            "title": {"type": "string"}
                         },
-                        "required": ["number", "title", "full_text"]
+                        "required": ["number", "title"]
                     }
                 }
             },
-            "required": ["segments"]
+            "required": ["titles"]
         }
         
         try:
-            # Generate segmentation using LLM
-            logger.info("Запрос к LLM для смыслового разбиения транскрипта...")
             response = await self.llm.generate_structured(prompt, schema)
             
-            if "segments" not in response or not response["segments"]:
-                logger.warning("LLM не вернул сегменты, используем стандартное разбиение")
-                segments = self.standard_segmenter._segment_transcript(root_segment)
-                for segment in segments:
-                    collection.add_segment(segment)
-                return collection
+            for item in response.get("titles", []):
+                number = int(item.get("number", 0))
+                if 1 <= number <= len(segments):
+                    segments[number - 1].add_metadata("topic_title", item.get("title", ""))
             
-            # Add segments to collection
-            logger.info(f"LLM вернул {len(response['segments'])} смысловых сегментов")
-            for segment_data in response["segments"]:
-                # Create segment
+            logger.info(f"LLM вернул {len(response.get('titles', []))} заголовков")
+        except Exception as e:
+            logger.error(f"Ошибка при получении заголовков тем: {str(e)}")
+        
+        return collection
+    
+    async def _segment_with_llm_windows(self, collection: SegmentCollection, root_segment: TextSegment):
+        """Segment text into topics with the LLM in overlapping windows.
+        
+        The text is split into units (transcript cues or paragraphs), and the
+        units into overlapping windows that are sent to the LLM concurrently.
+        The model only returns the numbers of the units that start a new topic
+        (with a title), never the text itself. Boundaries from neighbouring
+        windows are then reconciled in their overlap zone.
+        
+        Args:
+            collection: SegmentCollection to add segments to
+            root_segment: Root segment containing the text
+            
+        Returns:
+            Modified SegmentCollection
+        """
+        text = root_segment.text
+        is_transcript = text.startswith("WEBVTT")
+        
+        if is_transcript:
+            units = [cue for cue in self.webvtt_parser.parse(text) if cue.text]
+            unit_texts = [cue.text for cue in units]
+        else:
+            units = self.standard_segmenter._segment_by_paragraphs(root_segment)
+            unit_texts = [" ".join(unit.text.split()) for unit in units]
+        
+        if not units:
+            return collection
+        
+        # Split the units into overlapping windows
+        step = WINDOW_UNITS - WINDOW_OVERLAP
+        windows = []
+        for start in range(0, len(units), step):
+            end = min(start + WINDOW_UNITS, len(units))
+            windows.append((start, end))
+            if end == len(units):
+                break
+        
+        logger.info(f"{len(units)} единиц текста разбиты на {len(windows)} окон")
+        
+        semaphore = asyncio.Semaphore(WINDOW_CONCURRENCY)
+        
+        async def run_window(window):
+            async with semaphore:
+                return await self._find_window_boundaries(unit_texts, window, root_segment.language)
+        
+        window_boundaries = await asyncio.gather(*(run_window(window) for window in windows))
+        boundaries = self._reconcile_boundaries(windows, window_boundaries, len(units))
+        
+        # Create topic segments
+        starts = sorted(boundaries)
+        ends = starts[1:] + [len(units)]
+        for topic_number, (start, end) in enumerate(zip(starts, ends), 1):
+            if is_transcript:
+                segment = self.standard_segmenter._create_transcript_topic(
+                    root_segment, units[start:end], topic_number
+                )
+            else:
+                start_position = units[start].start_position
+                end_position = units[end - 1].end_position
                 segment = TextSegment(
                     document_id=root_segment.document_id,
-                    text=segment_data["full_text"],
+                    text=text[start_position:end_position],
+                    start_position=start_position,
+                    end_position=end_position,
                     language=root_segment.language,
                     parent_id=root_segment.id,
                     metadata={
-                        "segment_type": "llm_transcript_topic",
+                        "segment_type": "llm_topic",
                         "parent_segment": str(root_segment.id),
-                        "topic_number": segment_data["number"],
-                        "topic_title": segment_data["title"]
+                        "topic_number": topic_number
                     }
                 )
-                collection.add_segment(segment)
             
-            return collection
+            segment.add_metadata("topic_segmentation", "llm_windows")
+            if boundaries[start]:
+                segment.add_metadata("topic_title", boundaries[start])
+            collection.add_segment(segment)
+        
+        logger.info(f"Оконная сегментация завершена: {len(starts)} тем")
+        return collection
+    
+    async def _find_window_boundaries(self, unit_texts: List[str],
+                                    window: Tuple[int, int],
+                                    language: Optional[str]) -> Dict[int, str]:
+        """Ask the LLM for the topic boundaries within one window.
+        
+        Args:
+            unit_texts: Texts of all units
+            window: (start, end) unit range of the window
+            language: Language of the text
+            
+        Returns:
+            Dictionary mapping the global numbers of units that start a topic
+            to topic titles
+        """
+        start, end = window
+        numbered = "\n".join(f"[{i}] {unit_texts[i]}" for i in range(start, end))
+        
+        if language == "ru":
+            prompt = f"""
+            Ниже пронумерованные реплики (или абзацы) фрагмента текста.
+            Определи, с каких номеров начинаются новые смысловые темы, и дай каждой теме короткий заголовок.
+            Если фрагмент начинается с середины темы, не отмечай его первый номер.
+            Верни только номера и заголовки, текст повторять не нужно.
             
+            {numbered}
+            """
+        else:
+            prompt = f"""
+            Below are the numbered utterances (or paragraphs) of a text fragment.
+            Identify the numbers at which new topics start and give each topic a short title.
+            If the fragment starts in the middle of a topic, do not mark its first number.
+            Return only the numbers and titles, do not repeat the text.
+            
+            {numbered}
+            """
+        
+        schema = {
+            "type": "object",
+            "properties": {
+                "boundaries": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "start": {"type": "number"},
+                            "title": {"type": "string"}
+                        },
+                        "required": ["start"]
+                    }
+                }
+            },
+            "required": ["boundaries"]
+        }
+        
+        try:
+            response = await self.llm.generate_structured(prompt, schema)
         except Exception as e:
-            logger.error(f"Ошибка при LLM-сегментации: {str(e)}")
-            logger.info("Возврат к стандартному разбиению")
-            segments = self.standard_segmenter._segment_transcript(root_segment)
-            for segment in segments:
-                collection.add_segment(segment)
-            return collection
+            logger.error(f"Ошибка при сегментации окна {start}-{end}: {str(e)}")
+            return {}
+        
+        boundaries = {}
+        for item in response.get("boundaries", []):
+            try:
+                number = int(item.get("start"))
+            except (TypeError, ValueError):
+                continue
+            if start <= number < end:
+                boundaries[number] = item.get("title", "")
+        return boundaries
+    
+    def _reconcile_boundaries(self, windows: List[Tuple[int, int]],
+                            window_boundaries: List[Dict[int, str]],
+                            unit_count: int) -> Dict[int, str]:
+        """Merge the topic boundaries found in overlapping windows.
+        
+        Every position of the text is owned by one window: overlap zones are
+        split in the middle, so each window decides on the half where it has
+        more context. Boundaries outside the owned zone are dropped. When both
+        windows report a boundary close to the middle of the overlap (within
+        BOUNDARY_TOLERANCE units) it is kept once, at the earlier position.
+        Boundaries closer than MIN_TOPIC_UNITS to the previous one are dropped.
+        
+        Args:
+            windows: (start, end) unit ranges of the windows
+            window_boundaries: Boundaries found in each window
+            unit_count: Total number of units
+            
+        Returns:
+            Dictionary mapping topic start units to titles (always contains 0)
+        """
+        candidates = []
+        for i, ((start, end), boundaries) in enumerate(zip(windows, window_boundaries)):
+            # Zone owned by this window: up to the middle of each overlap
+            own_start = 0 if i == 0 else (start + windows[i - 1][1]) // 2
+            own_end = unit_count if i == len(windows) - 1 else (windows[i + 1][0] + end) // 2
+            
+            for number, title in boundaries.items():
+                if own_start <= number < own_end:
+                    candidates.append((number, title))
+        
+        candidates.sort()
+        merged = []
+        for number, title in candidates:
+            if merged and number - merged[-1][0] <= BOUNDARY_TOLERANCE:
+                # The same boundary seen from both sides of an overlap
+                if not merged[-1][1]:
+                    merged[-1] = (merged[-1][0], title)
+                continue
+            merged.append((number, title))
+        
+        result = {0: ""}
+        last = 0
+        for number, title in merged:
+            if number == 0:
+                result[0] = title
+            elif number - last >= MIN_TOPIC_UNITS and unit_count - number >= MIN_TOPIC_UNITS:
+                result[number] = title
+                last = number
+        return result
+    
+    def _excerpt(self, text: str, head: int = 400, tail: int = 200) -> str:
+        """Shorten a topic text to its start and end.
+        
+        Args:
+            text: Topic text
+            head: Characters to keep from the start
+            tail: Characters to keep from the end
+            
+        Returns:
+            Excerpt text
+        """
+        text = " ".join(text.split())
+        if len(text) <= head + tail:
+            return text
+        return f"{text[:head]} … {text[-tail:]}"
     
     def _clean_webvtt(self, text: str) -> str:
         """Remove WEBVTT header and timestamps from text.
@@ -224,38 +408,7 @@ class LLMSegmenter:
         Returns:
             Cleaned text with just the transcript content
         """
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        skip_next = False
-        for line in lines:
-            # Skip WEBVTT header
-            if line.startswith("WEBVTT"):
-                continue
-                
-            # Skip empty lines
-            if not line.strip():
-                continue
-                
-            # Skip timestamp lines (using simple heuristic)
-            if "-->" in line and any(c.isdigit() for c in line):
-                skip_next = False  # Reset the flag
-                continue
-                
-            # Skip line numbers (often appear before timestamps)
-            if line.strip().isdigit():
-                skip_next = True
-                continue
-                
-            # Skip line if flag is set
-            if skip_next:
-                skip_next = False
-                continue
-                
-            # Add line to cleaned content
-            cleaned_lines.append(line)
-        
-        return "\n".join(cleaned_lines)
+        return self.webvtt_parser.clean(text)
 
 async def main():
     """Main function."""
@@ -282,6 +435,14 @@ async def main():
         help="Output directory (default: output/llm_segmentation)"
     )
     
+    parser.add_argument(
+        "--mode", "-m",
+        default="tiling",
+        choices=["tiling", "windows"],
+        help="Topic segmentation mode: local TextTiling with LLM titles, or "
+             "parallel LLM segmentation of overlapping windows (default: tiling)"
+    )
+    
     args = parser.parse_args()
     
     # Check if file exists
@@ -300,7 +461,7 @@ async def main():
     document = loader.load_file(args.file_path, document_id=document_id)
     
     # Create LLM segmenter
-    segmenter = LLMSegmenter(provider=args.provider)
+    segmenter = LLMSegmenter(provider=args.provider, mode=args.mode)
     
     # Segment text
     logger.info(f"Starting LLM-based segmentation for {args.file_path}")
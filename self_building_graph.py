@@ -31,7 +31,7 @@ src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
 sys.path.insert(0, src_dir)
 
 # Import components from the knowledge_graph_synth package
-from knowledge_graph_synth.llm import LLMProviderFactory
+from knowledge_graph_synth.llm import LLMProviderFactory, CachedContext
 from knowledge_graph_synth.models import KnowledgeGraph, Entity, Relationship, TextSegment, SegmentCollection
 from knowledge_graph_synth.text.loader import TextLoader
 from knowledge_graph_synth.text.segmenter import TextSegmenter
@@ -62,6 +62,8 @@ class SelfBuildingGraphSystem:
         self.graph_analyzer = GraphAnalyzer()
         self.analyzer = GraphAnalyzer()  # Additional reference for backward compatibility
         self.accumulated_knowledge = ""
+        self.source_text = ""
+        self.source_context = None  # (provider, CachedContext) for the full story text
         self.reasoning_history = []
         self.hypothesis_graph = KnowledgeGraph()
         
@@ -81,6 +83,7 @@ class SelfBuildingGraphSystem:
         
         # Save the full text as accumulated knowledge
         self.accumulated_knowledge = text
+        self.source_text = text
         
         # Load text using TextLoader to get a segment collection with initial segment
         loader = TextLoader()
@@ -450,6 +453,23 @@ class SelfBuildingGraphSystem:
         
         return topics
     
+    async def _get_source_context(self, provider) -> CachedContext:
+        """
+        Get the cached handle for the full story text, creating it on first use.
+        The story is sent with every reasoning call, so it is uploaded once as a shared prefix.
+        """
+        if self.source_context is None or self.source_context[0] is not provider:
+            cached_context = await provider.create_cached_context(
+                f"Full story text:\n{self.source_text}",
+                model="reasoning"
+            )
+            self.source_context = (provider, cached_context)
+        return self.source_context[1]
+    
+    def _accumulated_insights(self) -> str:
+        """Get the knowledge accumulated on top of the source text."""
+        return self.accumulated_knowledge[len(self.source_text):].strip()
+    
     async def answer_question_with_reasoning(self, 
                                             entity: Entity, 
                                             question: str) -> Dict[str, Any]:
@@ -463,16 +483,19 @@ class SelfBuildingGraphSystem:
                 provider = LLMProviderFactory.get_provider(self.provider_name)
             
             # Include all accumulated knowledge and reasoning history
+            # (the story itself is referenced through the cached context)
             reasoning_context = "\n\n".join(self.reasoning_history[-5:]) if self.reasoning_history else ""
+            source_context = await self._get_source_context(provider)
             
             prompt = f"""
             You are analyzing a complex narrative and building a knowledge graph through reasoning.
+            The full story text is provided above.
             
             Entity: {entity.name} ({entity.type})
             Question: {question}
             
-            Full story context:
-            {self.accumulated_knowledge}
+            Insights gathered so far:
+            {self._accumulated_insights() or "None yet."}
             
             Previous reasoning (if any):
             {reasoning_context}
@@ -510,7 +533,7 @@ class SelfBuildingGraphSystem:
             """
             
             # Get the reasoned answer
-            response = await provider.generate_text(prompt)
+            response = await provider.generate_text(prompt, cached_context=source_context)
             
             # Add to reasoning history
             self.reasoning_history.append(f"Question about {entity.name}: {question}\n\nReasoning:\n{response}")
@@ -611,13 +634,14 @@ class SelfBuildingGraphSystem:
             if not provider:
                 provider = LLMProviderFactory.get_provider(self.provider_name)
             
-            # Create a prompt for theory generation
+            # Create a prompt for theory generation (the story is in the cached context)
+            source_context = await self._get_source_context(provider)
             prompt = f"""
             Based on all the accumulated knowledge and reasoning, generate a comprehensive theory 
-            that explains the central mystery or plot of the story.
+            that explains the central mystery or plot of the story. The full story text is provided above.
             
-            Full story text:
-            {self.accumulated_knowledge}
+            Insights gathered so far:
+            {self._accumulated_insights() or "None yet."}
             
             Reasoning history:
             {self.reasoning_history[-1] if self.reasoning_history else "No previous reasoning."}
@@ -639,7 +663,7 @@ class SelfBuildingGraphSystem:
             7. Confidence: Your confidence in this theory (0-1 scale)
             """
             
-            response = await provider.generate_text(prompt)
+            response = await provider.generate_text(prompt, cached_context=source_context)
             
             # Parse the theory from the response
             theory = {
@@ -1272,6 +1296,12 @@ class SelfBuildingGraphSystem:
         except Exception as e:
             logger.error(f"Error running analysis: {str(e)}")
             raise
+        finally:
+            # Drop the provider-side cache of the story text
+            if self.source_context:
+                provider, cached_context = self.source_context
+                await provider.release_cached_context(cached_context)
+                self.source_context = None
     
     def _generate_custom_theory(self) -> Dict[str, Any]:
         """Generate a comprehensive custom theory based on accumulated knowledge and reasoning."""
@@ -11,6 +11,8 @@ from typing import List, Optional
 from ..config import settings
 from ..text import TextLoader, TextNormalizer, TextSegmenter
 from ..llm import LLMProviderFactory
+from ..llm.budget import budget_controller
+from ..llm.cascade import model_cascade
 from ..graph import expansion, metagraph, GraphVisualizer
 
 logger = logging.getLogger(__name__)
@@ -146,7 +148,8 @@ async def process_file(args: argparse.Namespace):
     logger.info("Processing complete")
 
 
-async def process_segment_collection(args: argparse.Namespace, segmented_collection):
+async def process_segment_collection(args: argparse.Namespace, segmented_collection, segment_stream=None,
+                                     documents=None):
     """Process a segment collection with entity extraction, graph building, and theory generation.
     
     This function is the core processing pipeline that:
@@ -161,11 +164,23 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
     Args:
         args: Command-line arguments containing processing options
         segmented_collection: Collection of text segments to process
+        segment_stream: Leaf segments still being produced by a streaming
+            segmenter; they are added to the collection as they arrive
+    
+    Returns:
+        The knowledge graph (expanded if requested), or None if no graph was built
     """
     # Ensure we have output directory from the caller
     if not hasattr(args, 'output_dir'):
         args.output_dir = args.output
     
+    # Only the overlapped extraction pipeline can consume segments while they are produced
+    if segment_stream is not None and (getattr(args, 'contextual_analysis', False) or
+                                       not (args.extract and getattr(args, 'pipeline', False))):
+        for segment in segment_stream:
+            segmented_collection.add_segment(segment)
+        segment_stream = None
+    
     logger.info(f"Segmented into {len(segmented_collection.segments)} segments")
     
     # Test LLM provider if specified
@@ -215,6 +230,7 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         from ..text.context import ContextManager
         
         logger.info("Performing contextual analysis on segments...")
+        budget_controller.start_stage("contextual_analysis")
         
         # Determine if cross-segment analysis should be performed
         analyze_connections = getattr(args, 'analyze_connections', True)
@@ -298,14 +314,8 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
             with open(connections_path, "w", encoding="utf-8") as f:
                 json.dump(connections, f, ensure_ascii=False, indent=2)
             
-            # Save original segment texts
-            segment_texts = {}
-            for segment_id, segment in segmented_collection.segments.items():
-                segment_texts[str(segment_id)] = segment.text
-            
-            segments_path = os.path.join(context_dir, "segments.json")
-            with open(segments_path, "w", encoding="utf-8") as f:
-                json.dump(segment_texts, f, ensure_ascii=False, indent=2)
+            # Save the segments as offsets into one copy of the document text
+            segmented_collection.save(os.path.join(context_dir, "segments_columnar"))
             
             logger.info(f"Saved contextual analysis results to {context_dir}")
     
@@ -317,6 +327,7 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         from ..extraction import EntityExtractor, RelationshipExtractor, CoreferenceResolver, Grounder
         
         logger.info("Extracting entities and relationships...")
+        budget_controller.start_stage("entity_extraction")
         
         # Set up output directories for intermediate results
         import os
@@ -325,60 +336,100 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         relationships_dir = get_subdirectory_path(args.output_dir, "relationships")
         save_intermediate = getattr(args, 'save_intermediate', True)
         
-        # Extract entities
-        entity_extractor = EntityExtractor(provider_name=args.provider)
-        entities = await entity_extractor.extract_from_collection(
-            segmented_collection,
-            save_intermediate=save_intermediate,
-            output_dir=str(entities_dir)
-        )
-        logger.info(f"Extracted {len(entities)} entities")
-        
-        # Resolve coreferences
-        resolver = CoreferenceResolver()
-        resolved_entities = resolver.resolve_entities(entities)
-        logger.info(f"Resolved {len(entities)} entities into {len(resolved_entities)} unique entities")
+        # Near-duplicate segments are extracted once per cluster
+        deduplicator = None
+        if getattr(args, 'dedup', False):
+            from ..extraction import segment_deduplicator
+            deduplicator = segment_deduplicator
+            deduplicator.clear()
         
-        # Save resolved entities if intermediate saving is enabled
-        if save_intermediate:
-            import json
-            resolved_path = os.path.join(entities_dir, "resolved_entities.json")
-            with open(resolved_path, "w", encoding="utf-8") as f:
-                entities_json = [entity.to_dict() for entity in resolved_entities]
-                json.dump(entities_json, f, ensure_ascii=False, indent=2)
-        
-        # Ground entities
-        grounder = Grounder()
-        grounded_entities = grounder.ground_entities(resolved_entities, segmented_collection)
-        logger.info(f"Grounded {len(grounded_entities)} entities")
-        
-        # Extract relationships
-        relationship_extractor = RelationshipExtractor(provider_name=args.provider)
-        relationships = await relationship_extractor.extract_from_collection(
-            segmented_collection, grounded_entities,
-            save_intermediate=save_intermediate,
-            output_dir=str(relationships_dir)
-        )
-        logger.info(f"Extracted {len(relationships)} relationships")
-        
-        # Ground relationships
-        entity_map = {entity.id: entity for entity in grounded_entities}
-        grounded_relationships = grounder.ground_relationships(
-            relationships, entity_map, segmented_collection
-        )
-        logger.info(f"Grounded {len(grounded_relationships)} relationships")
-        
-        # Save grounded relationships if intermediate saving is enabled
-        if save_intermediate:
-            import json
-            grounded_path = os.path.join(relationships_dir, "grounded_relationships.json")
-            with open(grounded_path, "w", encoding="utf-8") as f:
-                rels_json = [rel.to_dict() for rel in grounded_relationships]
-                json.dump(rels_json, f, ensure_ascii=False, indent=2)
-        
-        # Update entities and relationships
-        entities = grounded_entities
-        relationships = grounded_relationships
+        if getattr(args, 'pipeline', False):
+            from ..extraction import ExtractionPipeline
+            
+            # Run extraction, grounding and relationship extraction as overlapping stages
+            if segment_stream is None:
+                segment_stream = [s for s in segmented_collection.segments.values() if not s.child_ids]
+            
+            pipeline = ExtractionPipeline(provider_name=args.provider, deduplicator=deduplicator)
+            entities, relationships = await pipeline.run(
+                segment_stream,
+                segmented_collection,
+                save_intermediate=save_intermediate,
+                entities_dir=str(entities_dir),
+                relationships_dir=str(relationships_dir),
+                resume=bool(getattr(args, 'resume', None))
+            )
+            logger.info(f"Extracted {len(entities)} entities and {len(relationships)} relationships")
+        else:
+            # Only cluster representatives are sent to the LLM
+            extraction_collection = segmented_collection
+            if deduplicator is not None:
+                from ..models import SegmentCollection
+                leaf_segments = [s for s in segmented_collection.segments.values() if not s.child_ids]
+                extraction_collection = SegmentCollection(document_id=segmented_collection.document_id)
+                for segment in deduplicator.deduplicate(leaf_segments):
+                    extraction_collection.add_segment(segment)
+            
+            # Extract entities
+            entity_extractor = EntityExtractor(provider_name=args.provider)
+            entities = await entity_extractor.extract_from_collection(
+                extraction_collection,
+                save_intermediate=save_intermediate,
+                output_dir=str(entities_dir),
+                resume=bool(getattr(args, 'resume', None))
+            )
+            logger.info(f"Extracted {len(entities)} entities")
+            
+            if deduplicator is not None:
+                entities = deduplicator.project_entities(entities)
+                logger.info(f"{len(entities)} entities after projection onto near-duplicate segments")
+            
+            # Resolve coreferences
+            resolver = CoreferenceResolver()
+            resolved_entities = resolver.resolve_entities(entities)
+            logger.info(f"Resolved {len(entities)} entities into {len(resolved_entities)} unique entities")
+            
+            # Save resolved entities if intermediate saving is enabled
+            if save_intermediate:
+                from ..output.artifacts import artifact_path, write_artifacts
+                write_artifacts(artifact_path(str(entities_dir), "resolved_entities"),
+                                (entity.to_dict() for entity in resolved_entities))
+            
+            # Ground entities
+            grounder = Grounder()
+            grounded_entities = grounder.ground_entities(resolved_entities, segmented_collection)
+            logger.info(f"Grounded {len(grounded_entities)} entities")
+            
+            # Extract relationships
+            budget_controller.start_stage("relationship_extraction")
+            relationship_extractor = RelationshipExtractor(provider_name=args.provider)
+            relationships = await relationship_extractor.extract_from_collection(
+                extraction_collection, grounded_entities,
+                save_intermediate=save_intermediate,
+                output_dir=str(relationships_dir),
+                resume=bool(getattr(args, 'resume', None))
+            )
+            logger.info(f"Extracted {len(relationships)} relationships")
+            
+            if deduplicator is not None:
+                relationships = deduplicator.project_relationships(relationships)
+            
+            # Ground relationships
+            entity_map = {entity.id: entity for entity in grounded_entities}
+            grounded_relationships = grounder.ground_relationships(
+                relationships, entity_map, segmented_collection
+            )
+            logger.info(f"Grounded {len(grounded_relationships)} relationships")
+            
+            # Save grounded relationships if intermediate saving is enabled
+            if save_intermediate:
+                from ..output.artifacts import artifact_path, write_artifacts
+                write_artifacts(artifact_path(str(relationships_dir), "grounded_relationships"),
+                                (rel.to_dict() for rel in grounded_relationships))
+            
+            # Update entities and relationships
+            entities = grounded_entities
+            relationships = grounded_relationships
     
     # Build knowledge graph if requested
     graph = None
@@ -394,6 +445,11 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         graph = builder.build(entities, relationships)
         logger.info(f"Built graph with {len(graph.entities)} entities and {len(graph.relationships)} relationships")
         
+        # Record which documents of a corpus contributed to the graph
+        if documents:
+            from ..text.corpus import document_provenance
+            graph.metadata["documents"] = document_provenance(graph, documents)
+        
         # Visualize the graph
         from .utils import get_subdirectory_path
         graphs_dir = get_subdirectory_path(args.output_dir, "graphs")
@@ -421,10 +477,23 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         
         logger.info(f"Graph visualization saved to {html_path}")
         logger.info(f"Graph report saved to {graphs_dir}/knowledge_graph_report.md")
+        
+        # Save the graph and its segments in the columnar format for fast reloading
+        if getattr(args, 'columnar', False) or settings.SAVE_COLUMNAR:
+            graph.save(os.path.join(str(graphs_dir), "knowledge_graph_columnar"))
+            segmented_collection.save(os.path.join(str(graphs_dir), "segments_columnar"))
+            logger.info(f"Columnar graph saved to {graphs_dir}/knowledge_graph_columnar")
+        
+        # Add the graph to the cross-run graph store
+        if getattr(args, 'store', None):
+            from ..graph.store import GraphStore
+            with GraphStore(args.store) as store:
+                store.save_graph(graph, os.path.basename(os.path.normpath(args.output_dir)))
     
     # Expand graph if requested
-    if args.expand_graph and graph:
+    if args.expand_graph and graph and budget_controller.allow_stage("graph_expansion"):
         logger.info("Recursively expanding the knowledge graph...")
+        budget_controller.start_stage("graph_expansion")
         
         # Create a graph expander
         graph_expander = expansion.GraphExpander(provider_name=args.provider)
@@ -434,7 +503,7 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
             expanded_graph = await graph_expander.expand_graph(
                 graph,
                 segmented_collection,
-                max_iterations=args.expansion_iterations,
+                max_iterations=budget_controller.expansion_iterations(args.expansion_iterations),
                 output_dir=args.output_dir
             )
             
@@ -471,8 +540,9 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         logger.info(f"Expanded graph visualization saved to {html_path}")
     
     # Build meta-graph if requested
-    if args.build_metagraph and graph:
+    if args.build_metagraph and graph and budget_controller.allow_stage("metagraph"):
         logger.info("Building meta-graph from knowledge graph...")
+        budget_controller.start_stage("metagraph")
         
         # Create a meta-graph builder
         meta_builder = metagraph.MetaGraphBuilder(
@@ -507,12 +577,13 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
             logger.warning("No meta-concepts found. Unable to create meta-graph.")
     
     # Generate theories if requested
-    if args.generate_theories and graph:
+    if args.generate_theories and graph and budget_controller.allow_stage("theory_generation"):
         from ..theory import TheoryGenerator, PatternFinder
         import json
         import os
         
         logger.info("Generating theories...")
+        budget_controller.start_stage("theory_generation")
         
         # Create theories directory
         from .utils import get_subdirectory_path
@@ -534,7 +605,7 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         # Generate theories
         theory_generator = TheoryGenerator(provider_name=args.provider)
         theories = await theory_generator.generate_theories(
-            graph, segmented_collection, max_theories=3
+            graph, segmented_collection, max_theories=budget_controller.theory_limit(3)
         )
         logger.info(f"Generated {len(theories)} theories")
         
@@ -570,6 +641,8 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         logger.info(f"Theories saved to {theories_json_path}")
         logger.info(f"Theories report saved to {theories_md_path}")
     
+    budget_controller.end_stage()
+    
     # Generate comprehensive HTML research report
     if args.generate_report and graph:
         from ..output.report import ReportGenerator
@@ -588,9 +661,9 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         report_generator.generate_report(
             str(report_path),
             graph,
-            source_file=args.file,
+            source_file=args.file or args.corpus,
             output_dir=str(args.output_dir),
-            title=f"Knowledge Graph Analysis: {os.path.basename(args.file)}"
+            title=f"Knowledge Graph Analysis: {os.path.basename(args.file or args.corpus)}"
         )
         
         # Ensure segment pages are created for the report
@@ -598,6 +671,8 @@ async def process_segment_collection(args: argparse.Namespace, segmented_collect
         ensure_segment_pages(args.output_dir)
         
         logger.info(f"Comprehensive research report saved to {report_path}")
+    
+    return graph
 
 
 async def process_file(args: argparse.Namespace):
@@ -612,37 +687,50 @@ async def process_file(args: argparse.Namespace):
     - Recursive graph expansion for deeper insights
     - Meta-graph creation for higher-level abstractions
     """
-    file_path = args.file
-    logger.info(f"Processing file: {file_path}")
+    file_path = args.file or args.corpus
+    logger.info(f"Processing {'corpus' if args.corpus else 'file'}: {file_path}")
     
     # Prepare output directory with timestamp
     from .utils import create_timestamped_dir
     import os
     base_output_dir = args.output
-    output_dir, timestamp = create_timestamped_dir(base_output_dir)
-    logger.info(f"Using timestamped output directory: {output_dir}")
+    if getattr(args, 'resume', None):
+        # Continue the extraction artifacts of an interrupted run
+        output_dir = args.resume.rstrip(os.sep)
+        timestamp = os.path.basename(output_dir)
+        if not os.path.isdir(output_dir):
+            logger.error(f"Output directory to resume not found: {output_dir}")
+            return
+        logger.info(f"Resuming in output directory: {output_dir}")
+    else:
+        output_dir, timestamp = create_timestamped_dir(base_output_dir)
+        logger.info(f"Using timestamped output directory: {output_dir}")
     
     # Store the timestamped directory for other functions to use
     args.output_dir = output_dir
     
-    # Load the text
-    loader = TextLoader()
+    # Configure the LLM budget for this run
+    from .utils import parse_stage_budgets
     try:
-        segments = loader.load(file_path)
-        logger.info(f"Loaded {len(segments.segments)} segments from {file_path}")
-    except Exception as e:
-        logger.error(f"Error loading file: {str(e)}")
+        stage_limits = parse_stage_budgets(getattr(args, 'stage_budget', None))
+    except ValueError as e:
+        logger.error(f"Invalid budget configuration: {str(e)}")
         return
     
-    # Normalize the text
-    normalizer = TextNormalizer()
-    normalized_segments = []
-    for segment in segments.segments.values():
-        normalized_segment = normalizer.normalize(segment)
-        normalized_segments.append(normalized_segment)
-        segments.add_segment(normalized_segment)
+    budget_controller.configure(
+        max_tokens=getattr(args, 'max_tokens', settings.BUDGET_MAX_TOKENS),
+        max_cost_usd=getattr(args, 'max_cost', settings.BUDGET_MAX_COST_USD),
+        max_seconds=getattr(args, 'max_time', settings.BUDGET_MAX_SECONDS),
+        stage_limits=stage_limits
+    )
     
-    logger.info(f"Normalized {len(normalized_segments)} segments")
+    # Reset the model cascade statistics for this run
+    model_cascade.enabled = not getattr(args, 'no_cascade', False) and settings.CASCADE_ENABLED
+    model_cascade.reset()
+    
+    # Reset the deduplication statistics for this run
+    from ..extraction import segment_deduplicator
+    segment_deduplicator.reset()
     
     # Set custom segmentation parameters if provided
     segment_length = getattr(args, 'segment_length', settings.MAX_SEGMENT_LENGTH)
@@ -652,9 +740,81 @@ async def process_file(args: argparse.Namespace):
     settings.LLM_BATCH_SIZE = getattr(args, 'batch_size', settings.LLM_BATCH_SIZE)
     settings.LLM_DELAY_BETWEEN_REQUESTS = getattr(args, 'delay', settings.LLM_DELAY_BETWEEN_REQUESTS)
     
-    # Segment the text
+    loader = TextLoader(use_mmap=getattr(args, 'mmap', False))
+    normalizer = TextNormalizer()
     segmenter = TextSegmenter(max_segment_length=segment_length, max_segment_overlap=segment_overlap)
-    segmented_collection = segmenter.segment(segments)
+    
+    segment_stream = None
+    corpus_loader = None
+    
+    if args.corpus:
+        # Prepare all documents in worker processes and feed them into one extraction run
+        from ..models import SegmentCollection
+        from ..text.corpus import CorpusLoader, find_corpus_files
+        
+        corpus_files = find_corpus_files(args.corpus)
+        if not corpus_files:
+            logger.error(f"No documents found for corpus: {args.corpus}")
+            return
+        logger.info(f"Found {len(corpus_files)} documents in corpus {args.corpus}")
+        
+        corpus_loader = CorpusLoader(
+            max_workers=getattr(args, 'workers', settings.CORPUS_MAX_WORKERS),
+            segment_length=segment_length,
+            segment_overlap=segment_overlap
+        )
+        segmented_collection = SegmentCollection()
+        segment_stream = corpus_loader.iter_segments(corpus_files, segmented_collection)
+        
+        # Without the overlapped pipeline, or when all segments are needed upfront, prepare all documents now
+        if (not getattr(args, 'pipeline', False) or getattr(args, 'gradual', False) or
+                getattr(args, 'max_segments', None)):
+            for _ in segment_stream:
+                pass
+            segment_stream = None
+            logger.info(f"Prepared {len(corpus_loader.documents)} documents")
+    elif getattr(args, 'stream', False):
+        # Read, segment and normalize the file incrementally
+        from ..models import SegmentCollection
+        try:
+            root, chunks = loader.stream(file_path)
+        except Exception as e:
+            logger.error(f"Error loading file: {str(e)}")
+            return
+        
+        segmented_collection = SegmentCollection(document_id=root.document_id)
+        segmented_collection.add_segment(root)
+        # The file itself is not normalized, so the segments keep their spans in it
+        segment_stream = (normalizer.normalize(segment, keep_span=True)
+                          for segment in segmenter.iter_segments(root, chunks))
+        
+        # Without the overlapped pipeline, or when all segments are needed upfront, read the whole stream now
+        if (not getattr(args, 'pipeline', False) or getattr(args, 'gradual', False) or
+                getattr(args, 'max_segments', None)):
+            for segment in segment_stream:
+                segmented_collection.add_segment(segment)
+            segment_stream = None
+            logger.info(f"Streamed {len(segmented_collection.segments) - 1} segments from {file_path}")
+    else:
+        # Load the text
+        try:
+            segments = loader.load(file_path)
+            logger.info(f"Loaded {len(segments.segments)} segments from {file_path}")
+        except Exception as e:
+            logger.error(f"Error loading file: {str(e)}")
+            return
+        
+        # Normalize the text
+        normalized_segments = []
+        for segment in segments.segments.values():
+            normalized_segment = normalizer.normalize(segment)
+            normalized_segments.append(normalized_segment)
+            segments.add_segment(normalized_segment)
+        
+        logger.info(f"Normalized {len(normalized_segments)} segments")
+        
+        # Segment the text
+        segmented_collection = segmenter.segment(segments)
     
     # Limit segments if max_segments specified (for testing with large files)
     max_segments = getattr(args, 'max_segments', None)
@@ -669,6 +829,7 @@ async def process_file(args: argparse.Namespace):
         # Process the file in increasingly larger chunks
         chunk_sizes = [10, 30, 100, 300, 1000, 3000]
         current_segment = 0
+        chunk_graphs = []
         
         for chunk_size in chunk_sizes:
             if current_segment >= total_segments:
@@ -689,7 +850,9 @@ async def process_file(args: argparse.Namespace):
                     chunk_collection.add_segment(segment)
             
             # Process this chunk
-            await process_segment_collection(args, chunk_collection)
+            chunk_graph = await process_segment_collection(args, chunk_collection)
+            if chunk_graph is not None:
+                chunk_graphs.append(chunk_graph)
             
             # Update current position
             current_segment = end_segment
@@ -701,6 +864,22 @@ async def process_file(args: argparse.Namespace):
                 await asyncio.sleep(wait_time)
         
         logger.info("Completed gradual processing of all segments")
+        
+        # Consolidate the graphs of all chunks into one
+        if len(chunk_graphs) > 1:
+            from ..graph import GraphBuilder
+            from .utils import get_subdirectory_path
+            
+            merged_graph = GraphBuilder().merge_graphs(chunk_graphs)
+            graphs_dir = get_subdirectory_path(args.output_dir, "graphs")
+            if getattr(args, 'columnar', False) or settings.SAVE_COLUMNAR:
+                merged_graph.save(os.path.join(str(graphs_dir), "knowledge_graph_merged_columnar"))
+            GraphVisualizer(output_dir=str(graphs_dir)).visualize_html(
+                merged_graph,
+                filename="knowledge_graph_merged.html",
+                title="Knowledge Graph (All Chunks)"
+            )
+            logger.info(f"Merged the graphs of {len(chunk_graphs)} chunks into {graphs_dir}/knowledge_graph_merged.html")
     
     # Regular processing (with optional max_segments limit)
     elif max_segments and len(leaf_segments) > max_segments:
@@ -717,7 +896,23 @@ async def process_file(args: argparse.Namespace):
         await process_segment_collection(args, segmented_collection)
     else:
         # Process the collection
-        await process_segment_collection(args, segmented_collection)
+        await process_segment_collection(
+            args, segmented_collection, segment_stream,
+            documents=corpus_loader.documents if corpus_loader else None
+        )
+    
+    # Report how often the fast model had to be escalated
+    logger.info(model_cascade.get_summary())
+    
+    # Report the extraction saved by skipping near-duplicate segments
+    if getattr(args, 'dedup', False):
+        from ..extraction import segment_deduplicator
+        logger.info(segment_deduplicator.get_summary())
+    
+    # Record usage, budget decisions and escalation rates in the run manifest
+    from .utils import write_run_manifest
+    sections = {"corpus": {"documents": corpus_loader.documents}} if corpus_loader else None
+    write_run_manifest(args.output_dir, args, sections)
     
     # Display summary of output files
     from .utils import display_output_summary
@@ -788,10 +983,20 @@ def setup_parser() -> argparse.ArgumentParser:
     
     # Process file command
     process_parser = subparsers.add_parser("process", help="Process a text file")
-    process_parser.add_argument(
+    source_group = process_parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument(
         "--file", "-f", 
-        help="Path to the text file to process",
-        required=True
+        help="Path to the text file to process"
+    )
+    source_group.add_argument(
+        "--corpus",
+        help="Directory or glob pattern of documents to process together into one graph"
+    )
+    process_parser.add_argument(
+        "--workers",
+        help="Worker processes that prepare corpus documents (default: one per core)",
+        type=int,
+        default=settings.CORPUS_MAX_WORKERS
     )
     process_parser.add_argument(
         "--provider", "-p",
@@ -902,6 +1107,77 @@ def setup_parser() -> argparse.ArgumentParser:
         help="Generate a comprehensive HTML research report",
         action="store_true"
     )
+    process_parser.add_argument(
+        "--max-tokens",
+        help="Maximum total LLM tokens for the run (budget is unlimited if not set)",
+        type=int,
+        default=settings.BUDGET_MAX_TOKENS
+    )
+    process_parser.add_argument(
+        "--max-cost",
+        help="Maximum estimated LLM cost for the run in USD",
+        type=float,
+        default=settings.BUDGET_MAX_COST_USD
+    )
+    process_parser.add_argument(
+        "--max-time",
+        help="Maximum wall time for the run in seconds",
+        type=float,
+        default=settings.BUDGET_MAX_SECONDS
+    )
+    process_parser.add_argument(
+        "--stage-budget",
+        help="Per-stage budget as stage:key=value[,key=value] with keys tokens, cost, seconds "
+             "(e.g. entity_extraction:tokens=200000,cost=0.5); can be repeated",
+        action="append",
+        default=None
+    )
+    process_parser.add_argument(
+        "--no-cascade",
+        help="Send every extraction batch to the reasoning model instead of trying the fast model first",
+        action="store_true"
+    )
+    process_parser.add_argument(
+        "--pipeline",
+        help="Run entity extraction, grounding and relationship extraction as overlapping stages "
+             "(with --stream, extraction starts while the file is still being read)",
+        action="store_true"
+    )
+    process_parser.add_argument(
+        "--dedup",
+        help="Extract near-duplicate segments once and copy the results onto their duplicates",
+        action="store_true"
+    )
+    process_parser.add_argument(
+        "--stream",
+        help="Read and segment the input file incrementally instead of loading it into memory first",
+        action="store_true"
+    )
+    process_parser.add_argument(
+        "--resume",
+        help="Resume an interrupted run in its output directory, extracting only the segments "
+             "missing from its intermediate results",
+        metavar="OUTPUT_DIR",
+        default=None
+    )
+    process_parser.add_argument(
+        "--store",
+        help=f"Also save the graph to a SQLite graph store shared by runs (default path: {settings.GRAPH_STORE_PATH})",
+        nargs="?",
+        const=str(settings.GRAPH_STORE_PATH),
+        default=None
+    )
+    process_parser.add_argument(
+        "--columnar",
+        help="Also save the graph and its segments in the columnar binary format, "
+             "for reloading with KnowledgeGraph.load and SegmentCollection.load",
+        action="store_true"
+    )
+    process_parser.add_argument(
+        "--mmap",
+        help="Memory-map the input file instead of reading it into memory",
+        action="store_true"
+    )
     process_parser.set_defaults(func=process_file)
     
     # List providers command
@@ -6,6 +6,8 @@ import re
 from pathlib import Path
 import logging
 
+from .utils import load_segment_texts
+
 logger = logging.getLogger(__name__)
 
 def ensure_segment_pages(output_dir):
@@ -21,18 +23,15 @@ def ensure_segment_pages(output_dir):
             logger.warning(f"Context directory not found: {context_dir}")
             return
             
-        # Check if segments.json and segment_summaries.json exist
-        segments_path = os.path.join(context_dir, "segments.json")
+        # Check if the segments and segment_summaries.json exist
+        segments = load_segment_texts(context_dir)
         summaries_path = os.path.join(context_dir, "segment_summaries.json")
         
-        if not os.path.exists(segments_path) or not os.path.exists(summaries_path):
+        if not segments or not os.path.exists(summaries_path):
             logger.warning(f"Missing segment data files in {context_dir}")
             return
             
-        # Load segments and summaries
-        with open(segments_path, 'r', encoding='utf-8') as f:
-            segments = json.load(f)
-        
+        # Load summaries
         with open(summaries_path, 'r', encoding='utf-8') as f:
             summaries = json.load(f)
         
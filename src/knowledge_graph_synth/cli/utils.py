@@ -4,9 +4,11 @@ import logging
 import sys
 import os
 import json
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
+from uuid import UUID
 
 from rich.console import Console
 from rich.table import Table
@@ -84,7 +86,7 @@ def create_progress_bar(description: str, total: int) -> Progress:
     Args:
         description: Description of the task
         total: Total number of steps
-        
+    
     Returns:
         Progress bar instance
     """
@@ -98,7 +100,7 @@ def verify_file_exists(file_path: str) -> bool:
     
     Args:
         file_path: Path to the file
-        
+    
     Returns:
         True if the file exists, False otherwise
     """
@@ -119,7 +121,7 @@ def ensure_directory_exists(dir_path: str) -> bool:
     
     Args:
         dir_path: Path to the directory
-        
+    
     Returns:
         True if the directory exists or was created, False otherwise
     """
@@ -130,14 +132,14 @@ def ensure_directory_exists(dir_path: str) -> bool:
     except Exception as e:
         print_error(f"Error creating directory {dir_path}: {str(e)}")
         return False
-        
-        
+
+
 def create_timestamped_dir(base_dir: str) -> Tuple[str, str]:
     """Create a timestamped directory within the base directory.
     
     Args:
         base_dir: Base directory path
-        
+    
     Returns:
         Tuple containing:
           - Full path to the created timestamped directory
@@ -156,7 +158,7 @@ def get_subdirectory_path(base_dir: str, subdir_name: str) -> str:
     Args:
         base_dir: Base directory path
         subdir_name: Name of the subdirectory
-        
+    
     Returns:
         Path to the subdirectory
     """
@@ -172,7 +174,7 @@ def get_relative_path(from_path: str, to_path: str, validate: bool = True) -> st
         from_path: Source file path
         to_path: Target file path
         validate: Whether to validate that both paths exist
-        
+    
     Returns:
         Relative path from source to target
     """
@@ -195,7 +197,7 @@ def resolve_asset_path(output_dir: str, asset_path: str) -> str:
     Args:
         output_dir: Output directory path (may be timestamped)
         asset_path: Relative path to the asset from the output directory
-        
+    
     Returns:
         Absolute path to the asset
     """
@@ -228,12 +230,61 @@ def resolve_asset_path(output_dir: str, asset_path: str) -> str:
     return direct_path
 
 
+class SegmentTexts(Mapping):
+    """Texts of saved segments by segment ID, read from the document text on access."""
+    
+    def __init__(self, collection: Any):
+        """Initialize the mapping.
+        
+        Args:
+            collection: Segment collection loaded with SegmentCollection.load()
+        """
+        self.collection = collection
+    
+    def __getitem__(self, segment_id: str) -> str:
+        try:
+            key = UUID(segment_id)
+        except (TypeError, ValueError):
+            raise KeyError(segment_id)
+        return self.collection.segments[key].text
+    
+    def __iter__(self) -> Iterator[str]:
+        return (str(segment_id) for segment_id in self.collection.segments)
+    
+    def __len__(self) -> int:
+        return len(self.collection.segments)
+
+
+def load_segment_texts(context_dir: str) -> Mapping:
+    """Load the segment texts saved by the contextual analysis.
+    
+    Segments are saved in context/segments_columnar as offsets into one copy
+    of the document text; older runs saved each text in context/segments.json.
+    
+    Args:
+        context_dir: Context directory of a run
+    
+    Returns:
+        Segment texts by segment ID (empty if none were saved)
+    """
+    columnar_path = os.path.join(context_dir, "segments_columnar")
+    if os.path.isdir(columnar_path):
+        from ..models import SegmentCollection
+        return SegmentTexts(SegmentCollection.load(columnar_path))
+    
+    json_path = os.path.join(context_dir, "segments.json")
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
 def is_timestamped_dir(dir_path: str) -> bool:
     """Check if a directory path is a timestamped directory.
     
     Args:
         dir_path: Directory path to check
-        
+    
     Returns:
         True if the directory name follows the timestamp pattern
     """
@@ -253,7 +304,7 @@ def find_output_files(output_dir: str) -> Dict[str, List[str]]:
     
     Args:
         output_dir: Path to the output directory
-        
+    
     Returns:
         Dictionary mapping file categories to file paths
     """
@@ -270,6 +321,9 @@ def find_output_files(output_dir: str) -> Dict[str, List[str]]:
     # Map extensions to categories
     extension_map = {
         ".json": "other",
+        ".jsonl": "other",
+        ".gz": "other",
+        ".zst": "other",
         ".html": "graphs",
         ".md": "reports",
         ".txt": "other"
@@ -319,7 +373,7 @@ def find_output_files(output_dir: str) -> Dict[str, List[str]]:
             # Use directory category if more specific
             if category != "other":
                 file_category = category
-                
+            
             result[file_category].append(file_path)
     
     return result
@@ -379,7 +433,7 @@ def display_output_summary(output_dir: str):
         for path in files["reports"]:
             if path.endswith(".md"):
                 print_success(f"Report: {os.path.basename(path)}")
-                
+    
     if files["theories"]:
         print_header("Theories")
         for path in files["theories"]:
@@ -387,4 +441,80 @@ def display_output_summary(output_dir: str):
                 print_success(f"Theories report: {os.path.basename(path)}")
     
     print("\nTo view output files, navigate to:")
-    print(f"  {os.path.abspath(output_dir)}")
\ No newline at end of file
+    print(f"  {os.path.abspath(output_dir)}")
+
+def parse_stage_budgets(values: Optional[List[str]]) -> Dict[str, Dict[str, float]]:
+    """Parse per-stage budget limits given on the command line.
+    
+    Each value has the form ``stage:key=value[,key=value...]`` where key is
+    one of ``tokens``, ``cost`` or ``seconds``.
+    
+    Args:
+        values: Raw option values
+    
+    Returns:
+        Dictionary mapping stage names to limit dictionaries
+    
+    Raises:
+        ValueError: If a value is malformed
+    """
+    key_map = {"tokens": "tokens", "cost": "cost_usd", "seconds": "seconds"}
+    stage_limits = {}
+    
+    for value in values or []:
+        stage, _, limits_text = value.partition(":")
+        if not stage or not limits_text:
+            raise ValueError(f"Invalid stage budget '{value}', expected stage:key=value")
+        
+        limits = stage_limits.setdefault(stage.strip(), {})
+        for item in limits_text.split(","):
+            key, _, amount = item.partition("=")
+            key = key.strip().lower()
+            if key not in key_map or not amount:
+                raise ValueError(f"Invalid stage budget limit '{item}' (use tokens, cost or seconds)")
+            limits[key_map[key]] = float(amount)
+    
+    return stage_limits
+
+
+def write_run_manifest(output_dir: str, 
+                       args: Any, 
+                       sections: Optional[Dict[str, Any]] = None) -> str:
+    """Write the run manifest with arguments, token usage, budget, cascade and deduplication stats.
+    
+    Args:
+        output_dir: Output directory of the run
+        args: Parsed command-line arguments
+        sections: Additional manifest sections to include
+    
+    Returns:
+        Path to the written manifest
+    """
+    from ..llm.base import token_counter
+    from ..llm.budget import budget_controller
+    from ..llm.cascade import model_cascade
+    from ..extraction.dedup import segment_deduplicator
+    
+    arguments = {
+        key: value for key, value in vars(args).items()
+        if not callable(value)
+    }
+    
+    manifest = {
+        "created_at": datetime.now().isoformat(),
+        "output_dir": output_dir,
+        "arguments": arguments,
+        "token_usage": token_counter.estimate_cost(),
+        "budget": budget_controller.to_manifest(),
+        "model_cascade": model_cascade.to_manifest(),
+        "deduplication": segment_deduplicator.to_manifest(),
+    }
+    if sections:
+        manifest.update(sections)
+    
+    manifest_path = os.path.join(output_dir, "run_manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+    
+    logger.info(f"Run manifest saved to {manifest_path}")
+    return manifest_path
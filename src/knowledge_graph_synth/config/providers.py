@@ -57,12 +57,31 @@ DEEPSEEK_CONFIG = {
     },
 }
 
+# Router backends: one per configured provider API key
+ROUTER_BACKENDS = [
+    {"name": f"{provider}-{i+1}", "provider": provider, "api_key": key}
+    for provider in ["gemini", "openai", "anthropic", "deepseek"]
+    for i, key in enumerate(settings.get_api_keys(provider))
+]
+
+# Router configuration (spreads requests across the backends above)
+ROUTER_CONFIG = {
+    # The router is usable as soon as one backend has a key
+    "api_key": ROUTER_BACKENDS[0]["api_key"] if ROUTER_BACKENDS else None,
+    "backends": ROUTER_BACKENDS,
+    "failure_threshold": settings.ROUTER_FAILURE_THRESHOLD,
+    "cooldown_seconds": settings.ROUTER_COOLDOWN_SECONDS,
+    "quota_cooldown_seconds": settings.ROUTER_QUOTA_COOLDOWN_SECONDS,
+    "requests_per_minute": settings.ROUTER_REQUESTS_PER_MINUTE,
+}
+
 # Map of all available providers
 PROVIDER_CONFIGS = {
     "gemini": GEMINI_CONFIG,
     "openai": OPENAI_CONFIG,
     "anthropic": ANTHROPIC_CONFIG,
     "deepseek": DEEPSEEK_CONFIG,
+    "router": ROUTER_CONFIG,
 }
 
 
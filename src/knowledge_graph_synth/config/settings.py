@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 import dotenv
 
@@ -23,10 +23,41 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 # Language settings
 SUPPORTED_LANGUAGES = ["en", "ru"]
 DEFAULT_LANGUAGE = "en"
+LANGUAGE_SAMPLE_SIZE = 2000  # Characters analyzed for language detection
+LANGUAGE_CYRILLIC_RATIO = 0.6  # Share of Cyrillic letters from which a text is Russian without langdetect
+LANGUAGE_LATIN_RATIO = 0.9  # Share of Latin letters from which a text is English without langdetect
+LANGUAGE_CACHE_SIZE = 10000  # Memoized language detection results
 
 # Text processing settings
 MAX_SEGMENT_LENGTH = 25000  # Maximum characters per segment (увеличено для более смысловых кусков)
 MAX_SEGMENT_OVERLAP = 800  # Overlap between segments (увеличено для лучшей связности)
+STREAM_CHUNK_SIZE = 1 << 20  # Bytes read at a time when streaming a document
+STREAM_MAX_PENDING_TEXT = 1 << 22  # Characters buffered without a paragraph break before a forced split
+STREAM_TRANSCRIPT_BUFFER_TOPICS = 4  # Topics of the maximum segment length buffered for topic detection when streaming transcripts
+CORPUS_FILE_PATTERNS = ["*.txt", "*.vtt", "*.md"]  # Documents picked up when a corpus is a directory
+CORPUS_MAX_WORKERS = int(os.getenv("CORPUS_MAX_WORKERS")) if os.getenv("CORPUS_MAX_WORKERS") else None  # None: one per core
+
+# Sentence segmentation settings
+SENTENCE_BACKEND = os.getenv("SENTENCE_BACKEND", "regex")  # "regex" or "spacy"
+SPACY_MODELS = {  # Pipelines whose sentence recognizer is used by the spaCy backend
+    "en": "en_core_web_sm",
+    "ru": "ru_core_news_sm",
+}
+SPACY_BATCH_SIZE = 64  # Texts per nlp.pipe batch
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))  # Processes used by nlp.pipe
+
+# Near-duplicate segment detection settings (MinHash with LSH banding)
+DEDUP_SIMILARITY_THRESHOLD = 0.9  # Minimum estimated Jaccard similarity of duplicate segments
+DEDUP_NUM_PERMUTATIONS = 128  # MinHash functions per signature
+DEDUP_BANDS = 32  # LSH bands (rows per band = permutations / bands)
+DEDUP_SHINGLE_SIZE = 5  # Words per shingle
+DEDUP_MIN_SEGMENT_LENGTH = 200  # Shorter segments are always extracted
+
+# Transcript topic segmentation settings (TextTiling)
+TILING_WINDOW = 10  # Utterances on each side of a gap compared for lexical cohesion
+TILING_SMOOTHING = 2  # Half-width of the moving average applied to cohesion scores
+TILING_MIN_TOPIC_UTTERANCES = 15  # Minimum utterances per topic
+TILING_DIMENSIONS = 1024  # Size of the hashed term vectors
 
 # LLM settings
 DEFAULT_LLM_PROVIDER = "gemini"
@@ -35,8 +66,37 @@ LLM_MAX_RETRIES = 5  # Повышенное количество повторн
 LLM_DELAY_BETWEEN_REQUESTS = 5.0  # Задержка между запросами в секундах (увеличена для снижения вероятности превышения квоты)
 LLM_MEGA_BATCH_SIZE = 100  # Количество сегментов для мега-батчевой обработки в одном запросе
 LLM_BATCH_SIZE = 25  # Количество сегментов для обычной батчевой обработки в одном запросе
+PIPELINE_BATCH_SIZE = 25  # Segments per batch flowing through the overlapped extraction pipeline
+PIPELINE_QUEUE_SIZE = 2  # Batches that may wait between two pipeline stages
+PIPELINE_ENTITY_WORKERS = 2  # Concurrent entity extraction batches in the pipeline
+LLM_CONTEXT_CACHE_MIN_TOKENS = 4096  # Smallest prefix worth caching on the provider side
+LLM_CONTEXT_CACHE_TTL = 3600  # Lifetime of provider-side context caches in seconds
 LLM_CONTEXT_WINDOW_SIZE = 500000  # Размер контекстного окна для моделей Gemini (в токенах)
 
+# Budget settings (limits are disabled unless set)
+BUDGET_MAX_TOKENS = int(os.getenv("BUDGET_MAX_TOKENS")) if os.getenv("BUDGET_MAX_TOKENS") else None
+BUDGET_MAX_COST_USD = float(os.getenv("BUDGET_MAX_COST_USD")) if os.getenv("BUDGET_MAX_COST_USD") else None
+BUDGET_MAX_SECONDS = float(os.getenv("BUDGET_MAX_SECONDS")) if os.getenv("BUDGET_MAX_SECONDS") else None
+BUDGET_DEGRADATION_THRESHOLDS = {  # Consumed budget fraction at which each degradation step starts
+    "fast_model": 0.5,
+    "skip_connection_analysis": 0.65,
+    "shrink_expansion": 0.8,
+    "cap_theories": 0.9,
+}
+
+# Model cascade settings (fast model first, escalate doubtful segments)
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "true").lower() in ("1", "true", "yes")
+CASCADE_FAST_MODEL = "fast"
+CASCADE_ESCALATION_MODEL = "reasoning"
+CASCADE_MIN_CONFIDENCE = 0.75  # Minimum mean confidence of a segment's items
+CASCADE_MAX_INVALID_RATIO = 0.3  # Maximum share of items whose quoted text is not in the segment
+
+# Router provider settings (load balancing across providers and API keys)
+ROUTER_FAILURE_THRESHOLD = 3  # Consecutive failures that open a backend's circuit breaker
+ROUTER_COOLDOWN_SECONDS = 60.0  # How long an open circuit rejects requests before a trial call
+ROUTER_QUOTA_COOLDOWN_SECONDS = 300.0  # How long a backend is skipped after a quota error
+ROUTER_REQUESTS_PER_MINUTE = int(os.getenv("ROUTER_REQUESTS_PER_MINUTE")) if os.getenv("ROUTER_REQUESTS_PER_MINUTE") else None
+
 # Gemini model configuration
 GEMINI_MODELS = {
     "default": "gemini-2.0-pro-exp-02-05",  # Using pro-exp model as default for JSON tasks
@@ -55,8 +115,22 @@ DEFAULT_GENERATION_CONFIG = {
 
 # Graph settings
 DEFAULT_CONFIDENCE_THRESHOLD = 0.7  # Minimum confidence score for entities and relationships
+GRAPH_STORE_PATH = Path(os.getenv("GRAPH_STORE_PATH", BASE_DIR / "output" / "graphs.db"))  # SQLite store shared by runs
+GRAPH_ANALYTICS_BACKEND = os.getenv("GRAPH_ANALYTICS_BACKEND", "auto")  # "auto" (SciPy if installed), "scipy" or "networkx"
+GRAPH_ANALYTICS_SAMPLES = int(os.getenv("GRAPH_ANALYTICS_SAMPLES", "256"))  # BFS sources sampled for betweenness and path lengths on larger graphs
+GRAPH_ANALYSIS_CACHE_SIZE = int(os.getenv("GRAPH_ANALYSIS_CACHE_SIZE", "64"))  # Analysis results memoized per graph version
+COMMUNITY_RESOLUTION = 1.0  # Louvain resolution (higher values give smaller communities)
+COMMUNITY_SEED = 42  # Random seed of community detection, for reproducible meta-graphs
+MOTIF_TOP_N = int(os.getenv("MOTIF_TOP_N", "10"))  # Structural patterns reported per motif kind, ranked by surprise
+MOTIF_MAX_SECONDS = float(os.getenv("MOTIF_MAX_SECONDS", "10"))  # Time budget of motif mining
+MOTIF_MAX_PAIRS = int(os.getenv("MOTIF_MAX_PAIRS", "2000000"))  # Largest batch of walks or wedges held in memory during motif mining
+GRAPH_MERGE_FAN_IN = 8  # Graphs merged together at each level of a tree reduction
+GRAPH_MERGE_MAX_WORKERS = int(os.getenv("GRAPH_MERGE_MAX_WORKERS")) if os.getenv("GRAPH_MERGE_MAX_WORKERS") else None  # None: one per core
+GRAPH_MERGE_PARALLEL_MIN_SIZE = 200000  # Entities plus relationships below which graphs are reduced in-process
 
 # Output settings
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "none")  # Intermediate JSONL artifacts: "none", "gzip" or "zstd"
+SAVE_COLUMNAR = os.getenv("SAVE_COLUMNAR", "false").lower() in ("1", "true", "yes")  # Also save graphs and segments in the columnar format (same as --columnar)
 DEFAULT_OUTPUT_FORMAT = "markdown"
 AVAILABLE_OUTPUT_FORMATS = ["markdown", "html", "json"]
 
@@ -81,4 +155,37 @@ def get_api_key(provider: str) -> Optional[str]:
     if not env_var:
         return None
     
-    return os.getenv(env_var)
\ No newline at end of file
+    return os.getenv(env_var)
+
+
+def get_api_keys(provider: str) -> List[str]:
+    """Get all API keys for a specific provider.
+    
+    Besides the regular key variable (e.g., GOOGLE_API_KEY), a comma-separated
+    list can be given in the plural variable (e.g., GOOGLE_API_KEYS).
+    
+    Args:
+        provider: The LLM provider name
+        
+    Returns:
+        List of distinct API keys (may be empty)
+    """
+    keys = []
+    single_key = get_api_key(provider)
+    if single_key:
+        keys.append(single_key)
+    
+    key_map = {
+        "gemini": "GOOGLE_API_KEYS",
+        "openai": "OPENAI_API_KEYS",
+        "anthropic": "ANTHROPIC_API_KEYS",
+        "deepseek": "DEEPSEEK_API_KEYS",
+    }
+    env_var = key_map.get(provider.lower())
+    if env_var:
+        for key in os.getenv(env_var, "").split(","):
+            key = key.strip()
+            if key and key not in keys:
+                keys.append(key)
+    
+    return keys
\ No newline at end of file
@@ -8,10 +8,15 @@ from .entity_extractor import EntityExtractor
 from .relation_extractor import RelationshipExtractor
 from .coreference import CoreferenceResolver
 from .grounding import Grounder
+from .pipeline import ExtractionPipeline
+from .dedup import SegmentDeduplicator, segment_deduplicator
 
 __all__ = [
     "EntityExtractor",
     "RelationshipExtractor",
     "CoreferenceResolver",
-    "Grounder"
+    "Grounder",
+    "ExtractionPipeline",
+    "SegmentDeduplicator",
+    "segment_deduplicator"
 ]
\ No newline at end of file
@@ -5,7 +5,7 @@ from typing import Dict, List, Optional, Any, Set, Tuple
 from uuid import UUID
 import re
 
-from ..models import Entity, Relationship
+from ..models import Entity, EntityAttribute, Relationship
 
 logger = logging.getLogger(__name__)
 
@@ -38,8 +38,23 @@ class CoreferenceResolver:
         Returns:
             List of merged entities
         """
+        merged_entities, _ = self.resolve_with_mapping(entities)
+        return merged_entities
+    
+    def resolve_with_mapping(self, entities: List[Entity]) -> Tuple[List[Entity], Dict[UUID, UUID]]:
+        """Identify and merge coreferent entities, keeping track of merged IDs.
+        
+        Args:
+            entities: List of entities to resolve
+            
+        Returns:
+            (merged_entities, old_to_new_ids) tuple, where old_to_new_ids maps
+            the ID of every merged-away entity to the ID of its merged entity
+            (suitable for update_relationships)
+        """
+        old_to_new_ids = {}
         if not entities:
-            return []
+            return [], old_to_new_ids
         
         # Group entities by canonical form of their names
         canonical_groups = {}
@@ -79,9 +94,12 @@ class CoreferenceResolver:
                     # Merge entities
                     merged_entity = self._merge_entities(type_group)
                     merged_entities.append(merged_entity)
+                    for entity in type_group:
+                        if entity.id != merged_entity.id:
+                            old_to_new_ids[entity.id] = merged_entity.id
         
         logger.info(f"Resolved {len(entities)} entities into {len(merged_entities)} unique entities")
-        return merged_entities
+        return merged_entities, old_to_new_ids
     
     def update_relationships(self, 
                           relationships: List[Relationship],
@@ -182,6 +200,11 @@ class CoreferenceResolver:
     def _merge_entities(self, entities: List[Entity]) -> Entity:
         """Merge a list of entities into a single entity.
         
+        The merged entity keeps the ID of the entity with the highest
+        confidence (the smallest ID on ties), so the same entities merge
+        into the same ID in every run, and relationships saved by an
+        interrupted run still point at it when the run is resumed.
+        
         Args:
             entities: List of entities to merge
             
@@ -194,14 +217,15 @@ class CoreferenceResolver:
         if len(entities) == 1:
             return entities[0]
         
-        # Sort entities by confidence (highest first)
-        sorted_entities = sorted(entities, key=lambda e: e.confidence, reverse=True)
+        # Sort entities by confidence (highest first), independently of their order
+        sorted_entities = sorted(entities, key=lambda e: (-e.confidence, e.id))
         
         # Use the highest confidence entity as the base
         base_entity = sorted_entities[0]
         
-        # Create a new entity with the same core properties
+        # Create a new entity with the same core properties and ID
         merged_entity = Entity(
+            id=base_entity.id,
             name=base_entity.name,
             type=base_entity.type,
             confidence=base_entity.confidence,
@@ -218,6 +242,16 @@ class CoreferenceResolver:
                 if key not in all_attributes or attr.confidence > all_attributes[key].confidence:
                     all_attributes[key] = attr
         
+        # Remember all documents the merged mentions come from
+        documents = set()
+        for entity in sorted_entities:
+            if entity.source_span and entity.source_span.document_id:
+                documents.add(entity.source_span.document_id)
+            for attr in entity.get_attribute("source_documents"):
+                documents.update(attr.value)
+        if len(documents) > 1:
+            all_attributes["source_documents"] = EntityAttribute(key="source_documents", value=sorted(documents))
+        
         # Add attributes to merged entity
         for attr in all_attributes.values():
             merged_entity.add_attribute(
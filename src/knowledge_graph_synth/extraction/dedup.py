@@ -0,0 +1,327 @@
+"""Near-duplicate segment detection for the knowledge graph synthesis system."""
+
+import logging
+import re
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+from uuid import UUID, uuid5
+
+import numpy as np
+
+from ..models import Entity, Relationship, TextSegment, SourceSpan
+from ..config import settings
+from ..output.artifacts import segment_key
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentDeduplicator:
+    """Clusters near-identical segments so each cluster is extracted once.
+    
+    Every segment gets a MinHash signature of its word shingles. Signatures
+    are split into bands and indexed by band, so a new segment is only
+    compared with segments that share a band (locality-sensitive hashing).
+    A segment whose estimated Jaccard similarity with an earlier segment
+    reaches the threshold becomes a member of that segment's cluster and is
+    not sent to the LLM. Entities and relationships extracted from the
+    representative are afterwards projected onto the members, with source
+    spans located in the member's own text.
+    """
+    
+    # Multiplier used to combine word hashes into shingle hashes
+    SHINGLE_BASE = np.uint64(1000003)
+    
+    def __init__(self,
+               threshold: float = settings.DEDUP_SIMILARITY_THRESHOLD,
+               num_permutations: int = settings.DEDUP_NUM_PERMUTATIONS,
+               bands: int = settings.DEDUP_BANDS,
+               shingle_size: int = settings.DEDUP_SHINGLE_SIZE,
+               min_length: int = settings.DEDUP_MIN_SEGMENT_LENGTH):
+        """Initialize the segment deduplicator.
+        
+        Args:
+            threshold: Minimum estimated Jaccard similarity of two segments
+                to treat them as duplicates
+            num_permutations: Number of MinHash functions
+            bands: Number of LSH bands (must divide num_permutations)
+            shingle_size: Words per shingle
+            min_length: Segments shorter than this (in characters) are never
+                deduplicated
+        """
+        self.threshold = threshold
+        self.num_permutations = num_permutations
+        self.bands = bands
+        self.rows = num_permutations // bands
+        self.shingle_size = shingle_size
+        self.min_length = min_length
+        
+        self.word_pattern = re.compile(r'\w+')
+        
+        # Multiply-shift hash functions; fixed seed keeps signatures stable across runs
+        random = np.random.default_rng(0)
+        self._multipliers = random.integers(1, 2**63, num_permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._offsets = random.integers(0, 2**63, num_permutations, dtype=np.uint64)
+        
+        self.reset()
+    
+    def reset(self) -> None:
+        """Forget all clusters and reset the statistics."""
+        self.stats = {"segments": 0, "duplicates": 0, "characters": 0, "duplicate_characters": 0,
+                      "projected_entities": 0, "projected_relationships": 0}
+        self.clear()
+    
+    def clear(self) -> None:
+        """Forget all clusters (statistics are kept for the run)."""
+        self.representatives = {}  # Segment ID -> representative segment
+        self.members = {}  # Representative ID -> duplicate segments
+        self._signatures = {}
+        self._buckets = {}
+    
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text.
+        
+        Args:
+            text: Text to sign
+        
+        Returns:
+            Array of num_permutations minimum hash values
+        """
+        words = self.word_pattern.findall(text.lower())
+        hashes = np.fromiter(
+            (zlib.crc32(word.encode("utf-8")) for word in words),
+            dtype=np.uint64, count=len(words)
+        )
+        
+        # Combine consecutive word hashes into shingle hashes
+        size = min(self.shingle_size, len(hashes))
+        if size == 0:
+            return np.zeros(self.num_permutations, dtype=np.uint64)
+        shingles = np.zeros(len(hashes) - size + 1, dtype=np.uint64)
+        for i in range(size):
+            shingles = shingles * self.SHINGLE_BASE + hashes[i:len(hashes) - size + 1 + i]
+        shingles = np.unique(shingles)
+        
+        # Arithmetic wraps modulo 2**64, the high bits are the hash value
+        values = (self._multipliers[:, None] * shingles[None, :] + self._offsets[:, None]) >> np.uint64(32)
+        return values.min(axis=1)
+    
+    def add(self, segment: TextSegment) -> Optional[TextSegment]:
+        """Register a segment.
+        
+        Args:
+            segment: Segment to register
+        
+        Returns:
+            The representative of the segment's cluster if it is a near
+            duplicate of an earlier segment, otherwise None
+        """
+        text = segment.text
+        self.stats["segments"] += 1
+        self.stats["characters"] += len(text)
+        
+        if len(text) < self.min_length:
+            return None
+        
+        signature = self.signature(text)
+        band_keys = [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+        
+        # Compare only with segments that share at least one band
+        candidates = []
+        for key in band_keys:
+            for candidate_id in self._buckets.get(key, ()):
+                if candidate_id not in candidates:
+                    candidates.append(candidate_id)
+        
+        for candidate_id in candidates:
+            similarity = float(np.mean(self._signatures[candidate_id] == signature))
+            if similarity >= self.threshold:
+                representative = self.representatives[candidate_id]
+                self.members.setdefault(candidate_id, []).append(segment)
+                self.stats["duplicates"] += 1
+                self.stats["duplicate_characters"] += len(text)
+                return representative
+        
+        self.representatives[segment.id] = segment
+        self._signatures[segment.id] = signature
+        for key in band_keys:
+            self._buckets.setdefault(key, []).append(segment.id)
+        return None
+    
+    def filter(self, segments: Iterable[TextSegment]) -> Iterator[TextSegment]:
+        """Drop near duplicates from a sequence of segments.
+        
+        Args:
+            segments: Segments in document order (a list or a generator)
+        
+        Yields:
+            Segments that are not near duplicates of an earlier segment
+        """
+        for segment in segments:
+            if self.add(segment) is None:
+                yield segment
+    
+    def deduplicate(self, segments: Iterable[TextSegment]) -> List[TextSegment]:
+        """Drop near duplicates from a list of segments.
+        
+        Args:
+            segments: Segments in document order
+        
+        Returns:
+            Segments that are not near duplicates of an earlier segment
+        """
+        unique_segments = list(self.filter(segments))
+        if self.members:
+            duplicates = sum(len(members) for members in self.members.values())
+            logger.info(f"Skipping {duplicates} near-duplicate segments in {len(self.members)} clusters")
+        return unique_segments
+    
+    def _project_span(self, span: SourceSpan,
+                    member: TextSegment,
+                    fallback_text: Optional[str] = None) -> Optional[SourceSpan]:
+        """Locate a source span of a representative in a cluster member.
+        
+        Args:
+            span: Source span in the representative's text
+            member: Cluster member
+            fallback_text: Text to look for if the span text is not found
+        
+        Returns:
+            Source span in the member's text, or None if the text does not
+            occur in the member
+        """
+        member_text = member.text
+        for needle, lowered in ((span.text, False), (fallback_text, True)):
+            if not needle:
+                continue
+            
+            haystack = member_text.lower() if lowered else member_text
+            needle = needle.lower() if lowered else needle
+            
+            # Use the occurrence closest to the original position
+            best = None
+            position = haystack.find(needle)
+            while position != -1:
+                if best is None or abs(position - span.start) < abs(best - span.start):
+                    best = position
+                position = haystack.find(needle, position + 1)
+            
+            if best is not None:
+                return SourceSpan(
+                    document_id=member.document_id,
+                    segment_id=str(member.id),
+                    start=best,
+                    end=best + len(needle),
+                    text=member_text[best:best + len(needle)]
+                )
+        return None
+    
+    def _cluster_items(self, items: List[Any]) -> Iterator[Tuple[Any, TextSegment]]:
+        """Pair items from representatives with the members of their cluster.
+        
+        Args:
+            items: Entities or relationships
+        
+        Yields:
+            (item, member) pairs
+        """
+        for item in items:
+            segment_id = item.source_span.segment_id if item.source_span else None
+            if not segment_id:
+                continue
+            for member in self.members.get(UUID(segment_id), ()):
+                yield item, member
+    
+    def _projected_id(self, item_id: UUID, member: TextSegment) -> UUID:
+        """Get the ID of the copy of an entity or relationship in a cluster member.
+        
+        The ID depends only on the original and on the position and text of
+        the member, so it is the same in a resumed run.
+        
+        Args:
+            item_id: ID of the original entity or relationship
+            member: Cluster member the copy belongs to
+        
+        Returns:
+            ID of the copy
+        """
+        return uuid5(item_id, segment_key(member))
+    
+    def project_entities(self, entities: List[Entity]) -> List[Entity]:
+        """Copy entities of representatives onto the members of their clusters.
+        
+        Args:
+            entities: Entities extracted from representatives
+        
+        Returns:
+            The entities followed by their copies in cluster members
+        """
+        projected = []
+        for entity, member in self._cluster_items(entities):
+            span = self._project_span(entity.source_span, member, entity.name)
+            if span is not None:
+                projected.append(entity.model_copy(update={"id": self._projected_id(entity.id, member),
+                                                           "source_span": span}, deep=True))
+        
+        self.stats["projected_entities"] += len(projected)
+        return entities + projected
+    
+    def project_relationships(self, relationships: List[Relationship]) -> List[Relationship]:
+        """Copy relationships of representatives onto the members of their clusters.
+        
+        The copies keep their source and target entity IDs.
+        
+        Args:
+            relationships: Relationships extracted from representatives
+        
+        Returns:
+            The relationships followed by their copies in cluster members
+        """
+        projected = []
+        for relationship, member in self._cluster_items(relationships):
+            span = self._project_span(relationship.source_span, member)
+            if span is not None:
+                projected.append(relationship.model_copy(update={"id": self._projected_id(relationship.id, member),
+                                                                 "source_span": span}, deep=True))
+        
+        self.stats["projected_relationships"] += len(projected)
+        return relationships + projected
+    
+    def get_summary(self) -> str:
+        """Get a human-readable summary of the savings.
+        
+        Returns:
+            Formatted summary string
+        """
+        if not self.stats["segments"]:
+            return "Segment deduplication: no segments processed"
+        
+        share = self.stats["duplicate_characters"] / max(self.stats["characters"], 1)
+        return (f"Segment deduplication: {self.stats['duplicates']}/{self.stats['segments']} segments "
+                f"skipped ({share:.1%} of the text), {self.stats['projected_entities']} entities and "
+                f"{self.stats['projected_relationships']} relationships projected onto duplicates")
+    
+    def to_manifest(self) -> Dict[str, Any]:
+        """Get the deduplication settings and savings for the run manifest.
+        
+        Returns:
+            Dictionary with thresholds and statistics
+        """
+        return {
+            "threshold": self.threshold,
+            "num_permutations": self.num_permutations,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            **self.stats,
+            "saved_characters_ratio": round(
+                self.stats["duplicate_characters"] / max(self.stats["characters"], 1), 4
+            ),
+            # Rough estimate (4 characters per token) for each extraction pass
+            "estimated_saved_tokens_per_pass": self.stats["duplicate_characters"] // 4,
+        }
+
+
+# Global segment deduplicator instance
+segment_deduplicator = SegmentDeduplicator()
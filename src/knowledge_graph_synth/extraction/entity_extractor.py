@@ -10,7 +10,11 @@ import asyncio
 from ..config import settings
 from ..models import TextSegment, SegmentCollection, Entity, SourceSpan
 from ..llm import LLMProviderFactory, prompt_manager, ResponseValidator
+from ..llm.budget import budget_controller, BudgetExceededError
+from ..llm.cascade import model_cascade
+from ..llm.handles import PromptHandles
 from ..llm.schemas import get_entity_extraction_schema, get_entity_analysis_schema
+from ..output.artifacts import ExtractionCheckpoint
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +38,9 @@ class EntityExtractor:
         self.provider_name = provider_name
         self.confidence_threshold = confidence_threshold
         self.validator = ResponseValidator()
+        
+        # Segments whose extraction was skipped or failed; a resumed run extracts them again
+        self.failed_segments: Set[UUID] = set()
     
     async def extract_from_segment(self, segment: TextSegment) -> List[Entity]:
         """Extract entities from a single text segment.
@@ -49,6 +56,7 @@ class EntityExtractor:
             provider = LLMProviderFactory.get_provider(self.provider_name)
         except Exception as e:
             logger.error(f"Error getting LLM provider: {str(e)}")
+            self.failed_segments.add(segment.id)
             return []
         
         # Get the appropriate prompt template for the segment's language
@@ -64,6 +72,7 @@ class EntityExtractor:
         
         if not prompt:
             logger.error(f"Error getting prompt template for entity extraction ({language})")
+            self.failed_segments.add(segment.id)
             return []
         
         # Extract entities using the LLM
@@ -89,6 +98,7 @@ class EntityExtractor:
             
         except Exception as e:
             logger.error(f"Error extracting entities: {str(e)}")
+            self.failed_segments.add(segment.id)
             return []
         
         # Convert response to Entity objects
@@ -130,7 +140,8 @@ class EntityExtractor:
         
         return entities
     
-    async def extract_from_mega_batch(self, segments: List[TextSegment]) -> List[Entity]:
+    async def extract_from_mega_batch(self, segments: List[TextSegment],
+                                    model_name: Optional[str] = None) -> List[Entity]:
         """Extract entities from a super large batch of segments using a single LLM call.
         
         This method leverages the massive context window of Gemini models (up to 1M tokens)
@@ -139,6 +150,7 @@ class EntityExtractor:
         
         Args:
             segments: List of text segments to process in a single mega batch
+            model_name: Model to use (None runs the model cascade)
             
         Returns:
             List of extracted entities
@@ -223,7 +235,7 @@ VERY IMPORTANT:
 - Be precise with position indexes - they must exactly match the source text
 - Maintain all entity mentions in their original language (don't translate)
 - Return complete results for all segments
-- Use the segment_id as provided for each segment to maintain traceability
+- Use the segment handle (S1, S2, ...) as the segment_id for each segment to maintain traceability
 - Focus particularly on organizations, people, products, services, technologies, and key concepts
 - For transcript segments, extract entities that relate to the topics being discussed
 """
@@ -233,22 +245,25 @@ VERY IMPORTANT:
             provider = LLMProviderFactory.get_provider(self.provider_name)
         except Exception as e:
             logger.error(f"Error getting LLM provider: {str(e)}")
+            self.failed_segments.update(segment.id for segment in segments)
             return []
         
         # Create segment data - format as efficiently as possible
         segments_text = "# SEGMENTS TO PROCESS\n\n"
         
         # Create a compact representation of the segments to maximize context usage
-        for i, segment in enumerate(segments):
-            segments_text += f"SEGMENT {i+1} [ID: {segment.id}]\n{segment.text}\n\n"
+        # (short handles instead of UUIDs, mapped back when parsing the response)
+        handles = PromptHandles()
+        for segment in segments:
+            segments_text += f"SEGMENT {handles.segment_handle(segment)}\n{segment.text}\n\n"
             
         # Split the mega batch if it grows too large
         # This is a safety measure in case the text is still too large
         if len(segments_text) > settings.LLM_CONTEXT_WINDOW_SIZE / 2:  # Use half of the context window for safety
             logger.warning(f"Mega batch too large ({len(segments_text)} chars), splitting")
             mid = len(segments) // 2
-            first_half = await self.extract_from_mega_batch(segments[:mid])
-            second_half = await self.extract_from_mega_batch(segments[mid:])
+            first_half = await self.extract_from_mega_batch(segments[:mid], model_name)
+            second_half = await self.extract_from_mega_batch(segments[mid:], model_name)
             return first_half + second_half
         
         # Create the full prompt
@@ -257,10 +272,12 @@ VERY IMPORTANT:
         # Log the size of the request
         logger.info(f"Processing mega batch with {len(segments)} segments ({len(prompt)} chars)")
         
+        # Run the fast model first unless a specific model was requested
+        use_cascade = model_name is None and model_cascade.enabled
+        model_name = model_name or model_cascade.first_model("reasoning")
+        
         # Extract entities using the LLM
         try:
-            # Use the model with the largest context window and best reasoning
-            model_name = "reasoning"
             
             # Make the API call
             logger.info(f"Submitting mega batch request to {model_name} model")
@@ -275,6 +292,17 @@ VERY IMPORTANT:
             processing_time = time.time() - start_time
             logger.info(f"Mega batch processed in {processing_time:.2f} seconds")
             
+            # Map segment handles back to segment IDs
+            response = handles.decode_segments(response)
+            
+            # Keep segments the fast model handled well, re-run the rest on the stronger model
+            escalated_segments = []
+            if use_cascade:
+                response, escalated_segments = model_cascade.review(
+                    response, segments, "entities", "entity_extraction",
+                    batch_schema["properties"]["segments"]["items"]
+                )
+            
             # Process the response
             all_entities = []
             
@@ -323,33 +351,49 @@ VERY IMPORTANT:
                                 
                             all_entities.append(entity)
             
+            if escalated_segments:
+                all_entities.extend(await self.extract_from_mega_batch(
+                    escalated_segments, model_cascade.escalation_model
+                ))
+            
             logger.info(f"Extracted {len(all_entities)} entities from mega batch")
             return all_entities
             
+        except BudgetExceededError as e:
+            logger.warning(f"Skipping mega batch: {str(e)}")
+            self.failed_segments.update(segment.id for segment in segments)
+            return []
         except Exception as e:
             logger.error(f"Error extracting entities from mega batch: {str(e)}")
             
+            # A failed fast-model call escalates the whole batch
+            if use_cascade:
+                model_cascade.record("entity_extraction", len(segments), ["error"] * len(segments))
+                return await self.extract_from_mega_batch(segments, model_cascade.escalation_model)
+            
             # If mega batch fails, split it and try again
             if len(segments) > 1:
                 logger.info(f"Splitting mega batch into smaller batches")
                 mid = len(segments) // 2
-                first_half = await self.extract_from_mega_batch(segments[:mid])
+                first_half = await self.extract_from_mega_batch(segments[:mid], model_name)
                 
                 # Add extra delay before processing second half
                 await asyncio.sleep(settings.LLM_DELAY_BETWEEN_REQUESTS * 2)
                 
-                second_half = await self.extract_from_mega_batch(segments[mid:])
+                second_half = await self.extract_from_mega_batch(segments[mid:], model_name)
                 return first_half + second_half
             else:
                 # For single segments, try the regular extraction
                 logger.info(f"Falling back to individual segment extraction")
                 return await self.extract_from_batch(segments)
     
-    async def extract_from_batch(self, segments: List[TextSegment]) -> List[Entity]:
+    async def extract_from_batch(self, segments: List[TextSegment],
+                               model_name: Optional[str] = None) -> List[Entity]:
         """Extract entities from a batch of segments using a single LLM call.
         
         Args:
             segments: List of text segments to process in a single batch
+            model_name: Model to use (None runs the model cascade)
             
         Returns:
             List of extracted entities
@@ -419,6 +463,7 @@ VERY IMPORTANT:
             provider = LLMProviderFactory.get_provider(self.provider_name)
         except Exception as e:
             logger.error(f"Error getting LLM provider: {str(e)}")
+            self.failed_segments.update(segment.id for segment in segments)
             return []
         
         # Create a prompt for batch extraction
@@ -448,11 +493,12 @@ Return the results as a structured JSON object with a "segments" array containin
 Be precise about the source spans - they must match the exact text positions.
 """
         
+        # Run the fast model first unless a specific model was requested
+        use_cascade = model_name is None and model_cascade.enabled
+        model_name = model_name or model_cascade.first_model("reasoning")
+        
         # Extract entities using the LLM
         try:
-            # Use reasoning model for better extraction
-            model_name = "reasoning"
-            
             # Extract entities
             response = await provider.generate_structured(
                 prompt,
@@ -460,6 +506,14 @@ Be precise about the source spans - they must match the exact text positions.
                 model_name
             )
             
+            # Keep segments the fast model handled well, re-run the rest on the stronger model
+            escalated_segments = []
+            if use_cascade:
+                response, escalated_segments = model_cascade.review(
+                    response, segments, "entities", "entity_extraction",
+                    batch_schema["properties"]["segments"]["items"]
+                )
+            
             # Process the response
             all_entities = []
             
@@ -508,10 +562,25 @@ Be precise about the source spans - they must match the exact text positions.
                                 
                             all_entities.append(entity)
             
+            if escalated_segments:
+                all_entities.extend(await self.extract_from_batch(
+                    escalated_segments, model_cascade.escalation_model
+                ))
+            
             return all_entities
             
+        except BudgetExceededError as e:
+            logger.warning(f"Skipping batch: {str(e)}")
+            self.failed_segments.update(segment.id for segment in segments)
+            return []
         except Exception as e:
             logger.error(f"Error extracting entities from batch: {str(e)}")
+            
+            # A failed fast-model call escalates the whole batch
+            if use_cascade:
+                model_cascade.record("entity_extraction", len(segments), ["error"] * len(segments))
+                return await self.extract_from_batch(segments, model_cascade.escalation_model)
+            
             # If batch extraction fails, fall back to individual segment extraction
             logger.info("Falling back to individual segment extraction")
             
@@ -524,36 +593,40 @@ Be precise about the source spans - they must match the exact text positions.
                     all_entities.extend(entities)
                 except Exception as seg_error:
                     logger.error(f"Error extracting entities from segment {segment.id}: {str(seg_error)}")
+                    self.failed_segments.add(segment.id)
             
             return all_entities
     
     async def extract_from_collection(self, collection: SegmentCollection, 
                                save_intermediate: bool = True,
-                               output_dir: str = "output/entities") -> List[Entity]:
+                               output_dir: str = "output/entities",
+                               resume: bool = False) -> List[Entity]:
         """Extract entities from a collection of text segments.
         
+        With save_intermediate, the entities of each batch are appended to
+        all_entities.jsonl as soon as the batch completes, and the segments it
+        covered to all_entities_progress.jsonl. Segments that were skipped or
+        failed, e.g. because the budget ran out, are not recorded as done.
+        
         Args:
             collection: Segment collection to process
             save_intermediate: Whether to save intermediate results
             output_dir: Directory to save intermediate results
+            resume: Continue the artifacts of an interrupted run in output_dir,
+                extracting only the segments no completed batch covered
             
         Returns:
             List of extracted entities
         """
-        import os
-        import json
-        from pathlib import Path
-        
-        all_entities = []
-        
-        # Create intermediate results directory
-        if save_intermediate:
-            os.makedirs(output_dir, exist_ok=True)
+        checkpoint = ExtractionCheckpoint(output_dir, "all_entities", resume=resume,
+                                          segments=collection.segments.values()) if save_intermediate else None
+        all_entities = Entity.from_trusted_dicts(checkpoint.records) if checkpoint else []
+        self.failed_segments.clear()
         
-        # Get leaf segments (those without children)
+        # Get leaf segments (those without children) that still need extraction
         leaf_segments = [
             segment for segment in collection.segments.values()
-            if not segment.child_ids
+            if not segment.child_ids and not (checkpoint and checkpoint.is_done(segment))
         ]
         
         # Try mega batch processing first (maximum efficiency with massive context window)
@@ -575,6 +648,11 @@ Be precise about the source spans - they must match the exact text positions.
             for batch_idx, batch in enumerate(mega_batches):
                 logger.info(f"Processing mega batch {batch_idx+1}/{len(mega_batches)} with {len(batch)} segments")
                 
+                # Stop scheduling batches once the run budget is used up
+                if budget_controller.is_exhausted():
+                    logger.warning("LLM budget exhausted, skipping remaining mega batches")
+                    break
+                
                 # Add delay between mega batches to avoid rate limiting
                 if batch_idx > 0:
                     wait_time = settings.LLM_DELAY_BETWEEN_REQUESTS * 2
@@ -585,16 +663,11 @@ Be precise about the source spans - they must match the exact text positions.
                 mega_batch_entities = await self.extract_from_mega_batch(batch)
                 all_entities.extend(mega_batch_entities)
                 
-                # Save mega batch results
-                if save_intermediate and mega_batch_entities:
-                    batch_start = batch_idx * mega_batch_size
-                    batch_end = min(batch_start + mega_batch_size, len(leaf_segments))
-                    batch_file = Path(output_dir) / f"mega_batch_{batch_start}_{batch_end}.json"
-                    
-                    with open(batch_file, "w", encoding="utf-8") as f:
-                        entities_json = [entity.to_dict() for entity in mega_batch_entities]
-                        json.dump(entities_json, f, ensure_ascii=False, indent=2)
+                # Append mega batch results
+                if checkpoint:
+                    checkpoint.add_batch(self._completed(batch), mega_batch_entities)
                 
+                batch_end = min(batch_idx * mega_batch_size + len(batch), len(leaf_segments))
                 logger.info(f"Processed {batch_end}/{len(leaf_segments)} segments total")
                 
             logger.info(f"Mega batch processing complete. Extracted {len(all_entities)} entities.")
@@ -607,6 +680,11 @@ Be precise about the source spans - they must match the exact text positions.
             parallel_batch_size = 3  # Lower concurrent tasks 
             batch_size = settings.LLM_BATCH_SIZE
             
+            # Segments of completed mega batches are not extracted again
+            if checkpoint:
+                leaf_segments = [segment for segment in leaf_segments if not checkpoint.is_done(segment)]
+            self.failed_segments.clear()
+            
             # Group segments into batches for efficient processing
             segment_batches = []
             for i in range(0, len(leaf_segments), batch_size):
@@ -615,6 +693,10 @@ Be precise about the source spans - they must match the exact text positions.
             
             # Process batches with limited parallelism
             for i in range(0, len(segment_batches), parallel_batch_size):
+                if budget_controller.is_exhausted():
+                    logger.warning("LLM budget exhausted, skipping remaining batches")
+                    break
+                
                 current_batches = segment_batches[i:i+parallel_batch_size]
                 
                 # Process batches in parallel
@@ -628,34 +710,34 @@ Be precise about the source spans - they must match the exact text positions.
                 
                 # Process results from each batch
                 batch_entities = []
-                for batch_idx, entities in enumerate(batch_results):
+                for batch, entities in zip(current_batches, batch_results):
                     batch_entities.extend(entities)
                     
-                    # Save batch results
-                    if save_intermediate and entities:
-                        batch_num = i + batch_idx
-                        batch_start = batch_num * batch_size
-                        batch_end = min(batch_start + batch_size, len(leaf_segments))
-                        import os
-                        batch_file = os.path.join(output_dir, f"batch_{batch_start}_{batch_end}.json")
-                        
-                        with open(batch_file, "w", encoding="utf-8") as f:
-                            entities_json = [entity.to_dict() for entity in entities]
-                            json.dump(entities_json, f, ensure_ascii=False, indent=2)
+                    # Append batch results
+                    if checkpoint:
+                        checkpoint.add_batch(self._completed(batch), entities)
                 
                 all_entities.extend(batch_entities)
                 processed_count = min((i + parallel_batch_size) * batch_size, len(leaf_segments))
                 logger.info(f"Processed {processed_count}/{len(leaf_segments)} segments")
         
-        # Save complete results
-        if save_intermediate:
-            all_file = os.path.join(output_dir, "all_entities.json")
-            with open(all_file, "w", encoding="utf-8") as f:
-                entities_json = [entity.to_dict() for entity in all_entities]
-                json.dump(entities_json, f, ensure_ascii=False, indent=2)
+        # The artifacts already hold all results
+        if checkpoint:
+            checkpoint.close()
         
         return all_entities
     
+    def _completed(self, segments: List[TextSegment]) -> List[TextSegment]:
+        """Get the segments of a batch whose extraction neither failed nor was skipped.
+        
+        Args:
+            segments: Segments of a batch
+        
+        Returns:
+            Segments to record as done
+        """
+        return [segment for segment in segments if segment.id not in self.failed_segments]
+    
     async def analyze_entity(self, entity: Entity, 
                           segment: TextSegment) -> Dict[str, Any]:
         """Perform detailed analysis of an entity.
@@ -0,0 +1,311 @@
+"""Stage-overlapped extraction pipeline for the knowledge graph synthesis system.
+
+This module runs entity extraction, grounding and relationship extraction as
+concurrent stages connected by bounded queues, so that later batches are
+still being extracted while earlier ones are already grounded and searched
+for relationships.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from uuid import UUID
+
+from ..models import Entity, Relationship, TextSegment, SegmentCollection
+from ..llm.budget import budget_controller
+from ..config import settings
+from ..output.artifacts import ExtractionCheckpoint, artifact_path, write_artifacts
+from .entity_extractor import EntityExtractor
+from .relation_extractor import RelationshipExtractor
+from .coreference import CoreferenceResolver
+from .grounding import Grounder
+from .dedup import SegmentDeduplicator
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionPipeline:
+    """Extracts entities and relationships with overlapping stages.
+    
+    Segments are read (possibly from a streaming segmenter) and grouped into
+    batches. Each batch flows through entity extraction, entity grounding,
+    relationship extraction and relationship grounding; the stages run
+    concurrently and are connected by bounded queues, so a slow stage applies
+    back pressure instead of letting work pile up in memory. Since
+    relationships are extracted per batch, coreference resolution runs once
+    at the end and relationships are remapped to the merged entities.
+    
+    With save_intermediate, the grounded entities and relationships of each
+    batch are appended to the artifacts as soon as the batch completes, so
+    an interrupted run can be resumed.
+    """
+    
+    def __init__(self,
+               provider_name: Optional[str] = None,
+               batch_size: int = settings.PIPELINE_BATCH_SIZE,
+               queue_size: int = settings.PIPELINE_QUEUE_SIZE,
+               entity_workers: int = settings.PIPELINE_ENTITY_WORKERS,
+               deduplicator: Optional[SegmentDeduplicator] = None):
+        """Initialize the extraction pipeline.
+        
+        Args:
+            provider_name: Name of the LLM provider to use
+            batch_size: Number of segments per batch
+            queue_size: Maximum number of batches waiting between two stages
+            entity_workers: Number of entity extraction batches run concurrently
+            deduplicator: If given, near-duplicate segments are not extracted;
+                results are projected onto them at the end
+        """
+        self.entity_extractor = EntityExtractor(provider_name=provider_name)
+        self.relationship_extractor = RelationshipExtractor(provider_name=provider_name)
+        self.resolver = CoreferenceResolver()
+        self.grounder = Grounder()
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.entity_workers = entity_workers
+        self.deduplicator = deduplicator
+        self.stats = {}
+    
+    def _record(self, stage: str, started: float, items: int) -> None:
+        """Record the time a stage spent on one batch.
+        
+        Args:
+            stage: Stage name
+            started: Time the stage started working on the batch
+            items: Number of items the stage produced
+        """
+        stage_stats = self.stats.setdefault(stage, {"batches": 0, "items": 0, "seconds": 0.0})
+        stage_stats["batches"] += 1
+        stage_stats["items"] += items
+        stage_stats["seconds"] += time.time() - started
+    
+    async def run(self, segments: Iterable[TextSegment],
+                 collection: SegmentCollection,
+                 save_intermediate: bool = True,
+                 entities_dir: str = "output/entities",
+                 relationships_dir: str = "output/relationships",
+                 resume: bool = False) -> Tuple[List[Entity], List[Relationship]]:
+        """Run the pipeline over a sequence of leaf segments.
+        
+        Args:
+            segments: Leaf segments in document order (a list or a generator
+                such as TextSegmenter.iter_segments)
+            collection: Segment collection; segments not yet in it are added
+                as they are read
+            save_intermediate: Whether to save intermediate results
+            entities_dir: Directory to save entity results
+            relationships_dir: Directory to save relationship results
+            resume: Continue the artifacts of an interrupted run, extracting
+                only what no completed batch covered (a generator of segments
+                is read completely first, to match them to the artifacts)
+        
+        Returns:
+            (entities, relationships) tuple with resolved, grounded entities
+            and grounded relationships
+        """
+        self.stats = {}
+        start_time = time.time()
+        
+        entity_queue = asyncio.Queue(maxsize=self.queue_size)
+        relationship_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.entity_extractor.failed_segments.clear()
+        self.relationship_extractor.failed_segments.clear()
+        
+        # Results of an interrupted run are restored, and new ones appended per batch
+        entity_checkpoint = relationship_checkpoint = None
+        if save_intermediate:
+            if resume:
+                segments = list(segments)
+            entity_checkpoint = ExtractionCheckpoint(entities_dir, "all_entities", resume=resume,
+                                                     segments=segments if resume else ())
+            relationship_checkpoint = ExtractionCheckpoint(relationships_dir, "all_relationships", resume=resume,
+                                                           segments=segments if resume else ())
+        entities = Entity.from_trusted_dicts(entity_checkpoint.records) if entity_checkpoint else []
+        relationships = Relationship.from_trusted_dicts(relationship_checkpoint.records) \
+            if relationship_checkpoint else []
+        restored_entities: Dict[str, List[Entity]] = {}
+        for entity in entities:
+            restored_entities.setdefault(entity.source_span.segment_id, []).append(entity)
+        
+        async def read_segments():
+            # Generators may read from disk, so they are advanced in a worker thread
+            iterator = iter(segments)
+            batch = []
+            started = time.time()
+            while not budget_controller.is_exhausted():
+                segment = await asyncio.to_thread(next, iterator, None)
+                if segment is None:
+                    break
+                
+                if segment.id not in collection.segments:
+                    collection.add_segment(segment)
+                if self.deduplicator is not None and self.deduplicator.add(segment) is not None:
+                    continue
+                batch.append(segment)
+                
+                if len(batch) >= self.batch_size:
+                    self._record("segmentation", started, len(batch))
+                    await entity_queue.put(batch)
+                    batch = []
+                    started = time.time()
+            
+            if batch:
+                self._record("segmentation", started, len(batch))
+                await entity_queue.put(batch)
+            for _ in range(self.entity_workers):
+                await entity_queue.put(None)
+        
+        async def extract_entities():
+            while True:
+                batch = await entity_queue.get()
+                if batch is None:
+                    break
+                
+                # Segments covered by a completed batch of an interrupted run keep their entities
+                todo, restored = [], []
+                for segment in batch:
+                    if entity_checkpoint and entity_checkpoint.is_done(segment):
+                        restored.extend(restored_entities.get(str(segment.id), []))
+                    else:
+                        todo.append(segment)
+                
+                started = time.time()
+                batch_entities = await self.entity_extractor.extract_from_mega_batch(todo) if todo else []
+                self._record("entity_extraction", started, len(batch_entities))
+                
+                started = time.time()
+                grounded_entities = self.grounder.ground_entities(batch_entities, collection)
+                self._record("entity_grounding", started, len(grounded_entities))
+                
+                # Segments whose extraction failed or was skipped are extracted again on resume
+                failed = self.entity_extractor.failed_segments
+                if entity_checkpoint:
+                    entity_checkpoint.add_batch([segment for segment in todo if segment.id not in failed],
+                                                grounded_entities)
+                
+                entities.extend(grounded_entities)
+                done = [segment for segment in batch if segment.id not in failed]
+                await relationship_queue.put((done, grounded_entities + restored))
+                
+                # Add delay between batches to avoid rate limiting
+                await asyncio.sleep(settings.LLM_DELAY_BETWEEN_REQUESTS)
+        
+        async def run_entity_workers():
+            await asyncio.gather(*(extract_entities() for _ in range(self.entity_workers)))
+            await relationship_queue.put(None)
+        
+        async def extract_relationships():
+            while True:
+                item = await relationship_queue.get()
+                if item is None:
+                    break
+                
+                batch, batch_entities = item
+                if relationship_checkpoint:
+                    batch = [segment for segment in batch if not relationship_checkpoint.is_done(segment)]
+                
+                # Group entities by segment
+                entities_by_segment = {}
+                for entity in batch_entities:
+                    entities_by_segment.setdefault(UUID(entity.source_span.segment_id), []).append(entity)
+                
+                # Only segments with multiple entities can contain relationships
+                segments_to_process = [
+                    segment for segment in batch
+                    if len(entities_by_segment.get(segment.id, [])) > 1
+                ]
+                if budget_controller.is_exhausted():
+                    continue
+                
+                grounded_relationships = []
+                if segments_to_process:
+                    started = time.time()
+                    batch_relationships = await self.relationship_extractor.extract_from_mega_batch(
+                        segments_to_process, entities_by_segment
+                    )
+                    self._record("relationship_extraction", started, len(batch_relationships))
+                    
+                    started = time.time()
+                    entity_map = {entity.id: entity for entity in batch_entities}
+                    grounded_relationships = self.grounder.ground_relationships(
+                        batch_relationships, entity_map, collection
+                    )
+                    self._record("relationship_grounding", started, len(grounded_relationships))
+                
+                if relationship_checkpoint:
+                    failed = self.relationship_extractor.failed_segments
+                    relationship_checkpoint.add_batch([segment for segment in batch if segment.id not in failed],
+                                                      grounded_relationships)
+                
+                relationships.extend(grounded_relationships)
+        
+        tasks = [
+            asyncio.ensure_future(read_segments()),
+            asyncio.ensure_future(run_entity_workers()),
+            asyncio.ensure_future(extract_relationships()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # A failed stage would leave the others blocked on their queues
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            for checkpoint in (entity_checkpoint, relationship_checkpoint):
+                if checkpoint:
+                    checkpoint.close()
+        
+        # Copy the results of each cluster representative onto its near duplicates
+        if self.deduplicator is not None:
+            started = time.time()
+            entities = self.deduplicator.project_entities(entities)
+            relationships = self.deduplicator.project_relationships(relationships)
+            self._record("deduplication", started, len(entities))
+        
+        # Merge coreferent entities across batches and remap their relationships
+        started = time.time()
+        resolved_entities, old_to_new_ids = self.resolver.resolve_with_mapping(entities)
+        resolved_relationships = self.resolver.update_relationships(relationships, old_to_new_ids)
+        self._record("coreference", started, len(resolved_entities))
+        
+        self.stats["wall_seconds"] = time.time() - start_time
+        logger.info(self.get_summary())
+        
+        # The checkpoints already hold all entities and relationships
+        if save_intermediate:
+            self._save(entities_dir, "resolved_entities", resolved_entities)
+            self._save(relationships_dir, "grounded_relationships", resolved_relationships)
+        
+        return resolved_entities, resolved_relationships
+    
+    def _save(self, output_dir: str, name: str, items: List[Any]) -> None:
+        """Save entities or relationships as a JSON Lines artifact.
+        
+        Args:
+            output_dir: Output directory
+            name: Artifact name without suffix
+            items: Entities or relationships to save
+        """
+        write_artifacts(artifact_path(output_dir, name), (item.to_dict() for item in items))
+    
+    def get_summary(self) -> str:
+        """Get a human-readable summary of the time spent per stage.
+        
+        Returns:
+            Formatted summary string
+        """
+        wall_seconds = self.stats.get("wall_seconds", 0.0)
+        stage_seconds = sum(
+            stage_stats["seconds"] for stage, stage_stats in self.stats.items()
+            if stage != "wall_seconds"
+        )
+        
+        lines = [f"Extraction pipeline: {wall_seconds:.1f}s wall time, {stage_seconds:.1f}s total stage time"]
+        for stage, stage_stats in self.stats.items():
+            if stage == "wall_seconds":
+                continue
+            lines.append(f"  {stage}: {stage_stats['batches']} batches, {stage_stats['items']} items, "
+                         f"{stage_stats['seconds']:.1f}s")
+        return "\n".join(lines)
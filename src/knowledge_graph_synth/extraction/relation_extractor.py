@@ -10,7 +10,11 @@ import asyncio
 from ..config import settings
 from ..models import TextSegment, SegmentCollection, Entity, Relationship, SourceSpan
 from ..llm import LLMProviderFactory, prompt_manager, ResponseValidator
+from ..llm.budget import budget_controller, BudgetExceededError
+from ..llm.cascade import model_cascade
+from ..llm.handles import PromptHandles
 from ..llm.schemas import get_relationship_extraction_schema, get_relationship_analysis_schema
+from ..output.artifacts import ExtractionCheckpoint
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +38,9 @@ class RelationshipExtractor:
         self.provider_name = provider_name
         self.confidence_threshold = confidence_threshold
         self.validator = ResponseValidator()
+        
+        # Segments whose extraction was skipped or failed; a resumed run extracts them again
+        self.failed_segments: Set[UUID] = set()
     
     async def extract_from_segment(self, 
                                 segment: TextSegment, 
@@ -55,6 +62,7 @@ class RelationshipExtractor:
             provider = LLMProviderFactory.get_provider(self.provider_name)
         except Exception as e:
             logger.error(f"Error getting LLM provider: {str(e)}")
+            self.failed_segments.add(segment.id)
             return []
         
         # Get the appropriate prompt template for the segment's language
@@ -75,6 +83,7 @@ class RelationshipExtractor:
         
         if not prompt:
             logger.error(f"Error getting prompt template for relationship extraction ({language})")
+            self.failed_segments.add(segment.id)
             return []
         
         # Extract relationships using the LLM
@@ -100,6 +109,7 @@ class RelationshipExtractor:
             
         except Exception as e:
             logger.error(f"Error extracting relationships: {str(e)}")
+            self.failed_segments.add(segment.id)
             return []
         
         # Get entity map for looking up IDs
@@ -185,12 +195,14 @@ class RelationshipExtractor:
     
     async def extract_from_batch(self, 
                                segments: List[TextSegment],
-                               entities_by_segment: Dict[UUID, List[Entity]]) -> List[Relationship]:
+                               entities_by_segment: Dict[UUID, List[Entity]],
+                               model_name: Optional[str] = None) -> List[Relationship]:
         """Extract relationships from a batch of segments using a single LLM call.
         
         Args:
             segments: List of text segments to process
             entities_by_segment: Dictionary mapping segment IDs to lists of entities
+            model_name: Model to use (None runs the model cascade)
             
         Returns:
             List of extracted relationships
@@ -263,11 +275,13 @@ class RelationshipExtractor:
         
         # Build segments text and entity context
         segments_text = ""
+        prompt_segments = []
         for i, segment in enumerate(segments):
             # Skip segments without entities or with only one entity
             if segment.id not in entities_by_segment or len(entities_by_segment[segment.id]) < 2:
                 continue
-                
+            
+            prompt_segments.append(segment)
             segment_entities = entities_by_segment[segment.id]
             
             # Add segment text
@@ -288,6 +302,7 @@ class RelationshipExtractor:
             provider = LLMProviderFactory.get_provider(self.provider_name)
         except Exception as e:
             logger.error(f"Error getting LLM provider: {str(e)}")
+            self.failed_segments.update(segment.id for segment in segments)
             return []
         
         # Create batch prompt
@@ -313,11 +328,12 @@ Be precise about the source spans - they must match the exact text positions.
 Only identify relationships that are explicitly stated in the text.
 """
         
+        # Run the fast model first unless a specific model was requested
+        use_cascade = model_name is None and model_cascade.enabled
+        model_name = model_name or model_cascade.first_model("reasoning")
+        
         # Extract relationships using the LLM
         try:
-            # Use reasoning model for better extraction
-            model_name = "reasoning"
-            
             # Extract relationships
             response = await provider.generate_structured(
                 prompt,
@@ -325,6 +341,14 @@ Only identify relationships that are explicitly stated in the text.
                 model_name
             )
             
+            # Keep segments the fast model handled well, re-run the rest on the stronger model
+            escalated_segments = []
+            if use_cascade:
+                response, escalated_segments = model_cascade.review(
+                    response, prompt_segments, "relationships", "relationship_extraction",
+                    batch_schema["properties"]["segments"]["items"]
+                )
+            
             # Process the response
             all_relationships = []
             
@@ -419,10 +443,25 @@ Only identify relationships that are explicitly stated in the text.
                             
                             all_relationships.append(relationship)
             
+            if escalated_segments:
+                all_relationships.extend(await self.extract_from_batch(
+                    escalated_segments, entities_by_segment, model_cascade.escalation_model
+                ))
+            
             return all_relationships
             
+        except BudgetExceededError as e:
+            logger.warning(f"Skipping batch: {str(e)}")
+            self.failed_segments.update(segment.id for segment in segments)
+            return []
         except Exception as e:
             logger.error(f"Error extracting relationships from batch: {str(e)}")
+            
+            # A failed fast-model call escalates the whole batch
+            if use_cascade and prompt_segments:
+                model_cascade.record("relationship_extraction", len(prompt_segments), ["error"] * len(prompt_segments))
+                return await self.extract_from_batch(prompt_segments, entities_by_segment, model_cascade.escalation_model)
+            
             # If batch extraction fails, fall back to individual segment extraction
             logger.info("Falling back to individual segment extraction")
             
@@ -439,12 +478,14 @@ Only identify relationships that are explicitly stated in the text.
                         all_relationships.extend(relationships)
                     except Exception as seg_error:
                         logger.error(f"Error extracting relationships from segment {segment.id}: {str(seg_error)}")
+                        self.failed_segments.add(segment.id)
             
             return all_relationships
     
     async def extract_from_mega_batch(self,
                                     segments: List[TextSegment],
-                                    entities_by_segment: Dict[UUID, List[Entity]]) -> List[Relationship]:
+                                    entities_by_segment: Dict[UUID, List[Entity]],
+                                    model_name: Optional[str] = None) -> List[Relationship]:
         """Extract relationships from a mega batch of segments using a single LLM call.
         
         This method leverages the massive context window of Gemini models to process
@@ -453,6 +494,7 @@ Only identify relationships that are explicitly stated in the text.
         Args:
             segments: List of text segments to process
             entities_by_segment: Dictionary mapping segment IDs to lists of entities
+            model_name: Model to use (None runs the model cascade)
             
         Returns:
             List of extracted relationships
@@ -476,20 +518,8 @@ Only identify relationships that are explicitly stated in the text.
                                     "type": "object",
                                     "properties": {
                                         "type": {"type": "string"},
-                                        "source": {
-                                            "type": "object",
-                                            "properties": {
-                                                "name": {"type": "string"},
-                                                "type": {"type": "string"}
-                                            }
-                                        },
-                                        "target": {
-                                            "type": "object",
-                                            "properties": {
-                                                "name": {"type": "string"},
-                                                "type": {"type": "string"}
-                                            }
-                                        },
+                                        "source": {"type": "string"},
+                                        "target": {"type": "string"},
                                         "bidirectional": {"type": "boolean"},
                                         "confidence": {"type": "number"},
                                         "source_span": {
@@ -531,8 +561,8 @@ Your task is to identify all relationships between entities in multiple text seg
 For EACH segment, identify ALL relationships between the entities that are listed with each segment.
 Provide the following information for each relationship:
 1. Type - a concise, descriptive label (e.g., WORKS_FOR, LOCATED_IN, PART_OF, USES, etc.)
-2. Source entity - the entity that is the subject of the relationship
-3. Target entity - the entity that is the object of the relationship
+2. Source entity - the handle (e.g., E3) of the entity that is the subject of the relationship
+3. Target entity - the handle of the entity that is the object of the relationship
 4. Whether the relationship is bidirectional
 5. Confidence score - between 0.0-1.0
 6. Source span - exact start/end position in the text and the exact text that expresses the relationship
@@ -543,7 +573,8 @@ VERY IMPORTANT:
 - Only identify relationships between entities that are explicitly listed for each segment
 - Be precise with position indexes - they must exactly match the source text
 - Return complete results for all segments
-- Use the segment_id as provided for each segment to maintain traceability
+- Use the segment handle (S1, S2, ...) as the segment_id for each segment to maintain traceability
+- Refer to entities only by their handles from the ENTITIES list
 """
         
         # Create segment data - optimized for maximum content in context window
@@ -559,24 +590,27 @@ VERY IMPORTANT:
         if not segments_with_entities:
             return []
         
-        # Build compact representation of segments and their entities
-        for i, segment in enumerate(segments_with_entities):
-            segment_entities = entities_by_segment[segment.id]
-            
-            segments_text += f"SEGMENT {i+1} [ID: {segment.id}]\n{segment.text}\n\n"
-            segments_text += f"Entities in Segment {i+1}:\n"
-            
-            for j, entity in enumerate(segment_entities):
-                segments_text += f"- Entity {j+1}: {entity.name} (Type: {entity.type})\n"
+        # Build compact representation of segments and their entities: short handles
+        # instead of UUIDs, and each distinct entity listed once for the whole batch
+        handles = PromptHandles()
+        for segment in segments_with_entities:
+            entity_handles = []
+            for entity in entities_by_segment[segment.id]:
+                handle = handles.entity_handle(entity)
+                if handle not in entity_handles:
+                    entity_handles.append(handle)
             
-            segments_text += "\n"
+            segments_text += f"SEGMENT {handles.segment_handle(segment)}\n{segment.text}\n"
+            segments_text += f"Entities: {', '.join(entity_handles)}\n\n"
+        
+        segments_text += f"# ENTITIES\n\n{handles.entity_legend()}\n"
         
         # Check if mega batch is too large
         if len(segments_text) > settings.LLM_CONTEXT_WINDOW_SIZE / 2:
             logger.warning(f"Mega batch too large ({len(segments_text)} chars), splitting")
             mid = len(segments_with_entities) // 2
-            first_half = await self.extract_from_mega_batch(segments_with_entities[:mid], entities_by_segment)
-            second_half = await self.extract_from_mega_batch(segments_with_entities[mid:], entities_by_segment)
+            first_half = await self.extract_from_mega_batch(segments_with_entities[:mid], entities_by_segment, model_name)
+            second_half = await self.extract_from_mega_batch(segments_with_entities[mid:], entities_by_segment, model_name)
             return first_half + second_half
         
         # Create full prompt
@@ -590,12 +624,15 @@ VERY IMPORTANT:
             provider = LLMProviderFactory.get_provider(self.provider_name)
         except Exception as e:
             logger.error(f"Error getting LLM provider: {str(e)}")
+            self.failed_segments.update(segment.id for segment in segments_with_entities)
             return []
             
+        # Run the fast model first unless a specific model was requested
+        use_cascade = model_name is None and model_cascade.enabled
+        model_name = model_name or model_cascade.first_model("reasoning")
+        
         # Extract relationships using the LLM
         try:
-            # Use the model with the best reasoning capabilities
-            model_name = "reasoning"
             
             # Make the API call
             logger.info(f"Submitting mega batch request to {model_name} model")
@@ -610,19 +647,23 @@ VERY IMPORTANT:
             processing_time = time.time() - start_time
             logger.info(f"Mega batch processed in {processing_time:.2f} seconds")
             
+            # Map segment handles back to segment IDs
+            response = handles.decode_segments(response)
+            
+            # Keep segments the fast model handled well, re-run the rest on the stronger model
+            escalated_segments = []
+            if use_cascade:
+                response, escalated_segments = model_cascade.review(
+                    response, segments_with_entities, "relationships", "relationship_extraction",
+                    batch_schema["properties"]["segments"]["items"]
+                )
+            
             # Process the response
             all_relationships = []
             
             # Map segment IDs to segments
             segment_map = {str(segment.id): segment for segment in segments}
             
-            # Get entity map for looking up IDs
-            entity_map = {}
-            for segment_id, segment_entities in entities_by_segment.items():
-                for entity in segment_entities:
-                    key = (entity.name.lower(), entity.type.lower())
-                    entity_map[key] = entity.id
-            
             # Process each segment's results
             if "segments" in response:
                 for segment_data in response["segments"]:
@@ -637,41 +678,15 @@ VERY IMPORTANT:
                             if confidence < self.confidence_threshold:
                                 continue
                             
-                            # Get source and target entities
-                            source_entity = rel_data.get("source", {})
-                            target_entity = rel_data.get("target", {})
-                            
-                            source_name = source_entity.get("name", "").lower()
-                            source_type = source_entity.get("type", "").lower()
-                            target_name = target_entity.get("name", "").lower()
-                            target_type = target_entity.get("type", "").lower()
-                            
-                            # Look up entity IDs
-                            source_id = None
-                            target_id = None
-                            
-                            # Try exact match first
-                            if (source_name, source_type) in entity_map:
-                                source_id = entity_map[(source_name, source_type)]
-                            else:
-                                # Try name-only match
-                                for (name, type_), id_ in entity_map.items():
-                                    if name == source_name:
-                                        source_id = id_
-                                        break
-                            
-                            if (target_name, target_type) in entity_map:
-                                target_id = entity_map[(target_name, target_type)]
-                            else:
-                                # Try name-only match
-                                for (name, type_), id_ in entity_map.items():
-                                    if name == target_name:
-                                        target_id = id_
-                                        break
+                            # Resolve entity handles (names are accepted as a fallback)
+                            source_ref = rel_data.get("source")
+                            target_ref = rel_data.get("target")
+                            source_id = handles.entity_id(source_ref, segment_id)
+                            target_id = handles.entity_id(target_ref, segment_id)
                             
                             # Skip if we can't find source or target entity
                             if not source_id or not target_id:
-                                logger.warning(f"Skipping relationship: could not find entities {source_name} -> {target_name}")
+                                logger.warning(f"Skipping relationship: could not find entities {source_ref} -> {target_ref}")
                                 continue
                             
                             # Create source span
@@ -704,22 +719,39 @@ VERY IMPORTANT:
                             
                             all_relationships.append(relationship)
             
+            if escalated_segments:
+                all_relationships.extend(await self.extract_from_mega_batch(
+                    escalated_segments, entities_by_segment, model_cascade.escalation_model
+                ))
+            
             logger.info(f"Extracted {len(all_relationships)} relationships from mega batch")
             return all_relationships
             
+        except BudgetExceededError as e:
+            logger.warning(f"Skipping mega batch: {str(e)}")
+            self.failed_segments.update(segment.id for segment in segments)
+            return []
         except Exception as e:
             logger.error(f"Error extracting relationships from mega batch: {str(e)}")
             
+            # A failed fast-model call escalates the whole batch
+            if use_cascade:
+                model_cascade.record("relationship_extraction", len(segments_with_entities),
+                                     ["error"] * len(segments_with_entities))
+                return await self.extract_from_mega_batch(
+                    segments_with_entities, entities_by_segment, model_cascade.escalation_model
+                )
+            
             # If mega batch fails and we have multiple segments, try splitting the batch
             if len(segments_with_entities) > 1:
                 logger.info(f"Splitting mega batch into smaller batches")
                 mid = len(segments_with_entities) // 2
-                first_half = await self.extract_from_mega_batch(segments_with_entities[:mid], entities_by_segment)
+                first_half = await self.extract_from_mega_batch(segments_with_entities[:mid], entities_by_segment, model_name)
                 
                 # Add extra delay before processing second half
                 await asyncio.sleep(settings.LLM_DELAY_BETWEEN_REQUESTS * 2)
                 
-                second_half = await self.extract_from_mega_batch(segments_with_entities[mid:], entities_by_segment)
+                second_half = await self.extract_from_mega_batch(segments_with_entities[mid:], entities_by_segment, model_name)
                 return first_half + second_half
             
             # Fall back to standard batch processing for individual segments
@@ -736,33 +768,36 @@ VERY IMPORTANT:
                                     collection: SegmentCollection,
                                     entities: List[Entity],
                                     save_intermediate: bool = True,
-                                    output_dir: str = "output/relationships") -> List[Relationship]:
+                                    output_dir: str = "output/relationships",
+                                    resume: bool = False) -> List[Relationship]:
         """Extract relationships from a collection of text segments.
         
+        With save_intermediate, the relationships of each batch are appended
+        to all_relationships.jsonl as soon as the batch completes, and the
+        segments it covered to all_relationships_progress.jsonl. Segments that
+        were skipped or failed, e.g. because the budget ran out, are not
+        recorded as done.
+        
         Args:
             collection: Segment collection to process
             entities: List of entities to consider for relationships
             save_intermediate: Whether to save intermediate results
             output_dir: Directory to save intermediate results
+            resume: Continue the artifacts of an interrupted run in output_dir,
+                extracting only the segments no completed batch covered
             
         Returns:
             List of extracted relationships
         """
-        import os
-        import json
-        from pathlib import Path
-        import time
-        
-        all_relationships = []
-        
-        # Create intermediate results directory
-        if save_intermediate:
-            os.makedirs(output_dir, exist_ok=True)
+        checkpoint = ExtractionCheckpoint(output_dir, "all_relationships", resume=resume,
+                                          segments=collection.segments.values()) if save_intermediate else None
+        all_relationships = Relationship.from_trusted_dicts(checkpoint.records) if checkpoint else []
+        self.failed_segments.clear()
         
-        # Get leaf segments (those without children)
+        # Get leaf segments (those without children) that still need extraction
         leaf_segments = [
             segment for segment in collection.segments.values()
-            if not segment.child_ids
+            if not segment.child_ids and not (checkpoint and checkpoint.is_done(segment))
         ]
         
         # Group entities by segment
@@ -801,6 +836,11 @@ VERY IMPORTANT:
             for batch_idx, batch in enumerate(mega_batches):
                 logger.info(f"Processing relationship mega batch {batch_idx+1}/{len(mega_batches)} with {len(batch)} segments")
                 
+                # Stop scheduling batches once the run budget is used up
+                if budget_controller.is_exhausted():
+                    logger.warning("LLM budget exhausted, skipping remaining mega batches")
+                    break
+                
                 # Add delay between mega batches
                 if batch_idx > 0:
                     wait_time = settings.LLM_DELAY_BETWEEN_REQUESTS * 3  # Longer delay for relationships
@@ -815,17 +855,11 @@ VERY IMPORTANT:
                 batch_duration = time.time() - batch_start_time
                 logger.info(f"Mega batch processing took {batch_duration:.2f} seconds")
                 
-                # Save mega batch results
-                if save_intermediate and mega_batch_rels:
-                    batch_start = batch_idx * mega_batch_size
-                    batch_end = min(batch_start + mega_batch_size, len(segments_to_process))
-                    import os
-                    batch_file = os.path.join(output_dir, f"mega_batch_{batch_start}_{batch_end}.json")
-                    
-                    with open(batch_file, "w", encoding="utf-8") as f:
-                        rels_json = [rel.to_dict() for rel in mega_batch_rels]
-                        json.dump(rels_json, f, ensure_ascii=False, indent=2)
+                # Append mega batch results
+                if checkpoint:
+                    checkpoint.add_batch(self._completed(batch), mega_batch_rels)
                 
+                batch_end = min(batch_idx * mega_batch_size + len(batch), len(segments_to_process))
                 logger.info(f"Processed {batch_end}/{len(segments_to_process)} segments")
                 
             logger.info(f"Mega batch processing complete. Extracted {len(all_relationships)} relationships.")
@@ -838,6 +872,12 @@ VERY IMPORTANT:
             parallel_batch_size = 2  # Fewer concurrent tasks for relationships
             batch_size = settings.LLM_BATCH_SIZE // 2  # Smaller batches
             
+            # Segments of completed mega batches are not extracted again
+            if checkpoint:
+                segments_to_process = [segment for segment in segments_to_process
+                                       if not checkpoint.is_done(segment)]
+            self.failed_segments.clear()
+            
             # Group segments into batches
             segment_batches = []
             for i in range(0, len(segments_to_process), batch_size):
@@ -846,6 +886,10 @@ VERY IMPORTANT:
             
             # Process batches with limited parallelism
             for i in range(0, len(segment_batches), parallel_batch_size):
+                if budget_controller.is_exhausted():
+                    logger.warning("LLM budget exhausted, skipping remaining batches")
+                    break
+                
                 current_batches = segment_batches[i:i+parallel_batch_size]
                 
                 # Process batches in parallel
@@ -859,34 +903,34 @@ VERY IMPORTANT:
                 
                 # Process results from each batch
                 batch_relationships = []
-                for batch_idx, relationships in enumerate(batch_results):
+                for batch, relationships in zip(current_batches, batch_results):
                     batch_relationships.extend(relationships)
                     
-                    # Save batch results
-                    if save_intermediate and relationships:
-                        batch_num = i + batch_idx
-                        batch_start = batch_num * batch_size
-                        batch_end = min(batch_start + batch_size, len(segments_to_process))
-                        batch_file = Path(output_dir) / f"batch_{batch_start}_{batch_end}.json"
-                        
-                        with open(batch_file, "w", encoding="utf-8") as f:
-                            rels_json = [rel.to_dict() for rel in relationships]
-                            json.dump(rels_json, f, ensure_ascii=False, indent=2)
+                    # Append batch results
+                    if checkpoint:
+                        checkpoint.add_batch(self._completed(batch), relationships)
                 
                 all_relationships.extend(batch_relationships)
                 processed_count = min((i + parallel_batch_size) * batch_size, len(segments_to_process))
                 logger.info(f"Processed {processed_count}/{len(segments_to_process)} segments")
         
-        # Save complete results
-        if save_intermediate:
-            import os
-            all_file = os.path.join(output_dir, "all_relationships.json")
-            with open(all_file, "w", encoding="utf-8") as f:
-                rels_json = [rel.to_dict() for rel in all_relationships]
-                json.dump(rels_json, f, ensure_ascii=False, indent=2)
+        # The artifacts already hold all results
+        if checkpoint:
+            checkpoint.close()
         
         return all_relationships
     
+    def _completed(self, segments: List[TextSegment]) -> List[TextSegment]:
+        """Get the segments of a batch whose extraction neither failed nor was skipped.
+        
+        Args:
+            segments: Segments of a batch
+        
+        Returns:
+            Segments to record as done
+        """
+        return [segment for segment in segments if segment.id not in self.failed_segments]
+    
     async def analyze_relationship(self, 
                                 relationship: Relationship,
                                 segment: TextSegment,
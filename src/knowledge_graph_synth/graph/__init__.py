@@ -5,17 +5,30 @@ visualizing, and verifying knowledge graphs.
 """
 
 from .builder import GraphBuilder
-from .analysis import GraphAnalyzer
+from .merge import GraphMerger
+from .analysis import GraphAnalyzer, graph_analyzer
 from .visualization import GraphVisualizer
 from .expansion import GraphExpander
 from .verification import GraphVerifier
 from .metagraph import MetaGraphBuilder
+from .store import GraphStore, StoredKnowledgeGraph
+from .sparse import SparseGraph
+from .community import louvain_communities, modularity
+from .motifs import mine_motifs
 
 __all__ = [
     "GraphBuilder",
+    "GraphMerger",
     "GraphAnalyzer",
+    "graph_analyzer",
     "GraphVisualizer",
     "GraphExpander",
     "GraphVerifier",
-    "MetaGraphBuilder"
+    "MetaGraphBuilder",
+    "GraphStore",
+    "StoredKnowledgeGraph",
+    "SparseGraph",
+    "louvain_communities",
+    "modularity",
+    "mine_motifs"
 ]
\ No newline at end of file
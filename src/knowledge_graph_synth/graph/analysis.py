@@ -1,13 +1,17 @@
 """Graph analysis for the knowledge graph synthesis system."""
 
+import copy
 import logging
-from typing import Dict, List, Optional, Any, Set, Tuple
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Any, Set, Tuple
 from uuid import UUID
 
 import networkx as nx
 
 from ..models import KnowledgeGraph, Entity
 from ..config import settings
+from .community import louvain_communities
+from .sparse import SparseGraph, use_sparse_analytics
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +21,56 @@ class GraphAnalyzer:
     
     This class implements algorithms for analyzing knowledge graphs,
     including centrality metrics, community detection, and pattern identification.
+    Results are memoized per graph version, so asking again about a graph that
+    has not changed since does not recompute them.
     """
     
-    def __init__(self):
-        """Initialize the graph analyzer."""
-        pass
+    def __init__(self, cache_size: int = settings.GRAPH_ANALYSIS_CACHE_SIZE):
+        """Initialize the graph analyzer.
+        
+        Args:
+            cache_size: Maximum number of memoized results (0 disables memoization)
+        """
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, str, Hashable], Any]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def memoize(self, graph: KnowledgeGraph, name: str, params: Hashable,
+              compute: Callable[[], Any]) -> Any:
+        """Get a result for the current version of a graph, computing it once.
+        
+        Results are keyed by (graph version, name, params) and the least
+        recently used ones are evicted beyond cache_size. Callers must not
+        modify the returned result.
+        
+        Args:
+            graph: Knowledge graph the result is computed from
+            name: Name of the analysis
+            params: Parameters the result depends on
+            compute: Function computing the result
+            
+        Returns:
+            Memoized or newly computed result
+        """
+        key = (graph.version, name, params)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return self._cache[key]
+        
+        self.cache_misses += 1
+        result = compute()
+        if self.cache_size > 0:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        
+        return result
+    
+    def clear_cache(self) -> None:
+        """Drop all memoized results."""
+        self._cache.clear()
     
     def get_central_entities(self, 
                           graph: KnowledgeGraph, 
@@ -37,6 +86,49 @@ class GraphAnalyzer:
         Returns:
             List of (entity, score) tuples
         """
+        sparse = use_sparse_analytics()
+        ranking = self.memoize(graph, "central_entities", (algorithm, sparse),
+                               lambda: self._rank_entities(graph, algorithm, sparse))
+        return ranking[:top_n]
+    
+    def _rank_entities(self, graph: KnowledgeGraph, algorithm: str, sparse: bool) -> List[Tuple[Entity, float]]:
+        """Rank all entities of the graph by centrality.
+        
+        Args:
+            graph: Knowledge graph to analyze
+            algorithm: Centrality algorithm to use
+            sparse: Whether to use the sparse backend
+            
+        Returns:
+            List of (entity, score) tuples, most central first
+        """
+        if sparse:
+            centrality = self._sparse_centrality(graph, algorithm)
+        else:
+            centrality = self._networkx_centrality(graph, algorithm)
+        
+        # Sort the entities by centrality
+        ranked_ids = sorted(centrality.keys(), key=lambda k: centrality[k], reverse=True)
+        
+        # Convert to (entity, score) tuples
+        result = []
+        for entity_id in ranked_ids:
+            entity = graph.get_entity(entity_id)
+            if entity:
+                result.append((entity, centrality[entity_id]))
+        
+        return result
+    
+    def _networkx_centrality(self, graph: KnowledgeGraph, algorithm: str) -> Dict[UUID, float]:
+        """Compute node centrality with NetworkX.
+        
+        Args:
+            graph: Knowledge graph to analyze
+            algorithm: Centrality algorithm to use
+            
+        Returns:
+            Dictionary mapping entity IDs to centrality scores
+        """
         # Get the NetworkX graph
         nx_graph = graph.to_networkx()
         
@@ -55,17 +147,38 @@ class GraphAnalyzer:
             logger.warning(f"Unknown centrality algorithm: {algorithm}, using degree centrality")
             centrality = nx.degree_centrality(nx_graph)
         
-        # Get the top-N entities by centrality
-        top_ids = sorted(centrality.keys(), key=lambda k: centrality[k], reverse=True)[:top_n]
+        return centrality
+    
+    def _sparse_centrality(self, graph: KnowledgeGraph, algorithm: str) -> Dict[UUID, float]:
+        """Compute node centrality on the sparse adjacency matrix.
         
-        # Convert to (entity, score) tuples
-        result = []
-        for entity_id in top_ids:
-            entity = graph.get_entity(entity_id)
-            if entity:
-                result.append((entity, centrality[entity_id]))
+        Betweenness is estimated from GRAPH_ANALYTICS_SAMPLES source nodes
+        on graphs with more nodes than that.
         
-        return result
+        Args:
+            graph: Knowledge graph to analyze
+            algorithm: Centrality algorithm to use
+            
+        Returns:
+            Dictionary mapping entity IDs to centrality scores
+        """
+        sparse_graph = SparseGraph.from_graph(graph)
+        
+        if algorithm == "degree":
+            scores = sparse_graph.degree_centrality()
+        elif algorithm == "eigenvector":
+            scores = sparse_graph.eigenvector_centrality()
+        elif algorithm == "betweenness":
+            scores = sparse_graph.betweenness_centrality(k=settings.GRAPH_ANALYTICS_SAMPLES)
+        elif algorithm == "closeness":
+            scores = sparse_graph.closeness_centrality()
+        elif algorithm == "pagerank":
+            scores = sparse_graph.pagerank()
+        else:
+            logger.warning(f"Unknown centrality algorithm: {algorithm}, using degree centrality")
+            scores = sparse_graph.degree_centrality()
+        
+        return sparse_graph.scores_by_id(scores)
     
     def detect_communities(self, 
                         graph: KnowledgeGraph,
@@ -74,37 +187,65 @@ class GraphAnalyzer:
         
         Args:
             graph: Knowledge graph to analyze
-            algorithm: Community detection algorithm to use
+            algorithm: Community detection algorithm to use: "louvain"
+                (built in), "louvain_networkx" (NetworkX implementation),
+                "kclique" or "connected"
             
         Returns:
             Dictionary mapping community IDs to lists of entities
         """
-        # Get the NetworkX graph
-        nx_graph = graph.to_networkx()
+        params = (algorithm, settings.COMMUNITY_RESOLUTION, settings.COMMUNITY_SEED)
+        communities = self.memoize(graph, "communities", params,
+                                   lambda: self._find_communities(graph, algorithm))
+        return {community_id: list(entities) for community_id, entities in communities.items()}
+    
+    def _find_communities(self, graph: KnowledgeGraph, algorithm: str) -> Dict[int, List[Entity]]:
+        """Run community detection on the graph.
         
-        # Default to Louvain algorithm
+        Args:
+            graph: Knowledge graph to analyze
+            algorithm: Community detection algorithm to use
+            
+        Returns:
+            Dictionary mapping community IDs to lists of entities
+        """
         communities = {}
         
         try:
             if algorithm == "louvain":
-                # Louvain algorithm requires the community library
-                # If not available, fall back to Girvan-Newman
-                try:
-                    import community as community_louvain
-                    partition = community_louvain.best_partition(nx_graph.to_undirected())
-                    
-                    # Group entities by community
-                    for node, community_id in partition.items():
-                        if community_id not in communities:
-                            communities[community_id] = []
-                        
+                # Built-in Louvain over the graph's arrays
+                core = graph.core
+                labels = louvain_communities(
+                    core,
+                    resolution=settings.COMMUNITY_RESOLUTION,
+                    seed=settings.COMMUNITY_SEED
+                )
+                
+                # Group entities by community
+                for node, community_id in enumerate(labels.tolist()):
+                    if community_id not in communities:
+                        communities[community_id] = []
+                    communities[community_id].append(graph.entities[core.node_ids[node]])
+                
+                return dict(sorted(communities.items()))
+            
+            # Get the NetworkX graph
+            nx_graph = graph.to_networkx()
+            
+            if algorithm == "louvain_networkx":
+                # Reference implementation, on the same weighted undirected graph
+                partition = nx.community.louvain_communities(
+                    self._weighted_undirected(nx_graph),
+                    resolution=settings.COMMUNITY_RESOLUTION,
+                    seed=settings.COMMUNITY_SEED
+                )
+                
+                for i, members in enumerate(sorted(partition, key=len, reverse=True)):
+                    communities[i] = []
+                    for node in members:
                         entity = graph.get_entity(node)
                         if entity:
-                            communities[community_id].append(entity)
-                    
-                except ImportError:
-                    logger.warning("Community detection library not available, falling back to k-clique")
-                    algorithm = "kclique"
+                            communities[i].append(entity)
             
             if algorithm == "kclique":
                 # Use k-clique communities
@@ -143,6 +284,24 @@ class GraphAnalyzer:
         
         return communities
     
+    def _weighted_undirected(self, nx_graph: nx.MultiDiGraph) -> nx.Graph:
+        """Collapse a multigraph into an undirected graph with edge multiplicities as weights.
+        
+        Args:
+            nx_graph: NetworkX graph of the knowledge graph
+            
+        Returns:
+            Undirected weighted graph
+        """
+        undirected = nx.Graph()
+        undirected.add_nodes_from(nx_graph)
+        for source, target in nx_graph.edges():
+            if undirected.has_edge(source, target):
+                undirected[source][target]["weight"] += 1
+            else:
+                undirected.add_edge(source, target, weight=1)
+        return undirected
+    
     def get_important_relationships(self, 
                                  graph: KnowledgeGraph,
                                  top_n: int = 10) -> List[Tuple[str, int]]:
@@ -183,8 +342,21 @@ class GraphAnalyzer:
         Returns:
             Dictionary of graph statistics
         """
-        nx_graph = graph.to_networkx()
+        sparse = use_sparse_analytics()
+        statistics = self.memoize(graph, "statistics", sparse,
+                                  lambda: self._compute_statistics(graph, sparse))
+        return copy.deepcopy(statistics)
+    
+    def _compute_statistics(self, graph: KnowledgeGraph, sparse: bool) -> Dict[str, Any]:
+        """Compute general statistics about the graph.
         
+        Args:
+            graph: Knowledge graph to analyze
+            sparse: Whether to use the sparse backend
+            
+        Returns:
+            Dictionary of graph statistics
+        """
         # Entity type statistics
         entity_types = {}
         for entity_id, entity in graph.entities.items():
@@ -206,14 +378,42 @@ class GraphAnalyzer:
             relation_types[rel_type] += 1
         
         # Graph structure statistics
+        if sparse:
+            structure = self._sparse_structure_statistics(graph)
+        else:
+            structure = self._networkx_structure_statistics(graph)
+        
+        # Assemble statistics
+        statistics = {
+            "num_entities": len(graph.entities),
+            "num_relationships": len(graph.relationships),
+            "entity_types": entity_types,
+            "relationship_types": relation_types,
+            **structure
+        }
+        
+        return statistics
+    
+    def _networkx_structure_statistics(self, graph: KnowledgeGraph) -> Dict[str, Any]:
+        """Compute graph structure statistics with NetworkX.
+        
+        Args:
+            graph: Knowledge graph to analyze
+            
+        Returns:
+            Dictionary with avg_degree, density, num_components,
+            avg_clustering and avg_path_length
+        """
+        nx_graph = graph.to_networkx()
+        
         try:
             avg_degree = sum(dict(nx_graph.degree()).values()) / float(nx_graph.number_of_nodes())
             density = nx.density(nx_graph)
             components = list(nx.weakly_connected_components(nx_graph))
             
-            # Try to compute average clustering coefficient
+            # Try to compute average clustering coefficient (on the simple graph, as the sparse backend)
             try:
-                avg_clustering = nx.average_clustering(nx_graph.to_undirected())
+                avg_clustering = nx.average_clustering(nx.Graph(nx_graph.to_undirected()))
             except:
                 avg_clustering = None
             
@@ -234,17 +434,50 @@ class GraphAnalyzer:
             avg_clustering = None
             avg_path_length = None
         
-        # Assemble statistics
-        statistics = {
-            "num_entities": len(graph.entities),
-            "num_relationships": len(graph.relationships),
-            "entity_types": entity_types,
-            "relationship_types": relation_types,
+        return {
             "avg_degree": avg_degree,
             "density": density,
             "num_components": len(components),
             "avg_clustering": avg_clustering,
             "avg_path_length": avg_path_length,
         }
+    
+    def _sparse_structure_statistics(self, graph: KnowledgeGraph) -> Dict[str, Any]:
+        """Compute graph structure statistics on the sparse adjacency matrix.
+        
+        The average path length is estimated from GRAPH_ANALYTICS_SAMPLES
+        source nodes on graphs with more nodes than that.
+        
+        Args:
+            graph: Knowledge graph to analyze
+            
+        Returns:
+            Dictionary with avg_degree, density, num_components,
+            avg_clustering and avg_path_length
+        """
+        sparse_graph = SparseGraph.from_graph(graph)
+        if sparse_graph.num_nodes == 0:
+            return {
+                "avg_degree": None,
+                "density": None,
+                "num_components": 0,
+                "avg_clustering": None,
+                "avg_path_length": None,
+            }
+        
+        num_components, _ = sparse_graph.weakly_connected_components()
+        avg_path_length = None
+        if sparse_graph.is_strongly_connected():
+            avg_path_length = sparse_graph.average_shortest_path_length(k=settings.GRAPH_ANALYTICS_SAMPLES)
         
-        return statistics
\ No newline at end of file
+        return {
+            "avg_degree": float(sparse_graph.degrees().mean()),
+            "density": sparse_graph.density(),
+            "num_components": num_components,
+            "avg_clustering": sparse_graph.average_clustering(),
+            "avg_path_length": avg_path_length,
+        }
+
+
+# Global graph analyzer instance (shared so that memoized results are reused)
+graph_analyzer = GraphAnalyzer()
@@ -8,6 +8,7 @@ import networkx as nx
 
 from ..models import Entity, Relationship, KnowledgeGraph
 from ..config import settings
+from .merge import GraphMerger
 
 logger = logging.getLogger(__name__)
 
@@ -81,6 +82,10 @@ class GraphBuilder:
     def merge_graphs(self, graphs: List[KnowledgeGraph]) -> KnowledgeGraph:
         """Merge multiple knowledge graphs.
         
+        Entities are matched by normalized (name, type) and by their aliases,
+        and duplicate relationships are removed (see GraphMerger). Many large
+        graphs are merged as a tree in worker processes.
+        
         Args:
             graphs: List of knowledge graphs to merge
             
@@ -93,87 +98,7 @@ class GraphBuilder:
         if len(graphs) == 1:
             return graphs[0]
         
-        # Create a new graph for the merged result
-        merged_graph = KnowledgeGraph()
-        
-        # Track entities that have been merged
-        merged_entities = {}
-        
-        # First, add all entities
-        for graph in graphs:
-            for entity_id, entity in graph.entities.items():
-                if entity_id in merged_entities:
-                    # This entity has already been added
-                    continue
-                
-                # Check if this entity exists in the merged graph
-                # (based on name and type)
-                existing_entities = merged_graph.get_entities_by_type(entity.type)
-                match_found = False
-                
-                for existing in existing_entities:
-                    if existing.name.lower() == entity.name.lower():
-                        # Merge attributes from this entity into the existing one
-                        for attr in entity.attributes:
-                            existing_attrs = existing.get_attribute(attr.key)
-                            
-                            if not existing_attrs:
-                                # Add the attribute
-                                existing.add_attribute(
-                                    attr.key,
-                                    attr.value,
-                                    attr.confidence,
-                                    attr.source_span
-                                )
-                            elif attr.confidence > max(e.confidence for e in existing_attrs):
-                                # Replace with higher confidence attribute
-                                existing.attributes = [
-                                    a for a in existing.attributes
-                                    if a.key != attr.key
-                                ]
-                                existing.add_attribute(
-                                    attr.key,
-                                    attr.value,
-                                    attr.confidence,
-                                    attr.source_span
-                                )
-                        
-                        # Update merged entities map
-                        merged_entities[entity_id] = existing.id
-                        match_found = True
-                        break
-                
-                if not match_found:
-                    # Add as a new entity
-                    merged_graph.add_entity(entity)
-                    merged_entities[entity_id] = entity.id
-        
-        # Then, add all relationships
-        for graph in graphs:
-            for rel_id, rel in graph.relationships.items():
-                # Update source and target IDs
-                source_id = merged_entities.get(rel.source_id, rel.source_id)
-                target_id = merged_entities.get(rel.target_id, rel.target_id)
-                
-                # Create a new relationship with updated IDs
-                new_rel = Relationship(
-                    id=rel.id,
-                    source_id=source_id,
-                    target_id=target_id,
-                    type=rel.type,
-                    directed=rel.directed,
-                    attributes=rel.attributes,
-                    confidence=rel.confidence,
-                    source_span=rel.source_span
-                )
-                
-                try:
-                    merged_graph.add_relationship(new_rel)
-                except ValueError as e:
-                    logger.warning(f"Error adding relationship during merge: {str(e)}")
-        
-        logger.info(f"Merged {len(graphs)} graphs into a graph with {len(merged_graph.entities)} entities and {len(merged_graph.relationships)} relationships")
-        return merged_graph
+        return GraphMerger().reduce(graphs)
     
     def validate_graph(self, graph: KnowledgeGraph) -> Tuple[bool, List[str]]:
         """Validate a knowledge graph.
@@ -0,0 +1,231 @@
+"""Community detection for the knowledge graph synthesis system.
+
+Louvain modularity optimization over the array core of a graph, with NumPy
+as the only requirement. Local moving is done for all nodes at once: the
+weight from every node to every neighbouring community is aggregated with
+one sort of the edge arrays, each node picks the community with the largest
+modularity gain, and a random subset of the improving nodes moves. Moves
+that would lower modularity are retried with a smaller subset. Communities
+are then merged into nodes and the process repeats on the smaller graph.
+Results depend only on the seed.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..models import GraphCore
+
+logger = logging.getLogger(__name__)
+
+# Smallest fraction of the improving nodes moved at once before a level stops
+_MIN_MOVE_FRACTION = 1.0 / 64
+
+
+def _aggregate(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray,
+             num_nodes: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum the weights of repeated (row, col) entries.
+    
+    Args:
+        rows: Row of each entry
+        cols: Column of each entry
+        weights: Weight of each entry
+        num_nodes: Number of nodes
+    
+    Returns:
+        (rows, cols, weights) tuple with unique entries sorted by row, then column
+    """
+    keys, inverse = np.unique(rows.astype(np.int64) * num_nodes + cols, return_inverse=True)
+    return keys // num_nodes, keys % num_nodes, np.bincount(inverse, weights=weights)
+
+
+def _symmetric_edges(core: GraphCore) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the undirected weighted adjacency of a graph as coordinate arrays.
+    
+    Parallel relationships add to the weight of an edge, and a self-loop
+    counts twice towards the degree of its node.
+    
+    Args:
+        core: Array core of the knowledge graph
+    
+    Returns:
+        (rows, cols, weights) tuple of the symmetric adjacency matrix
+    """
+    rows = np.concatenate([core.edge_sources, core.edge_targets])
+    cols = np.concatenate([core.edge_targets, core.edge_sources])
+    return _aggregate(rows, cols, np.ones(len(rows)), core.num_nodes)
+
+
+def _modularity(community: np.ndarray, rows: np.ndarray, cols: np.ndarray, weights: np.ndarray,
+              degree: np.ndarray, total: float, resolution: float) -> float:
+    """Compute the modularity of a partition of a level graph."""
+    internal = weights[community[rows] == community[cols]].sum()
+    community_degree = np.bincount(community, weights=degree, minlength=len(degree))
+    return internal / total - resolution * np.square(community_degree).sum() / total ** 2
+
+
+def _move_nodes(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, degree: np.ndarray,
+              resolution: float, threshold: float, rng: np.random.Generator) -> Tuple[np.ndarray, float, float]:
+    """Move nodes between communities until modularity stops improving.
+    
+    Args:
+        rows: Row of each adjacency entry
+        cols: Column of each adjacency entry
+        weights: Weight of each adjacency entry
+        degree: Weighted degree of each node
+        resolution: Resolution parameter
+        threshold: Minimum modularity gain of an iteration
+        rng: Random number generator
+    
+    Returns:
+        (community, initial modularity, final modularity) tuple
+    """
+    n = len(degree)
+    total = degree.sum()
+    half_total = total / 2
+    community = np.arange(n)
+    
+    # Self-loops stay inside their node's community and do not affect moves
+    links = rows != cols
+    link_rows, link_cols, link_weights = rows[links], cols[links], weights[links]
+    
+    initial = quality = _modularity(community, rows, cols, weights, degree, total, resolution)
+    scale = resolution * degree / (2 * half_total ** 2)
+    fraction = 1.0
+    
+    # Only nodes whose neighbourhood changed can have a better community
+    active = np.ones(n, dtype=bool)
+    
+    while True:
+        community_degree = np.bincount(community, weights=degree, minlength=n)
+        sizes = np.bincount(community, minlength=n)
+        
+        # Weight from every active node to every neighbouring community
+        selected = active[link_rows]
+        keys, inverse = np.unique(link_rows[selected] * n + community[link_cols[selected]], return_inverse=True)
+        if len(keys) == 0:
+            break
+        link_weight = np.bincount(inverse, weights=link_weights[selected])
+        nodes, targets = keys // n, keys % n
+        own = community[nodes] == targets
+        own_weight = np.zeros(n)
+        own_weight[nodes[own]] = link_weight[own]
+        
+        # Modularity gain of moving each node to each neighbouring community
+        # instead of staying in its own (which it leaves in both cases)
+        stay = own_weight / half_total - scale * (community_degree[community] - degree)
+        gain = link_weight / half_total - scale[nodes] * community_degree[targets] - stay[nodes]
+        gain[own] = -np.inf
+        
+        # Best community of each node; ties go to the lowest community number
+        starts = np.flatnonzero(np.r_[True, nodes[1:] != nodes[:-1]])
+        best_gain = np.maximum.reduceat(gain, starts)
+        candidates = np.flatnonzero(gain == np.repeat(best_gain, np.diff(np.r_[starts, len(nodes)])))
+        best = candidates[np.r_[True, nodes[candidates[1:]] != nodes[candidates[:-1]]]]
+        best_nodes, best_targets = nodes[best], targets[best]
+        
+        # Two singletons only merge towards the lower number, so they do not swap
+        improving = (best_gain > 0) & ~(
+            (sizes[community[best_nodes]] == 1) & (sizes[best_targets] == 1)
+            & (best_targets > community[best_nodes])
+        )
+        if not improving.any():
+            break
+        
+        movers = improving & (rng.random(len(best_nodes)) < fraction)
+        candidate = community.copy()
+        candidate[best_nodes[movers]] = best_targets[movers]
+        candidate_quality = _modularity(candidate, rows, cols, weights, degree, total, resolution)
+        
+        if candidate_quality > quality:
+            gained = candidate_quality - quality
+            community, quality = candidate, candidate_quality
+            if gained < threshold:
+                break
+            
+            # Reconsider the nodes that moved and their neighbours
+            moved = np.zeros(n, dtype=bool)
+            moved[best_nodes[movers]] = True
+            active = moved.copy()
+            active[link_cols[moved[link_rows]]] = True
+        else:
+            # Moving together undid each other's gains: move fewer nodes at once
+            fraction /= 2
+            if fraction < _MIN_MOVE_FRACTION:
+                break
+    
+    return community, initial, quality
+
+
+def louvain_communities(core: GraphCore,
+                      resolution: float = 1.0,
+                      threshold: float = 1.0e-7,
+                      seed: Optional[int] = None) -> np.ndarray:
+    """Detect communities with the Louvain method.
+    
+    The graph is treated as undirected, with parallel relationships adding
+    to the weight of an edge.
+    
+    Args:
+        core: Array core of the knowledge graph
+        resolution: Resolution parameter (higher values give smaller communities)
+        threshold: Minimum modularity gain of a level
+        seed: Random seed
+    
+    Returns:
+        Community number of each node; communities are numbered by
+        decreasing size
+    """
+    n = core.num_nodes
+    labels = np.arange(n)
+    if n == 0 or core.num_edges == 0:
+        return labels
+    
+    rng = np.random.default_rng(seed)
+    rows, cols, weights = _symmetric_edges(core)
+    degree = np.bincount(rows, weights=weights, minlength=n)
+    level = 0
+    
+    while True:
+        community, initial, quality = _move_nodes(rows, cols, weights, degree, resolution, threshold, rng)
+        if quality - initial < threshold:
+            break
+        
+        # Merge each community into one node of the next level
+        _, community = np.unique(community, return_inverse=True)
+        count = int(community.max()) + 1
+        labels = community[labels]
+        rows, cols, weights = _aggregate(community[rows], community[cols], weights, count)
+        degree = np.bincount(rows, weights=weights, minlength=count)
+        
+        level += 1
+        logger.debug(f"Louvain level {level}: {count} communities, modularity {quality:.4f}")
+    
+    # Number communities by decreasing size
+    sizes = np.bincount(labels)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+    return rank[labels]
+
+
+def modularity(core: GraphCore, labels: np.ndarray, resolution: float = 1.0) -> float:
+    """Compute the modularity of a partition of a graph.
+    
+    Uses the same undirected weighted graph as louvain_communities(), and
+    matches nx.community.modularity() on it.
+    
+    Args:
+        core: Array core of the knowledge graph
+        labels: Community number of each node
+        resolution: Resolution parameter
+    
+    Returns:
+        Modularity
+    """
+    if core.num_edges == 0:
+        return 0.0
+    
+    rows, cols, weights = _symmetric_edges(core)
+    degree = np.bincount(rows, weights=weights, minlength=core.num_nodes)
+    return float(_modularity(np.asarray(labels), rows, cols, weights, degree, degree.sum(), resolution))
@@ -8,9 +8,9 @@ from typing import Dict, List, Optional, Any, Set, Tuple
 from uuid import UUID
 
 from ..models import KnowledgeGraph, Entity, Relationship, TextSegment, SegmentCollection
-from ..llm import LLMProviderFactory, prompt_manager, ResponseValidator
+from ..llm import LLMProviderFactory, prompt_manager, ResponseValidator, CachedContext
 from ..extraction import EntityExtractor, RelationshipExtractor, CoreferenceResolver, Grounder
-from .analysis import GraphAnalyzer
+from .analysis import graph_analyzer
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -34,7 +34,7 @@ class GraphExpander:
         """
         self.provider_name = provider_name
         self.confidence_threshold = confidence_threshold
-        self.analyzer = GraphAnalyzer()
+        self.analyzer = graph_analyzer
     
     async def identify_expansion_targets(self, 
                                      graph: KnowledgeGraph) -> List[Dict[str, Any]]:
@@ -90,13 +90,16 @@ class GraphExpander:
     async def generate_questions(self, 
                              target: Dict[str, Any], 
                              graph: KnowledgeGraph,
-                             num_questions: int = 3) -> List[str]:
+                             num_questions: int = 3,
+                             cached_context: Optional[CachedContext] = None) -> List[str]:
         """Generate questions to expand knowledge about a target entity.
         
         Args:
             target: Expansion target (entity and metadata)
             graph: Knowledge graph context
             num_questions: Number of questions to generate
+            cached_context: Source text of the expansion iteration, shared by
+                its questions and answers
             
         Returns:
             List of questions
@@ -157,10 +160,12 @@ The questions should:
 
 Format each question on a new line, numbered 1 to {num_questions}.
 """
+        if cached_context is not None:
+            prompt += "The relevant source text is provided above.\n"
         
         # Generate questions
         try:
-            response = await provider.generate_text(prompt)
+            response = await provider.generate_text(prompt, cached_context=cached_context)
             
             # Extract questions from the response
             questions = []
@@ -206,13 +211,16 @@ Format each question on a new line, numbered 1 to {num_questions}.
     async def answer_question(self, 
                           question: str, 
                           target: Dict[str, Any],
-                          collection: SegmentCollection) -> Dict[str, Any]:
+                          collection: SegmentCollection,
+                          cached_context: Optional[CachedContext] = None) -> Dict[str, Any]:
         """Generate an answer to an expansion question.
         
         Args:
             question: Question to answer
             target: Expansion target (entity and metadata)
             collection: Text segments to search for information
+            cached_context: Source text of the expansion iteration; without
+                it, the text relevant to the target is sent with the prompt
             
         Returns:
             Dictionary with answer and extracted information
@@ -241,25 +249,21 @@ Format each question on a new line, numbered 1 to {num_questions}.
             logger.warning(f"No relevant segments found for entity {entity.name}")
             return {"answer": "", "entities": [], "relationships": []}
         
-        # Concatenate relevant text (with limiting to avoid context limits)
-        max_tokens = 4000
-        relevant_text = ""
-        
-        for segment in relevant_segments:
-            if len(relevant_text) + len(segment.text) > max_tokens:
-                break
-                
-            relevant_text += segment.text + "\n\n"
+        # The relevant text is either in the cached context or sent with the prompt
+        if cached_context is not None:
+            source = "the source text provided above"
+            relevant_text = ""
+        else:
+            source = "the provided text"
+            relevant_text = f"Relevant text:\n{self._join_segment_texts(relevant_segments)}\n"
         
         # Create a prompt for answering the question
         prompt = f"""
-Answer the following question about {entity.name} ({entity.type}) based ONLY on the provided text.
+Answer the following question about {entity.name} ({entity.type}) based ONLY on {source}.
 
 Question: {question}
 
-Relevant text:
 {relevant_text}
-
 Your answer should:
 1. Be factual and grounded in the provided text
 2. Include specific details and evidence
@@ -279,7 +283,7 @@ Format your response with these sections:
             logger.debug(f"Sending question to LLM: {question}")
             logger.debug(f"Prompt: {prompt[:500]}...")
             
-            response = await provider.generate_text(prompt)
+            response = await provider.generate_text(prompt, cached_context=cached_context)
             logger.debug(f"Received response: {response[:500]}...")
             
             # Parse the response
@@ -406,70 +410,79 @@ Format your response with these sections:
             if report_generator:
                 report_generator.add_iteration_data(iteration, targets)
             
-            # Generate questions for each target
-            all_questions = []
-            for target in targets:
-                questions = await self.generate_questions(target, expanded_graph)
-                for question in questions:
-                    all_questions.append((target, question))
-                    
-                    # Add question to report
-                    if report_generator:
-                        report_generator.add_question(
-                            iteration=iteration,
-                            target_name=target["entity"].name,
-                            target_type=target["entity"].type,
-                            question=question
-                        )
+            # The source text of the targets is shared by all questions and answers of the iteration
+            provider, cached_context = await self._create_source_context(targets, collection)
             
-            # Answer questions and extract new information
+            # New information found by the answers
             new_entities = []
             new_relationships = []
             
-            for target, question in all_questions:
-                logger.info(f"Processing question: {question}")
-                
-                # Answer the question
-                answer_result = await self.answer_question(question, target, collection)
+            try:
+                # Generate questions for each target
+                all_questions = []
+                for target in targets:
+                    questions = await self.generate_questions(target, expanded_graph, cached_context=cached_context)
+                    for question in questions:
+                        all_questions.append((target, question))
+                        
+                        # Add question to report
+                        if report_generator:
+                            report_generator.add_question(
+                                iteration=iteration,
+                                target_name=target["entity"].name,
+                                target_type=target["entity"].type,
+                                question=question
+                            )
                 
-                # Add answer to report
-                if report_generator and answer_result["answer"]:
-                    report_generator.add_answer(
-                        iteration=iteration,
-                        target_name=target["entity"].name,
-                        target_type=target["entity"].type,
-                        question=question,
-                        answer=answer_result["answer"],
-                        confidence=answer_result["confidence"],
-                        new_entities_text=answer_result.get("entities_text", ""),
-                        new_relationships_text=answer_result.get("relationships_text", "")
+                # Answer questions and extract new information
+                for target, question in all_questions:
+                    logger.info(f"Processing question: {question}")
+                    
+                    # Answer the question
+                    answer_result = await self.answer_question(question, target, collection,
+                                                             cached_context=cached_context)
+                    
+                    # Add answer to report
+                    if report_generator and answer_result["answer"]:
+                        report_generator.add_answer(
+                            iteration=iteration,
+                            target_name=target["entity"].name,
+                            target_type=target["entity"].type,
+                            question=question,
+                            answer=answer_result["answer"],
+                            confidence=answer_result["confidence"],
+                            new_entities_text=answer_result.get("entities_text", ""),
+                            new_relationships_text=answer_result.get("relationships_text", "")
+                        )
+                    
+                    if not answer_result["answer"]:
+                        continue
+                    
+                    # Extract entities from the answer
+                    answer_segment = TextSegment(
+                        id=uuid.uuid4(),  # Generate a new UUID for the segment
+                        text=answer_result["answer"],
+                        start_position=0,
+                        end_position=len(answer_result["answer"]),
+                        language="en"  # Assuming English
                     )
-                
-                if not answer_result["answer"]:
-                    continue
-                
-                # Extract entities from the answer
-                answer_segment = TextSegment(
-                    id=uuid.uuid4(),  # Generate a new UUID for the segment
-                    text=answer_result["answer"],
-                    start_position=0,
-                    end_position=len(answer_result["answer"]),
-                    language="en"  # Assuming English
-                )
-                
-                # Add segment to collection for proper grounding later
-                collection.add_segment(answer_segment)
-                
-                extracted_entities = await entity_extractor.extract_from_segment(answer_segment)
-                
-                # Extract relationships
-                extracted_relationships = await relation_extractor.extract_from_segment(
-                    answer_segment, 
-                    extracted_entities + list(expanded_graph.entities.values())
-                )
-                
-                new_entities.extend(extracted_entities)
-                new_relationships.extend(extracted_relationships)
+                    
+                    # Add segment to collection for proper grounding later
+                    collection.add_segment(answer_segment)
+                    
+                    extracted_entities = await entity_extractor.extract_from_segment(answer_segment)
+                    
+                    # Extract relationships
+                    extracted_relationships = await relation_extractor.extract_from_segment(
+                        answer_segment, 
+                        extracted_entities + list(expanded_graph.entities.values())
+                    )
+                    
+                    new_entities.extend(extracted_entities)
+                    new_relationships.extend(extracted_relationships)
+            finally:
+                if cached_context is not None:
+                    await provider.release_cached_context(cached_context)
             
             # Resolve coreferences
             all_entities = list(expanded_graph.entities.values()) + new_entities
@@ -519,6 +532,67 @@ Format your response with these sections:
         
         return expanded_graph
     
+    async def _create_source_context(self, 
+                                 targets: List[Dict[str, Any]],
+                                 collection: SegmentCollection) -> Tuple[Any, Optional[CachedContext]]:
+        """Create the cached context of an expansion iteration.
+        
+        The source text relevant to the targets is sent to the provider once
+        and shared by all questions and answers of the iteration.
+        
+        Args:
+            targets: Expansion targets of the iteration
+            collection: Text segments to search for information
+        
+        Returns:
+            (provider, cached_context) tuple; the context is None if it could
+            not be created
+        """
+        try:
+            provider = LLMProviderFactory.get_reasoning_provider()
+            if not provider:
+                provider = LLMProviderFactory.get_provider(self.provider_name)
+        except Exception as e:
+            logger.error(f"Error getting LLM provider: {str(e)}")
+            return None, None
+        
+        sections = []
+        for target in targets:
+            entity = target["entity"]
+            segments = self._find_relevant_segments(entity, collection)
+            if segments:
+                sections.append(f"Text relevant to {entity.name} ({entity.type}):\n{self._join_segment_texts(segments)}")
+        
+        if not sections:
+            return provider, None
+        
+        try:
+            cached_context = await provider.create_cached_context("\n".join(sections))
+        except Exception as e:
+            logger.warning(f"Error creating cached context, sending source text with each prompt: {str(e)}")
+            return provider, None
+        
+        return provider, cached_context
+    
+    def _join_segment_texts(self, segments: List[TextSegment], max_chars: int = 4000) -> str:
+        """Concatenate segment texts, stopping before the text gets too long.
+        
+        Args:
+            segments: Segments in order of relevance
+            max_chars: Maximum length of the text
+        
+        Returns:
+            Concatenated text
+        """
+        text = ""
+        for segment in segments:
+            if len(text) + len(segment.text) > max_chars:
+                break
+            
+            text += segment.text + "\n\n"
+        
+        return text
+    
     def _find_relevant_segments(self, 
                             entity: Entity, 
                             collection: SegmentCollection) -> List[TextSegment]:
@@ -0,0 +1,316 @@
+"""Graph merging for the knowledge graph synthesis system.
+
+Graphs are merged with hash joins. Every entity is indexed by its ID, by the
+normalized (name, type) of its name and by the normalized (alias, type) of
+each of its aliases; entities that share any key, directly or through a
+chain of aliases, become one entity. Relationships are then rewritten to
+the merged entities and deduplicated by (source, target, type) in the same
+pass. All of this is linear in the size of the input graphs.
+
+Which entity, attribute or relationship survives a merge depends only on
+their confidence and, on ties, on their content and IDs, never on the order
+in which they are merged. Merging is therefore associative, so many graphs
+can be merged as a tree in worker processes with the same result as merging
+them all at once.
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from uuid import UUID
+
+from ..models import Entity, EntityAttribute, Relationship, KnowledgeGraph
+from ..models.bulk import gc_paused
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Attribute keys holding alternative names of an entity
+ALIAS_KEYS = ("aliases", "alias", "alternative_names")
+
+# Parts of a name removed by normalization
+_ARTICLE = re.compile(r'^(the|a|an)\s+')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str) -> str:
+    """Get the normalized form of an entity name used as a merge key.
+    
+    Uses the same canonical form as coreference resolution: lowercase,
+    without a leading article, punctuation or repeated whitespace.
+    
+    Args:
+        name: Entity name
+    
+    Returns:
+        Normalized name
+    """
+    canonical = _ARTICLE.sub('', name.lower())
+    canonical = _PUNCTUATION.sub('', canonical)
+    canonical = _WHITESPACE.sub(' ', canonical).strip()
+    
+    # Names made only of punctuation are kept as they are
+    return canonical or name.strip().lower()
+
+
+def _values(attr: EntityAttribute) -> List[Any]:
+    """Get the values of an attribute that may hold a single value or a list."""
+    values = attr.value if isinstance(attr.value, (list, tuple, set)) else [attr.value]
+    return [value for value in values if value]
+
+
+def entity_aliases(entity: Entity) -> List[str]:
+    """Get the alternative names recorded in the attributes of an entity.
+    
+    Args:
+        entity: Entity
+    
+    Returns:
+        Aliases in the order they were recorded
+    """
+    return [str(value) for attr in entity.attributes if attr.key.lower() in ALIAS_KEYS for value in _values(attr)]
+
+
+def _attribute_rank(attr: EntityAttribute) -> Tuple[float, str]:
+    """Get the rank of an attribute among attributes with the same key."""
+    return attr.confidence, str(attr.value)
+
+
+def _merge_group(graphs: List[KnowledgeGraph]) -> KnowledgeGraph:
+    """Merge graphs in a worker process."""
+    return GraphMerger(max_workers=1).merge(graphs)
+
+
+class GraphMerger:
+    """Merges knowledge graphs into one consolidated graph.
+    
+    When entities merge, the one with the highest confidence (the one with
+    the smallest ID on ties) keeps its ID, name and type. For every other
+    attribute key the attribute with the highest confidence (the one with
+    the smallest value on ties) wins. Aliases and source documents are
+    combined, and the names of the other entities are added as aliases, in
+    sorted order. Of duplicate relationships the one with the highest
+    confidence (the one with the smallest ID on ties) is kept.
+    Relationships that only connect an entity to itself because of a merge,
+    and relationships whose entities are missing, are dropped.
+    """
+    
+    def __init__(self,
+               max_workers: Optional[int] = settings.GRAPH_MERGE_MAX_WORKERS,
+               fan_in: int = settings.GRAPH_MERGE_FAN_IN,
+               parallel_min_size: int = settings.GRAPH_MERGE_PARALLEL_MIN_SIZE):
+        """Initialize the graph merger.
+        
+        Args:
+            max_workers: Number of worker processes for reduce() (None for
+                one per core, 1 to merge in-process)
+            fan_in: Number of graphs merged together at each level of reduce()
+            parallel_min_size: Total number of entities and relationships
+                below which reduce() merges in-process
+        """
+        self.max_workers = max_workers
+        self.fan_in = max(fan_in, 2)
+        self.parallel_min_size = parallel_min_size
+        self.stats: Dict[str, int] = {}
+    
+    def merge(self, graphs: List[KnowledgeGraph]) -> KnowledgeGraph:
+        """Merge graphs in one pass.
+        
+        The garbage collector is paused while the merged entities and
+        relationships are created.
+        
+        Args:
+            graphs: Knowledge graphs to merge
+        
+        Returns:
+            Merged knowledge graph
+        """
+        with gc_paused():
+            entities = [entity for graph in graphs for entity in graph.entities.values()]
+            groups = self._group_entities(entities)
+            
+            merged_entities = []
+            representative: Dict[UUID, UUID] = {}
+            for group in groups:
+                entity = self._merge_entities([entities[index] for index in group])
+                merged_entities.append(entity)
+                for index in group:
+                    representative[entities[index].id] = entity.id
+            
+            relationships, dropped = self._merge_relationships(graphs, representative)
+        
+        metadata: Dict[str, Any] = {}
+        for graph in graphs:
+            for key, value in graph.metadata.items():
+                if isinstance(value, dict) and isinstance(metadata.get(key), dict):
+                    metadata[key] = {**value, **metadata[key]}
+                else:
+                    metadata.setdefault(key, value)
+        
+        merged_graph = KnowledgeGraph.from_records(merged_entities, relationships, metadata=metadata)
+        
+        self.stats = {
+            "graphs": len(graphs),
+            "entities": len(entities),
+            "merged_entities": len(merged_entities),
+            "relationships": sum(len(graph.relationships) for graph in graphs),
+            "merged_relationships": len(relationships),
+            "dropped_relationships": dropped,
+        }
+        logger.info(f"Merged {len(graphs)} graphs into a graph with {len(merged_graph.entities)} entities "
+                    f"and {len(merged_graph.relationships)} relationships")
+        return merged_graph
+    
+    def reduce(self, graphs: List[KnowledgeGraph]) -> KnowledgeGraph:
+        """Merge many graphs as a tree, with the levels merged in worker processes.
+        
+        Groups of fan_in consecutive graphs are merged in parallel, then
+        groups of the results, until one level remains. Since merging is
+        associative, the result is the same as merge() of all graphs.
+        
+        Args:
+            graphs: Knowledge graphs to merge (e.g. one per chunk or document)
+        
+        Returns:
+            Merged knowledge graph
+        """
+        graphs = list(graphs)
+        size = sum(len(graph.entities) + len(graph.relationships) for graph in graphs)
+        workers = self.max_workers or os.cpu_count() or 1
+        if len(graphs) <= self.fan_in or workers == 1 or size < self.parallel_min_size:
+            return self.merge(graphs)
+        
+        level = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while len(graphs) > self.fan_in:
+                groups = [graphs[start:start + self.fan_in] for start in range(0, len(graphs), self.fan_in)]
+                graphs = list(executor.map(_merge_group, groups))
+                level += 1
+                logger.info(f"Merge level {level}: {len(groups)} groups merged into {len(graphs)} graphs")
+        
+        return self.merge(graphs)
+    
+    def _group_entities(self, entities: List[Entity]) -> List[List[int]]:
+        """Group the entities that refer to the same object.
+        
+        Args:
+            entities: Entities of all input graphs, in order
+        
+        Returns:
+            Lists of entity positions, ordered by their first entity
+        """
+        parent = list(range(len(entities)))
+        
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+        
+        # Join each entity to the first entity with any of its keys
+        owners: Dict[Hashable, int] = {}
+        for index, entity in enumerate(entities):
+            keys = [entity.id, (normalize_name(entity.name), entity.type)]
+            keys.extend((normalize_name(alias), entity.type) for alias in entity_aliases(entity))
+            
+            for key in keys:
+                owner = owners.setdefault(key, index)
+                if owner != index:
+                    # The earlier group stays the root, which keeps groups in input order
+                    first, second = sorted((find(owner), find(index)))
+                    parent[second] = first
+        
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(entities)):
+            groups.setdefault(find(index), []).append(index)
+        return list(groups.values())
+    
+    def _merge_entities(self, entities: List[Entity]) -> Entity:
+        """Merge the entities of one group.
+        
+        Args:
+            entities: Entities referring to the same object, in input order
+        
+        Returns:
+            Merged entity (the entity itself for a group of one)
+        """
+        if len(entities) == 1:
+            return entities[0]
+        
+        # The entity that keeps its ID does not depend on the order of the entities
+        base = min(entities, key=lambda entity: (-entity.confidence, entity.id))
+        if all(entity.id == base.id for entity in entities):
+            # The same entity in several graphs
+            return base
+        
+        attributes: Dict[str, EntityAttribute] = {}
+        documents = set()
+        names = {entity.name for entity in entities}
+        for entity in entities:
+            if entity.source_span and entity.source_span.document_id:
+                documents.add(entity.source_span.document_id)
+            
+            for attr in entity.attributes:
+                key = attr.key.lower()
+                if key in ALIAS_KEYS:
+                    names.update(str(value) for value in _values(attr))
+                elif key == "source_documents":
+                    documents.update(_values(attr))
+                elif key not in attributes or _attribute_rank(attr) > _attribute_rank(attributes[key]):
+                    attributes[key] = attr
+        
+        # Every other spelling is kept, so that no name is lost when the
+        # entity is merged again
+        names.discard(base.name)
+        combined = {"aliases": sorted(names), "source_documents": sorted(documents) if len(documents) > 1 else []}
+        merged_attributes = [attributes[key] for key in sorted(attributes)]
+        merged_attributes.extend(EntityAttribute(key=key, value=value) for key, value in combined.items() if value)
+        return base.model_copy(update={"attributes": merged_attributes})
+    
+    def _merge_relationships(self, graphs: List[KnowledgeGraph],
+                           representative: Dict[UUID, UUID]) -> Tuple[List[Relationship], int]:
+        """Rewrite relationships to the merged entities and deduplicate them.
+        
+        Args:
+            graphs: Input graphs
+            representative: ID of the merged entity of every input entity
+        
+        Returns:
+            (relationships, dropped) tuple with the unique relationships and
+            the number of relationships dropped for missing or merged entities
+        """
+        unique: Dict[Tuple[UUID, UUID, str, bool], Tuple[Relationship, UUID, UUID]] = {}
+        dropped = 0
+        for graph in graphs:
+            for rel in graph.relationships.values():
+                source_id = representative.get(rel.source_id)
+                target_id = representative.get(rel.target_id)
+                if source_id is None or target_id is None or \
+                        (source_id == target_id and rel.source_id != rel.target_id):
+                    dropped += 1
+                    continue
+                
+                # Undirected relationships match in either direction, never directed ones
+                key = (source_id, target_id, rel.type.lower(), rel.directed)
+                if not rel.directed and target_id < source_id:
+                    key = (target_id, source_id, key[2], False)
+                
+                existing = unique.get(key)
+                if existing is None or (-rel.confidence, rel.id) < (-existing[0].confidence, existing[0].id):
+                    unique[key] = (rel, source_id, target_id)
+        
+        # Only the kept relationships that point to merged entities are copied
+        relationships = [
+            rel if (source_id, target_id) == (rel.source_id, rel.target_id)
+            else rel.model_copy(update={"source_id": source_id, "target_id": target_id})
+            for rel, source_id, target_id in unique.values()
+        ]
+        
+        if dropped:
+            logger.warning(f"Dropped {dropped} relationships with missing entities or merged into self-loops")
+        return relationships, dropped
@@ -7,7 +7,7 @@ from uuid import UUID, uuid4
 
 from ..models import KnowledgeGraph, Entity, Relationship, SourceSpan
 from ..llm import LLMProviderFactory
-from .analysis import GraphAnalyzer
+from .analysis import graph_analyzer
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -35,7 +35,7 @@ class MetaGraphBuilder:
         self.provider_name = provider_name
         self.min_cluster_size = min_cluster_size
         self.confidence_threshold = confidence_threshold
-        self.analyzer = GraphAnalyzer()
+        self.analyzer = graph_analyzer
     
     async def build_metagraph(self, graph: KnowledgeGraph) -> KnowledgeGraph:
         """Build a meta-graph from a knowledge graph.
@@ -0,0 +1,465 @@
+"""Structural motif mining for the knowledge graph synthesis system.
+
+Counts four kinds of motifs over the array core of a graph in one bounded
+pass: stars (entities with far more neighbours than average), typed paths
+(entity type → relationship type → entity type), chains (two typed paths
+joined at an entity) and triangles grouped by the types of their entities.
+Each distinct motif is counted once and compared with its expected count in
+a graph with the same degrees and type frequencies, so motifs are ranked by
+how surprising they are instead of being enumerated one occurrence at a
+time. Occurrences are processed in batches of at most `max_pairs` items, and
+work that is not reached before the time budget runs out is skipped.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from ..models import GraphCore
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Smallest number of occurrences of a reported motif
+_MIN_COUNT = 2
+
+# Smallest number of neighbours of the hub of a reported star
+_MIN_STAR_DEGREE = 5
+
+# Largest number of neighbours listed in the example of a star
+_STAR_EXAMPLE_SIZE = 5
+
+
+def surprise(observed: Any, expected: Any) -> np.ndarray:
+    """Compute how surprising observed counts are given expected counts.
+    
+    Uses the signed square root of the Poisson deviance, which behaves like
+    a z-score: 0 when a count is as expected, positive when it is higher.
+    
+    Args:
+        observed: Observed counts
+        expected: Expected counts
+    
+    Returns:
+        Surprise of each count
+    """
+    observed = np.asarray(observed, dtype=np.float64)
+    expected = np.maximum(np.asarray(expected, dtype=np.float64), 1e-12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ratio = np.where(observed > 0, observed * np.log(observed / expected), 0.0)
+    deviance = np.maximum(2 * (log_ratio - (observed - expected)), 0.0)
+    return np.sign(observed - expected) * np.sqrt(deviance)
+
+
+class _Budget:
+    """Time and memory budget of one mining run."""
+    
+    def __init__(self, max_seconds: float, max_pairs: int):
+        self.deadline = time.perf_counter() + max_seconds
+        self.max_pairs = max(int(max_pairs), 1)
+    
+    def expired(self) -> bool:
+        """Check whether the time budget has run out."""
+        return time.perf_counter() > self.deadline
+    
+    def batches(self, work: np.ndarray) -> Iterator[Tuple[int, int]]:
+        """Split items into consecutive batches of at most max_pairs work.
+        
+        An item with more work than that is a batch of its own. Stops when
+        the time budget runs out.
+        
+        Args:
+            work: Work of each item
+        
+        Yields:
+            (start, stop) item ranges
+        """
+        ends = np.cumsum(work)
+        start = 0
+        while start < len(work) and not self.expired():
+            done = ends[start - 1] if start else 0
+            stop = max(int(np.searchsorted(ends, done + self.max_pairs, side="right")), start + 1)
+            yield start, stop
+            start = stop
+
+
+def _top(counts: np.ndarray, expected: np.ndarray, top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Select the most surprising over-represented motifs.
+    
+    Args:
+        counts: Observed count of each motif
+        expected: Expected count of each motif
+        top_n: Number of motifs to select
+    
+    Returns:
+        (indices, surprise) tuple for the selected motifs, most surprising first
+    """
+    scores = surprise(counts, expected)
+    candidates = np.flatnonzero((counts >= _MIN_COUNT) & (scores > 0))
+    selected = candidates[np.argsort(-scores[candidates], kind="stable")][:top_n]
+    return selected, scores[selected]
+
+
+def _pairs(offsets: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand groups into the positions of their members.
+    
+    Args:
+        offsets: First position of each group
+        counts: Number of members of each group
+    
+    Returns:
+        (group, position) tuple with one entry per member
+    """
+    group = np.repeat(np.arange(len(counts)), counts)
+    within = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return group, offsets[group] + within
+
+
+def _merge(keys: np.ndarray, counts: np.ndarray, new_keys: np.ndarray,
+          new_counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Add keyed counts to a running total."""
+    merged, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    return merged, np.bincount(inverse, weights=np.concatenate([counts, new_counts]))
+
+
+def _simple_edges(core: GraphCore) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the undirected simple edges of a graph.
+    
+    Args:
+        core: Array core of the knowledge graph
+    
+    Returns:
+        (low, high) tuple of node numbers with low < high, sorted by (low, high)
+    """
+    n = core.num_nodes
+    low = np.minimum(core.edge_sources, core.edge_targets).astype(np.int64)
+    high = np.maximum(core.edge_sources, core.edge_targets).astype(np.int64)
+    keys = np.unique(low[low != high] * n + high[low != high])
+    return keys // n, keys % n
+
+
+def _stars(core: GraphCore, degree: np.ndarray, top_n: int) -> List[Dict[str, Any]]:
+    """Find entities with far more neighbours than average.
+    
+    Args:
+        core: Array core of the knowledge graph
+        degree: Number of distinct neighbours of each node
+        top_n: Number of stars to report
+    
+    Returns:
+        Star motifs
+    """
+    mean = degree.mean()
+    candidates = np.flatnonzero(degree >= _MIN_STAR_DEGREE)
+    selected, scores = _top(degree[candidates], np.full(len(candidates), mean), top_n)
+    
+    motifs = []
+    for node, score in zip(candidates[selected].tolist(), scores.tolist()):
+        neighbours = core.neighbors(node)
+        neighbours = neighbours[neighbours != node]
+        types = np.bincount(core.node_types[neighbours], minlength=len(core.type_names))
+        example = neighbours[np.argsort(-degree[neighbours], kind="stable")][:_STAR_EXAMPLE_SIZE]
+        motifs.append({
+            "kind": "star",
+            "signature": [core.type_names[core.node_types[node]], core.type_names[int(types.argmax())]],
+            "count": int(degree[node]),
+            "expected": float(mean),
+            "surprise": float(score),
+            "nodes": [node] + example.tolist(),
+            "exact": True
+        })
+    return motifs
+
+
+def _typed_paths(core: GraphCore, top_n: int) -> List[Dict[str, Any]]:
+    """Count relationships by the types of their entities and their own type.
+    
+    The expected count of a typed path assumes that each relationship type
+    connects sources and targets in proportion to how often each entity type
+    is a source or target overall.
+    
+    Args:
+        core: Array core of the knowledge graph
+        top_n: Number of typed paths to report
+    
+    Returns:
+        Typed path motifs
+    """
+    t, r = len(core.type_names), len(core.edge_type_names)
+    source_types = core.node_types[core.edge_sources].astype(np.int64)
+    target_types = core.node_types[core.edge_targets].astype(np.int64)
+    keys = (source_types * r + core.edge_types) * t + target_types
+    signatures, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    
+    m = core.num_edges
+    source_share = np.bincount(source_types, minlength=t) / m
+    target_share = np.bincount(target_types, minlength=t) / m
+    relation_count = np.bincount(core.edge_types, minlength=r)
+    source_type, relation, target_type = signatures // (r * t), signatures // t % r, signatures % t
+    expected = relation_count[relation] * source_share[source_type] * target_share[target_type]
+    
+    motifs = []
+    selected, scores = _top(counts, expected, top_n)
+    for index, score in zip(selected.tolist(), scores.tolist()):
+        edge = first[index]
+        motifs.append({
+            "kind": "typed_path",
+            "signature": [core.type_names[source_type[index]], core.edge_type_names[relation[index]],
+                          core.type_names[target_type[index]]],
+            "count": int(counts[index]),
+            "expected": float(expected[index]),
+            "surprise": float(score),
+            "nodes": [int(core.edge_sources[edge]), int(core.edge_targets[edge])],
+            "exact": True
+        })
+    return motifs
+
+
+def _chains(core: GraphCore, budget: _Budget, rng: np.random.Generator, top_n: int) -> List[Dict[str, Any]]:
+    """Count two-step walks by the types of their entities and relationships.
+    
+    Relationships (other than self-loops) are first aggregated per middle entity into ends keyed by
+    (source type, relationship type) and (relationship type, target type),
+    so a hub contributes one pair per combination of types rather than one
+    per walk. The expected count of a chain keeps the number of walks
+    through each entity and picks the type of each end at random from the
+    ends of the middle type. Middle entities are processed in random order;
+    if the time budget runs out, counts and expected counts both cover the
+    entities that were processed.
+    
+    Args:
+        core: Array core of the knowledge graph
+        budget: Mining budget
+        rng: Random number generator
+        top_n: Number of chains to report
+    
+    Returns:
+        Chain motifs
+    """
+    n, t, r = core.num_nodes, len(core.type_names), len(core.edge_type_names)
+    k = t * r
+    
+    # A self-loop would chain with itself
+    links = core.edge_sources != core.edge_targets
+    sources = core.edge_sources[links].astype(np.int64)
+    targets = core.edge_targets[links].astype(np.int64)
+    relations = core.edge_types[links].astype(np.int64)
+    in_ends = core.node_types[sources].astype(np.int64) * r + relations
+    out_ends = relations * t + core.node_types[targets]
+    
+    # Distinct ends at each node, sorted by node
+    in_pairs, in_counts = np.unique(targets * k + in_ends, return_counts=True)
+    out_pairs, out_counts = np.unique(sources * k + out_ends, return_counts=True)
+    in_start = np.searchsorted(in_pairs // k, np.arange(n + 1))
+    out_start = np.searchsorted(out_pairs // k, np.arange(n + 1))
+    in_length, out_length = np.diff(in_start), np.diff(out_start)
+    
+    middles = np.flatnonzero(in_length * out_length)
+    middles = middles[rng.permutation(len(middles))]
+    keys, counts = np.zeros(0, dtype=np.int64), np.zeros(0)
+    done = 0
+    for start, stop in budget.batches(in_length[middles] * out_length[middles]):
+        nodes = middles[start:stop]
+        
+        # Pair every incoming end of each node with every outgoing end
+        group, position = _pairs(np.zeros(len(nodes), dtype=np.int64),
+                                 in_length[nodes] * out_length[nodes])
+        node = nodes[group]
+        incoming = in_start[node] + position // out_length[node]
+        outgoing = out_start[node] + position % out_length[node]
+        batch_keys = (core.node_types[node].astype(np.int64) * k + in_pairs[incoming] % k) * k \
+            + out_pairs[outgoing] % k
+        keys, counts = _merge(keys, counts, batch_keys, in_counts[incoming] * out_counts[outgoing])
+        done = stop
+    
+    if done < len(middles):
+        logger.warning(f"Motif mining time budget exhausted after {done} of {len(middles)} chain middles")
+    
+    # Walks through the processed entities of each type, split by the share
+    # of each end among the relationships of entities of that type
+    processed = middles[:done]
+    walks = np.bincount(core.node_types[processed], minlength=t,
+                        weights=np.bincount(targets, minlength=n)[processed] * np.bincount(sources, minlength=n)[processed])
+    in_total = np.bincount(core.node_types[targets].astype(np.int64) * k + in_ends, minlength=t * k).reshape(t, k)
+    out_total = np.bincount(core.node_types[sources].astype(np.int64) * k + out_ends, minlength=t * k).reshape(t, k)
+    in_share = in_total / np.maximum(in_total.sum(axis=1, keepdims=True), 1)
+    out_share = out_total / np.maximum(out_total.sum(axis=1, keepdims=True), 1)
+    
+    middle_type, in_end, out_end = keys // (k * k), keys // k % k, keys % k
+    expected = walks[middle_type] * in_share[middle_type, in_end] * out_share[middle_type, out_end]
+    
+    motifs = []
+    selected, scores = _top(counts, expected, top_n)
+    for index, score in zip(selected.tolist(), scores.tolist()):
+        source_type, first_relation = divmod(int(in_end[index]), r)
+        second_relation, target_type = divmod(int(out_end[index]), t)
+        
+        # Example: the middle entity with the most walks of this chain
+        first = np.flatnonzero(in_ends == in_end[index])
+        first = first[core.node_types[targets[first]] == middle_type[index]]
+        second = np.flatnonzero(out_ends == out_end[index])
+        middle = np.intersect1d(targets[first], sources[second])
+        walks = np.bincount(targets[first], minlength=n)[middle] * np.bincount(sources[second], minlength=n)[middle]
+        example = int(middle[walks.argmax()])
+        before = sources[first[targets[first] == example]]
+        after = targets[second[sources[second] == example]]
+        
+        # Prefer an example that does not return to where it started
+        start, end = int(before[0]), int(after[0])
+        other = np.flatnonzero(after != start)
+        if len(other):
+            end = int(after[other[0]])
+        
+        motifs.append({
+            "kind": "chain",
+            "signature": [core.type_names[source_type], core.edge_type_names[first_relation],
+                          core.type_names[middle_type[index]], core.edge_type_names[second_relation],
+                          core.type_names[target_type]],
+            "count": int(counts[index]),
+            "expected": float(expected[index]),
+            "surprise": float(score),
+            "nodes": [start, example, end],
+            "exact": done == len(middles)
+        })
+    return motifs
+
+
+def _triangles(core: GraphCore, low: np.ndarray, high: np.ndarray, degree: np.ndarray,
+              budget: _Budget, rng: np.random.Generator, top_n: int) -> List[Dict[str, Any]]:
+    """Count triangles by the types of their entities.
+    
+    Each edge is directed from the node of lower degree to the other, and a
+    triangle is counted once at its lowest node by checking which pairs of
+    that node's out-neighbours are connected; no node has more than
+    sqrt(2 * edges) out-neighbours this way. The expected count of a typed
+    triangle is the number of triangles in a random graph with the same
+    degrees, split by the share of each type among the wedges. Nodes are
+    processed in random order; if the time budget runs out, expected counts
+    are scaled to the wedges that were checked.
+    
+    Args:
+        core: Array core of the knowledge graph
+        low: Lower node of each undirected edge
+        high: Higher node of each undirected edge
+        degree: Number of distinct neighbours of each node
+        budget: Mining budget
+        rng: Random number generator
+        top_n: Number of typed triangles to report
+    
+    Returns:
+        Triangle motifs
+    """
+    n, t = core.num_nodes, len(core.type_names)
+    edge_keys = low * n + high
+    
+    # Direct each edge from the node of lower (degree, number) to the other
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.lexsort((np.arange(n), degree))] = np.arange(n)
+    swap = rank[low] > rank[high]
+    heads, tails = np.where(swap, high, low), np.where(swap, low, high)
+    order = np.argsort(heads, kind="stable")
+    heads, tails = heads[order], tails[order]
+    start = np.searchsorted(heads, np.arange(n + 1))
+    out_degree = np.diff(start)
+    
+    wedges = out_degree * (out_degree - 1) // 2
+    roots = np.flatnonzero(wedges)
+    roots = roots[rng.permutation(len(roots))]
+    keys, counts = np.zeros(0, dtype=np.int64), np.zeros(0)
+    examples: Dict[int, List[int]] = {}
+    done = 0
+    for begin, stop in budget.batches(wedges[roots]):
+        nodes = roots[begin:stop]
+        
+        # Pair every out-neighbour of each node with the ones after it
+        group, first = _pairs(start[nodes], out_degree[nodes])
+        later = start[nodes[group] + 1] - first - 1
+        _, second = _pairs(first + 1, later)
+        first = np.repeat(first, later)
+        a, b = tails[first], tails[second]
+        pair_keys = np.minimum(a, b) * n + np.maximum(a, b)
+        found = np.minimum(np.searchsorted(edge_keys, pair_keys), len(edge_keys) - 1)
+        closed = edge_keys[found] == pair_keys
+        
+        corners = np.stack([heads[first[closed]], a[closed], b[closed]], axis=1)
+        types = np.sort(core.node_types[corners].astype(np.int64), axis=1)
+        batch_keys, index, batch_counts = np.unique((types[:, 0] * t + types[:, 1]) * t + types[:, 2],
+                                                    return_index=True, return_counts=True)
+        for key, triangle in zip(batch_keys.tolist(), index.tolist()):
+            examples.setdefault(key, corners[triangle].tolist())
+        keys, counts = _merge(keys, counts, batch_keys, batch_counts)
+        done = stop
+    
+    coverage = wedges[roots[:done]].sum() / max(wedges.sum(), 1)
+    if done < len(roots):
+        logger.warning(f"Motif mining time budget exhausted after {coverage:.0%} of the triangle wedges")
+    
+    # Triangles in a random graph with the same degrees, and the type share of wedge centres
+    degree = degree.astype(np.float64)
+    centres = degree * (degree - 1)
+    expected_triangles = (centres.sum() / max(degree.sum(), 1)) ** 3 / 6 * coverage
+    share = np.bincount(core.node_types, weights=centres, minlength=t) / max(centres.sum(), 1)
+    
+    first_type, second_type, third_type = keys // (t * t), keys // t % t, keys % t
+    probability = share[first_type] * share[second_type] * share[third_type]
+    probability *= np.where((first_type == second_type) & (second_type == third_type), 1,
+                            np.where((first_type == second_type) | (second_type == third_type), 3, 6))
+    expected = expected_triangles * probability
+    
+    motifs = []
+    selected, scores = _top(counts, expected, top_n)
+    for index, score in zip(selected.tolist(), scores.tolist()):
+        motifs.append({
+            "kind": "triangle",
+            "signature": [core.type_names[first_type[index]], core.type_names[second_type[index]],
+                          core.type_names[third_type[index]]],
+            "count": int(counts[index]),
+            "expected": float(expected[index]),
+            "surprise": float(score),
+            "nodes": examples[int(keys[index])],
+            "exact": done == len(roots)
+        })
+    return motifs
+
+
+def mine_motifs(core: GraphCore,
+              top_n: int = settings.MOTIF_TOP_N,
+              max_seconds: float = settings.MOTIF_MAX_SECONDS,
+              max_pairs: int = settings.MOTIF_MAX_PAIRS,
+              seed: int = 0) -> List[Dict[str, Any]]:
+    """Find the most surprising structural motifs of a graph.
+    
+    Args:
+        core: Array core of the knowledge graph
+        top_n: Number of motifs to report of each kind
+        max_seconds: Time budget; chains and triangles that are not reached
+            in time are skipped, and their counts cover part of the graph
+        max_pairs: Largest number of walks or wedges held in memory at once
+        seed: Random seed of the processing order
+    
+    Returns:
+        Motifs, most surprising first. Each motif is a dictionary with
+        "kind" ("star", "typed_path", "chain" or "triangle"), "signature"
+        (entity and relationship type names), "count", "expected",
+        "surprise", "nodes" (node numbers of an example) and "exact"
+        (False if the count covers only part of the graph)
+    """
+    if core.num_edges == 0:
+        return []
+    
+    budget = _Budget(max_seconds, max_pairs)
+    rng = np.random.default_rng(seed)
+    low, high = _simple_edges(core)
+    degree = np.bincount(low, minlength=core.num_nodes) + np.bincount(high, minlength=core.num_nodes)
+    
+    motifs = _stars(core, degree, top_n) + _typed_paths(core, top_n)
+    motifs.extend(_chains(core, budget, rng, top_n))
+    if len(low) and not budget.expired():
+        motifs.extend(_triangles(core, low, high, degree, budget, rng, top_n))
+    elif len(low):
+        logger.warning("Motif mining time budget exhausted, skipping triangles")
+    
+    motifs.sort(key=lambda motif: motif["surprise"], reverse=True)
+    return motifs
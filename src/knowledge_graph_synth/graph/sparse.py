@@ -0,0 +1,469 @@
+"""Sparse-matrix graph analytics for the knowledge graph synthesis system.
+
+The NetworkX algorithms used by the analyzer and the report walk the graph in
+pure Python and become slow beyond a few thousand nodes. This module converts
+the array core of a graph once into a SciPy CSR adjacency matrix and computes
+the same metrics with vectorized operations. SciPy is optional: without it
+the callers keep using NetworkX.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+import networkx as nx
+import numpy as np
+
+from ..config import settings
+from ..models import GraphCore, KnowledgeGraph
+
+logger = logging.getLogger(__name__)
+
+try:
+    import scipy.sparse as sp
+    from scipy.sparse import csgraph
+    from scipy.sparse.linalg import eigs
+except ImportError:
+    sp = None
+
+# Number of dense matrix entries processed per block of BFS sources
+_BLOCK_ENTRIES = 1 << 22
+
+# Number of rows per block when counting triangles
+_ROW_BLOCK = 4096
+
+
+def use_sparse_analytics() -> bool:
+    """Check whether graph analytics should use the sparse backend.
+    
+    Returns:
+        True if GRAPH_ANALYTICS_BACKEND selects SciPy and it is installed
+    """
+    backend = settings.GRAPH_ANALYTICS_BACKEND.lower()
+    if backend == "networkx":
+        return False
+    if sp is None:
+        if backend == "scipy":
+            logger.warning("SciPy is not available, using NetworkX for graph analytics")
+        return False
+    return True
+
+
+class SparseGraph:
+    """A knowledge graph as a sparse adjacency matrix.
+    
+    Nodes are numbered as in the graph's GraphCore. Entry (i, j) of the
+    adjacency matrix is the number of relationships from node i to node j,
+    or 1 for a simple graph (parallel relationships collapsed, as in a
+    NetworkX DiGraph). Results are arrays indexed by node number; use
+    scores_by_id() to key them by entity ID.
+    """
+    
+    def __init__(self, core: GraphCore, simple: bool = False):
+        """Initialize the sparse graph.
+        
+        Args:
+            core: Array core of the knowledge graph
+            simple: Collapse parallel relationships into one edge
+        
+        Raises:
+            ImportError: If SciPy is not installed
+        """
+        if sp is None:
+            raise ImportError("SciPy is required for sparse graph analytics")
+        
+        self.core = core
+        n = core.num_nodes
+        weights = np.ones(core.num_edges, dtype=np.float64)
+        self.adjacency = sp.csr_matrix((weights, (core.edge_sources, core.edge_targets)), shape=(n, n))
+        self.adjacency.sum_duplicates()
+        if simple:
+            self.adjacency.data[:] = 1.0
+        
+        self._pattern = None
+        self._undirected = None
+    
+    @classmethod
+    def from_graph(cls, graph: KnowledgeGraph, simple: bool = False) -> "SparseGraph":
+        """Build the sparse matrix of a knowledge graph.
+        
+        Args:
+            graph: Knowledge graph to convert
+            simple: Collapse parallel relationships into one edge
+        
+        Returns:
+            SparseGraph instance
+        """
+        return cls(graph.core, simple=simple)
+    
+    @property
+    def num_nodes(self) -> int:
+        """Get the number of nodes.
+        
+        Returns:
+            Node count
+        """
+        return self.adjacency.shape[0]
+    
+    @property
+    def num_edges(self) -> int:
+        """Get the number of edges, counting parallel edges unless simple.
+        
+        Returns:
+            Edge count
+        """
+        return int(self.adjacency.sum())
+    
+    @property
+    def pattern(self) -> Any:
+        """Get the adjacency matrix with every edge weighted 1.
+        
+        Returns:
+            CSR matrix
+        """
+        if self._pattern is None:
+            self._pattern = self.adjacency.copy()
+            self._pattern.data[:] = 1.0
+        return self._pattern
+    
+    @property
+    def undirected(self) -> Any:
+        """Get the adjacency matrix of the underlying simple undirected graph.
+        
+        Returns:
+            Symmetric CSR matrix without self-loops
+        """
+        if self._undirected is None:
+            undirected = (self.pattern + self.pattern.T).tocsr()
+            undirected.setdiag(0)
+            undirected.eliminate_zeros()
+            undirected.data[:] = 1.0
+            self._undirected = undirected
+        return self._undirected
+    
+    def scores_by_id(self, scores: np.ndarray) -> Dict[UUID, float]:
+        """Key per-node scores by entity ID.
+        
+        Args:
+            scores: Score of each node
+        
+        Returns:
+            Dictionary mapping entity IDs to scores, in node order
+        """
+        return dict(zip(self.core.node_ids, scores.tolist()))
+    
+    def degrees(self) -> np.ndarray:
+        """Get the degree of every node (a self-loop counts twice).
+        
+        Returns:
+            Degree of each node
+        """
+        return np.asarray(self.adjacency.sum(axis=0)).ravel() + np.asarray(self.adjacency.sum(axis=1)).ravel()
+    
+    def density(self) -> float:
+        """Get the density of the graph as a directed graph.
+        
+        Returns:
+            Edges divided by the number of ordered node pairs
+        """
+        n = self.num_nodes
+        if n <= 1:
+            return 0.0
+        return self.num_edges / (n * (n - 1))
+    
+    def degree_centrality(self) -> np.ndarray:
+        """Compute degree centrality, as nx.degree_centrality().
+        
+        Returns:
+            Centrality of each node
+        """
+        n = self.num_nodes
+        if n <= 1:
+            return np.ones(n)
+        return self.degrees() / (n - 1)
+    
+    def pagerank(self, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6) -> np.ndarray:
+        """Compute PageRank by power iteration, as nx.pagerank().
+        
+        Parallel relationships add to the weight of an edge, and the rank
+        of dangling nodes is spread uniformly.
+        
+        Args:
+            alpha: Damping factor
+            max_iter: Maximum number of iterations
+            tol: Convergence tolerance per node
+        
+        Returns:
+            PageRank of each node
+        
+        Raises:
+            nx.PowerIterationFailedConvergence: If it does not converge
+        """
+        n = self.num_nodes
+        if n == 0:
+            return np.zeros(0)
+        
+        out_weight = np.asarray(self.adjacency.sum(axis=1)).ravel()
+        inverse = np.zeros(n)
+        inverse[out_weight != 0] = 1.0 / out_weight[out_weight != 0]
+        transition = (sp.diags(inverse) @ self.adjacency).T.tocsr()
+        dangling = out_weight == 0
+        
+        uniform = np.full(n, 1.0 / n)
+        x = uniform
+        for _ in range(max_iter):
+            x_last = x
+            x = alpha * (transition @ x + x[dangling].sum() * uniform) + (1 - alpha) * uniform
+            if np.abs(x - x_last).sum() < n * tol:
+                return x
+        raise nx.PowerIterationFailedConvergence(max_iter)
+    
+    def eigenvector_centrality(self, max_iter: int = 50) -> np.ndarray:
+        """Compute eigenvector centrality, as nx.eigenvector_centrality_numpy().
+        
+        The scores are the principal left eigenvector of the adjacency
+        matrix with unit Euclidean norm. Unlike NetworkX, graphs that are
+        not strongly connected get a result instead of an error.
+        
+        Args:
+            max_iter: Maximum number of ARPACK iterations
+        
+        Returns:
+            Centrality of each node
+        
+        Raises:
+            nx.NetworkXPointlessConcept: If the graph is empty
+        """
+        n = self.num_nodes
+        if n == 0:
+            raise nx.NetworkXPointlessConcept("cannot compute centrality for the null graph")
+        
+        if n < 3:
+            values, vectors = np.linalg.eig(self.adjacency.T.toarray())
+            largest = vectors[:, np.argmax(values.real)].real
+        else:
+            _, vectors = eigs(self.adjacency.T.astype(np.float64), k=1, which="LR", maxiter=max_iter, tol=0)
+            largest = vectors.flatten().real
+        
+        norm = np.sign(largest.sum()) * np.linalg.norm(largest)
+        return largest / norm if norm else largest
+    
+    def _source_blocks(self, sources: np.ndarray):
+        """Split BFS sources into blocks that bound the dense working set."""
+        size = max(1, _BLOCK_ENTRIES // max(self.num_nodes, 1))
+        for start in range(0, len(sources), size):
+            yield sources[start:start + size]
+    
+    def _sample_sources(self, k: Optional[int], seed: Optional[int]) -> Optional[np.ndarray]:
+        """Sample k distinct source nodes, or None to use all of them."""
+        if k is None or k >= self.num_nodes:
+            return None
+        return np.sort(np.random.default_rng(seed).choice(self.num_nodes, size=k, replace=False))
+    
+    def closeness_centrality(self) -> np.ndarray:
+        """Compute closeness centrality, as nx.closeness_centrality().
+        
+        Uses incoming distances and the Wasserman-Faust scaling for nodes
+        that only part of the graph can reach.
+        
+        Returns:
+            Centrality of each node
+        """
+        n = self.num_nodes
+        closeness = np.zeros(n)
+        if n <= 1:
+            return closeness
+        
+        reverse = self.pattern.T.tocsr()
+        for block in self._source_blocks(np.arange(n)):
+            distances = csgraph.shortest_path(reverse, directed=True, unweighted=True, indices=block)
+            reachable = np.isfinite(distances)
+            reached = reachable.sum(axis=1) - 1.0
+            total = np.where(reachable, distances, 0.0).sum(axis=1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                closeness[block] = np.where(total > 0, reached / total * reached / (n - 1), 0.0)
+        
+        return closeness
+    
+    def betweenness_centrality(self, k: Optional[int] = None, seed: Optional[int] = None) -> np.ndarray:
+        """Compute normalized betweenness centrality, as nx.betweenness_centrality().
+        
+        Brandes' algorithm runs for a block of sources at a time: shortest
+        path counts are propagated level by level with sparse matrix
+        products, and dependencies are accumulated back the same way.
+        Parallel relationships count as one edge.
+        
+        Args:
+            k: Number of sampled source nodes (None for all; exact)
+            seed: Random seed for the sample
+        
+        Returns:
+            Centrality of each node, estimated from the sample if k is given
+        """
+        n = self.num_nodes
+        betweenness = np.zeros(n)
+        if n == 0:
+            return betweenness
+        
+        sampled = self._sample_sources(k, seed)
+        sources = np.arange(n) if sampled is None else sampled
+        forward = self.pattern.T.tocsr()
+        backward = self.pattern
+        
+        for block in self._source_blocks(sources):
+            columns = np.arange(len(block))
+            sigma = np.zeros((n, len(block)))
+            sigma[block, columns] = 1.0
+            depth = np.full((n, len(block)), -1, dtype=np.int32)
+            depth[block, columns] = 0
+            
+            # Count shortest paths level by level
+            frontier = sigma.copy()
+            level = 0
+            while True:
+                paths = forward @ frontier
+                paths[depth >= 0] = 0.0
+                reached = paths > 0
+                if not reached.any():
+                    break
+                level += 1
+                sigma[reached] = paths[reached]
+                depth[reached] = level
+                frontier = np.where(reached, paths, 0.0)
+            
+            # Accumulate dependencies from the deepest level back to the sources
+            delta = np.zeros((n, len(block)))
+            safe_sigma = np.where(sigma > 0, sigma, 1.0)
+            for current in range(level, 0, -1):
+                weights = np.where(depth == current, (1.0 + delta) / safe_sigma, 0.0)
+                delta += np.where(depth == current - 1, sigma * (backward @ weights), 0.0)
+            
+            delta[block, columns] = 0.0
+            betweenness += delta.sum(axis=1)
+        
+        if n <= 2:
+            return betweenness
+        if sampled is None:
+            return betweenness / ((n - 1) * (n - 2))
+        
+        # Sources cannot lie on their own paths, so they have one sample less
+        scale = np.full(n, 1.0 / (len(sampled) * (n - 2)))
+        scale[sampled] = 1.0 / ((len(sampled) - 1) * (n - 2)) if len(sampled) > 1 else np.nan
+        return betweenness * scale
+    
+    def weakly_connected_components(self) -> Tuple[int, np.ndarray]:
+        """Find the weakly connected components.
+        
+        Returns:
+            (count, labels) tuple with the component number of each node
+        """
+        if self.num_nodes == 0:
+            return 0, np.zeros(0, dtype=np.int32)
+        return csgraph.connected_components(self.adjacency, directed=True, connection="weak")
+    
+    def is_strongly_connected(self) -> bool:
+        """Check whether every node can reach every other node.
+        
+        Returns:
+            True if the graph is strongly connected
+        """
+        if self.num_nodes == 0:
+            return False
+        count, _ = csgraph.connected_components(self.adjacency, directed=True, connection="strong")
+        return count == 1
+    
+    def largest_component(self) -> np.ndarray:
+        """Get the nodes of the largest weakly connected component.
+        
+        Returns:
+            Node numbers
+        """
+        count, labels = self.weakly_connected_components()
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(labels == np.argmax(np.bincount(labels)))
+    
+    def average_clustering(self) -> float:
+        """Compute the average clustering coefficient of the undirected graph.
+        
+        Matches nx.average_clustering() on the simple undirected graph:
+        parallel relationships, directions and self-loops are ignored.
+        
+        Returns:
+            Average clustering coefficient
+        """
+        n = self.num_nodes
+        if n == 0:
+            return 0.0
+        
+        undirected = self.undirected
+        degrees = np.diff(undirected.indptr).astype(np.float64)
+        triangles = np.zeros(n)
+        for start in range(0, n, _ROW_BLOCK):
+            rows = undirected[start:start + _ROW_BLOCK]
+            triangles[start:start + _ROW_BLOCK] = np.asarray((rows @ undirected).multiply(rows).sum(axis=1)).ravel() / 2
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coefficients = np.where(degrees > 1, 2 * triangles / (degrees * (degrees - 1)), 0.0)
+        return float(coefficients.mean())
+    
+    def average_shortest_path_length(self, k: Optional[int] = None, seed: Optional[int] = None) -> float:
+        """Compute the average shortest path length of a strongly connected graph.
+        
+        Args:
+            k: Number of sampled source nodes (None for all; exact)
+            seed: Random seed for the sample
+        
+        Returns:
+            Average directed distance between distinct nodes
+        """
+        n = self.num_nodes
+        if n <= 1:
+            return 0.0
+        
+        sampled = self._sample_sources(k, seed)
+        sources = np.arange(n) if sampled is None else sampled
+        total = 0.0
+        for block in self._source_blocks(sources):
+            distances = csgraph.shortest_path(self.pattern, directed=True, unweighted=True, indices=block)
+            total += distances[np.isfinite(distances)].sum()
+        return total / (len(sources) * (n - 1))
+    
+    def approximate_diameter(self, sweeps: int = 8, seed: Optional[int] = 0) -> int:
+        """Estimate the diameter of the largest component by repeated BFS sweeps.
+        
+        The first breadth-first search starts at the highest-degree node and
+        each later one at the farthest node of the previous search, or at a
+        random node of the component once that repeats. The result is a lower
+        bound on the undirected diameter that is exact for trees and usually
+        exact for sparse real-world graphs.
+        
+        Args:
+            sweeps: Number of breadth-first searches
+            seed: Random seed for the restart nodes
+        
+        Returns:
+            Estimated diameter (0 for an empty graph)
+        """
+        component = self.largest_component()
+        if len(component) <= 1:
+            return 0
+        
+        undirected = self.undirected
+        degrees = np.diff(undirected.indptr)
+        start = int(component[np.argmax(degrees[component])])
+        rng = np.random.default_rng(seed)
+        
+        diameter = 0
+        visited = set()
+        for _ in range(min(sweeps, len(component))):
+            while start in visited:
+                start = int(rng.choice(component))
+            visited.add(start)
+            
+            distances = csgraph.shortest_path(undirected, directed=False, unweighted=True, indices=start)
+            distances[~np.isfinite(distances)] = -1
+            start = int(np.argmax(distances))
+            diameter = max(diameter, int(distances[start]))
+        
+        return diameter
@@ -0,0 +1,606 @@
+"""SQLite graph store for the knowledge graph synthesis system.
+
+The store keeps the graphs of many runs in one SQLite file, so they can be
+queried together (for example, to find the entities that occur in every
+interview of a study) and reopened without loading them into memory.
+"""
+
+import json
+import logging
+import sqlite3
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+from uuid import UUID
+
+from pydantic import PrivateAttr
+
+from ..models import Entity, Relationship, KnowledgeGraph
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS graphs (
+    name TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    graph TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE,
+    type TEXT NOT NULL COLLATE NOCASE,
+    confidence REAL NOT NULL,
+    document_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (graph, id)
+);
+CREATE INDEX IF NOT EXISTS idx_entities_name ON entities (name, type);
+CREATE INDEX IF NOT EXISTS idx_entities_type ON entities (graph, type);
+CREATE TABLE IF NOT EXISTS relationships (
+    graph TEXT NOT NULL,
+    id TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    type TEXT NOT NULL COLLATE NOCASE,
+    confidence REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (graph, id)
+);
+CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships (graph, source_id);
+CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships (graph, target_id);
+CREATE INDEX IF NOT EXISTS idx_relationships_type ON relationships (graph, type);
+"""
+
+
+def _entity_row(graph: str, entity: Entity) -> Tuple:
+    """Build the table row of an entity."""
+    return (graph, str(entity.id), entity.name, entity.type, entity.confidence,
+            entity.source_span.document_id if entity.source_span else None,
+            entity.model_dump_json())
+
+
+def _relationship_row(graph: str, relationship: Relationship) -> Tuple:
+    """Build the table row of a relationship."""
+    return (graph, str(relationship.id), str(relationship.source_id), str(relationship.target_id),
+            relationship.type, relationship.confidence, relationship.model_dump_json())
+
+
+class _StoreTable(MutableMapping):
+    """A mapping from UUIDs to the entities or relationships of a stored graph.
+    
+    Reads and writes go straight to the database, so a graph backed by it
+    does not have to fit into memory.
+    """
+    
+    def __init__(self, store: "GraphStore", table: str, graph: str, model: Type[Any]):
+        """Initialize the table view.
+        
+        Args:
+            store: Graph store
+            table: Table name ("entities" or "relationships")
+            graph: Graph name
+            model: Model class of the rows
+        """
+        self.store = store
+        self.table = table
+        self.graph = graph
+        self.model = model
+        self._row = _entity_row if table == "entities" else _relationship_row
+    
+    def __getitem__(self, key: Any) -> Any:
+        row = self.store.connection.execute(
+            f"SELECT data FROM {self.table} WHERE graph = ? AND id = ?", (self.graph, str(key))
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self.model.model_validate_json(row[0])
+    
+    def __setitem__(self, key: Any, value: Any) -> None:
+        row = self._row(self.graph, value)
+        self.store.connection.execute(
+            f"INSERT OR REPLACE INTO {self.table} VALUES ({', '.join('?' * len(row))})", row
+        )
+    
+    def __delitem__(self, key: Any) -> None:
+        cursor = self.store.connection.execute(
+            f"DELETE FROM {self.table} WHERE graph = ? AND id = ?", (self.graph, str(key))
+        )
+        if not cursor.rowcount:
+            raise KeyError(key)
+    
+    def __contains__(self, key: Any) -> bool:
+        return self.store.connection.execute(
+            f"SELECT 1 FROM {self.table} WHERE graph = ? AND id = ?", (self.graph, str(key))
+        ).fetchone() is not None
+    
+    def __iter__(self) -> Iterator[UUID]:
+        cursor = self.store.connection.execute(f"SELECT id FROM {self.table} WHERE graph = ?", (self.graph,))
+        for (key,) in cursor:
+            yield UUID(key)
+    
+    def __len__(self) -> int:
+        return self.store.connection.execute(
+            f"SELECT COUNT(*) FROM {self.table} WHERE graph = ?", (self.graph,)
+        ).fetchone()[0]
+    
+    def values(self) -> Iterator[Any]:
+        """Iterate over the rows without a lookup per key."""
+        cursor = self.store.connection.execute(f"SELECT data FROM {self.table} WHERE graph = ?", (self.graph,))
+        for (data,) in cursor:
+            yield self.model.model_validate_json(data)
+    
+    def items(self) -> Iterator[Tuple[UUID, Any]]:
+        """Iterate over (id, row) pairs without a lookup per key."""
+        for value in self.values():
+            yield value.id, value
+
+
+class StoredKnowledgeGraph(KnowledgeGraph):
+    """A knowledge graph whose entities and relationships live in a GraphStore.
+    
+    It has the API of KnowledgeGraph; lookups by type and by entity use the
+    indexes of the store instead of scanning all relationships. Changes to
+    the metadata are saved with GraphStore.set_metadata().
+    """
+    
+    _store: Optional["GraphStore"] = PrivateAttr(default=None)
+    _name: str = PrivateAttr(default="")
+    
+    def get_entities_by_type(self, entity_type: str) -> List[Entity]:
+        """Get all entities of a specific type.
+        
+        Args:
+            entity_type: Type of entities to retrieve
+        
+        Returns:
+            List of matching entities
+        """
+        return self._store.get_entities_by_type(entity_type, self._name)
+    
+    def get_relationships_by_type(self, relationship_type: str) -> List[Relationship]:
+        """Get all relationships of a specific type.
+        
+        Args:
+            relationship_type: Type of relationships to retrieve
+        
+        Returns:
+            List of matching relationships
+        """
+        return self._store.get_relationships_by_type(relationship_type, self._name)
+    
+    def get_entity_relationships(self, entity_id: UUID,
+                               outgoing: bool = True,
+                               incoming: bool = True) -> List[Relationship]:
+        """Get all relationships involving an entity.
+        
+        Args:
+            entity_id: UUID of the entity
+            outgoing: Include relationships where entity is the source
+            incoming: Include relationships where entity is the target
+        
+        Returns:
+            List of relationships involving the entity
+        """
+        return self._store.get_entity_relationships(entity_id, self._name, outgoing, incoming)
+    
+    def get_connected_entities(self, entity_id: UUID,
+                             outgoing: bool = True,
+                             incoming: bool = True) -> List[Tuple[Entity, Relationship]]:
+        """Get all entities connected to an entity.
+        
+        Args:
+            entity_id: UUID of the entity
+            outgoing: Include entities connected via outgoing relationships
+            incoming: Include entities connected via incoming relationships
+        
+        Returns:
+            List of (entity, relationship) tuples
+        """
+        return self._store.get_connected_entities(entity_id, self._name, outgoing, incoming)
+
+
+class GraphStore:
+    """Persistent store of knowledge graphs in a SQLite database.
+    
+    Each graph is stored under a name (usually the run), with entities and
+    relationships as rows that hold the indexed fields (name, type, source,
+    target) next to the JSON of the model. The database runs in WAL mode, so
+    readers are not blocked while a run writes its graph. Graphs are written
+    with executemany in one transaction, and neighbourhoods are expanded with
+    recursive SQL queries, so they can be explored without loading the graph.
+    """
+    
+    def __init__(self, path: str = settings.GRAPH_STORE_PATH):
+        """Open (and create if needed) a graph store.
+        
+        Args:
+            path: Path of the SQLite database file (":memory:" for a
+                temporary store)
+        """
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # Autocommit mode; bulk writes open explicit transactions
+        self.connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+    
+    def __enter__(self) -> "GraphStore":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run several writes in one transaction.
+        
+        Yields:
+            The database connection
+        """
+        self.connection.execute("BEGIN")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+    
+    def add_entities(self, entities: Iterable[Entity], graph: str) -> None:
+        """Insert or replace entities of a graph.
+        
+        Args:
+            entities: Entities to store
+            graph: Graph name
+        """
+        with self.transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (_entity_row(graph, entity) for entity in entities)
+            )
+    
+    def add_relationships(self, relationships: Iterable[Relationship], graph: str) -> None:
+        """Insert or replace relationships of a graph.
+        
+        Args:
+            relationships: Relationships to store
+            graph: Graph name
+        """
+        with self.transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO relationships VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (_relationship_row(graph, relationship) for relationship in relationships)
+            )
+    
+    def set_metadata(self, graph: str, metadata: Dict[str, Any]) -> None:
+        """Register a graph and save its metadata.
+        
+        Args:
+            graph: Graph name
+            metadata: Graph metadata
+        """
+        self.connection.execute(
+            "INSERT INTO graphs VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET metadata = excluded.metadata",
+            (graph, datetime.now().isoformat(), json.dumps(metadata, ensure_ascii=False, default=str))
+        )
+    
+    def save_graph(self, graph: KnowledgeGraph, name: str) -> None:
+        """Save a knowledge graph, replacing a stored graph with the same name.
+        
+        Args:
+            graph: Knowledge graph to save
+            name: Graph name
+        """
+        self.delete_graph(name)
+        self.set_metadata(name, graph.metadata)
+        self.add_entities(graph.entities.values(), name)
+        self.add_relationships(graph.relationships.values(), name)
+        logger.info(f"Stored graph '{name}' with {len(graph.entities)} entities and "
+                    f"{len(graph.relationships)} relationships in {self.path}")
+    
+    def delete_graph(self, name: str) -> None:
+        """Delete a stored graph.
+        
+        Args:
+            name: Graph name
+        """
+        with self.transaction() as connection:
+            for table in ("relationships", "entities"):
+                connection.execute(f"DELETE FROM {table} WHERE graph = ?", (name,))
+            connection.execute("DELETE FROM graphs WHERE name = ?", (name,))
+    
+    def list_graphs(self) -> List[Dict[str, Any]]:
+        """List the stored graphs.
+        
+        Returns:
+            Dictionaries with the name, creation time and size of each graph
+        """
+        rows = self.connection.execute(
+            "SELECT g.name, g.created_at, "
+            "(SELECT COUNT(*) FROM entities e WHERE e.graph = g.name), "
+            "(SELECT COUNT(*) FROM relationships r WHERE r.graph = g.name) "
+            "FROM graphs g ORDER BY g.created_at"
+        ).fetchall()
+        return [
+            {"name": name, "created_at": created_at, "entities": entities, "relationships": relationships}
+            for name, created_at, entities, relationships in rows
+        ]
+    
+    def open_graph(self, name: str) -> StoredKnowledgeGraph:
+        """Open a stored graph without loading it.
+        
+        Entities and relationships added to the returned graph are written to
+        the store.
+        
+        Args:
+            name: Graph name (created if it does not exist)
+        
+        Returns:
+            Knowledge graph backed by the store
+        """
+        row = self.connection.execute("SELECT metadata FROM graphs WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            self.set_metadata(name, {})
+        
+        graph = StoredKnowledgeGraph.model_construct(
+            entities=_StoreTable(self, "entities", name, Entity),
+            relationships=_StoreTable(self, "relationships", name, Relationship),
+            metadata=json.loads(row[0]) if row else {}
+        )
+        graph._store = self
+        graph._name = name
+        return graph
+    
+    def load_graph(self, name: str) -> KnowledgeGraph:
+        """Load a stored graph into memory.
+        
+        Args:
+            name: Graph name
+        
+        Returns:
+            In-memory knowledge graph
+        
+        Raises:
+            KeyError: If no graph with this name is stored
+        """
+        row = self.connection.execute("SELECT metadata FROM graphs WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        
+        stored = self.open_graph(name)
+        return KnowledgeGraph.from_records(stored.entities.values(), stored.relationships.values(), stored.metadata)
+    
+    def _query(self, model: Type[Any], sql: str, parameters: Tuple) -> List[Any]:
+        """Run a query that selects the data column of rows."""
+        return [model.model_validate_json(data) for (data,) in self.connection.execute(sql, parameters)]
+    
+    def get_entity(self, entity_id: UUID, graph: str) -> Optional[Entity]:
+        """Get an entity by ID.
+        
+        Args:
+            entity_id: UUID of the entity to retrieve
+            graph: Graph name
+        
+        Returns:
+            The entity if found, otherwise None
+        """
+        return self.open_graph(graph).entities.get(entity_id)
+    
+    def find_entities(self, name: Optional[str] = None,
+                    entity_type: Optional[str] = None,
+                    graph: Optional[str] = None) -> List[Tuple[str, Entity]]:
+        """Find entities by name and type, in one graph or in all graphs.
+        
+        Names and types are compared case-insensitively.
+        
+        Args:
+            name: Entity name
+            entity_type: Entity type
+            graph: Graph name (None to search all graphs)
+        
+        Returns:
+            List of (graph name, entity) tuples
+        """
+        conditions, parameters = [], []
+        for column, value in (("name", name), ("type", entity_type), ("graph", graph)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(f"SELECT graph, data FROM entities {where}", parameters)
+        return [(graph_name, Entity.model_validate_json(data)) for graph_name, data in rows]
+    
+    def get_entities_by_type(self, entity_type: str, graph: str) -> List[Entity]:
+        """Get all entities of a specific type.
+        
+        Args:
+            entity_type: Type of entities to retrieve
+            graph: Graph name
+        
+        Returns:
+            List of matching entities
+        """
+        return self._query(Entity, "SELECT data FROM entities WHERE graph = ? AND type = ?", (graph, entity_type))
+    
+    def get_relationships_by_type(self, relationship_type: str, graph: str) -> List[Relationship]:
+        """Get all relationships of a specific type.
+        
+        Args:
+            relationship_type: Type of relationships to retrieve
+            graph: Graph name
+        
+        Returns:
+            List of matching relationships
+        """
+        return self._query(Relationship, "SELECT data FROM relationships WHERE graph = ? AND type = ?",
+                           (graph, relationship_type))
+    
+    def get_entity_relationships(self, entity_id: UUID, graph: str,
+                               outgoing: bool = True,
+                               incoming: bool = True) -> List[Relationship]:
+        """Get all relationships involving an entity.
+        
+        Args:
+            entity_id: UUID of the entity
+            graph: Graph name
+            outgoing: Include relationships where entity is the source
+            incoming: Include relationships where entity is the target
+        
+        Returns:
+            List of relationships involving the entity
+        """
+        result = []
+        if outgoing:
+            result.extend(self._query(Relationship, "SELECT data FROM relationships WHERE graph = ? AND source_id = ?",
+                                      (graph, str(entity_id))))
+        if incoming:
+            result.extend(self._query(Relationship, "SELECT data FROM relationships WHERE graph = ? AND target_id = ?",
+                                      (graph, str(entity_id))))
+        return result
+    
+    def get_connected_entities(self, entity_id: UUID, graph: str,
+                             outgoing: bool = True,
+                             incoming: bool = True) -> List[Tuple[Entity, Relationship]]:
+        """Get all entities connected to an entity.
+        
+        Args:
+            entity_id: UUID of the entity
+            graph: Graph name
+            outgoing: Include entities connected via outgoing relationships
+            incoming: Include entities connected via incoming relationships
+        
+        Returns:
+            List of (entity, relationship) tuples
+        """
+        directions = []
+        if outgoing:
+            directions.append(("source_id", "target_id"))
+        if incoming:
+            directions.append(("target_id", "source_id"))
+        
+        result = []
+        for own, other in directions:
+            rows = self.connection.execute(
+                f"SELECT e.data, r.data FROM relationships r "
+                f"JOIN entities e ON e.graph = r.graph AND e.id = r.{other} "
+                f"WHERE r.graph = ? AND r.{own} = ?",
+                (graph, str(entity_id))
+            )
+            result.extend(
+                (Entity.model_validate_json(entity), Relationship.model_validate_json(relationship))
+                for entity, relationship in rows
+            )
+        return result
+    
+    def neighborhood(self, entity_id: UUID, graph: str,
+                   hops: int = 1,
+                   outgoing: bool = True,
+                   incoming: bool = True) -> Dict[UUID, int]:
+        """Find the entities within a number of hops of an entity.
+        
+        The traversal runs as a recursive query in the database.
+        
+        Args:
+            entity_id: UUID of the start entity
+            graph: Graph name
+            hops: Maximum number of relationships between the entities
+            outgoing: Follow relationships from source to target
+            incoming: Follow relationships from target to source
+        
+        Returns:
+            Dictionary mapping entity IDs (including the start entity) to
+            their distance in hops
+        """
+        steps = []
+        if outgoing:
+            steps.append("SELECT r.target_id, h.depth + 1 FROM hops h "
+                         "JOIN relationships r ON r.graph = :graph AND r.source_id = h.id "
+                         "WHERE h.depth < :hops")
+        if incoming:
+            steps.append("SELECT r.source_id, h.depth + 1 FROM hops h "
+                         "JOIN relationships r ON r.graph = :graph AND r.target_id = h.id "
+                         "WHERE h.depth < :hops")
+        if not steps:
+            return {entity_id: 0}
+        
+        rows = self.connection.execute(
+            "WITH RECURSIVE hops(id, depth) AS (SELECT :start, 0 UNION "
+            + " UNION ".join(steps) +
+            ") SELECT id, MIN(depth) FROM hops GROUP BY id",
+            {"start": str(entity_id), "graph": graph, "hops": hops}
+        )
+        return {UUID(node): depth for node, depth in rows}
+    
+    def subgraph(self, entity_ids: Iterable[UUID], graph: str) -> KnowledgeGraph:
+        """Load the part of a stored graph spanned by some entities.
+        
+        Args:
+            entity_ids: UUIDs of the entities to include
+            graph: Graph name
+        
+        Returns:
+            In-memory knowledge graph with the entities and the relationships
+            between them
+        """
+        result = KnowledgeGraph()
+        ids = [str(entity_id) for entity_id in entity_ids]
+        
+        # Stay below SQLite's limit on query parameters
+        chunks = [ids[start:start + 500] for start in range(0, len(ids), 500)]
+        for chunk in chunks:
+            placeholders = ", ".join("?" * len(chunk))
+            for entity in self._query(Entity, f"SELECT data FROM entities WHERE graph = ? AND id IN ({placeholders})",
+                                      (graph, *chunk)):
+                result.add_entity(entity)
+        
+        for chunk in chunks:
+            placeholders = ", ".join("?" * len(chunk))
+            for relationship in self._query(
+                    Relationship,
+                    f"SELECT data FROM relationships WHERE graph = ? AND source_id IN ({placeholders})",
+                    (graph, *chunk)):
+                if relationship.target_id in result.entities:
+                    result.add_relationship(relationship)
+        
+        return result
+    
+    def common_entities(self, graphs: Optional[List[str]] = None,
+                      min_graphs: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Find entities (by name and type) that occur in several graphs.
+        
+        Args:
+            graphs: Graph names to compare (None for all stored graphs)
+            min_graphs: Minimum number of graphs an entity must occur in
+                (None for all of them)
+        
+        Returns:
+            Dictionaries with the name, type and graph count of each entity,
+            most widespread first
+        """
+        if graphs is None:
+            graphs = [row[0] for row in self.connection.execute("SELECT name FROM graphs")]
+        if not graphs:
+            return []
+        if min_graphs is None:
+            min_graphs = len(graphs)
+        
+        placeholders = ", ".join("?" * len(graphs))
+        rows = self.connection.execute(
+            f"SELECT name, type, COUNT(DISTINCT graph) AS graph_count FROM entities "
+            f"WHERE graph IN ({placeholders}) GROUP BY name, type "
+            f"HAVING graph_count >= ? ORDER BY graph_count DESC, name",
+            (*graphs, min_graphs)
+        )
+        return [{"name": name, "type": entity_type, "graphs": count} for name, entity_type, count in rows]
@@ -292,6 +292,7 @@ class GraphVisualizer:
             Language code ('en' or 'ru')
         """
         from ..config import settings
+        from ..text.language import language_detector
         
         # If graph has a language attribute, use it
         if hasattr(graph, 'language') and graph.language:
@@ -309,7 +310,7 @@ class GraphVisualizer:
                         language_counts[lang] += 1
             
             # Check if entity name contains Cyrillic characters (rough heuristic for Russian)
-            if any(ord('а') <= ord(c) <= ord('я') or ord('А') <= ord(c) <= ord('Я') for c in entity.name):
+            if language_detector.has_cyrillic(entity.name):
                 language_counts["ru"] += 1
         
         # Determine the predominant language
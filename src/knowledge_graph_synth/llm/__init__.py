@@ -6,19 +6,29 @@ and response validation.
 """
 
 from .factory import LLMProviderFactory
-from .base import LLMProvider
+from .base import LLMProvider, CachedContext
 from .gemini import GeminiProvider
 from .gemini_reasoning import GeminiReasoningProvider
+from .router import RouterProvider
 from .prompts import prompt_manager
 from .cache import ResponseCache
 from .validation import ResponseValidator
+from .budget import BudgetController, BudgetExceededError
+from .cascade import ModelCascade
+from .handles import PromptHandles
 
 __all__ = [
     "LLMProviderFactory",
     "LLMProvider",
+    "CachedContext",
     "GeminiProvider",
     "GeminiReasoningProvider",
+    "RouterProvider",
     "prompt_manager",
     "ResponseCache",
-    "ResponseValidator"
+    "ResponseValidator",
+    "BudgetController",
+    "BudgetExceededError",
+    "ModelCascade",
+    "PromptHandles"
 ]
\ No newline at end of file
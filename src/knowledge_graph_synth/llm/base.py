@@ -144,6 +144,40 @@ class TokenCounter:
 token_counter = TokenCounter()
 
 
+class CachedContext:
+    """Handle for a prompt prefix shared by several LLM calls.
+    
+    Providers with server-side context caching upload the prefix once and
+    store the cache name in the handle; other providers keep the prefix
+    locally and prepend it to each prompt.
+    """
+    
+    def __init__(self, 
+               content: str, 
+               model: Optional[str] = None, 
+               name: Optional[str] = None):
+        """Initialize the cached context handle.
+        
+        Args:
+            content: Shared prompt prefix
+            model: Model name the cache was created for
+            name: Provider-side cache name (None for a local handle)
+        """
+        self.content = content
+        self.model = model
+        self.name = name
+        self.created_at = datetime.now()
+    
+    @property
+    def is_remote(self) -> bool:
+        """Check whether the prefix is cached by the provider.
+        
+        Returns:
+            True if the provider holds the prefix
+        """
+        return self.name is not None
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers.
     
@@ -167,12 +201,14 @@ class LLMProvider(ABC):
     @abstractmethod
     async def generate_text(self, prompt: str, 
                          model: Optional[str] = None,
+                         cached_context: Optional[CachedContext] = None,
                          **kwargs) -> str:
         """Generate text from a prompt.
         
         Args:
             prompt: The prompt text
             model: Specific model to use (defaults to provider's default model)
+            cached_context: Shared prompt prefix to put before the prompt
             **kwargs: Additional provider-specific parameters
             
         Returns:
@@ -187,6 +223,7 @@ class LLMProvider(ABC):
     async def generate_structured(self, prompt: str,
                                response_schema: Dict[str, Any],
                                model: Optional[str] = None,
+                               cached_context: Optional[CachedContext] = None,
                                **kwargs) -> Dict[str, Any]:
         """Generate structured output from a prompt.
         
@@ -194,6 +231,7 @@ class LLMProvider(ABC):
             prompt: The prompt text
             response_schema: JSON Schema definition for the response format
             model: Specific model to use (defaults to provider's default model)
+            cached_context: Shared prompt prefix to put before the prompt
             **kwargs: Additional provider-specific parameters
             
         Returns:
@@ -213,6 +251,48 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def create_cached_context(self, content: str,
+                                 model: Optional[str] = None,
+                                 ttl_seconds: Optional[int] = None) -> CachedContext:
+        """Create a handle for a prompt prefix shared by several calls.
+        
+        The default implementation keeps the prefix locally, so calls using
+        the handle behave exactly like calls with the prefix inlined.
+        Providers with server-side caching override this method.
+        
+        Args:
+            content: Shared prompt prefix (e.g., source document or graph summary)
+            model: Model the prefix will be used with
+            ttl_seconds: How long the cache should live
+            
+        Returns:
+            Cached context handle
+        """
+        return CachedContext(content, model)
+    
+    async def release_cached_context(self, cached_context: CachedContext) -> None:
+        """Release a cached context that is no longer needed.
+        
+        Args:
+            cached_context: Handle returned by create_cached_context
+        """
+        pass
+    
+    def apply_cached_context(self, prompt: str, 
+                          cached_context: Optional[CachedContext]) -> str:
+        """Prepend a locally held prefix to a prompt.
+        
+        Args:
+            prompt: The prompt text
+            cached_context: Cached context handle (or None)
+            
+        Returns:
+            Prompt to send to the model
+        """
+        if cached_context is None:
+            return prompt
+        return f"{cached_context.content}\n\n{prompt}"
+    
     def get_model(self, model_key: Optional[str] = None) -> str:
         """Get the model identifier for a given model key.
         
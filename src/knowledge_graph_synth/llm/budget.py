@@ -0,0 +1,365 @@
+"""Run-level budget control for LLM usage."""
+
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from .base import TokenCounter, token_counter
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when an LLM call would exceed a hard budget limit."""
+    pass
+
+
+class BudgetController:
+    """Keeps LLM usage of a run within token, cost and wall-time limits.
+    
+    The controller reads the global TokenCounter before each API call. As the
+    consumed share of the budget grows it activates degradation steps in a
+    fixed order (cheaper model, no connection analysis, fewer expansion
+    iterations, fewer theories) and refuses calls once a limit is reached.
+    Every decision is recorded so it can be written to the run manifest.
+    """
+    
+    # Degradation steps in the order they are applied
+    DEGRADATION_STEPS = [
+        "fast_model",
+        "skip_connection_analysis",
+        "shrink_expansion",
+        "cap_theories",
+    ]
+    
+    def __init__(self,
+               max_tokens: Optional[int] = None,
+               max_cost_usd: Optional[float] = None,
+               max_seconds: Optional[float] = None,
+               stage_limits: Optional[Dict[str, Dict[str, float]]] = None,
+               thresholds: Optional[Dict[str, float]] = None,
+               counter: Optional[TokenCounter] = None):
+        """Initialize the budget controller.
+        
+        Args:
+            max_tokens: Maximum total tokens for the run (None for no limit)
+            max_cost_usd: Maximum estimated cost in USD for the run
+            max_seconds: Maximum wall time for the run in seconds
+            stage_limits: Per-stage limits, e.g. {"entity_extraction": {"tokens": 100000}}
+            thresholds: Consumed budget fraction at which each degradation step activates
+            counter: Token counter to read usage from (defaults to the global counter)
+        """
+        self.counter = counter or token_counter
+        self.configure(max_tokens, max_cost_usd, max_seconds, stage_limits, thresholds)
+    
+    def configure(self,
+                max_tokens: Optional[int] = None,
+                max_cost_usd: Optional[float] = None,
+                max_seconds: Optional[float] = None,
+                stage_limits: Optional[Dict[str, Dict[str, float]]] = None,
+                thresholds: Optional[Dict[str, float]] = None) -> None:
+        """Set the limits and reset the run state.
+        
+        Args:
+            max_tokens: Maximum total tokens for the run (None for no limit)
+            max_cost_usd: Maximum estimated cost in USD for the run
+            max_seconds: Maximum wall time for the run in seconds
+            stage_limits: Per-stage limits keyed by stage name
+            thresholds: Consumed budget fraction at which each degradation step activates
+        """
+        self.limits = {
+            "tokens": max_tokens,
+            "cost_usd": max_cost_usd,
+            "seconds": max_seconds,
+        }
+        self.stage_limits = stage_limits or {}
+        self.thresholds = dict(settings.BUDGET_DEGRADATION_THRESHOLDS)
+        if thresholds:
+            self.thresholds.update(thresholds)
+        
+        self.decisions = []
+        self.active_steps = set()
+        self.current_stage = None
+        self.stages = {}
+        self.run_start = self._snapshot()
+    
+    @property
+    def enabled(self) -> bool:
+        """Check whether any limit is configured.
+        
+        Returns:
+            True if at least one run or stage limit is set
+        """
+        has_run_limit = any(value is not None for value in self.limits.values())
+        return has_run_limit or bool(self.stage_limits)
+    
+    def _snapshot(self) -> Dict[str, float]:
+        """Take a snapshot of the current usage counters.
+        
+        Returns:
+            Dictionary with tokens, cost and timestamp
+        """
+        stats = self.counter.estimate_cost()
+        return {
+            "tokens": stats["total_tokens"],
+            "cost_usd": stats["total_cost_usd"],
+            "time": time.time(),
+        }
+    
+    def start_stage(self, name: str) -> None:
+        """Mark the beginning of a pipeline stage.
+        
+        Starting a stage implicitly ends the previous one.
+        
+        Args:
+            name: Stage name (e.g., "entity_extraction")
+        """
+        if self.current_stage:
+            self.end_stage()
+        
+        # A stage may run several times (e.g. gradual processing), so usage accumulates
+        previous = self.stages.get(name, {}).get("usage")
+        self.current_stage = name
+        self.stages[name] = {"start": self._snapshot(), "usage": None, "previous": previous}
+    
+    def end_stage(self) -> None:
+        """Mark the end of the current pipeline stage."""
+        if not self.current_stage:
+            return
+        
+        self.stages[self.current_stage]["usage"] = self.usage(self.current_stage)
+        self.current_stage = None
+    
+    def usage(self, stage: Optional[str] = None) -> Dict[str, float]:
+        """Get the usage of the run or of a stage.
+        
+        Args:
+            stage: Stage name, or None for the whole run
+        
+        Returns:
+            Dictionary with consumed tokens, cost and seconds
+        """
+        if stage is not None:
+            stage_info = self.stages.get(stage)
+            if not stage_info:
+                return {"tokens": 0, "cost_usd": 0.0, "seconds": 0.0}
+            if stage_info["usage"] is not None and stage != self.current_stage:
+                return stage_info["usage"]
+            start = stage_info["start"]
+            previous = stage_info["previous"]
+        else:
+            start = self.run_start
+            previous = None
+        
+        now = self._snapshot()
+        usage = {
+            "tokens": now["tokens"] - start["tokens"],
+            "cost_usd": now["cost_usd"] - start["cost_usd"],
+            "seconds": now["time"] - start["time"],
+        }
+        if previous:
+            for key in usage:
+                usage[key] += previous[key]
+        
+        return usage
+    
+    def consumed_fraction(self, stage: Optional[str] = None,
+                        extra_tokens: int = 0) -> float:
+        """Get the largest consumed share of any configured limit.
+        
+        Args:
+            stage: Stage name, or None for the whole run
+            extra_tokens: Tokens about to be spent, counted as already consumed
+        
+        Returns:
+            Consumed fraction (0.0 when no limit is configured)
+        """
+        limits = self.stage_limits.get(stage, {}) if stage is not None else self.limits
+        used = dict(self.usage(stage))
+        used["tokens"] += extra_tokens
+        
+        fractions = [
+            used[key] / limit
+            for key, limit in limits.items()
+            if limit and key in used
+        ]
+        return max(fractions, default=0.0)
+    
+    def _current_fraction(self, extra_tokens: int = 0) -> float:
+        """Get the consumed fraction of the run or the current stage, whichever is larger.
+        
+        Args:
+            extra_tokens: Tokens about to be spent
+        
+        Returns:
+            Consumed fraction
+        """
+        fraction = self.consumed_fraction(extra_tokens=extra_tokens)
+        if self.current_stage in self.stage_limits:
+            fraction = max(fraction, self.consumed_fraction(self.current_stage, extra_tokens))
+        return fraction
+    
+    def record_decision(self, action: str, reason: str, **details) -> None:
+        """Record a budget decision for the run manifest.
+        
+        Args:
+            action: Decision name (a degradation step, "halt", "skip_stage", ...)
+            reason: Human-readable reason
+            **details: Additional decision details
+        """
+        decision = {
+            "action": action,
+            "stage": self.current_stage,
+            "reason": reason,
+            "consumed_fraction": round(self._current_fraction(), 4),
+            "usage": self.usage(),
+            "timestamp": datetime.now().isoformat(),
+        }
+        decision.update(details)
+        self.decisions.append(decision)
+        logger.warning(f"Budget decision: {action} ({reason})")
+    
+    def _update_degradation(self) -> None:
+        """Activate degradation steps whose thresholds have been reached."""
+        if not self.enabled:
+            return
+        
+        fraction = self._current_fraction()
+        for step in self.DEGRADATION_STEPS:
+            if step in self.active_steps:
+                continue
+            
+            threshold = self.thresholds.get(step)
+            if threshold is None or fraction < threshold:
+                # Steps are applied strictly in order
+                break
+            
+            self.active_steps.add(step)
+            self.record_decision(step, f"consumed {fraction:.0%} of budget (threshold {threshold:.0%})")
+    
+    def is_degraded(self, step: str) -> bool:
+        """Check whether a degradation step is active.
+        
+        Args:
+            step: Degradation step name
+        
+        Returns:
+            True if the step has been activated
+        """
+        self._update_degradation()
+        return step in self.active_steps
+    
+    def is_exhausted(self) -> bool:
+        """Check whether the run or the current stage has used up its budget.
+        
+        Returns:
+            True if no further LLM calls should be made
+        """
+        return self.enabled and self._current_fraction() >= 1.0
+    
+    def before_call(self, model: Optional[str] = None, prompt: str = "") -> Optional[str]:
+        """Check the budget before an LLM call and select the model to use.
+        
+        Args:
+            model: Requested model key or name
+            prompt: Prompt text, used to estimate the tokens about to be spent
+        
+        Returns:
+            The model key or name to use for the call
+        
+        Raises:
+            BudgetExceededError: If the call would exceed a hard limit
+        """
+        if not self.enabled:
+            return model
+        
+        # A very rough approximation is 4 characters per token
+        estimated_tokens = len(prompt) // 4
+        if self._current_fraction(estimated_tokens) >= 1.0:
+            if "halt" not in self.active_steps:
+                self.active_steps.add("halt")
+                self.record_decision("halt", "budget limit reached, refusing further LLM calls")
+            raise BudgetExceededError(f"LLM budget exhausted (stage: {self.current_stage or 'run'})")
+        
+        if self.is_degraded("fast_model") and model != "fast":
+            return "fast"
+        
+        return model
+    
+    def allow_stage(self, name: str) -> bool:
+        """Decide whether an LLM-backed pipeline stage may start.
+        
+        Args:
+            name: Stage name
+        
+        Returns:
+            True if the run budget still allows the stage
+        """
+        if self.enabled and self.consumed_fraction() >= 1.0:
+            self.record_decision("skip_stage", "run budget exhausted", skipped_stage=name)
+            return False
+        return True
+    
+    def allow_connection_analysis(self, requested: bool = True) -> bool:
+        """Decide whether cross-segment connection analysis may run.
+        
+        Args:
+            requested: Whether connection analysis was requested
+        
+        Returns:
+            True if connection analysis should run
+        """
+        return requested and not self.is_degraded("skip_connection_analysis")
+    
+    def expansion_iterations(self, requested: int) -> int:
+        """Get the number of graph expansion iterations allowed by the budget.
+        
+        Args:
+            requested: Requested number of iterations
+        
+        Returns:
+            Allowed number of iterations
+        """
+        if self.is_degraded("shrink_expansion") and requested > 1:
+            self.record_decision("shrink_expansion_applied", "reduced expansion iterations",
+                                 requested=requested, allowed=1)
+            return 1
+        return requested
+    
+    def theory_limit(self, requested: int) -> int:
+        """Get the number of theories allowed by the budget.
+        
+        Args:
+            requested: Requested number of theories
+        
+        Returns:
+            Allowed number of theories
+        """
+        if self.is_degraded("cap_theories") and requested > 1:
+            self.record_decision("cap_theories_applied", "reduced number of theories",
+                                 requested=requested, allowed=1)
+            return 1
+        return requested
+    
+    def to_manifest(self) -> Dict[str, Any]:
+        """Get the budget state for the run manifest.
+        
+        Returns:
+            Dictionary with limits, usage and decisions
+        """
+        return {
+            "limits": self.limits,
+            "stage_limits": self.stage_limits,
+            "thresholds": self.thresholds,
+            "usage": self.usage(),
+            "stages": {name: self.usage(name) for name in self.stages},
+            "active_degradations": [step for step in self.DEGRADATION_STEPS if step in self.active_steps],
+            "halted": "halt" in self.active_steps,
+            "decisions": self.decisions,
+        }
+
+
+# Global budget controller instance (no limits until configured)
+budget_controller = BudgetController()
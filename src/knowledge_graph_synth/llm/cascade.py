@@ -0,0 +1,233 @@
+"""Model cascade for batch extraction: fast model first, escalate on doubt."""
+
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Any, Tuple
+
+from .budget import budget_controller
+from .validation import ResponseValidator
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCascade:
+    """Decides which segments of a fast-model batch response need a stronger model.
+    
+    Extraction batches are first sent to the fast model. Each segment of the
+    response is checked with the ResponseValidator (schema and quoted source
+    text) and against confidence statistics. Segments that fail are re-run on
+    the escalation model; the rest are accepted as is. Escalation rates are
+    tracked per stage so they can be reported with the run.
+    """
+    
+    def __init__(self,
+               enabled: bool = settings.CASCADE_ENABLED,
+               fast_model: str = settings.CASCADE_FAST_MODEL,
+               escalation_model: str = settings.CASCADE_ESCALATION_MODEL,
+               min_confidence: float = settings.CASCADE_MIN_CONFIDENCE,
+               max_invalid_ratio: float = settings.CASCADE_MAX_INVALID_RATIO):
+        """Initialize the model cascade.
+        
+        Args:
+            enabled: Whether to run the fast model first
+            fast_model: Model key used for the first pass
+            escalation_model: Model key used for escalated segments
+            min_confidence: Minimum mean item confidence for accepting a segment
+            max_invalid_ratio: Maximum share of items with unverifiable source text
+        """
+        self.enabled = enabled
+        self.fast_model = fast_model
+        self.escalation_model = escalation_model
+        self.min_confidence = min_confidence
+        self.max_invalid_ratio = max_invalid_ratio
+        self.validator = ResponseValidator()
+        self.reset()
+    
+    def reset(self) -> None:
+        """Reset the escalation statistics."""
+        self.stats = {}
+    
+    def first_model(self, default: str) -> str:
+        """Get the model key for the first pass over a batch.
+        
+        Args:
+            default: Model key to use when the cascade is disabled
+        
+        Returns:
+            Model key
+        """
+        return self.fast_model if self.enabled else default
+    
+    def _stage_stats(self, stage: str) -> Dict[str, Any]:
+        """Get the statistics of a stage, creating them if needed.
+        
+        Args:
+            stage: Stage name
+        
+        Returns:
+            Statistics dictionary
+        """
+        if stage not in self.stats:
+            self.stats[stage] = {"segments": 0, "escalated": 0, "reasons": Counter()}
+        return self.stats[stage]
+    
+    def _check_segment(self, segment_data: Optional[Dict[str, Any]],
+                     source_text: str,
+                     item_key: str,
+                     item_schema: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Check the fast-model output for a single segment.
+        
+        Args:
+            segment_data: Response entry for the segment (None if missing)
+            source_text: Segment text
+            item_key: Key of the extracted items ("entities" or "relationships")
+            item_schema: JSON Schema of a segment entry
+        
+        Returns:
+            Reason for escalation, or None if the output is accepted
+        """
+        if segment_data is None:
+            return "missing"
+        
+        if item_schema:
+            is_valid, _ = self.validator.validate_schema(segment_data, item_schema)
+            if not is_valid:
+                return "schema"
+        
+        items = segment_data.get(item_key, [])
+        if not items:
+            return None
+        
+        if item_key == "relationships":
+            validate_spans = self.validator.validate_relationship_source_spans
+        else:
+            validate_spans = self.validator.validate_entity_source_spans
+        
+        # Offsets are repaired later by the Grounder, so only the quoted text is checked
+        invalid = 0
+        for item in items:
+            span_text = (item.get("source_span") or {}).get("text", "")
+            is_valid, _ = validate_spans({item_key: [{"source_span": {"text": span_text}}]}, source_text)
+            if not is_valid:
+                invalid += 1
+        
+        if invalid / len(items) > self.max_invalid_ratio:
+            return "source_text"
+        
+        confidences = [item.get("confidence", 0.0) for item in items]
+        if sum(confidences) / len(confidences) < self.min_confidence:
+            return "low_confidence"
+        
+        return None
+    
+    def review(self, response: Dict[str, Any],
+              segments: List[Any],
+              item_key: str,
+              stage: str,
+              item_schema: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], List[Any]]:
+        """Split a fast-model batch response into accepted and escalated segments.
+        
+        Args:
+            response: Structured batch response with a "segments" array
+            segments: Segments sent in the batch
+            item_key: Key of the extracted items ("entities" or "relationships")
+            stage: Stage name for the statistics
+            item_schema: JSON Schema of a segment entry
+        
+        Returns:
+            (accepted_response, segments_to_escalate) tuple
+        """
+        segment_results = {}
+        for segment_data in (response or {}).get("segments", []):
+            if isinstance(segment_data, dict) and segment_data.get("segment_id"):
+                segment_results[str(segment_data["segment_id"])] = segment_data
+        
+        # Under budget degradation every call goes to the fast model, so escalating is pointless
+        can_escalate = not budget_controller.is_degraded("fast_model")
+        
+        accepted = []
+        escalate = []
+        reasons = []
+        for segment in segments:
+            segment_data = segment_results.get(str(segment.id))
+            reason = self._check_segment(segment_data, segment.text, item_key, item_schema)
+            if reason and can_escalate:
+                escalate.append(segment)
+                reasons.append(reason)
+            elif segment_data is not None:
+                accepted.append(segment_data)
+        
+        self.record(stage, len(segments), reasons)
+        if escalate:
+            logger.info(f"Escalating {len(escalate)}/{len(segments)} segments to {self.escalation_model} "
+                       f"model ({', '.join(sorted(set(reasons)))})")
+        
+        return {"segments": accepted}, escalate
+    
+    def record(self, stage: str, total: int, reasons: List[str]) -> None:
+        """Record the outcome of a cascade pass.
+        
+        Args:
+            stage: Stage name
+            total: Number of segments in the pass
+            reasons: Escalation reason for each escalated segment
+        """
+        stage_stats = self._stage_stats(stage)
+        stage_stats["segments"] += total
+        stage_stats["escalated"] += len(reasons)
+        stage_stats["reasons"].update(reasons)
+    
+    def escalation_rates(self) -> Dict[str, float]:
+        """Get the share of escalated segments per stage.
+        
+        Returns:
+            Dictionary mapping stage names to escalation rates
+        """
+        return {
+            stage: (stage_stats["escalated"] / stage_stats["segments"] if stage_stats["segments"] else 0.0)
+            for stage, stage_stats in self.stats.items()
+        }
+    
+    def get_summary(self) -> str:
+        """Get a human-readable summary of the escalation rates.
+        
+        Returns:
+            Formatted summary string
+        """
+        if not self.stats:
+            return "Model cascade: no batches processed"
+        
+        lines = ["Model cascade escalation rates:"]
+        for stage, rate in self.escalation_rates().items():
+            stage_stats = self.stats[stage]
+            lines.append(f"  {stage}: {stage_stats['escalated']}/{stage_stats['segments']} segments ({rate:.1%})")
+        return "\n".join(lines)
+    
+    def to_manifest(self) -> Dict[str, Any]:
+        """Get the cascade configuration and statistics for the run manifest.
+        
+        Returns:
+            Dictionary with models, thresholds and per-stage escalation statistics
+        """
+        rates = self.escalation_rates()
+        return {
+            "enabled": self.enabled,
+            "fast_model": self.fast_model,
+            "escalation_model": self.escalation_model,
+            "min_confidence": self.min_confidence,
+            "max_invalid_ratio": self.max_invalid_ratio,
+            "stages": {
+                stage: {
+                    "segments": stage_stats["segments"],
+                    "escalated": stage_stats["escalated"],
+                    "escalation_rate": round(rates[stage], 4),
+                    "reasons": dict(stage_stats["reasons"]),
+                }
+                for stage, stage_stats in self.stats.items()
+            },
+        }
+
+
+# Global model cascade instance
+model_cascade = ModelCascade()
@@ -6,6 +6,7 @@ from typing import Dict, List, Optional, Any, Union
 from .base import LLMProvider
 from .gemini import GeminiProvider
 from .gemini_reasoning import GeminiReasoningProvider
+from .router import RouterProvider
 from ..config import settings, providers
 
 logger = logging.getLogger(__name__)
@@ -22,6 +23,7 @@ class LLMProviderFactory:
     _provider_classes = {
         "gemini": GeminiProvider,
         "gemini_reasoning": GeminiReasoningProvider,
+        "router": RouterProvider,
         # Add other providers here as they are implemented
     }
     
@@ -9,7 +9,8 @@ from typing import Dict, List, Optional, Any, Union
 from google import genai
 from google.genai import types
 
-from .base import LLMProvider, token_counter
+from .base import LLMProvider, CachedContext, token_counter
+from .budget import budget_controller
 from ..config import settings, providers
 
 logger = logging.getLogger(__name__)
@@ -33,8 +34,9 @@ class GeminiProvider(LLMProvider):
         
         super().__init__(config)
         
-        # Initialize Gemini client
-        self.client = genai.Client(api_key=self.api_key)
+        # Initialize Gemini client (a custom base URL allows proxies and local stub endpoints)
+        http_options = types.HttpOptions(base_url=config["base_url"]) if config.get("base_url") else None
+        self.client = genai.Client(api_key=self.api_key, http_options=http_options)
         
         # Convert generation config to the new format
         self.generation_config = self._convert_generation_config(config.get("generation_config", {}))
@@ -103,12 +105,14 @@ class GeminiProvider(LLMProvider):
     
     async def generate_text(self, prompt: str, 
                          model: Optional[str] = None,
+                         cached_context: Optional[CachedContext] = None,
                          **kwargs) -> str:
         """Generate text from a prompt using Gemini.
         
         Args:
             prompt: The prompt text
             model: Specific model to use (defaults to provider's default model)
+            cached_context: Shared prompt prefix to put before the prompt
             **kwargs: Additional provider-specific parameters
             
         Returns:
@@ -117,6 +121,9 @@ class GeminiProvider(LLMProvider):
         Raises:
             Exception: On generation failure
         """
+        # Check the run budget (may switch to a cheaper model or refuse the call)
+        model = budget_controller.before_call(model, prompt)
+        
         # Get the actual model name from our mapping or use the provided one
         if model in self.models:
             model_name = self.models[model]
@@ -131,6 +138,9 @@ class GeminiProvider(LLMProvider):
         for key, value in kwargs.items():
             config[key] = value
         
+        # Reference the cached prefix or inline it
+        prompt = self._use_cached_context(prompt, model_name, cached_context, config)
+        
         # Apply safety settings if available
         safety_settings = self.safety_settings
         
@@ -171,6 +181,8 @@ class GeminiProvider(LLMProvider):
                     input_tokens = usage.prompt_token_count
                 if hasattr(usage, 'candidates_token_count'):
                     output_tokens = usage.candidates_token_count
+                if getattr(usage, 'cached_content_token_count', None):
+                    logger.debug(f"{usage.cached_content_token_count} input tokens served from context cache")
             
             # Record token usage
             token_counter.add_call(model_name, input_tokens, output_tokens)
@@ -187,6 +199,7 @@ class GeminiProvider(LLMProvider):
     async def generate_structured(self, prompt: str,
                                response_schema: Dict[str, Any],
                                model: Optional[str] = None,
+                               cached_context: Optional[CachedContext] = None,
                                **kwargs) -> Dict[str, Any]:
         """Generate structured output from a prompt using Gemini.
         
@@ -194,6 +207,7 @@ class GeminiProvider(LLMProvider):
             prompt: The prompt text
             response_schema: JSON Schema definition for the response format
             model: Specific model to use (defaults to provider's default model)
+            cached_context: Shared prompt prefix to put before the prompt
             **kwargs: Additional provider-specific parameters
             
         Returns:
@@ -202,6 +216,9 @@ class GeminiProvider(LLMProvider):
         Raises:
             Exception: On generation failure
         """
+        # Check the run budget (may switch to a cheaper model or refuse the call)
+        model = budget_controller.before_call(model, prompt)
+        
         # Get the actual model name from our mapping or use the provided one
         if model in self.models:
             model_name = self.models[model]
@@ -222,6 +239,9 @@ class GeminiProvider(LLMProvider):
             if key not in config:
                 config[key] = value
         
+        # Reference the cached prefix or inline it
+        prompt = self._use_cached_context(prompt, model_name, cached_context, config)
+        
         # Apply safety settings if available
         safety_settings = self.safety_settings
         
@@ -262,6 +282,8 @@ class GeminiProvider(LLMProvider):
                     input_tokens = usage.prompt_token_count
                 if hasattr(usage, 'candidates_token_count'):
                     output_tokens = usage.candidates_token_count
+                if getattr(usage, 'cached_content_token_count', None):
+                    logger.debug(f"{usage.cached_content_token_count} input tokens served from context cache")
             
             # Record token usage
             token_counter.add_call(model_name, input_tokens, output_tokens)
@@ -287,6 +309,86 @@ class GeminiProvider(LLMProvider):
             logger.error(f"Error generating structured response with Gemini: {str(e)}")
             raise
     
+    async def create_cached_context(self, content: str,
+                                 model: Optional[str] = None,
+                                 ttl_seconds: Optional[int] = None) -> CachedContext:
+        """Upload a shared prompt prefix to Gemini explicit context caching.
+        
+        Prefixes that are too small to be cached, or for which cache creation
+        fails, get a local handle and are sent inline as before.
+        
+        Args:
+            content: Shared prompt prefix (e.g., source document or graph summary)
+            model: Model the prefix will be used with (caches are model-specific)
+            ttl_seconds: Cache lifetime (defaults to settings.LLM_CONTEXT_CACHE_TTL)
+            
+        Returns:
+            Cached context handle
+        """
+        if model in self.models:
+            model_name = self.models[model]
+        else:
+            model_name = model or self.models.get(self.preferred_model_type, self.models["default"])
+        
+        # A very rough approximation is 4 characters per token
+        if len(content) // 4 < settings.LLM_CONTEXT_CACHE_MIN_TOKENS:
+            return CachedContext(content, model_name)
+        
+        ttl_seconds = ttl_seconds or settings.LLM_CONTEXT_CACHE_TTL
+        try:
+            cache = await asyncio.to_thread(
+                self.client.caches.create,
+                model=model_name,
+                config=types.CreateCachedContentConfig(
+                    contents=[content],
+                    display_name="knowledge-graph-synth",
+                    ttl=f"{ttl_seconds}s"
+                )
+            )
+            logger.info(f"Created context cache {cache.name} for {model_name} ({len(content)} chars)")
+            return CachedContext(content, model_name, name=cache.name)
+        except Exception as e:
+            logger.warning(f"Context caching unavailable for {model_name}, sending prefix inline: {str(e)}")
+            return CachedContext(content, model_name)
+    
+    async def release_cached_context(self, cached_context: CachedContext) -> None:
+        """Delete a Gemini context cache.
+        
+        Args:
+            cached_context: Handle returned by create_cached_context
+        """
+        if not cached_context or not cached_context.is_remote:
+            return
+        
+        try:
+            await asyncio.to_thread(self.client.caches.delete, name=cached_context.name)
+        except Exception as e:
+            logger.warning(f"Failed to delete context cache {cached_context.name}: {str(e)}")
+    
+    def _use_cached_context(self, prompt: str, 
+                         model_name: str,
+                         cached_context: Optional[CachedContext],
+                         config: Dict[str, Any]) -> str:
+        """Attach a cached context to a request.
+        
+        A provider-side cache is referenced in the generation config when it
+        was created for the same model; otherwise the prefix is inlined.
+        
+        Args:
+            prompt: The prompt text
+            model_name: Model used for the request
+            cached_context: Cached context handle (or None)
+            config: Generation config to update
+            
+        Returns:
+            Prompt to send to the model
+        """
+        if cached_context is not None and cached_context.is_remote and cached_context.model == model_name:
+            config["cached_content"] = cached_context.name
+            return prompt
+        
+        return self.apply_cached_context(prompt, cached_context)
+    
     def _convert_generation_config(self, old_config: Dict[str, Any]) -> Dict[str, Any]:
         """Convert old generation config format to new SDK format.
         
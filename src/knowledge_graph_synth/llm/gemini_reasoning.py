@@ -6,6 +6,7 @@ from typing import Dict, List, Optional, Any, Union
 
 from google.genai import types
 
+from .base import CachedContext
 from .gemini import GeminiProvider
 from ..config import settings, providers
 
@@ -90,6 +91,21 @@ class GeminiReasoningProvider(GeminiProvider):
         # Generate the response using the parent class method
         return await super().generate_structured(reasoning_prompt, response_schema, model, **reasoning_config)
     
+    async def create_cached_context(self, content: str,
+                                 model: Optional[str] = None,
+                                 ttl_seconds: Optional[int] = None) -> CachedContext:
+        """Upload a shared prompt prefix for the reasoning model variant.
+        
+        Args:
+            content: Shared prompt prefix (e.g., source document or graph summary)
+            model: Model the prefix will be used with (defaults to the reasoning model variant)
+            ttl_seconds: Cache lifetime (defaults to settings.LLM_CONTEXT_CACHE_TTL)
+        
+        Returns:
+            Cached context handle
+        """
+        return await super().create_cached_context(content, model or "reasoning", ttl_seconds)
+    
     def _create_reasoning_prompt(self, prompt: str, structured: bool = False) -> str:
         """Create a prompt optimized for the reasoning model variant.
         
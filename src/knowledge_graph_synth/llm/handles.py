@@ -0,0 +1,140 @@
+"""Compact prompt handles for segments and entities in batch prompts."""
+
+import logging
+from typing import Dict, Optional, Any
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+
+class PromptHandles:
+    """Assigns short per-request handles to segments and entities.
+    
+    Batch prompts refer to segments as S1, S2, ... and to entities as E1, E2, ...
+    instead of 36-character UUIDs, and the model echoes these handles back.
+    Entities with the same name and type share one handle, so each entity is
+    listed once per prompt no matter how many segments mention it. Handles are
+    mapped back to the real IDs when the response is parsed.
+    """
+    
+    def __init__(self):
+        """Initialize an empty handle table."""
+        self.segments = {}
+        self._segment_handles = {}
+        self.entities = {}
+        self._entity_handles = {}
+        self._entity_names = {}
+    
+    def segment_handle(self, segment: Any) -> str:
+        """Get the handle of a segment, assigning a new one if needed.
+        
+        Args:
+            segment: Text segment
+        
+        Returns:
+            Segment handle (e.g., "S1")
+        """
+        segment_id = str(segment.id)
+        if segment_id not in self._segment_handles:
+            handle = f"S{len(self.segments) + 1}"
+            self._segment_handles[segment_id] = handle
+            self.segments[handle] = segment
+        return self._segment_handles[segment_id]
+    
+    def entity_handle(self, entity: Any) -> str:
+        """Get the handle of an entity, assigning a new one if needed.
+        
+        Args:
+            entity: Entity (with name, type, id and source_span)
+        
+        Returns:
+            Entity handle (e.g., "E17")
+        """
+        key = (entity.name.lower(), entity.type.lower())
+        if key not in self._entity_handles:
+            handle = f"E{len(self.entities) + 1}"
+            self._entity_handles[key] = handle
+            self.entities[handle] = {"name": entity.name, "type": entity.type, "ids": {}, "default": entity.id}
+            self._entity_names.setdefault(key[0], handle)
+        
+        handle = self._entity_handles[key]
+        segment_id = entity.source_span.segment_id if entity.source_span else None
+        self.entities[handle]["ids"].setdefault(segment_id, entity.id)
+        return handle
+    
+    def entity_legend(self) -> str:
+        """Get the list of entity handles for the prompt, one line per entity.
+        
+        Returns:
+            Legend text
+        """
+        return "\n".join(
+            f"{handle}: {info['name']} ({info['type']})"
+            for handle, info in self.entities.items()
+        )
+    
+    def segment_for(self, handle: Any) -> Optional[Any]:
+        """Resolve a segment handle returned by the model.
+        
+        Args:
+            handle: Segment handle (full segment IDs are accepted as well)
+        
+        Returns:
+            The segment, or None if the handle is unknown
+        """
+        handle = str(handle or "").strip()
+        if handle in self.segments:
+            return self.segments[handle]
+        
+        # Tolerate "s1" and echoed full IDs
+        if handle.upper() in self.segments:
+            return self.segments[handle.upper()]
+        if handle in self._segment_handles:
+            return self.segments[self._segment_handles[handle]]
+        return None
+    
+    def decode_segments(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace segment handles in a batch response with segment IDs.
+        
+        Entries with unknown handles are dropped.
+        
+        Args:
+            response: Structured batch response with a "segments" array
+        
+        Returns:
+            Response with real segment IDs
+        """
+        decoded = []
+        for segment_data in (response or {}).get("segments", []):
+            if not isinstance(segment_data, dict):
+                continue
+            segment = self.segment_for(segment_data.get("segment_id"))
+            if segment is None:
+                logger.warning(f"Unknown segment handle in response: {segment_data.get('segment_id')}")
+                continue
+            decoded.append(dict(segment_data, segment_id=str(segment.id)))
+        
+        return {"segments": decoded}
+    
+    def entity_id(self, reference: Any, segment_id: Optional[str] = None) -> Optional[UUID]:
+        """Resolve an entity reference returned by the model.
+        
+        Args:
+            reference: Entity handle, entity name, or a {"name", "type"} object
+            segment_id: ID of the segment the reference comes from
+        
+        Returns:
+            ID of the entity (preferring the one from the same segment), or None
+        """
+        if isinstance(reference, dict):
+            key = (str(reference.get("name", "")).lower(), str(reference.get("type", "")).lower())
+            handle = self._entity_handles.get(key) or self._entity_names.get(key[0])
+        else:
+            reference = str(reference or "").strip()
+            handle = reference.upper() if reference.upper() in self.entities else self._entity_names.get(reference.lower())
+        
+        if not handle:
+            return None
+        
+        info = self.entities[handle]
+        return info["ids"].get(segment_id, info["default"])
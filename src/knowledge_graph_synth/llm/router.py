@@ -0,0 +1,398 @@
+"""Router provider that balances requests across several LLM backends."""
+
+import logging
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional, Any
+
+from .base import LLMProvider, CachedContext
+from .budget import BudgetExceededError
+from ..config import settings, providers
+
+logger = logging.getLogger(__name__)
+
+
+class BackendHealth:
+    """Observed health of one router backend.
+    
+    Tracks latency and error rate as exponentially weighted moving averages,
+    requests in the last minute against an optional quota, and a circuit
+    breaker that rejects requests after repeated failures. Once the cooldown
+    has passed, the circuit is half-open and lets a single trial request
+    through at a time; its outcome closes or reopens the circuit.
+    """
+    
+    # Smoothing factor for the moving averages
+    ALPHA = 0.3
+    
+    def __init__(self,
+               name: str,
+               provider: LLMProvider,
+               failure_threshold: int = settings.ROUTER_FAILURE_THRESHOLD,
+               cooldown_seconds: float = settings.ROUTER_COOLDOWN_SECONDS,
+               quota_cooldown_seconds: float = settings.ROUTER_QUOTA_COOLDOWN_SECONDS,
+               requests_per_minute: Optional[int] = None):
+        """Initialize the backend health state.
+        
+        Args:
+            name: Backend name
+            provider: Provider instance serving this backend
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown_seconds: Time an open circuit waits before a trial call
+            quota_cooldown_seconds: Time the backend is skipped after a quota error
+            requests_per_minute: Request quota per minute (None for unknown)
+        """
+        self.name = name
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.quota_cooldown_seconds = quota_cooldown_seconds
+        self.requests_per_minute = requests_per_minute
+        
+        self.latency = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.recent_requests = deque()
+        self.last_error = None
+        self.probing = False
+    
+    @property
+    def state(self) -> str:
+        """Get the circuit breaker state.
+        
+        Returns:
+            "closed", "open" or "half_open"
+        """
+        if self.consecutive_failures < self.failure_threshold and self.open_until == 0.0:
+            return "closed"
+        if time.time() < self.open_until:
+            return "open"
+        return "half_open"
+    
+    def remaining_quota(self) -> float:
+        """Get the share of the per-minute quota that is still available.
+        
+        Returns:
+            Value between 0.0 and 1.0 (1.0 when no quota is configured)
+        """
+        now = time.time()
+        while self.recent_requests and now - self.recent_requests[0] > 60:
+            self.recent_requests.popleft()
+        
+        if not self.requests_per_minute:
+            return 1.0
+        return max(0.0, 1.0 - len(self.recent_requests) / self.requests_per_minute)
+    
+    def is_available(self) -> bool:
+        """Check whether the backend may receive a request.
+        
+        Returns:
+            True if the circuit is closed and quota remains
+        """
+        return self.state == "closed" and self.remaining_quota() > 0.0
+    
+    def needs_probe(self) -> bool:
+        """Check whether the backend is waiting for its trial request.
+        
+        Returns:
+            True if the circuit is half-open, no trial request is in flight
+            and quota remains
+        """
+        return self.state == "half_open" and not self.probing and self.remaining_quota() > 0.0
+    
+    def weight(self) -> float:
+        """Get the load balancing weight of the backend.
+        
+        Faster backends with fewer errors and more remaining quota get
+        proportionally more traffic. Backends without measurements yet are
+        assumed to take one second per call.
+        
+        Returns:
+            Positive weight (0.0 if unavailable)
+        """
+        if not self.is_available():
+            return 0.0
+        
+        latency = self.latency if self.latency is not None else 1.0
+        success_rate = max(0.05, 1.0 - self.error_rate)
+        return success_rate * self.remaining_quota() / max(latency, 0.01)
+    
+    def record_request(self) -> None:
+        """Record that a request is being sent."""
+        self.recent_requests.append(time.time())
+    
+    def record_success(self, latency: float) -> None:
+        """Record a successful call.
+        
+        Args:
+            latency: Call duration in seconds
+        """
+        self.calls += 1
+        self.latency = latency if self.latency is None else (1 - self.ALPHA) * self.latency + self.ALPHA * latency
+        self.error_rate = (1 - self.ALPHA) * self.error_rate
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+    
+    def record_failure(self, error: Exception) -> None:
+        """Record a failed call and open the circuit if needed.
+        
+        Args:
+            error: The exception raised by the backend
+        """
+        self.calls += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.error_rate = (1 - self.ALPHA) * self.error_rate + self.ALPHA
+        self.last_error = str(error)
+        
+        if is_quota_error(error):
+            self.open_until = time.time() + self.quota_cooldown_seconds
+            logger.warning(f"Backend {self.name} is out of quota, skipping it for {self.quota_cooldown_seconds:.0f}s")
+        elif self.consecutive_failures >= self.failure_threshold:
+            self.open_until = time.time() + self.cooldown_seconds
+            logger.warning(f"Circuit opened for backend {self.name} after "
+                         f"{self.consecutive_failures} consecutive failures")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the health state for reporting.
+        
+        Returns:
+            Dictionary with health statistics
+        """
+        return {
+            "name": self.name,
+            "state": self.state,
+            "latency": self.latency,
+            "error_rate": round(self.error_rate, 4),
+            "remaining_quota": round(self.remaining_quota(), 4),
+            "calls": self.calls,
+            "failures": self.failures,
+            "probing": self.probing,
+            "last_error": self.last_error,
+        }
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Check whether an error means the backend's quota is exhausted.
+    
+    Args:
+        error: Exception raised by a provider
+    
+    Returns:
+        True for rate limit and quota errors
+    """
+    message = str(error).lower()
+    return any(marker in message for marker in ("429", "resource_exhausted", "quota", "rate limit"))
+
+
+class RouterProvider(LLMProvider):
+    """LLM provider that spreads requests across several backends.
+    
+    Each backend is a regular provider (e.g., Gemini with its own API key or
+    endpoint). Requests go to a backend chosen at random in proportion to its
+    health weight; on error the next backend is tried, and backends that keep
+    failing or run out of quota are skipped until their circuit breaker lets
+    a trial request through again.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize the router provider.
+        
+        Args:
+            config: Router configuration with a "backends" list (defaults to
+                config from providers module). Each backend has "provider"
+                and "api_key" and optionally "name", "base_url" and
+                "requests_per_minute".
+        
+        Raises:
+            ValueError: If no backend can be created
+        """
+        if config is None:
+            config = providers.ROUTER_CONFIG
+        
+        super().__init__(config)
+        
+        # Imported here to avoid a circular import with the factory
+        from .factory import LLMProviderFactory
+        
+        self.backends = []
+        for i, backend_config in enumerate(config.get("backends", [])):
+            provider_name = backend_config.get("provider", "gemini")
+            name = backend_config.get("name", f"{provider_name}-{i+1}")
+            
+            provider_class = LLMProviderFactory._provider_classes.get(provider_name)
+            if provider_class is None or provider_class is RouterProvider:
+                logger.debug(f"Skipping router backend {name}: provider {provider_name} is not implemented")
+                continue
+            
+            # Backends share the provider defaults and override key and endpoint
+            provider_config = dict(providers.get_provider_config(provider_name) or
+                                   providers.PROVIDER_CONFIGS.get(provider_name, {}))
+            provider_config.update({
+                key: value for key, value in backend_config.items()
+                if key not in ("name", "provider", "requests_per_minute")
+            })
+            
+            try:
+                provider = provider_class(provider_config)
+            except Exception as e:
+                logger.error(f"Error creating router backend {name}: {str(e)}")
+                continue
+            
+            self.backends.append(BackendHealth(
+                name,
+                provider,
+                failure_threshold=config.get("failure_threshold", settings.ROUTER_FAILURE_THRESHOLD),
+                cooldown_seconds=config.get("cooldown_seconds", settings.ROUTER_COOLDOWN_SECONDS),
+                quota_cooldown_seconds=config.get("quota_cooldown_seconds", settings.ROUTER_QUOTA_COOLDOWN_SECONDS),
+                requests_per_minute=backend_config.get("requests_per_minute", config.get("requests_per_minute"))
+            ))
+        
+        if not self.backends:
+            raise ValueError("Router provider has no usable backends")
+        
+        logger.info(f"Router provider using backends: {[backend.name for backend in self.backends]}")
+    
+    def name(self) -> str:
+        """Get the name of the LLM provider.
+        
+        Returns:
+            Provider name
+        """
+        return "router"
+    
+    def set_preferred_model(self, model_type: str):
+        """Set the preferred model type on all backends that support it.
+        
+        Args:
+            model_type: Type of model to use ("default", "thinking", "reasoning", etc.)
+        """
+        for backend in self.backends:
+            if hasattr(backend.provider, "set_preferred_model"):
+                backend.provider.set_preferred_model(model_type)
+    
+    def _select_order(self) -> List[BackendHealth]:
+        """Order the backends for a request.
+        
+        Half-open backends waiting for their trial request come first, so
+        that each gets exactly one request. Available backends follow, drawn
+        by weighted random sampling without replacement; open, probing and
+        quota-limited ones come last as a last resort.
+        
+        Returns:
+            Backends in the order they should be tried
+        """
+        order = [backend for backend in self.backends if backend.needs_probe()]
+        candidates = [backend for backend in self.backends if backend.weight() > 0]
+        while candidates:
+            weights = [backend.weight() for backend in candidates]
+            chosen = random.choices(candidates, weights=weights)[0]
+            order.append(chosen)
+            candidates.remove(chosen)
+        
+        # Keep unavailable backends at the end so a request never fails without trying
+        order.extend(sorted(
+            (backend for backend in self.backends if backend not in order),
+            key=lambda backend: backend.open_until
+        ))
+        return order
+    
+    async def _route(self, method: str, *args, **kwargs) -> Any:
+        """Send a request to the best backend, failing over on errors.
+        
+        Args:
+            method: Provider method name ("generate_text" or "generate_structured")
+            *args: Positional arguments of the method
+            **kwargs: Keyword arguments of the method
+        
+        Returns:
+            The backend's response
+        
+        Raises:
+            BudgetExceededError: If the run budget refuses the call
+            Exception: The last backend error if all backends fail
+        """
+        last_error = None
+        for backend in self._select_order():
+            # A backend whose circuit is not closed takes one trial request at a time
+            probe = backend.state != "closed"
+            if probe:
+                if backend.probing:
+                    continue
+                backend.probing = True
+            
+            backend.record_request()
+            start_time = time.time()
+            try:
+                result = await getattr(backend.provider, method)(*args, **kwargs)
+            except BudgetExceededError:
+                # The budget applies to the whole run, other backends would refuse too
+                raise
+            except Exception as e:
+                backend.record_failure(e)
+                last_error = e
+                logger.warning(f"Router backend {backend.name} failed ({str(e)}), trying next backend")
+                continue
+            finally:
+                if probe:
+                    backend.probing = False
+            
+            backend.record_success(time.time() - start_time)
+            return result
+        
+        raise last_error or RuntimeError("No router backends available")
+    
+    async def generate_text(self, prompt: str,
+                         model: Optional[str] = None,
+                         cached_context: Optional[CachedContext] = None,
+                         **kwargs) -> str:
+        """Generate text using one of the backends.
+        
+        Args:
+            prompt: The prompt text
+            model: Specific model to use (defaults to the backend's default model)
+            cached_context: Shared prompt prefix to put before the prompt
+            **kwargs: Additional provider-specific parameters
+        
+        Returns:
+            Generated text response
+        
+        Raises:
+            Exception: If all backends fail
+        """
+        return await self._route("generate_text", prompt, model, cached_context=cached_context, **kwargs)
+    
+    async def generate_structured(self, prompt: str,
+                               response_schema: Dict[str, Any],
+                               model: Optional[str] = None,
+                               cached_context: Optional[CachedContext] = None,
+                               **kwargs) -> Dict[str, Any]:
+        """Generate structured output using one of the backends.
+        
+        Args:
+            prompt: The prompt text
+            response_schema: JSON Schema definition for the response format
+            model: Specific model to use (defaults to the backend's default model)
+            cached_context: Shared prompt prefix to put before the prompt
+            **kwargs: Additional provider-specific parameters
+        
+        Returns:
+            Structured response as a dictionary
+        
+        Raises:
+            Exception: If all backends fail
+        """
+        return await self._route("generate_structured", prompt, response_schema, model,
+                                 cached_context=cached_context, **kwargs)
+    
+    def health(self) -> List[Dict[str, Any]]:
+        """Get the health state of all backends.
+        
+        Returns:
+            List of backend health dictionaries
+        """
+        return [backend.to_dict() for backend in self.backends]
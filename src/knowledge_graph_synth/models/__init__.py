@@ -4,16 +4,21 @@ This module provides Pydantic models for the core data structures used in the sy
 including text segments, entities, relationships, and the knowledge graph itself.
 """
 
+from .document import DocumentBuffer
 from .segment import TextSegment, SegmentCollection
 from .entity import Entity, EntityAttribute
 from .relationship import Relationship
+from .graph_core import GraphCore
 from .graph import KnowledgeGraph
 from .provenance import SourceSpan, EvidenceCollection
+from .columnar import ColumnarTable
 
 __all__ = [
+    "DocumentBuffer",
     "TextSegment", "SegmentCollection",
     "Entity", "EntityAttribute",
     "Relationship",
-    "KnowledgeGraph",
-    "SourceSpan", "EvidenceCollection"
+    "KnowledgeGraph", "GraphCore",
+    "SourceSpan", "EvidenceCollection",
+    "ColumnarTable"
 ]
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""Helpers for building many model instances at once."""
+
+import gc
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector while many objects are created.
+    
+    Every model instance is a tracked container, so building a large graph
+    triggers collections over and over, each walking all objects created so
+    far. None of these objects is garbage yet, so the collections can safely
+    wait until the batch is built.
+    
+    Yields:
+        None
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
@@ -0,0 +1,602 @@
+"""Columnar binary persistence for the knowledge graph synthesis system.
+
+Graphs and segment collections are stored as a directory of NumPy arrays:
+one array per scalar field, dictionary-encoded arrays for repeated strings
+(types, documents, languages) and offset/byte arrays for free text. The
+arrays can be memory-mapped, and objects are only built from a row when they
+are accessed, so opening a large graph does not depend on its size.
+"""
+
+import json
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+import numpy as np
+
+from .document import DocumentBuffer
+from .entity import Entity, EntityAttribute
+from .graph import KnowledgeGraph
+from .graph_core import GraphCore
+from .provenance import SourceSpan
+from .relationship import Relationship
+from .segment import TextSegment, SegmentCollection
+
+FORMAT_NAME = "kgs-columnar"
+FORMAT_VERSION = 1
+
+
+class StringColumn:
+    """A column of strings stored as UTF-8 bytes plus row offsets."""
+    
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        """Initialize the string column.
+        
+        Args:
+            offsets: Byte offset of each row, plus the total length
+            data: UTF-8 bytes of all rows
+        """
+        self.offsets = offsets
+        self.data = data
+    
+    def __getitem__(self, row: int) -> str:
+        """Decode one row.
+        
+        Args:
+            row: Row index
+        
+        Returns:
+            String value
+        """
+        return self.data[self.offsets[row]:self.offsets[row + 1]].tobytes().decode("utf-8")
+    
+    def __len__(self) -> int:
+        """Get the number of rows.
+        
+        Returns:
+            Row count
+        """
+        return len(self.offsets) - 1
+
+
+class ColumnarTable(MutableMapping):
+    """A mapping from UUIDs to objects that are decoded from columns on access.
+    
+    Rows are looked up by binary search over the stored IDs, and decoded
+    objects are cached, so changes to them are kept. Objects that are added
+    or replaced later are held in memory next to the stored rows.
+    """
+    
+    def __init__(self, ids: np.ndarray, order: np.ndarray, decode: Callable[[int], Any]):
+        """Initialize the table.
+        
+        Args:
+            ids: 16-byte IDs of the stored rows
+            order: Row order that sorts the IDs
+            decode: Function that builds the object of a row
+        """
+        self._ids = ids
+        self._order = order
+        self._decode = decode
+        self._cache: Dict[int, Any] = {}
+        self._added: Dict[UUID, Any] = {}
+        self._deleted = set()
+    
+    def _row(self, key: Any) -> int:
+        """Find the stored row of a key.
+        
+        Args:
+            key: Object ID
+        
+        Returns:
+            Row index, or -1 if the key is not stored (or was deleted)
+        """
+        if not isinstance(key, UUID) or not len(self._ids):
+            return -1
+        
+        needle = np.array([key.bytes], dtype="S16")
+        position = int(np.searchsorted(self._ids, needle, sorter=self._order)[0])
+        if position < len(self._order):
+            row = int(self._order[position])
+            if self._ids[row] == needle[0] and row not in self._deleted:
+                return row
+        return -1
+    
+    def row_key(self, row: int) -> UUID:
+        """Get the ID of a stored row.
+        
+        Args:
+            row: Row index
+        
+        Returns:
+            Object ID
+        """
+        # Fixed-width byte strings drop trailing zero bytes
+        return UUID(bytes=bytes(self._ids[row]).ljust(16, b"\0"))
+    
+    def __getitem__(self, key: Any) -> Any:
+        if key in self._added:
+            return self._added[key]
+        
+        row = self._row(key)
+        if row < 0:
+            raise KeyError(key)
+        
+        value = self._cache.get(row)
+        if value is None:
+            value = self._decode(row)
+            self._cache[row] = value
+        return value
+    
+    def __setitem__(self, key: Any, value: Any) -> None:
+        row = self._row(key)
+        if row >= 0:
+            self._cache[row] = value
+        else:
+            self._added[key] = value
+    
+    def __delitem__(self, key: Any) -> None:
+        if key in self._added:
+            del self._added[key]
+            return
+        
+        row = self._row(key)
+        if row < 0:
+            raise KeyError(key)
+        self._deleted.add(row)
+        self._cache.pop(row, None)
+    
+    def __contains__(self, key: Any) -> bool:
+        return key in self._added or self._row(key) >= 0
+    
+    def __iter__(self) -> Iterator[UUID]:
+        for row in range(len(self._ids)):
+            if row not in self._deleted:
+                yield self.row_key(row)
+        yield from list(self._added)
+    
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._deleted) + len(self._added)
+
+
+class _RowKeys:
+    """The IDs of a table's stored rows as a sequence, and their row numbers."""
+    
+    def __init__(self, table: ColumnarTable):
+        """Initialize the view.
+        
+        Args:
+            table: Columnar table
+        """
+        self.table = table
+    
+    def __getitem__(self, row: int) -> UUID:
+        return self.table.row_key(row)
+    
+    def __len__(self) -> int:
+        return len(self.table._ids)
+    
+    def get(self, key: UUID, default: int = -1) -> int:
+        """Get the row number of an ID."""
+        row = self.table._row(key)
+        return default if row < 0 else row
+
+
+class _Dictionary:
+    """Dictionary encoding of a string column."""
+    
+    def __init__(self, values: Optional[List[str]] = None):
+        """Initialize the dictionary.
+        
+        Args:
+            values: Known values, in code order
+        """
+        self.values = list(values or [])
+        self._codes = {value: code for code, value in enumerate(self.values)}
+    
+    def encode(self, value: Optional[str]) -> int:
+        """Get the code of a value, adding it if needed (-1 for None)."""
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+    
+    def decode(self, code: int) -> Optional[str]:
+        """Get the value of a code."""
+        return self.values[code] if code >= 0 else None
+
+
+def _ids(items: List[Any]) -> np.ndarray:
+    """Build the ID column of a list of objects."""
+    return np.array([item.id.bytes for item in items], dtype="S16")
+
+
+def _attributes_json(attributes: List[EntityAttribute]) -> str:
+    """Serialize attributes for the lazy attribute column."""
+    if not attributes:
+        return ""
+    return json.dumps([
+        {
+            "key": attr.key,
+            "value": attr.value,
+            "confidence": attr.confidence,
+            "source_span": attr.source_span.to_dict() if attr.source_span else None
+        }
+        for attr in attributes
+    ], ensure_ascii=False, default=str)
+
+
+def _attributes(text: str) -> List[EntityAttribute]:
+    """Deserialize the attribute column of a row."""
+    if not text:
+        return []
+    return [EntityAttribute(**attr) for attr in json.loads(text)]
+
+
+class _Writer:
+    """Writes the columns of one columnar directory."""
+    
+    def __init__(self, path: str, kind: str):
+        """Create the output directory.
+        
+        Args:
+            path: Output directory
+            kind: Kind of content ("graph" or "segments")
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "kind": kind, "dictionaries": {}}
+    
+    def array(self, name: str, values: Any, dtype: Any) -> np.ndarray:
+        """Write a fixed-width column."""
+        array = np.asarray(values, dtype=dtype)
+        np.save(self.path / f"{name}.npy", array, allow_pickle=False)
+        return array
+    
+    def ids(self, name: str, items: List[Any]) -> None:
+        """Write the ID column and the order that sorts it."""
+        ids = self.array(name, _ids(items), "S16")
+        self.array(f"{name}_order", np.argsort(ids, kind="stable"), np.int64)
+    
+    def strings(self, name: str, values: List[str]) -> None:
+        """Write a string column as offsets and UTF-8 bytes."""
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        self.array(f"{name}.offsets", offsets, np.int64)
+        self.array(f"{name}.data", np.frombuffer(b"".join(encoded), dtype=np.uint8), np.uint8)
+    
+    def dictionary(self, name: str, dictionary: _Dictionary) -> None:
+        """Record the values of a dictionary-encoded column."""
+        self.manifest["dictionaries"][name] = dictionary.values
+    
+    def close(self, **fields: Any) -> None:
+        """Write the manifest with the given extra fields."""
+        self.manifest.update(fields)
+        with open(self.path / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2, default=str)
+
+
+class _Reader:
+    """Reads the columns of one columnar directory."""
+    
+    def __init__(self, path: str, kind: str, mmap: bool):
+        """Open a columnar directory.
+        
+        Args:
+            path: Directory to read
+            kind: Expected kind of content
+            mmap: Whether to memory-map the columns
+        
+        Raises:
+            ValueError: If the directory has another kind or a newer version
+        """
+        self.path = Path(path)
+        with open(self.path / "manifest.json", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        
+        if self.manifest.get("format") != FORMAT_NAME or self.manifest.get("kind") != kind:
+            raise ValueError(f"{path} is not a columnar {kind} directory")
+        if self.manifest.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format version {self.manifest['version']}")
+        
+        self.mmap_mode = "r" if mmap else None
+    
+    def array(self, name: str) -> np.ndarray:
+        """Open a fixed-width column."""
+        return np.load(self.path / f"{name}.npy", mmap_mode=self.mmap_mode, allow_pickle=False)
+    
+    def strings(self, name: str) -> StringColumn:
+        """Open a string column."""
+        return StringColumn(self.array(f"{name}.offsets"), self.array(f"{name}.data"))
+    
+    def dictionary(self, name: str) -> _Dictionary:
+        """Get the values of a dictionary-encoded column."""
+        return _Dictionary(self.manifest["dictionaries"].get(name, []))
+
+
+def save_graph(graph: KnowledgeGraph, path: str) -> None:
+    """Save a knowledge graph in the columnar format.
+    
+    Args:
+        graph: Knowledge graph to save
+        path: Output directory
+    
+    Raises:
+        ValueError: If a relationship refers to an entity outside the graph
+    """
+    entities = list(graph.entities.values())
+    relationships = list(graph.relationships.values())
+    rows = {entity.id: row for row, entity in enumerate(entities)}
+    
+    types = _Dictionary()
+    relationship_types = _Dictionary()
+    documents = _Dictionary()
+    
+    writer = _Writer(path, "graph")
+    
+    writer.ids("entity_id", entities)
+    writer.strings("entity_name", [entity.name for entity in entities])
+    writer.array("entity_type", [types.encode(entity.type) for entity in entities], np.int32)
+    writer.array("entity_confidence", [entity.confidence for entity in entities], np.float64)
+    writer.array("entity_span_document", [documents.encode(e.source_span.document_id) for e in entities], np.int32)
+    writer.strings("entity_span_segment", [e.source_span.segment_id or "" for e in entities])
+    writer.array("entity_span_start", [e.source_span.start for e in entities], np.int64)
+    writer.array("entity_span_end", [e.source_span.end for e in entities], np.int64)
+    writer.strings("entity_span_text", [e.source_span.text for e in entities])
+    writer.strings("entity_attributes", [_attributes_json(e.attributes) for e in entities])
+    
+    try:
+        sources = [rows[r.source_id] for r in relationships]
+        targets = [rows[r.target_id] for r in relationships]
+    except KeyError as e:
+        raise ValueError(f"Relationship refers to entity {e.args[0]} that is not in the graph")
+    
+    writer.ids("relationship_id", relationships)
+    writer.array("relationship_source", sources, np.int64)
+    writer.array("relationship_target", targets, np.int64)
+    writer.array("relationship_type", [relationship_types.encode(r.type) for r in relationships], np.int32)
+    writer.array("relationship_directed", [r.directed for r in relationships], np.bool_)
+    writer.array("relationship_confidence", [r.confidence for r in relationships], np.float64)
+    writer.array("relationship_span_document", [documents.encode(r.source_span.document_id) for r in relationships], np.int32)
+    writer.strings("relationship_span_segment", [r.source_span.segment_id or "" for r in relationships])
+    writer.array("relationship_span_start", [r.source_span.start for r in relationships], np.int64)
+    writer.array("relationship_span_end", [r.source_span.end for r in relationships], np.int64)
+    writer.strings("relationship_span_text", [r.source_span.text for r in relationships])
+    writer.strings("relationship_attributes", [_attributes_json(r.attributes) for r in relationships])
+    
+    writer.dictionary("entity_types", types)
+    writer.dictionary("relationship_types", relationship_types)
+    writer.dictionary("documents", documents)
+    writer.close(entities=len(entities), relationships=len(relationships), metadata=graph.metadata)
+
+
+def load_graph(path: str, mmap: bool = True) -> KnowledgeGraph:
+    """Open a knowledge graph saved in the columnar format.
+    
+    Entities and relationships are decoded when they are first accessed.
+    
+    Args:
+        path: Directory written by save_graph
+        mmap: Whether to memory-map the columns instead of reading them
+    
+    Returns:
+        Knowledge graph backed by the columns
+    """
+    reader = _Reader(path, "graph", mmap)
+    types = reader.dictionary("entity_types")
+    relationship_types = reader.dictionary("relationship_types")
+    documents = reader.dictionary("documents")
+    
+    entity_columns = {
+        name: reader.array(f"entity_{name}")
+        for name in ("type", "confidence", "span_document", "span_start", "span_end")
+    }
+    entity_strings = {
+        name: reader.strings(f"entity_{name}")
+        for name in ("name", "span_segment", "span_text", "attributes")
+    }
+    
+    def decode_entity(row: int) -> Entity:
+        entity = Entity(
+            id=entities.row_key(row),
+            name=entity_strings["name"][row],
+            type=types.decode(int(entity_columns["type"][row])),
+            confidence=float(entity_columns["confidence"][row]),
+            source_span=SourceSpan(
+                document_id=documents.decode(int(entity_columns["span_document"][row])),
+                segment_id=entity_strings["span_segment"][row] or None,
+                start=int(entity_columns["span_start"][row]),
+                end=int(entity_columns["span_end"][row]),
+                text=entity_strings["span_text"][row]
+            )
+        )
+        entity.attributes = _attributes(entity_strings["attributes"][row])
+        return entity
+    
+    relationship_columns = {
+        name: reader.array(f"relationship_{name}")
+        for name in ("source", "target", "type", "directed", "confidence",
+                     "span_document", "span_start", "span_end")
+    }
+    relationship_strings = {
+        name: reader.strings(f"relationship_{name}")
+        for name in ("span_segment", "span_text", "attributes")
+    }
+    
+    def decode_relationship(row: int) -> Relationship:
+        relationship = Relationship(
+            id=relationships.row_key(row),
+            source_id=entities.row_key(int(relationship_columns["source"][row])),
+            target_id=entities.row_key(int(relationship_columns["target"][row])),
+            type=relationship_types.decode(int(relationship_columns["type"][row])),
+            directed=bool(relationship_columns["directed"][row]),
+            confidence=float(relationship_columns["confidence"][row]),
+            source_span=SourceSpan(
+                document_id=documents.decode(int(relationship_columns["span_document"][row])),
+                segment_id=relationship_strings["span_segment"][row] or None,
+                start=int(relationship_columns["span_start"][row]),
+                end=int(relationship_columns["span_end"][row]),
+                text=relationship_strings["span_text"][row]
+            )
+        )
+        relationship.attributes = _attributes(relationship_strings["attributes"][row])
+        return relationship
+    
+    entities = ColumnarTable(reader.array("entity_id"), reader.array("entity_id_order"), decode_entity)
+    relationships = ColumnarTable(
+        reader.array("relationship_id"), reader.array("relationship_id_order"), decode_relationship
+    )
+    
+    graph = KnowledgeGraph.model_construct(
+        entities=entities,
+        relationships=relationships,
+        metadata=reader.manifest.get("metadata", {})
+    )
+    
+    # The structure is read from the columns without decoding any object
+    graph._core = GraphCore(
+        node_ids=_RowKeys(entities),
+        node_names=entity_strings["name"],
+        node_types=entity_columns["type"],
+        node_confidence=entity_columns["confidence"],
+        type_names=types.values,
+        edge_ids=_RowKeys(relationships),
+        edge_sources=relationship_columns["source"],
+        edge_targets=relationship_columns["target"],
+        edge_types=relationship_columns["type"],
+        edge_confidence=relationship_columns["confidence"],
+        edge_type_names=relationship_types.values,
+        node_index=_RowKeys(entities)
+    )
+    return graph
+
+
+def save_segments(collection: SegmentCollection, path: str) -> None:
+    """Save a segment collection in the columnar format.
+    
+    Segments that are views into a document buffer are stored as offsets;
+    the text of each buffer is written once as a UTF-8 file.
+    
+    Args:
+        collection: Segment collection to save
+        path: Output directory
+    """
+    segments = list(collection.segments.values())
+    documents = _Dictionary()
+    languages = _Dictionary()
+    
+    writer = _Writer(path, "segments")
+    
+    # Each shared buffer is written once
+    buffers = {}
+    buffer_rows = []
+    for segment in segments:
+        buffer = segment.buffer
+        if buffer is None or segment.start_position is None:
+            buffer_rows.append(-1)
+            continue
+        if id(buffer) not in buffers:
+            index = len(buffers)
+            buffers[id(buffer)] = index
+            (writer.path / f"buffer_{index}.txt").write_bytes(buffer.text.encode("utf-8"))
+        buffer_rows.append(buffers[id(buffer)])
+    
+    children = [child_id for segment in segments for child_id in segment.child_ids]
+    child_offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+    np.cumsum([len(segment.child_ids) for segment in segments], out=child_offsets[1:])
+    
+    writer.ids("segment_id", segments)
+    writer.array("segment_document", [documents.encode(s.document_id) for s in segments], np.int32)
+    writer.array("segment_language", [languages.encode(s.language) for s in segments], np.int32)
+    writer.array("segment_start", [-1 if s.start_position is None else s.start_position for s in segments], np.int64)
+    writer.array("segment_end", [-1 if s.end_position is None else s.end_position for s in segments], np.int64)
+    writer.array("segment_parent", [s.parent_id.bytes if s.parent_id else b"" for s in segments], "S16")
+    writer.array("segment_children", [child_id.bytes for child_id in children], "S16")
+    writer.array("segment_children.offsets", child_offsets, np.int64)
+    writer.array("segment_buffer", buffer_rows, np.int32)
+    writer.strings("segment_text", ["" if row >= 0 else s.text for s, row in zip(segments, buffer_rows)])
+    writer.strings("segment_metadata", [
+        json.dumps(s.metadata, ensure_ascii=False, default=str) if s.metadata else "" for s in segments
+    ])
+    
+    writer.dictionary("documents", documents)
+    writer.dictionary("languages", languages)
+    writer.close(segments=len(segments), buffers=len(buffers), document_id=collection.document_id)
+
+
+def load_segments(path: str, mmap: bool = True) -> SegmentCollection:
+    """Open a segment collection saved in the columnar format.
+    
+    Segments are decoded when they are first accessed. With mmap, document
+    buffers are memory-mapped as well.
+    
+    Args:
+        path: Directory written by save_segments
+        mmap: Whether to memory-map the columns and buffers
+    
+    Returns:
+        Segment collection backed by the columns
+    """
+    reader = _Reader(path, "segments", mmap)
+    documents = reader.dictionary("documents")
+    languages = reader.dictionary("languages")
+    
+    columns = {
+        name: reader.array(f"segment_{name}")
+        for name in ("document", "language", "start", "end", "parent", "children",
+                     "children.offsets", "buffer")
+    }
+    texts = reader.strings("segment_text")
+    metadata = reader.strings("segment_metadata")
+    buffers: Dict[int, DocumentBuffer] = {}
+    
+    def get_buffer(index: int, document_id: Optional[str]) -> DocumentBuffer:
+        buffer = buffers.get(index)
+        if buffer is None:
+            buffer_path = reader.path / f"buffer_{index}.txt"
+            if mmap:
+                buffer = DocumentBuffer.from_file(buffer_path, document_id=document_id, use_mmap=True)
+            else:
+                # Read the bytes as they are; offsets refer to untranslated newlines
+                buffer = DocumentBuffer(buffer_path.read_bytes().decode("utf-8"), document_id)
+            buffers[index] = buffer
+        return buffer
+    
+    def uuid_or_none(value: bytes) -> Optional[UUID]:
+        return UUID(bytes=bytes(value).ljust(16, b"\0")) if value else None
+    
+    def decode_segment(row: int) -> TextSegment:
+        start = int(columns["start"][row])
+        end = int(columns["end"][row])
+        child_start, child_end = columns["children.offsets"][row], columns["children.offsets"][row + 1]
+        metadata_text = metadata[row]
+        document_id = documents.decode(int(columns["document"][row]))
+        
+        fields = dict(
+            id=table.row_key(row),
+            document_id=document_id,
+            language=languages.decode(int(columns["language"][row])),
+            metadata=json.loads(metadata_text) if metadata_text else {},
+            parent_id=uuid_or_none(columns["parent"][row]),
+            child_ids=[uuid_or_none(child) for child in columns["children"][child_start:child_end]]
+        )
+        
+        buffer_index = int(columns["buffer"][row])
+        if buffer_index >= 0:
+            return TextSegment.from_buffer(get_buffer(buffer_index, document_id), start, end, **fields)
+        
+        return TextSegment(
+            text=texts[row],
+            start_position=start if start >= 0 else None,
+            end_position=end if end >= 0 else None,
+            **fields
+        )
+    
+    table = ColumnarTable(reader.array("segment_id"), reader.array("segment_id_order"), decode_segment)
+    return SegmentCollection.model_construct(segments=table, document_id=reader.manifest.get("document_id"))
@@ -0,0 +1,191 @@
+"""Shared document text buffer for the knowledge graph synthesis system.
+
+Segments refer to their document by character offsets into a single buffer
+instead of holding their own copy of the text.
+"""
+
+import bisect
+import mmap
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Optional
+
+
+class DocumentBuffer:
+    """The text of a document, shared by all of its segments.
+    
+    The text is either held in memory as one string or memory-mapped from a
+    UTF-8 file. For memory-mapped files a sparse character-to-byte index is
+    built once, so any slice can be decoded without reading the whole file.
+    """
+    
+    # Bytes between checkpoints of the character-to-byte index
+    CHECKPOINT_BYTES = 65536
+    
+    def __init__(self, text: Optional[str] = None, document_id: Optional[str] = None):
+        """Initialize an in-memory document buffer.
+        
+        Args:
+            text: Document text
+            document_id: Document identifier
+        """
+        self.document_id = document_id
+        self.path = None
+        self._text = text or ""
+        self._mmap = None
+        self._checkpoints = None
+        self._char_offsets = None
+        self._length = len(self._text)
+    
+    @classmethod
+    def from_file(cls,
+                path: str,
+                document_id: Optional[str] = None,
+                use_mmap: bool = False) -> "DocumentBuffer":
+        """Create a buffer for a UTF-8 text file.
+        
+        Without memory mapping the file is read like Path.read_text (with
+        newline translation); memory-mapped buffers expose the raw file
+        content.
+        
+        Args:
+            path: Path to the text file
+            document_id: Document identifier (defaults to the file name)
+            use_mmap: Whether to memory-map the file instead of reading it
+        
+        Returns:
+            Document buffer
+        """
+        path = Path(path)
+        document_id = document_id or path.name
+        
+        if not use_mmap or path.stat().st_size == 0:
+            return cls(path.read_text(encoding="utf-8"), document_id)
+        
+        buffer = cls(None, document_id)
+        buffer.path = str(path)
+        buffer._open_mmap()
+        return buffer
+    
+    @classmethod
+    def from_temporary_file(cls, text: str, document_id: Optional[str] = None) -> "DocumentBuffer":
+        """Create a memory-mapped buffer for a text that exists only in memory.
+        
+        The text is written to a temporary file, which is deleted when the
+        buffer is garbage collected.
+        
+        Args:
+            text: Document text
+            document_id: Document identifier
+        
+        Returns:
+            Memory-mapped document buffer
+        """
+        fd, path = tempfile.mkstemp(prefix="kgs_", suffix=".txt")
+        with os.fdopen(fd, "wb") as f:
+            f.write(text.encode("utf-8"))
+        
+        buffer = cls.from_file(path, document_id, use_mmap=True)
+        weakref.finalize(buffer, os.remove, path)
+        return buffer
+    
+    def _open_mmap(self) -> None:
+        """Map the file and build the character-to-byte index."""
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        # Checkpoints are (character offset, byte offset) pairs on character boundaries
+        checkpoints = [(0, 0)]
+        char_offset = 0
+        byte_offset = 0
+        size = len(self._mmap)
+        
+        while byte_offset < size:
+            boundary = min(byte_offset + self.CHECKPOINT_BYTES, size)
+            # Never split a multi-byte UTF-8 sequence
+            while boundary < size and (self._mmap[boundary] & 0xC0) == 0x80:
+                boundary += 1
+            
+            char_offset += len(self._mmap[byte_offset:boundary].decode("utf-8"))
+            byte_offset = boundary
+            checkpoints.append((char_offset, byte_offset))
+        
+        self._checkpoints = checkpoints
+        self._char_offsets = [char for char, _ in checkpoints]
+        self._length = char_offset
+    
+    @property
+    def is_mapped(self) -> bool:
+        """Check whether the buffer is memory-mapped.
+        
+        Returns:
+            True if the text is read from a memory-mapped file
+        """
+        return self._mmap is not None
+    
+    @property
+    def text(self) -> str:
+        """Get the full document text.
+        
+        Returns:
+            Document text
+        """
+        return self.slice(0, self._length)
+    
+    def slice(self, start: int, end: int) -> str:
+        """Get the text between two character offsets.
+        
+        Args:
+            start: Start character offset
+            end: End character offset (exclusive)
+        
+        Returns:
+            Text of the span
+        """
+        start = max(0, start)
+        end = min(end, self._length)
+        if end <= start:
+            return ""
+        
+        if self._mmap is None:
+            return self._text[start:end]
+        
+        # Decode from the checkpoint before start up to the checkpoint after end
+        first = bisect.bisect_right(self._char_offsets, start) - 1
+        last = bisect.bisect_left(self._char_offsets, end)
+        first_char, first_byte = self._checkpoints[first]
+        last_byte = self._checkpoints[min(last, len(self._checkpoints) - 1)][1]
+        
+        chunk = self._mmap[first_byte:last_byte].decode("utf-8")
+        return chunk[start - first_char:end - first_char]
+    
+    def close(self) -> None:
+        """Release the memory mapping, if any."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+    
+    def __len__(self) -> int:
+        """Get the number of characters in the document.
+        
+        Returns:
+            Character count
+        """
+        return self._length
+    
+    def __getstate__(self):
+        """Get the state for pickling (memory maps are reopened by path)."""
+        state = self.__dict__.copy()
+        if self._mmap is not None:
+            state["_mmap"] = None
+            state["_checkpoints"] = None
+            state["_char_offsets"] = None
+        return state
+    
+    def __setstate__(self, state):
+        """Restore the state after unpickling."""
+        self.__dict__.update(state)
+        if self.path and self._text == "" and self._length:
+            self._open_mmap()
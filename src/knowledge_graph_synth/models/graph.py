@@ -1,15 +1,41 @@
 """Graph models for the knowledge graph synthesis system."""
 
-from typing import Dict, List, Optional, Any, Set, Tuple
+import itertools
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple, Union
 from uuid import UUID
 
 import networkx as nx
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 
+from .bulk import gc_paused
 from .entity import Entity
+from .graph_core import GraphCore
 from .relationship import Relationship
 
+# Source of graph versions, shared by all graphs so that a version identifies
+# one state of one graph
+_graph_versions = itertools.count(1)
+
+
+def _as_models(records: Iterable[Any], model: Any) -> List[Any]:
+    """Convert the dictionaries among records to models in one bulk call.
+    
+    Args:
+        records: Model instances or dictionaries
+        model: Model class with from_trusted_dicts()
+    
+    Returns:
+        Model instances in the order of the records
+    """
+    records = list(records)
+    dicts = [record for record in records if not isinstance(record, model)]
+    if not dicts:
+        return records
+    
+    converted = iter(model.from_trusted_dicts(dicts))
+    return [record if isinstance(record, model) else next(converted) for record in records]
+
 
 class KnowledgeGraph(BaseModel):
     """A knowledge graph constructed from entities and relationships.
@@ -26,6 +52,40 @@ class KnowledgeGraph(BaseModel):
     relationships: Dict[UUID, Relationship] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
     _graph: Optional[nx.MultiDiGraph] = None
+    _core: Optional[GraphCore] = None
+    _version: int = PrivateAttr(default_factory=lambda: next(_graph_versions))
+    
+    @property
+    def version(self) -> int:
+        """Get the version of the graph.
+        
+        The version increases with every change made through add_entity() or
+        add_relationship(), and no two graphs share a version, so results
+        computed from a graph stay valid while its version is unchanged.
+        
+        Returns:
+            Version number
+        """
+        return self._version
+    
+    def _changed(self) -> None:
+        """Invalidate the cached views of the graph after a change.
+        
+        The core is kept: add_entity() and add_relationship() append to it.
+        """
+        self._graph = None  # Invalidate cached graph
+        self._version = next(_graph_versions)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Cached views are rebuilt on demand and not worth pickling
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {**(state["__pydantic_private__"] or {}), "_graph": None, "_core": None}
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # A graph unpickled from another process needs a version of its own
+        super().__setstate__(state)
+        self._changed()
     
     def add_entity(self, entity: Entity) -> None:
         """Add an entity to the graph.
@@ -33,8 +93,14 @@ class KnowledgeGraph(BaseModel):
         Args:
             entity: Entity to add
         """
+        if self._core is not None:
+            if entity.id in self.entities:
+                self._core = None  # Replaced entities are re-indexed on demand
+            else:
+                self._core.add_node(entity.id, entity.name, entity.type, entity.confidence)
+        
         self.entities[entity.id] = entity
-        self._graph = None  # Invalidate cached graph
+        self._changed()
     
     def add_relationship(self, relationship: Relationship) -> None:
         """Add a relationship to the graph.
@@ -49,15 +115,38 @@ class KnowledgeGraph(BaseModel):
         if relationship.target_id not in self.entities:
             raise ValueError(f"Target entity {relationship.target_id} not found")
         
+        if self._core is not None:
+            if relationship.id in self.relationships:
+                self._core = None
+            else:
+                self._core.add_edge(relationship.id, self._core.node_index(relationship.source_id),
+                                    self._core.node_index(relationship.target_id), relationship.type,
+                                    relationship.confidence)
+        
         self.relationships[relationship.id] = relationship
-        self._graph = None  # Invalidate cached graph
+        self._changed()
+    
+    @property
+    def core(self) -> GraphCore:
+        """Get the adjacency index of the graph.
+        
+        The core is built on first use and updated by add_entity() and
+        add_relationship(); other changes to the dictionaries are not
+        reflected in it.
+        
+        Returns:
+            GraphCore of the graph
+        """
+        if self._core is None:
+            self._core = GraphCore.from_graph(self)
+        return self._core
     
     def get_entity(self, entity_id: UUID) -> Optional[Entity]:
         """Get an entity by ID.
         
         Args:
             entity_id: UUID of the entity to retrieve
-            
+        
         Returns:
             The entity if found, otherwise None
         """
@@ -68,7 +157,7 @@ class KnowledgeGraph(BaseModel):
         
         Args:
             relationship_id: UUID of the relationship to retrieve
-            
+        
         Returns:
             The relationship if found, otherwise None
         """
@@ -79,7 +168,7 @@ class KnowledgeGraph(BaseModel):
         
         Args:
             entity_type: Type of entities to retrieve
-            
+        
         Returns:
             List of matching entities
         """
@@ -93,7 +182,7 @@ class KnowledgeGraph(BaseModel):
         
         Args:
             relationship_type: Type of relationships to retrieve
-            
+        
         Returns:
             List of matching relationships
         """
@@ -111,25 +200,22 @@ class KnowledgeGraph(BaseModel):
             entity_id: UUID of the entity
             outgoing: Include relationships where entity is the source
             incoming: Include relationships where entity is the target
-            
+        
         Returns:
             List of relationships involving the entity
         """
-        result = []
+        core = self.core
+        node = core.node_index(entity_id)
+        if node < 0:
+            return []
         
+        edges = []
         if outgoing:
-            result.extend([
-                rel for rel in self.relationships.values()
-                if rel.source_id == entity_id
-            ])
-        
+            edges.extend(core.out_edges(node).tolist())
         if incoming:
-            result.extend([
-                rel for rel in self.relationships.values()
-                if rel.target_id == entity_id
-            ])
+            edges.extend(core.in_edges(node).tolist())
         
-        return result
+        return [self.relationships[core.edge_ids[edge]] for edge in edges]
     
     def get_connected_entities(self, entity_id: UUID,
                              outgoing: bool = True,
@@ -140,7 +226,7 @@ class KnowledgeGraph(BaseModel):
             entity_id: UUID of the entity
             outgoing: Include entities connected via outgoing relationships
             incoming: Include entities connected via incoming relationships
-            
+        
         Returns:
             List of (entity, relationship) tuples
         """
@@ -202,7 +288,7 @@ class KnowledgeGraph(BaseModel):
         
         Args:
             G: NetworkX MultiDiGraph
-            
+        
         Returns:
             KnowledgeGraph instance
         """
@@ -220,12 +306,72 @@ class KnowledgeGraph(BaseModel):
         
         return kg
     
+    @classmethod
+    def from_records(cls, entities: Iterable[Union[Entity, Dict[str, Any]]],
+                   relationships: Iterable[Union[Relationship, Dict[str, Any]]] = (),
+                   metadata: Optional[Dict[str, Any]] = None) -> 'KnowledgeGraph':
+        """Build a knowledge graph from trusted entities and relationships in bulk.
+        
+        Dictionaries are converted with from_trusted_dicts(); model instances
+        are used as they are, without being validated again. The garbage
+        collector is paused while the graph is built.
+        
+        Args:
+            entities: Entities or dictionaries in the format of Entity.to_dict()
+            relationships: Relationships or dictionaries in the format of
+                Relationship.to_dict()
+            metadata: Graph metadata
+        
+        Returns:
+            KnowledgeGraph instance
+        
+        Raises:
+            ValueError: If a relationship refers to an entity that is not in the graph
+        """
+        with gc_paused():
+            entity_map = {entity.id: entity for entity in _as_models(entities, Entity)}
+            
+            relationship_map = {}
+            for rel in _as_models(relationships, Relationship):
+                if rel.source_id not in entity_map:
+                    raise ValueError(f"Source entity {rel.source_id} not found")
+                if rel.target_id not in entity_map:
+                    raise ValueError(f"Target entity {rel.target_id} not found")
+                relationship_map[rel.id] = rel
+            
+            return cls.model_construct(entities=entity_map, relationships=relationship_map, metadata=dict(metadata or {}))
+    
+    def save(self, path: str) -> None:
+        """Save the graph in the columnar binary format.
+        
+        Args:
+            path: Output directory
+        """
+        from .columnar import save_graph
+        save_graph(self, path)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'KnowledgeGraph':
+        """Open a graph saved with save().
+        
+        Entities and relationships are decoded lazily, when they are accessed.
+        
+        Args:
+            path: Directory written by save()
+            mmap: Whether to memory-map the columns instead of reading them
+        
+        Returns:
+            KnowledgeGraph instance
+        """
+        from .columnar import load_graph
+        return load_graph(path, mmap=mmap)
+    
     def filter_by_confidence(self, threshold: float) -> 'KnowledgeGraph':
         """Create a new knowledge graph filtered by confidence.
         
         Args:
             threshold: Minimum confidence score
-            
+        
         Returns:
             New KnowledgeGraph with filtered entities and relationships
         """
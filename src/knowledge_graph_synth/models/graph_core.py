@@ -0,0 +1,491 @@
+"""Compact array representation of knowledge graph structure."""
+
+import sys
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+
+def _append(array: np.ndarray, count: int, value: Any) -> np.ndarray:
+    """Store a value after the first count items of an array.
+    
+    Args:
+        array: Array with count items in use
+        count: Number of items in use
+        value: Value to store
+    
+    Returns:
+        The array, or a copy twice its size if it was full
+    """
+    if count >= len(array):
+        grown = np.empty(max(16, 2 * count), dtype=array.dtype)
+        grown[:count] = array[:count]
+        array = grown
+    array[count] = value
+    return array
+
+
+def _as_list(items: Sequence[Any]) -> List[Any]:
+    """Get a sequence as a list that nodes or edges can be appended to.
+    
+    Args:
+        items: List, or another sequence such as a column of a saved graph
+    
+    Returns:
+        The list itself, or a list copy of the sequence
+    """
+    return items if isinstance(items, list) else list(items)
+
+
+class GraphCore:
+    """Integer-indexed adjacency index of a knowledge graph.
+    
+    The core does not hold the graph's data: entities and relationships stay
+    in the KnowledgeGraph dictionaries, and the core is an index on top of
+    them that costs extra memory. Entities and relationships are numbered in
+    the order of the graph's dictionaries. Types are stored as codes into
+    interned type tables, endpoints and confidences as NumPy arrays, and
+    adjacency in CSR form (an offset array per node into an array of edge
+    numbers), so a node's relationships are found without scanning all of
+    them, and graph algorithms can run on the arrays directly.
+    
+    Nodes and edges added with add_node() and add_edge() are appended to the
+    arrays, which grow by doubling; edges appended after the CSR arrays were
+    built are kept per node until the CSR arrays are needed as a whole.
+    """
+    
+    __slots__ = ("node_ids", "node_names", "_node_types", "_node_confidence", "type_names",
+                 "edge_ids", "_edge_sources", "_edge_targets", "_edge_types", "_edge_confidence",
+                 "edge_type_names", "_num_nodes", "_num_edges", "_node_index", "_type_codes",
+                 "_edge_type_codes", "_out", "_in", "_out_pending", "_in_pending")
+    
+    def __init__(self,
+               node_ids: Sequence[UUID],
+               node_names: Sequence[str],
+               node_types: np.ndarray,
+               node_confidence: np.ndarray,
+               type_names: List[str],
+               edge_ids: Sequence[UUID],
+               edge_sources: np.ndarray,
+               edge_targets: np.ndarray,
+               edge_types: np.ndarray,
+               edge_confidence: np.ndarray,
+               edge_type_names: List[str],
+               node_index: Optional[Mapping[UUID, int]] = None):
+        """Initialize the graph core.
+        
+        Args:
+            node_ids: Entity ID of each node
+            node_names: Entity name of each node
+            node_types: Type code of each node
+            node_confidence: Entity confidence of each node
+            type_names: Entity type of each type code
+            edge_ids: Relationship ID of each edge
+            edge_sources: Source node of each edge
+            edge_targets: Target node of each edge
+            edge_types: Type code of each edge
+            edge_confidence: Relationship confidence of each edge
+            edge_type_names: Relationship type of each type code
+            node_index: Mapping (with get()) from entity ID to node number;
+                built on first use if not given
+        """
+        self.node_ids = node_ids
+        self.node_names = node_names
+        self._node_types = node_types
+        self._node_confidence = node_confidence
+        self.type_names = type_names
+        self.edge_ids = edge_ids
+        self._edge_sources = edge_sources
+        self._edge_targets = edge_targets
+        self._edge_types = edge_types
+        self._edge_confidence = edge_confidence
+        self.edge_type_names = edge_type_names
+        self._num_nodes = len(node_ids)
+        self._num_edges = len(edge_sources)
+        self._node_index = node_index
+        self._type_codes: Optional[Dict[str, int]] = None
+        self._edge_type_codes: Optional[Dict[str, int]] = None
+        self._out: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._in: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._out_pending: Dict[int, List[int]] = {}
+        self._in_pending: Dict[int, List[int]] = {}
+    
+    @classmethod
+    def from_graph(cls, graph: Any) -> "GraphCore":
+        """Build the core of a knowledge graph.
+        
+        Args:
+            graph: KnowledgeGraph to index
+        
+        Returns:
+            GraphCore instance
+        """
+        node_ids = []
+        node_names = []
+        node_types = []
+        node_confidence = []
+        type_codes: Dict[str, int] = {}
+        
+        for entity_id, entity in graph.entities.items():
+            node_ids.append(entity_id)
+            node_names.append(sys.intern(entity.name))
+            node_types.append(type_codes.setdefault(entity.type, len(type_codes)))
+            node_confidence.append(entity.confidence)
+        
+        node_index = {entity_id: node for node, entity_id in enumerate(node_ids)}
+        
+        edge_ids = []
+        edge_sources = []
+        edge_targets = []
+        edge_types = []
+        edge_confidence = []
+        edge_type_codes: Dict[str, int] = {}
+        
+        for rel_id, rel in graph.relationships.items():
+            source = node_index.get(rel.source_id)
+            target = node_index.get(rel.target_id)
+            if source is None or target is None:
+                continue
+            edge_ids.append(rel_id)
+            edge_sources.append(source)
+            edge_targets.append(target)
+            edge_types.append(edge_type_codes.setdefault(rel.type, len(edge_type_codes)))
+            edge_confidence.append(rel.confidence)
+        
+        return cls(
+            node_ids=node_ids,
+            node_names=node_names,
+            node_types=np.array(node_types, dtype=np.int32),
+            node_confidence=np.array(node_confidence, dtype=np.float32),
+            type_names=list(type_codes),
+            edge_ids=edge_ids,
+            edge_sources=np.array(edge_sources, dtype=np.int32),
+            edge_targets=np.array(edge_targets, dtype=np.int32),
+            edge_types=np.array(edge_types, dtype=np.int32),
+            edge_confidence=np.array(edge_confidence, dtype=np.float32),
+            edge_type_names=list(edge_type_codes),
+            node_index=node_index
+        )
+    
+    @property
+    def num_nodes(self) -> int:
+        """Get the number of nodes.
+        
+        Returns:
+            Node count
+        """
+        return self._num_nodes
+    
+    @property
+    def num_edges(self) -> int:
+        """Get the number of edges.
+        
+        Returns:
+            Edge count
+        """
+        return self._num_edges
+    
+    @property
+    def node_types(self) -> np.ndarray:
+        """Get the type code of each node.
+        
+        Returns:
+            Type codes
+        """
+        return self._node_types[:self._num_nodes]
+    
+    @property
+    def node_confidence(self) -> np.ndarray:
+        """Get the entity confidence of each node.
+        
+        Returns:
+            Confidences
+        """
+        return self._node_confidence[:self._num_nodes]
+    
+    @property
+    def edge_sources(self) -> np.ndarray:
+        """Get the source node of each edge.
+        
+        Returns:
+            Node numbers
+        """
+        return self._edge_sources[:self._num_edges]
+    
+    @property
+    def edge_targets(self) -> np.ndarray:
+        """Get the target node of each edge.
+        
+        Returns:
+            Node numbers
+        """
+        return self._edge_targets[:self._num_edges]
+    
+    @property
+    def edge_types(self) -> np.ndarray:
+        """Get the type code of each edge.
+        
+        Returns:
+            Type codes
+        """
+        return self._edge_types[:self._num_edges]
+    
+    @property
+    def edge_confidence(self) -> np.ndarray:
+        """Get the relationship confidence of each edge.
+        
+        Returns:
+            Confidences
+        """
+        return self._edge_confidence[:self._num_edges]
+    
+    @property
+    def nbytes(self) -> int:
+        """Get the memory used by the arrays of the core.
+        
+        Returns:
+            Size in bytes (without the ID and name sequences)
+        """
+        arrays = [self._node_types, self._node_confidence, self._edge_sources, self._edge_targets,
+                  self._edge_types, self._edge_confidence]
+        for csr in (self._out, self._in):
+            if csr is not None:
+                arrays.extend(csr)
+        return sum(array.nbytes for array in arrays)
+    
+    def add_node(self, entity_id: UUID, name: str, entity_type: str, confidence: float) -> int:
+        """Append a node for a new entity.
+        
+        Args:
+            entity_id: Entity ID
+            name: Entity name
+            entity_type: Entity type
+            confidence: Entity confidence
+        
+        Returns:
+            Node number
+        """
+        if self._type_codes is None:
+            self._type_codes = {name: code for code, name in enumerate(self.type_names)}
+        if entity_type not in self._type_codes:
+            self._type_codes[entity_type] = len(self.type_names)
+            self.type_names = list(self.type_names) + [entity_type]
+        
+        node = self._num_nodes
+        self.node_ids = _as_list(self.node_ids)
+        self.node_names = _as_list(self.node_names)
+        self.node_ids.append(entity_id)
+        self.node_names.append(sys.intern(name))
+        self._node_types = _append(self._node_types, node, self._type_codes[entity_type])
+        self._node_confidence = _append(self._node_confidence, node, confidence)
+        self._num_nodes += 1
+        
+        if isinstance(self._node_index, dict):
+            self._node_index[entity_id] = node
+        else:
+            self._node_index = None
+        return node
+    
+    def add_edge(self, edge_id: UUID, source: int, target: int, relationship_type: str,
+                confidence: float) -> int:
+        """Append an edge for a new relationship.
+        
+        Args:
+            edge_id: Relationship ID
+            source: Source node
+            target: Target node
+            relationship_type: Relationship type
+            confidence: Relationship confidence
+        
+        Returns:
+            Edge number
+        """
+        if self._edge_type_codes is None:
+            self._edge_type_codes = {name: code for code, name in enumerate(self.edge_type_names)}
+        if relationship_type not in self._edge_type_codes:
+            self._edge_type_codes[relationship_type] = len(self.edge_type_names)
+            self.edge_type_names = list(self.edge_type_names) + [relationship_type]
+        
+        edge = self._num_edges
+        self.edge_ids = _as_list(self.edge_ids)
+        self.edge_ids.append(edge_id)
+        self._edge_sources = _append(self._edge_sources, edge, source)
+        self._edge_targets = _append(self._edge_targets, edge, target)
+        self._edge_types = _append(self._edge_types, edge, self._edge_type_codes[relationship_type])
+        self._edge_confidence = _append(self._edge_confidence, edge, confidence)
+        self._num_edges += 1
+        
+        # Built CSR arrays are completed on the next whole-array access
+        if self._out is not None:
+            self._out_pending.setdefault(source, []).append(edge)
+        if self._in is not None:
+            self._in_pending.setdefault(target, []).append(edge)
+        return edge
+    
+    def node_index(self, entity_id: UUID) -> int:
+        """Get the node number of an entity.
+        
+        Args:
+            entity_id: Entity ID
+        
+        Returns:
+            Node number, or -1 if the entity is not in the graph
+        """
+        if self._node_index is None:
+            self._node_index = {node_id: node for node, node_id in enumerate(self.node_ids)}
+        return self._node_index.get(entity_id, -1)
+    
+    def _csr(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Group edges by node.
+        
+        Args:
+            keys: Node of each edge (source or target)
+        
+        Returns:
+            (offsets, edges) tuple: the edges of node i are
+            edges[offsets[i]:offsets[i + 1]], in graph order
+        """
+        offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=self.num_nodes), out=offsets[1:])
+        edges = np.argsort(keys, kind="stable").astype(np.int32)
+        return offsets, edges
+    
+    @property
+    def out_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the outgoing edges of all nodes in CSR form.
+        
+        Returns:
+            (offsets, edges) tuple
+        """
+        if self._out is None or self._out_pending or len(self._out[0]) <= self.num_nodes:
+            self._out = self._csr(self.edge_sources)
+            self._out_pending = {}
+        return self._out
+    
+    @property
+    def in_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the incoming edges of all nodes in CSR form.
+        
+        Returns:
+            (offsets, edges) tuple
+        """
+        if self._in is None or self._in_pending or len(self._in[0]) <= self.num_nodes:
+            self._in = self._csr(self.edge_targets)
+            self._in_pending = {}
+        return self._in
+    
+    def _node_edges(self, csr: Optional[Tuple[np.ndarray, np.ndarray]], pending: Dict[int, List[int]],
+                   node: int) -> Optional[np.ndarray]:
+        """Get the edges of a node from CSR arrays and the edges appended since.
+        
+        Args:
+            csr: (offsets, edges) tuple, possibly built before nodes were appended
+            pending: Edges appended since the CSR arrays were built, by node
+            node: Node number
+        
+        Returns:
+            Edge numbers in graph order, or None if the CSR arrays are not built
+        """
+        if csr is None:
+            return None
+        offsets, edges = csr
+        if node + 1 < len(offsets):
+            node_edges = edges[offsets[node]:offsets[node + 1]]
+        else:
+            node_edges = np.zeros(0, dtype=np.int32)
+        if node in pending:
+            node_edges = np.concatenate([node_edges, np.array(pending[node], dtype=np.int32)])
+        return node_edges
+    
+    def out_edges(self, node: int) -> np.ndarray:
+        """Get the edges that start at a node.
+        
+        Args:
+            node: Node number
+        
+        Returns:
+            Edge numbers in graph order
+        """
+        node_edges = self._node_edges(self._out, self._out_pending, node)
+        if node_edges is None:
+            offsets, edges = self.out_csr
+            node_edges = edges[offsets[node]:offsets[node + 1]]
+        return node_edges
+    
+    def in_edges(self, node: int) -> np.ndarray:
+        """Get the edges that end at a node.
+        
+        Args:
+            node: Node number
+        
+        Returns:
+            Edge numbers in graph order
+        """
+        node_edges = self._node_edges(self._in, self._in_pending, node)
+        if node_edges is None:
+            offsets, edges = self.in_csr
+            node_edges = edges[offsets[node]:offsets[node + 1]]
+        return node_edges
+    
+    def neighbors(self, node: int, outgoing: bool = True, incoming: bool = True) -> np.ndarray:
+        """Get the nodes connected to a node.
+        
+        Args:
+            node: Node number
+            outgoing: Include targets of outgoing edges
+            incoming: Include sources of incoming edges
+        
+        Returns:
+            Unique node numbers
+        """
+        parts = []
+        if outgoing:
+            parts.append(self.edge_targets[self.out_edges(node)])
+        if incoming:
+            parts.append(self.edge_sources[self.in_edges(node)])
+        if not parts:
+            return np.zeros(0, dtype=np.int32)
+        return np.unique(np.concatenate(parts))
+    
+    def degrees(self, outgoing: bool = True, incoming: bool = True) -> np.ndarray:
+        """Get the degree of every node.
+        
+        Args:
+            outgoing: Count outgoing edges
+            incoming: Count incoming edges
+        
+        Returns:
+            Degree of each node
+        """
+        degrees = np.zeros(self.num_nodes, dtype=np.int64)
+        if outgoing:
+            degrees += np.bincount(self.edge_sources, minlength=self.num_nodes)
+        if incoming:
+            degrees += np.bincount(self.edge_targets, minlength=self.num_nodes)
+        return degrees
+    
+    def nodes_of_type(self, entity_type: str) -> np.ndarray:
+        """Get the nodes of an entity type.
+        
+        Args:
+            entity_type: Entity type (case-insensitive)
+        
+        Returns:
+            Node numbers
+        """
+        codes = [code for code, name in enumerate(self.type_names) if name.lower() == entity_type.lower()]
+        return np.flatnonzero(np.isin(self.node_types, codes))
+    
+    def edges_of_type(self, relationship_type: str) -> np.ndarray:
+        """Get the edges of a relationship type.
+        
+        Args:
+            relationship_type: Relationship type (case-insensitive)
+        
+        Returns:
+            Edge numbers
+        """
+        codes = [code for code, name in enumerate(self.edge_type_names)
+                 if name.lower() == relationship_type.lower()]
+        return np.flatnonzero(np.isin(self.edge_types, codes))
@@ -1,10 +1,11 @@
 """Relationship models for the knowledge graph synthesis system."""
 
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterable, List, Optional, Any, Union
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 
+from .bulk import gc_paused
 from .provenance import SourceSpan
 from .entity import EntityAttribute
 
@@ -28,6 +29,21 @@ class Relationship(BaseModel):
     confidence: float = Field(ge=0.0, le=1.0)
     source_span: SourceSpan
     
+    @classmethod
+    def from_trusted_dicts(cls, records: Iterable[Dict[str, Any]]) -> List["Relationship"]:
+        """Create relationships in bulk from data that is known to be valid.
+        
+        See Entity.from_trusted_dicts().
+        
+        Args:
+            records: Dictionaries in the format of to_dict()
+            
+        Returns:
+            List of relationships
+        """
+        with gc_paused():
+            return _relationship_list.validate_python(list(records))
+    
     def add_attribute(self, key: str, value: Any, 
                       confidence: float = 1.0,
                       source_span: Optional[SourceSpan] = None) -> None:
@@ -81,4 +97,8 @@ class Relationship(BaseModel):
             ],
             "confidence": self.confidence,
             "source_span": self.source_span.to_dict()
-        }
\ No newline at end of file
+        }
+
+
+# Validator for bulk construction of relationships
+_relationship_list = TypeAdapter(List[Relationship])
@@ -3,7 +3,9 @@
 from typing import Dict, List, Optional, Any, Set
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
+
+from .document import DocumentBuffer
 
 
 class TextSegment(BaseModel):
@@ -12,13 +14,17 @@ class TextSegment(BaseModel):
     Text segments are the primary units of processing in the system. Each segment
     contains a portion of the original text, along with metadata about its position
     in the document and its place in the hierarchy of segments.
+    
+    A segment either holds its own text or is a view into a shared
+    DocumentBuffer, in which case the text is sliced from the buffer by
+    start_position and end_position only when it is accessed.
     """
     
-    model_config = ConfigDict(frozen=False)
+    model_config = ConfigDict(frozen=False, populate_by_name=True)
     
     id: UUID = Field(default_factory=uuid4)
     document_id: Optional[str] = None
-    text: str
+    inline_text: Optional[str] = Field(default=None, alias="text")
     start_position: Optional[int] = None
     end_position: Optional[int] = None
     language: Optional[str] = None
@@ -26,6 +32,56 @@ class TextSegment(BaseModel):
     parent_id: Optional[UUID] = None
     child_ids: List[UUID] = Field(default_factory=list)
     
+    _buffer: Optional[DocumentBuffer] = PrivateAttr(default=None)
+    
+    @classmethod
+    def from_buffer(cls, buffer: DocumentBuffer, start: int, end: int, **kwargs) -> "TextSegment":
+        """Create a segment as a view into a document buffer.
+        
+        Args:
+            buffer: Shared document buffer
+            start: Start character offset in the document
+            end: End character offset in the document (exclusive)
+            **kwargs: Other segment fields
+            
+        Returns:
+            Text segment without its own copy of the text
+        """
+        segment = cls(start_position=start, end_position=end, **kwargs)
+        segment._buffer = buffer
+        return segment
+    
+    @property
+    def buffer(self) -> Optional[DocumentBuffer]:
+        """Get the document buffer the segment is a view into.
+        
+        Returns:
+            Document buffer, or None if the segment holds its own text
+        """
+        return self._buffer if self.inline_text is None else None
+    
+    @property
+    def text(self) -> str:
+        """Get the text of the segment.
+        
+        Returns:
+            Segment text
+        """
+        if self.inline_text is not None:
+            return self.inline_text
+        if self._buffer is not None and self.start_position is not None and self.end_position is not None:
+            return self._buffer.slice(self.start_position, self.end_position)
+        return ""
+    
+    @text.setter
+    def text(self, value: str) -> None:
+        """Replace the text of the segment with its own copy.
+        
+        Args:
+            value: New segment text
+        """
+        self.inline_text = value
+    
     @property
     def length(self) -> int:
         """Get the length of the text segment.
@@ -33,6 +89,8 @@ class TextSegment(BaseModel):
         Returns:
             Number of characters in the segment
         """
+        if self.buffer is not None and self.start_position is not None and self.end_position is not None:
+            return self.end_position - self.start_position
         return len(self.text)
         
     @property
@@ -117,6 +175,31 @@ class SegmentCollection(BaseModel):
             parent = self.segments[segment.parent_id]
             parent.add_child(segment.id)
     
+    def save(self, path: str) -> None:
+        """Save the collection in the columnar binary format.
+        
+        Args:
+            path: Output directory
+        """
+        from .columnar import save_segments
+        save_segments(self, path)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "SegmentCollection":
+        """Open a collection saved with save().
+        
+        Segments are decoded lazily, when they are accessed.
+        
+        Args:
+            path: Directory written by save()
+            mmap: Whether to memory-map the columns and document texts
+            
+        Returns:
+            SegmentCollection instance
+        """
+        from .columnar import load_segments
+        return load_segments(path, mmap=mmap)
+    
     def get_segment(self, segment_id: UUID) -> Optional[TextSegment]:
         """Get a segment by ID.
         
@@ -0,0 +1,366 @@
+"""JSON Lines artifacts for the knowledge graph synthesis system.
+
+Intermediate results (entities, relationships, extraction progress) are
+written as JSON Lines: one object per line, appended as batches complete.
+Files can be read back while a run is still writing them, and readers
+stream them without loading the whole file.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Errors raised when a compressed artifact ends in the middle of a block
+_TRUNCATION_ERRORS = (EOFError, zstandard.ZstdError) if zstandard is not None else (EOFError,)
+
+# File name suffix of each compression
+COMPRESSION_SUFFIXES = {
+    "none": ".jsonl",
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst",
+}
+
+
+def dumps(record: Any) -> bytes:
+    """Serialize a record as one line of UTF-8 JSON.
+    
+    Uses orjson when it is installed, otherwise the standard json module.
+    
+    Args:
+        record: JSON-serializable object (values that are not are converted
+            with str())
+    
+    Returns:
+        Encoded line including the trailing newline
+    """
+    if orjson is not None:
+        return orjson.dumps(record, default=str, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def loads(line: bytes) -> Any:
+    """Parse one line of JSON.
+    
+    Args:
+        line: Encoded line
+    
+    Returns:
+        Parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def get_compression(path: str) -> str:
+    """Get the compression of an artifact from its file name.
+    
+    Args:
+        path: Artifact path
+    
+    Returns:
+        "none", "gzip" or "zstd"
+    """
+    name = str(path)
+    if name.endswith(".gz"):
+        return "gzip"
+    if name.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def artifact_path(directory: str, name: str, compression: Optional[str] = None) -> str:
+    """Build the path of an artifact.
+    
+    Args:
+        directory: Output directory
+        name: Artifact name without suffix (e.g. "entities")
+        compression: "none", "gzip" or "zstd" (default: ARTIFACT_COMPRESSION;
+            zstd falls back to gzip if zstandard is not installed)
+    
+    Returns:
+        Artifact path with the suffix of the compression
+    """
+    compression = compression or settings.ARTIFACT_COMPRESSION
+    if compression == "zstd" and zstandard is None:
+        logger.warning("zstandard is not available, compressing artifacts with gzip")
+        compression = "gzip"
+    return os.path.join(directory, name + COMPRESSION_SUFFIXES[compression])
+
+
+def find_artifact(directory: str, name: str) -> Optional[str]:
+    """Find an artifact written with any compression.
+    
+    Args:
+        directory: Output directory
+        name: Artifact name without suffix
+    
+    Returns:
+        Path of the artifact, or None if it does not exist
+    """
+    for suffix in COMPRESSION_SUFFIXES.values():
+        path = os.path.join(directory, name + suffix)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class ArtifactWriter:
+    """Appends records to a JSON Lines artifact.
+    
+    Every call to write_many() ends with a flush, so a batch is on disk (and
+    visible to readers) as soon as it is written. Compressed artifacts are
+    written as a sequence of gzip members or zstd frames, one per flush,
+    which the readers decode as one stream.
+    """
+    
+    def __init__(self, path: str, append: bool = True):
+        """Open an artifact for writing.
+        
+        Args:
+            path: Artifact path; the suffix selects the compression
+            append: Keep existing records (False to start a new file)
+        """
+        self.path = str(path)
+        self.compression = get_compression(self.path)
+        self.count = 0
+        
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab" if append else "wb")
+        self._buffer: List[bytes] = []
+    
+    def write(self, record: Any) -> None:
+        """Add a record; it is written at the next flush.
+        
+        Args:
+            record: JSON-serializable record
+        """
+        self._buffer.append(dumps(record))
+        self.count += 1
+    
+    def write_many(self, records: Iterable[Any]) -> None:
+        """Write records and flush them to disk.
+        
+        Args:
+            records: JSON-serializable records
+        """
+        for record in records:
+            self.write(record)
+        self.flush()
+    
+    def flush(self) -> None:
+        """Write the pending records to disk."""
+        if not self._buffer:
+            return
+        
+        data = b"".join(self._buffer)
+        self._buffer = []
+        if self.compression == "gzip":
+            data = gzip.compress(data)
+        elif self.compression == "zstd":
+            data = zstandard.ZstdCompressor().compress(data)
+        
+        self._file.write(data)
+        self._file.flush()
+    
+    def close(self) -> None:
+        """Flush the pending records and close the file."""
+        self.flush()
+        self._file.close()
+    
+    def __enter__(self) -> "ArtifactWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def _open_lines(path: str) -> BinaryIO:
+    """Open an artifact as a stream of decompressed bytes."""
+    compression = get_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError(f"zstandard is required to read {path}")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True))
+    return open(path, "rb")
+
+
+def read_artifacts(path: str) -> Iterator[Any]:
+    """Stream the records of a JSON Lines artifact.
+    
+    A last line that is cut off (a run that stopped while writing) is
+    skipped with a warning.
+    
+    Args:
+        path: Artifact path
+    
+    Yields:
+        Records in the order they were written
+    """
+    with _open_lines(path) as f:
+        lines = iter(f)
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except _TRUNCATION_ERRORS:
+                logger.warning(f"Skipping incomplete end of {path}")
+                return
+            
+            if not line.strip():
+                continue
+            try:
+                record = loads(line)
+            except ValueError:
+                if line.endswith(b"\n"):
+                    raise
+                logger.warning(f"Skipping incomplete last record of {path}")
+                return
+            yield record
+
+
+def write_artifacts(path: str, records: Iterable[Any]) -> int:
+    """Write all records of an artifact, replacing an existing file.
+    
+    Args:
+        path: Artifact path
+        records: JSON-serializable records
+    
+    Returns:
+        Number of records written
+    """
+    with ArtifactWriter(path, append=False) as writer:
+        writer.write_many(records)
+        return writer.count
+
+
+def segment_key(segment: Any) -> str:
+    """Get a key of a segment that is the same in every run over the same input.
+    
+    Segment IDs are generated anew each time a text is segmented, so
+    checkpoints identify segments by document, position and content instead.
+    
+    Args:
+        segment: Text segment
+    
+    Returns:
+        Stable segment key
+    """
+    digest = hashlib.sha1(segment.text.encode("utf-8")).hexdigest()[:16]
+    return f"{segment.document_id or ''}:{segment.start_position}:{segment.end_position}:{digest}"
+
+
+class ExtractionCheckpoint:
+    """Checkpoint of an extraction stage that appends its results per batch.
+    
+    Results are appended to the "<name>" artifact, and the keys and IDs of
+    the segments each batch covered to "<name>_progress", after the batch
+    completes. A resumed run reads both back, only processes the segments
+    whose key no completed batch covered, and points the restored records
+    at the IDs the same segments have in the current run.
+    """
+    
+    def __init__(self, directory: str, name: str, resume: bool = False,
+                 segments: Iterable[Any] = ()):
+        """Open the checkpoint of a stage.
+        
+        Args:
+            directory: Output directory of the stage
+            name: Artifact name of the results (e.g. "all_entities")
+            resume: Continue existing artifacts instead of replacing them
+            segments: Segments of the current run, used to map restored
+                records to current segment IDs
+        """
+        self.results_path = (resume and find_artifact(directory, name)) or artifact_path(directory, name)
+        self.progress_path = (resume and find_artifact(directory, f"{name}_progress")) or \
+            artifact_path(directory, f"{name}_progress")
+        
+        self.done_segments = set()
+        self.records: List[Dict[str, Any]] = []
+        if resume and os.path.exists(self.progress_path):
+            current_ids = {segment_key(segment): str(segment.id) for segment in segments}
+            
+            # Keep the batches whose segments are all still part of the input
+            batches = [
+                batch for batch in read_artifacts(self.progress_path)
+                if all(key in current_ids for key in batch["segments"])
+            ]
+            previous_keys = {}
+            for batch in batches:
+                self.done_segments.update(batch["segments"])
+                previous_keys.update(zip(batch["ids"], batch["segments"]))
+            
+            # Records of a batch whose progress was not written are produced again
+            if os.path.exists(self.results_path):
+                for record in read_artifacts(self.results_path):
+                    span = record.get("source_span") or {}
+                    key = previous_keys.get(span.get("segment_id"))
+                    if key is None:
+                        continue
+                    span["segment_id"] = current_ids[key]
+                    self.records.append(record)
+            
+            # Progress refers to the current segment IDs from now on
+            for batch in batches:
+                batch["ids"] = [current_ids[key] for key in batch["segments"]]
+            
+            logger.info(f"Resuming from {self.progress_path}: {len(self.done_segments)} segments "
+                        f"and {len(self.records)} records already done")
+            
+            # Rewrite both files without the records of an interrupted batch
+            write_artifacts(self.results_path, self.records)
+            write_artifacts(self.progress_path, batches)
+        
+        self._results = ArtifactWriter(self.results_path, append=resume)
+        self._progress = ArtifactWriter(self.progress_path, append=resume)
+    
+    def is_done(self, segment: Any) -> bool:
+        """Check whether a completed batch covered a segment.
+        
+        Args:
+            segment: Text segment
+        
+        Returns:
+            True if the segment does not need to be processed again
+        """
+        return segment_key(segment) in self.done_segments
+    
+    def add_batch(self, segments: Iterable[Any], items: Iterable[Any]) -> None:
+        """Record a completed batch.
+        
+        Args:
+            segments: Segments the batch covered
+            items: Entities or relationships extracted from the batch
+        """
+        segments = list(segments)
+        self._results.write_many(item.to_dict() for item in items)
+        keys = [segment_key(segment) for segment in segments]
+        self._progress.write_many([{"segments": keys, "ids": [str(segment.id) for segment in segments]}])
+        self.done_segments.update(keys)
+    
+    def close(self) -> None:
+        """Close the artifacts."""
+        self._results.close()
+        self._progress.close()
@@ -1,5 +1,6 @@
 """HTML research report generator for the knowledge graph synthesis system."""
 
+import copy
 import json
 import logging
 import os
@@ -10,6 +11,7 @@ from typing import Dict, List, Any, Optional
 from jinja2 import Environment, FileSystemLoader
 import markdown
 import networkx as nx
+import numpy as np
 import plotly.graph_objects as go
 import plotly.offline as opy
 
@@ -17,6 +19,9 @@ from ...models.graph import KnowledgeGraph
 from ...models.entity import Entity
 from ...models.relationship import Relationship
 from ...models.provenance import SourceSpan
+from ..artifacts import COMPRESSION_SUFFIXES, read_artifacts
+from ...graph.analysis import graph_analyzer
+from ...graph.sparse import SparseGraph, use_sparse_analytics
 
 logger = logging.getLogger(__name__)
 
@@ -608,6 +613,24 @@ class ReportGenerator:
         Returns:
             Dictionary with graph metrics
         """
+        sparse = use_sparse_analytics()
+        metrics = graph_analyzer.memoize(graph, "report_metrics", sparse,
+                                         lambda: self._compute_graph_metrics(graph, sparse))
+        return copy.deepcopy(metrics)
+    
+    def _compute_graph_metrics(self, graph: KnowledgeGraph, sparse: bool) -> Dict[str, Any]:
+        """Compute the metrics of the knowledge graph.
+        
+        Args:
+            graph: Knowledge graph to analyze
+            sparse: Whether to use the sparse backend
+            
+        Returns:
+            Dictionary with graph metrics
+        """
+        if sparse:
+            return self._calculate_sparse_graph_metrics(graph)
+        
         # Convert to NetworkX graph for analysis
         G = nx.DiGraph()
         
@@ -682,6 +705,57 @@ class ReportGenerator:
         
         return metrics
     
+    def _calculate_sparse_graph_metrics(self, graph: KnowledgeGraph) -> Dict[str, Any]:
+        """Calculate the metrics of _calculate_graph_metrics() on a sparse matrix.
+        
+        Parallel relationships count as one edge, as in the NetworkX DiGraph,
+        and the diameter of the largest component is estimated with a few
+        breadth-first sweeps instead of computed exactly.
+        
+        Args:
+            graph: Knowledge graph to analyze
+            
+        Returns:
+            Dictionary with graph metrics
+        """
+        sparse_graph = SparseGraph.from_graph(graph, simple=True)
+        degrees = sparse_graph.degrees()
+        
+        metrics = {
+            "node_count": sparse_graph.num_nodes,
+            "edge_count": sparse_graph.num_edges,
+            "density": sparse_graph.density(),
+            "avg_degree": float(degrees.mean()) if len(degrees) else 0,
+            "max_degree": int(degrees.max()) if len(degrees) else 0,
+            "avg_clustering": sparse_graph.average_clustering(),
+        }
+        
+        # Centrality metrics
+        central_entities = []
+        centrality = sparse_graph.degree_centrality()
+        for node in np.argsort(-centrality, kind="stable")[:10]:
+            entity = graph.entities.get(sparse_graph.core.node_ids[node])
+            if entity:
+                central_entities.append({
+                    "name": entity.name,
+                    "type": entity.type,
+                    "centrality": float(centrality[node])
+                })
+        metrics["central_entities"] = central_entities
+        
+        # Connected components
+        num_components, _ = sparse_graph.weakly_connected_components()
+        if num_components:
+            metrics["connected_components"] = num_components
+            metrics["largest_component_size"] = len(sparse_graph.largest_component())
+            metrics["diameter"] = sparse_graph.approximate_diameter()
+        else:
+            metrics["connected_components"] = 1
+            metrics["largest_component_size"] = 0
+            metrics["diameter"] = 0
+        
+        return metrics
+    
     def _create_plotly_graph(self, graph: KnowledgeGraph) -> str:
         """Create an interactive Plotly graph visualization.
         
@@ -797,12 +871,15 @@ class ReportGenerator:
         """Load JSON data from a file if it exists.
         
         Args:
-            file_path: Path to the JSON file
+            file_path: Path to the JSON file, or to a JSON Lines artifact
+                (whose records are returned as a list)
             
         Returns:
             Parsed JSON data or None if the file doesn't exist
         """
         try:
+            if os.path.exists(file_path) and str(file_path).endswith(tuple(COMPRESSION_SUFFIXES.values())):
+                return list(read_artifacts(file_path))
             if os.path.exists(file_path):
                 with open(file_path, "r", encoding="utf-8") as f:
                     return json.load(f)
@@ -1096,7 +1173,7 @@ class ReportGenerator:
         
         # Load contextual analysis data if available
         try:
-            from ...cli.utils import resolve_asset_path
+            from ...cli.utils import resolve_asset_path, load_segment_texts
             
             # Try to resolve paths for all needed files, regardless of directory structure
             segment_summaries = []
@@ -1120,10 +1197,7 @@ class ReportGenerator:
                 segment_connections = connections_data
                 
             # Load original segment texts
-            segments_path = resolve_asset_path(output_dir, "context/segments.json")
-            segments_data = self._load_json_if_exists(segments_path)
-            if segments_data:
-                segment_texts = segments_data
+            segment_texts = load_segment_texts(resolve_asset_path(output_dir, "context"))
             
             # Load theories if available
             theories_path = resolve_asset_path(output_dir, "theories/theories.json")
@@ -1157,10 +1231,8 @@ class ReportGenerator:
                 segment_connections = connections_data
                 
             # Load original segment texts
-            segments_path = os.path.join(context_dir, "segments.json")
-            segments_data = self._load_json_if_exists(segments_path)
-            if segments_data:
-                segment_texts = segments_data
+            from ...cli.utils import load_segment_texts
+            segment_texts = load_segment_texts(context_dir)
             
             # Load theories if available
             theories_path = os.path.join(output_dir, "theories", "theories.json")
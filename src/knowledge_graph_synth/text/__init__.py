@@ -7,11 +7,19 @@ managing context for text documents.
 from .loader import TextLoader
 from .normalizer import TextNormalizer
 from .segmenter import TextSegmenter
+from .sentences import SentenceSplitter
+from .language import LanguageDetector, language_detector
+from .corpus import CorpusLoader, find_corpus_files
 from .context import ContextManager
 
 __all__ = [
     "TextLoader",
     "TextNormalizer",
     "TextSegmenter",
+    "SentenceSplitter",
+    "LanguageDetector",
+    "language_detector",
+    "CorpusLoader",
+    "find_corpus_files",
     "ContextManager"
 ]
\ No newline at end of file
@@ -7,6 +7,7 @@ from uuid import UUID
 
 from ..models.segment import TextSegment, SegmentCollection
 from ..llm import LLMProviderFactory, prompt_manager
+from ..llm.budget import budget_controller
 from ..llm.schemas.contextual import (
     get_segment_summary_schema,
     get_cross_segment_analysis_schema
@@ -430,7 +431,8 @@ class ContextManager:
             # Log progress
             logger.info(f"Processed {min(i + batch_size, len(segment_ids))}/{len(segment_ids)} segments")
         
-        # Analyze connections between segments if requested
+        # Analyze connections between segments if requested and the budget allows it
+        analyze_connections = budget_controller.allow_connection_analysis(analyze_connections)
         if analyze_connections:
             logger.info("Analyzing connections between segments")
             
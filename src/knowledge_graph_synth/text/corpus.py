@@ -0,0 +1,211 @@
+"""Multi-document corpus loading for the knowledge graph synthesis system."""
+
+import glob
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..models.segment import TextSegment, SegmentCollection
+from ..config import settings
+from .loader import TextLoader
+from .normalizer import TextNormalizer
+from .segmenter import TextSegmenter
+
+logger = logging.getLogger(__name__)
+
+
+def find_corpus_files(corpus: str) -> List[Path]:
+    """Find the documents of a corpus.
+    
+    Args:
+        corpus: Directory (searched recursively for CORPUS_FILE_PATTERNS) or
+            glob pattern
+    
+    Returns:
+        Sorted list of document paths
+    """
+    path = Path(corpus)
+    if path.is_dir():
+        files = set()
+        for pattern in settings.CORPUS_FILE_PATTERNS:
+            files.update(path.rglob(pattern))
+    else:
+        files = {Path(match) for match in glob.glob(corpus, recursive=True)}
+    
+    return sorted(file for file in files if file.is_file())
+
+
+def document_ids(paths: List[Path]) -> List[str]:
+    """Derive unique document IDs from document paths.
+    
+    Documents are named by their path relative to the common directory of
+    the corpus, so files with the same name in different folders stay apart.
+    
+    Args:
+        paths: Document paths
+    
+    Returns:
+        Document IDs in the same order
+    """
+    if not paths:
+        return []
+    if len(paths) == 1:
+        return [paths[0].name]
+    
+    root = os.path.commonpath([str(path.absolute().parent) for path in paths])
+    return [path.absolute().relative_to(root).as_posix() for path in paths]
+
+
+def prepare_document(file_path: str,
+                   document_id: str,
+                   segment_length: int = settings.MAX_SEGMENT_LENGTH,
+                   segment_overlap: int = settings.MAX_SEGMENT_OVERLAP) -> SegmentCollection:
+    """Load, normalize and segment one document.
+    
+    This runs in a worker process, so it only takes picklable arguments.
+    
+    Args:
+        file_path: Path to the document
+        document_id: Document identifier
+        segment_length: Maximum segment length
+        segment_overlap: Segment overlap
+    
+    Returns:
+        Segmented collection of the document
+    """
+    loader = TextLoader()
+    normalizer = TextNormalizer()
+    segmenter = TextSegmenter(max_segment_length=segment_length, max_segment_overlap=segment_overlap)
+    
+    segments = loader.load(file_path, document_id=document_id)
+    for segment in list(segments.segments.values()):
+        segments.add_segment(normalizer.normalize(segment))
+    
+    return segmenter.segment(segments)
+
+
+class CorpusLoader:
+    """Loads, normalizes and segments the documents of a corpus in parallel.
+    
+    Documents are prepared in a process pool, so segmentation of large
+    corpora uses all cores. The segments of all documents are merged into
+    one collection and can be consumed as a single stream, which lets one
+    extraction pipeline (with one rate limit) process the whole corpus.
+    Every segment keeps the ID of its document for provenance.
+    """
+    
+    def __init__(self,
+               max_workers: Optional[int] = settings.CORPUS_MAX_WORKERS,
+               segment_length: int = settings.MAX_SEGMENT_LENGTH,
+               segment_overlap: int = settings.MAX_SEGMENT_OVERLAP):
+        """Initialize the corpus loader.
+        
+        Args:
+            max_workers: Number of worker processes (None for one per core)
+            segment_length: Maximum segment length
+            segment_overlap: Segment overlap
+        """
+        self.max_workers = max_workers
+        self.segment_length = segment_length
+        self.segment_overlap = segment_overlap
+        self.documents: Dict[str, Dict[str, Any]] = {}
+    
+    def iter_documents(self, paths: List[Path]) -> Iterator[Tuple[str, SegmentCollection]]:
+        """Prepare documents in worker processes.
+        
+        Args:
+            paths: Document paths
+        
+        Yields:
+            (document_id, collection) tuples in the order of the paths;
+            documents that fail to load are logged and skipped
+        """
+        ids = document_ids(paths)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(prepare_document, str(path), document_id,
+                                self.segment_length, self.segment_overlap)
+                for path, document_id in zip(paths, ids)
+            ]
+            
+            for path, document_id, future in zip(paths, ids, futures):
+                try:
+                    collection = future.result()
+                except Exception as e:
+                    logger.error(f"Error loading document {path}: {str(e)}")
+                    continue
+                
+                leaf_count = sum(1 for segment in collection.segments.values() if not segment.child_ids)
+                self.documents[document_id] = {
+                    "path": str(path),
+                    "segments": leaf_count,
+                    "language": next(
+                        (s.language for s in collection.get_root_segments() if s.language), None
+                    ),
+                }
+                logger.info(f"Prepared {document_id}: {leaf_count} segments")
+                yield document_id, collection
+    
+    def iter_segments(self, paths: List[Path], collection: SegmentCollection) -> Iterator[TextSegment]:
+        """Prepare documents and stream the segments of all of them.
+        
+        Each document's segments are added to the shared collection as soon
+        as the document is ready.
+        
+        Args:
+            paths: Document paths
+            collection: Collection that receives the segments of all documents
+        
+        Yields:
+            Leaf segments, document by document
+        """
+        for _, document in self.iter_documents(paths):
+            for segment in document.segments.values():
+                collection.add_segment(segment)
+            for segment in document.segments.values():
+                if not segment.child_ids:
+                    yield segment
+    
+    def load(self, paths: List[Path]) -> SegmentCollection:
+        """Prepare all documents of a corpus.
+        
+        Args:
+            paths: Document paths
+        
+        Returns:
+            Collection with the segments of all documents
+        """
+        collection = SegmentCollection()
+        for _ in self.iter_segments(paths, collection):
+            pass
+        return collection
+
+
+def document_provenance(graph: Any, documents: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Count the entities and relationships of a graph per document.
+    
+    Args:
+        graph: Knowledge graph built from a corpus
+        documents: Document information from CorpusLoader.documents
+    
+    Returns:
+        Document information extended with entity and relationship counts
+    """
+    provenance = {document_id: dict(info, entities=0, relationships=0) for document_id, info in documents.items()}
+    
+    for entity in graph.entities.values():
+        sources = {entity.source_span.document_id} if entity.source_span else set()
+        for attr in entity.get_attribute("source_documents"):
+            sources.update(attr.value)
+        for document_id in sources:
+            if document_id in provenance:
+                provenance[document_id]["entities"] += 1
+    
+    for relationship in graph.relationships.values():
+        document_id = relationship.source_span.document_id if relationship.source_span else None
+        if document_id in provenance:
+            provenance[document_id]["relationships"] += 1
+    
+    return provenance
@@ -0,0 +1,177 @@
+"""Language detection for the knowledge graph synthesis system."""
+
+import logging
+from typing import Dict, Mapping, Optional
+from uuid import UUID
+
+from ..models.segment import TextSegment
+from ..config import settings
+from .webvtt import WebVTTParser
+
+logger = logging.getLogger(__name__)
+
+# Translation tables that delete all letters of one script
+_CYRILLIC_LETTERS = {code: None for code in range(0x0400, 0x0530)}
+_LATIN_LETTERS = {code: None for code in list(range(0x41, 0x5B)) + list(range(0x61, 0x7B)) + list(range(0xC0, 0x250))}
+
+
+class LanguageDetector:
+    """Detects the language of texts and segments.
+    
+    Only the supported languages (English and Russian) are told apart, so the
+    share of Cyrillic among Cyrillic and Latin letters is usually enough. The
+    letters are counted with str.translate, which runs in C instead of a
+    Python loop over characters. Only texts whose script ratio is ambiguous
+    (mixed-script texts) are passed to langdetect. Results are memoized by the
+    hash of the analyzed sample, and segments inherit the language of their
+    parent segments.
+    """
+    
+    def __init__(self,
+               sample_size: int = settings.LANGUAGE_SAMPLE_SIZE,
+               cyrillic_ratio: float = settings.LANGUAGE_CYRILLIC_RATIO,
+               latin_ratio: float = settings.LANGUAGE_LATIN_RATIO,
+               cache_size: int = settings.LANGUAGE_CACHE_SIZE):
+        """Initialize the language detector.
+        
+        Args:
+            sample_size: Characters of a text that are analyzed
+            cyrillic_ratio: Share of Cyrillic letters from which a text is
+                Russian without further checks
+            latin_ratio: Share of Latin letters from which a text is English
+                without further checks
+            cache_size: Maximum number of memoized results
+        """
+        self.sample_size = sample_size
+        self.cyrillic_ratio = cyrillic_ratio
+        self.latin_ratio = latin_ratio
+        self.cache_size = cache_size
+        
+        self.webvtt_parser = WebVTTParser()
+        self._cache: Dict[int, str] = {}
+        self.stats = {"script": 0, "langdetect": 0, "cached": 0, "inherited": 0}
+    
+    def count_scripts(self, text: str) -> tuple:
+        """Count the Cyrillic and Latin letters of a text.
+        
+        Args:
+            text: Text to analyze
+        
+        Returns:
+            (cyrillic, latin) tuple of letter counts
+        """
+        length = len(text)
+        cyrillic = length - len(text.translate(_CYRILLIC_LETTERS))
+        latin = length - len(text.translate(_LATIN_LETTERS))
+        return cyrillic, latin
+    
+    def has_cyrillic(self, text: str) -> bool:
+        """Check whether a text contains Cyrillic letters.
+        
+        Args:
+            text: Text to check
+        
+        Returns:
+            True if the text contains at least one Cyrillic letter
+        """
+        return len(text.translate(_CYRILLIC_LETTERS)) < len(text)
+    
+    def detect(self, text: str) -> str:
+        """Detect the language of a text.
+        
+        Args:
+            text: Text to analyze (WEBVTT transcripts are analyzed by their
+                cue texts)
+        
+        Returns:
+            ISO language code ('en' or 'ru')
+        """
+        if text.startswith("WEBVTT"):
+            cue_texts = (cue.text for cue in self.webvtt_parser.iter_cues([text[:self.sample_size * 10]]))
+            sample = " ".join(cue_texts)[:self.sample_size]
+        else:
+            sample = text[:self.sample_size]
+        
+        key = hash(sample)
+        language = self._cache.get(key)
+        if language is not None:
+            self.stats["cached"] += 1
+            return language
+        
+        language = self._detect_sample(sample)
+        
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[key] = language
+        return language
+    
+    def _detect_sample(self, sample: str) -> str:
+        """Detect the language of a text sample.
+        
+        Args:
+            sample: Text sample
+        
+        Returns:
+            ISO language code ('en' or 'ru')
+        """
+        cyrillic, latin = self.count_scripts(sample)
+        letters = cyrillic + latin
+        
+        if letters == 0:
+            self.stats["script"] += 1
+            return settings.DEFAULT_LANGUAGE
+        
+        if cyrillic / letters >= self.cyrillic_ratio:
+            self.stats["script"] += 1
+            return "ru"
+        if latin / letters >= self.latin_ratio:
+            self.stats["script"] += 1
+            return "en"
+        
+        # Mixed scripts: ask the statistical detector
+        self.stats["langdetect"] += 1
+        try:
+            import langdetect
+            detected = langdetect.detect(sample)
+            if detected in settings.SUPPORTED_LANGUAGES:
+                return detected
+        except ImportError:
+            logger.warning("langdetect is not available, using the script ratio")
+        except Exception as e:
+            logger.warning(f"Language detection failed: {str(e)}")
+        
+        return "ru" if cyrillic >= latin else "en"
+    
+    def detect_segment(self, segment: TextSegment,
+                     segments: Optional[Mapping[UUID, TextSegment]] = None) -> str:
+        """Detect the language of a segment.
+        
+        The segment's own language is used if it is set; otherwise the
+        language of the nearest ancestor that has one; otherwise the text is
+        analyzed.
+        
+        Args:
+            segment: Segment to analyze
+            segments: Segments by ID used to look up ancestors (for example
+                SegmentCollection.segments)
+        
+        Returns:
+            ISO language code ('en' or 'ru')
+        """
+        if segment.language:
+            return segment.language
+        
+        if segments is not None:
+            parent_id = segment.parent_id
+            while parent_id is not None and parent_id in segments:
+                parent = segments[parent_id]
+                if parent.language:
+                    self.stats["inherited"] += 1
+                    return parent.language
+                parent_id = parent.parent_id
+        
+        return self.detect(segment.text)
+
+
+# Global language detector instance
+language_detector = LanguageDetector()
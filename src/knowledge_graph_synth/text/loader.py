@@ -1,15 +1,18 @@
 """Text loading module for the knowledge graph synthesis system."""
 
+import codecs
+import itertools
+import mmap
 import os
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from uuid import UUID, uuid4
 
-import langdetect
-
+from ..models.document import DocumentBuffer
 from ..models.segment import TextSegment, SegmentCollection
 from ..config import settings
+from .language import language_detector
 
 
 class TextLoader:
@@ -19,15 +22,21 @@ class TextLoader:
     and creating an initial TextSegment for further processing.
     """
     
-    def __init__(self):
-        """Initialize the text loader."""
-        pass
+    def __init__(self, use_mmap: bool = False):
+        """Initialize the text loader.
+        
+        Args:
+            use_mmap: Whether to memory-map loaded files instead of reading
+                them into memory
+        """
+        self.use_mmap = use_mmap
     
-    def load(self, file_path: str) -> SegmentCollection:
+    def load(self, file_path: str, document_id: Optional[str] = None) -> SegmentCollection:
         """Load text from a file.
         
         Args:
             file_path: Path to the text file
+            document_id: Document identifier (defaults to the file name)
             
         Returns:
             SegmentCollection containing the loaded text
@@ -45,21 +54,21 @@ class TextLoader:
             raise ValueError(f"Not a file: {file_path}")
         
         try:
-            text = path.read_text(encoding='utf-8')
+            buffer = DocumentBuffer.from_file(path, document_id=document_id, use_mmap=self.use_mmap)
         except Exception as e:
             raise IOError(f"Error reading file {file_path}: {str(e)}")
         
         # Create a SegmentCollection
-        collection = SegmentCollection(document_id=path.name)
+        collection = SegmentCollection(document_id=buffer.document_id)
         
-        # Create initial root segment
-        language = self._detect_language(text)
-        segment = TextSegment(
-            text=text,
-            start_position=0,
-            end_position=len(text),
+        # Create initial root segment as a view over the whole document
+        language = language_detector.detect(buffer.slice(0, 20000))
+        segment = TextSegment.from_buffer(
+            buffer,
+            0,
+            len(buffer),
             language=language,
-            document_id=path.name,
+            document_id=buffer.document_id,
             metadata={
                 "file_path": str(path.absolute()),
                 "file_size": path.stat().st_size,
@@ -70,6 +79,87 @@ class TextLoader:
         collection.add_segment(segment)
         return collection
     
+    def iter_text(self, file_path: str, chunk_size: int = settings.STREAM_CHUNK_SIZE) -> Iterator[str]:
+        """Read a UTF-8 file incrementally.
+        
+        The file is read in chunks of bytes (from a memory map if the loader
+        uses one) and decoded incrementally, so multi-byte characters split
+        between chunks are handled. Unlike load(), line endings are kept as
+        they are in the file, so character offsets match a memory-mapped
+        DocumentBuffer of the same file.
+        
+        Args:
+            file_path: Path to the text file
+            chunk_size: Number of bytes to read at a time
+            
+        Yields:
+            Decoded text chunks
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        
+        with open(file_path, "rb") as f:
+            if self.use_mmap and os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(0, len(mapped), chunk_size):
+                        text = decoder.decode(mapped[offset:offset + chunk_size])
+                        if text:
+                            yield text
+            else:
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    text = decoder.decode(data)
+                    if text:
+                        yield text
+        
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+    
+    def stream(self, file_path: str,
+              chunk_size: int = settings.STREAM_CHUNK_SIZE) -> Tuple[TextSegment, Iterator[str]]:
+        """Open a file for streaming segmentation.
+        
+        Only the first chunk is read here, to detect the language. The root
+        segment has no text of its own; TextSegmenter.iter_segments creates
+        its child segments from the returned chunks.
+        
+        Args:
+            file_path: Path to the text file
+            chunk_size: Number of bytes to read at a time
+            
+        Returns:
+            (root_segment, text_chunks) tuple
+        
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        if not path.is_file():
+            raise ValueError(f"Not a file: {file_path}")
+        
+        chunks = self.iter_text(path, chunk_size)
+        first_chunk = next(chunks, "")
+        
+        root = TextSegment(
+            start_position=0,
+            language=language_detector.detect(first_chunk[:20000]),
+            document_id=path.name,
+            metadata={
+                "file_path": str(path.absolute()),
+                "file_size": path.stat().st_size,
+                "file_name": path.name,
+                "streamed": True,
+            }
+        )
+        
+        return root, itertools.chain([first_chunk], chunks)
+    
     def load_text(self, text: str, document_id: Optional[str] = None) -> SegmentCollection:
         """Load text directly from a string.
         
@@ -84,63 +174,15 @@ class TextLoader:
         collection = SegmentCollection(document_id=doc_id)
         
         # Create initial root segment
-        language = self._detect_language(text)
-        segment = TextSegment(
-            text=text,
-            start_position=0,
-            end_position=len(text),
+        language = language_detector.detect(text)
+        segment = TextSegment.from_buffer(
+            DocumentBuffer(text, doc_id),
+            0,
+            len(text),
             language=language,
             document_id=doc_id,
             metadata={}
         )
         
         collection.add_segment(segment)
-        return collection
-    
-    def _detect_language(self, text: str) -> str:
-        """Detect the language of the text.
-        
-        Args:
-            text: Text to analyze
-            
-        Returns:
-            ISO language code ('en', 'ru', etc.)
-        """
-        # If the text is in WEBVTT format, extract actual content for language detection
-        if text.startswith("WEBVTT"):
-            # Extract real speech content from transcript
-            content_lines = []
-            lines = text.split('\n')
-            timestamp_pattern = r'\d{2}:\d{2}:\d{2}\.\d{3} --> \d{2}:\d{2}:\d{2}\.\d{3}'
-            
-            for i, line in enumerate(lines):
-                # Skip WEBVTT header, timestamps, and empty lines
-                if (i > 0 and  # Not header
-                    not re.match(timestamp_pattern, line) and  # Not timestamp
-                    line.strip()):  # Not empty
-                    content_lines.append(line)
-            
-            # Join all content lines together for language detection
-            detection_text = " ".join(content_lines)
-            # Use at most 1000 characters
-            sample = detection_text[:min(len(detection_text), 1000)]
-        else:
-            # For normal text, just use the first 1000 characters
-            sample = text[:min(len(text), 1000)]
-        
-        try:
-            # Check for Cyrillic characters as a stronger signal for Russian
-            if any(ord('а') <= ord(c) <= ord('я') or ord('А') <= ord(c) <= ord('Я') for c in sample):
-                return 'ru'
-                
-            # Fallback to language detection library
-            lang = langdetect.detect(sample)
-            
-            # Currently we only support English and Russian
-            if lang not in settings.SUPPORTED_LANGUAGES:
-                return settings.DEFAULT_LANGUAGE
-            
-            return lang
-        except Exception:
-            # Default to English if language detection fails
-            return settings.DEFAULT_LANGUAGE
\ No newline at end of file
+        return collection
\ No newline at end of file
@@ -5,8 +5,10 @@ import logging
 from typing import Dict, List, Optional, Any
 from uuid import UUID
 
+from ..models.document import DocumentBuffer
 from ..models.segment import TextSegment
 from ..config import settings
+from .language import language_detector
 
 logger = logging.getLogger(__name__)
 
@@ -26,16 +28,25 @@ class TextNormalizer:
         self.multiple_newlines_pattern = re.compile(r'\n{3,}')
         self.control_chars_pattern = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
     
-    def normalize(self, segment: TextSegment) -> TextSegment:
+    def normalize(self, segment: TextSegment,
+                segments: Optional[Dict[UUID, TextSegment]] = None,
+                keep_span: bool = False) -> TextSegment:
         """Normalize a text segment.
         
         Args:
             segment: Text segment to normalize
-            
+            segments: Segments by ID; a segment without a language inherits
+                the language of its nearest ancestor among them
+            keep_span: Keep the start and end positions of the segment in the
+                source text instead of fitting them to the normalized text
+                (for segments cut from a document that is not normalized
+                itself, e.g. when streaming)
+        
         Returns:
             Normalized text segment
         """
-        text = segment.text
+        original_text = segment.text
+        text = original_text
         
         # Remove control characters
         text = self.control_chars_pattern.sub('', text)
@@ -54,23 +65,53 @@ class TextNormalizer:
         # Verify language detection or detect language if needed
         language = segment.language
         if not language:
-            # If no language is set, detect it
-            language = self._detect_language(text)
+            # If no language is set, inherit or detect it
+            language = language_detector.detect_segment(segment, segments)
             logger.info(f"Detected language for segment {segment.id}: {language}")
         
         # Create a new segment with normalized text
-        normalized_segment = TextSegment(
+        fields = dict(
             id=segment.id,  # Keep the same ID
             document_id=segment.document_id,
-            text=text,
-            start_position=segment.start_position,
-            end_position=segment.start_position + len(text),
             language=language,  # Use the verified language
             metadata=segment.metadata.copy(),
             parent_id=segment.parent_id,
             child_ids=segment.child_ids.copy()
         )
         
+        if segment.parent_id is None and segment.start_position == 0:
+            # The normalized text becomes the shared buffer its child segments point into
+            source = segment.buffer
+            if source is not None and source.is_mapped and text == original_text:
+                # Nothing changed, so the segments keep pointing into the mapped file
+                buffer = source
+            elif source is not None and source.is_mapped:
+                # A mapped document stays out of memory once it is normalized
+                buffer = DocumentBuffer.from_temporary_file(text, segment.document_id)
+            else:
+                buffer = DocumentBuffer(text, segment.document_id)
+            normalized_segment = TextSegment.from_buffer(
+                buffer,
+                0,
+                len(text),
+                **fields
+            )
+        elif keep_span and text == original_text and segment.buffer is not None:
+            # Nothing changed, so the segment stays a view into the source
+            normalized_segment = TextSegment.from_buffer(
+                segment.buffer,
+                segment.start_position,
+                segment.end_position,
+                **fields
+            )
+        else:
+            normalized_segment = TextSegment(
+                text=text,
+                start_position=segment.start_position,
+                end_position=segment.end_position if keep_span else segment.start_position + len(text),
+                **fields
+            )
+        
         # Add normalization metadata
         normalized_segment.add_metadata('normalized', True)
         normalized_segment.add_metadata('original_length', segment.length)
@@ -84,37 +125,9 @@ class TextNormalizer:
         
         Args:
             segments: List of text segments to normalize
-            
-        Returns:
-            List of normalized text segments
-        """
-        return [self.normalize(segment) for segment in segments]
         
-    def _detect_language(self, text: str) -> str:
-        """Detect language of the text.
-        
-        Args:
-            text: Text to analyze
-            
         Returns:
-            Language code ("en", "ru", etc.)
+            List of normalized text segments
         """
-        # Check for Cyrillic characters as a strong signal for Russian
-        sample = text[:1000]  # Use first 1000 characters for detection
-        if any(ord('а') <= ord(c) <= ord('я') or ord('А') <= ord(c) <= ord('Я') for c in sample):
-            return "ru"
-        
-        try:
-            # Try to use langdetect if available
-            import langdetect
-            detected = langdetect.detect(sample)
-            
-            # Only return supported languages
-            if detected in settings.SUPPORTED_LANGUAGES:
-                return detected
-            
-        except (ImportError, Exception) as e:
-            logger.warning(f"Language detection failed: {str(e)}")
-        
-        # Default to English if detection fails or language not supported
-        return settings.DEFAULT_LANGUAGE
\ No newline at end of file
+        segments_by_id = {segment.id: segment for segment in segments}
+        return [self.normalize(segment, segments_by_id) for segment in segments]
\ No newline at end of file
@@ -1,11 +1,15 @@
 """Text segmentation for the knowledge graph synthesis system."""
 
+import itertools
 import re
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
 from uuid import UUID, uuid4
 
 from ..models.segment import TextSegment, SegmentCollection
 from ..config import settings
+from .sentences import SentenceSplitter
+from .tiling import TopicTiler
+from .webvtt import WebVTTCue, WebVTTParser
 
 
 class TextSegmenter:
@@ -18,19 +22,25 @@ class TextSegmenter:
     
     def __init__(self, 
                 max_segment_length: int = settings.MAX_SEGMENT_LENGTH,
-                max_segment_overlap: int = settings.MAX_SEGMENT_OVERLAP):
+                max_segment_overlap: int = settings.MAX_SEGMENT_OVERLAP,
+                sentence_backend: str = settings.SENTENCE_BACKEND):
         """Initialize the text segmenter.
         
         Args:
             max_segment_length: Maximum characters per segment
             max_segment_overlap: Overlap between segments in characters
+            sentence_backend: Sentence boundary detection, "regex" or "spacy"
         """
         self.max_segment_length = max_segment_length
         self.max_segment_overlap = max_segment_overlap
+        self.sentence_splitter = SentenceSplitter(sentence_backend)
         
         # Regex patterns for segmentation
         self.paragraph_pattern = re.compile(r'\n\s*\n')
         self.section_header_pattern = re.compile(r'\n[A-Z][A-Z0-9 ,.;:&\'-]*\n')
+        self.sentence_end_pattern = re.compile(r'[.!?]\s+')
+        self.webvtt_parser = WebVTTParser()
+        self.topic_tiler = TopicTiler()
     
     def segment(self, collection: SegmentCollection) -> SegmentCollection:
         """Segment a SegmentCollection.
@@ -55,10 +65,17 @@ class TextSegmenter:
                 # Standard paragraph-based segmentation for normal text
                 paragraph_segments = self._segment_by_paragraphs(root)
                 
+                # Find the sentences of all long paragraphs in one batch
+                long_paragraphs = [p for p in paragraph_segments if p.length > self.max_segment_length]
+                sentence_ends = dict(zip(
+                    (p.id for p in long_paragraphs),
+                    self.sentence_splitter.sentence_ends([p.text for p in long_paragraphs], root.language)
+                ))
+                
                 for paragraph in paragraph_segments:
                     # If paragraph is too long, split it further
-                    if paragraph.length > self.max_segment_length:
-                        sentence_segments = self._segment_by_sentences(paragraph)
+                    if paragraph.id in sentence_ends:
+                        sentence_segments = self._segment_by_sentences(paragraph, sentence_ends[paragraph.id])
                         for sentence in sentence_segments:
                             collection.add_segment(sentence)
                     else:
@@ -66,6 +83,282 @@ class TextSegmenter:
         
         return collection
         
+    def iter_segments(self, root: TextSegment, chunks: Iterable[str]) -> Iterator[TextSegment]:
+        """Segment a document while it is being read.
+        
+        This is the streaming counterpart of segment(): the text arrives in
+        chunks (see TextLoader.stream) and segments are yielded as soon as
+        their paragraph is complete, with start and end positions relative
+        to the start of the document. Only the current unfinished paragraph
+        is kept in memory.
+        
+        Args:
+            root: Root segment of the document
+            chunks: Text chunks in document order
+            
+        Yields:
+            Leaf segments in document order
+        """
+        chunks = iter(chunks)
+        first_chunk = next(chunks, "")
+        chunks = itertools.chain([first_chunk], chunks)
+        
+        if first_chunk.startswith("WEBVTT"):
+            yield from self._iter_transcript(root, chunks)
+            return
+        
+        pending = ""
+        offset = 0  # Document position of pending[0]
+        
+        for chunk in chunks:
+            pending += chunk
+            consumed = 0
+            
+            # A break is only final if non-whitespace text follows it in this chunk
+            last_text_end = len(pending.rstrip())
+            for match in self.paragraph_pattern.finditer(pending):
+                if match.end() >= last_text_end:
+                    break
+                if consumed < match.start():
+                    yield from self._iter_paragraph(root, pending[consumed:match.start()], offset + consumed)
+                consumed = match.end()
+            
+            # Do not let a single huge paragraph grow without bound
+            if len(pending) - consumed > settings.STREAM_MAX_PENDING_TEXT:
+                cut = len(pending)
+                for match in self.sentence_end_pattern.finditer(pending, consumed):
+                    cut = match.end()
+                yield from self._iter_paragraph(root, pending[consumed:cut], offset + consumed)
+                consumed = cut
+            
+            pending = pending[consumed:]
+            offset += consumed
+        
+        if pending.strip():
+            yield from self._iter_paragraph(root, pending, offset)
+    
+    def _iter_paragraph(self, root: TextSegment, text: str, start_position: int) -> Iterator[TextSegment]:
+        """Create the segments of one streamed paragraph.
+        
+        Args:
+            root: Root segment of the document
+            text: Paragraph text
+            start_position: Document position of the paragraph
+            
+        Yields:
+            The paragraph, or its sentences if it is too long
+        """
+        paragraph = TextSegment(
+            document_id=root.document_id,
+            text=text,
+            start_position=start_position,
+            end_position=start_position + len(text),
+            language=root.language,
+            parent_id=root.id,
+            metadata={
+                "segment_type": "paragraph",
+                "parent_segment": str(root.id)
+            }
+        )
+        
+        if paragraph.length > self.max_segment_length:
+            yield from self._segment_by_sentences(paragraph)
+        else:
+            yield paragraph
+    
+    def _iter_transcript(self, root: TextSegment, chunks: Iterable[str]) -> Iterator[TextSegment]:
+        """Segment a streamed transcript (WEBVTT format) into topics.
+        
+        Works like _segment_transcript on a sliding buffer of utterances
+        that holds a few topics of max_segment_length: once the buffer is
+        full, all topics but the last are emitted and the last one stays in
+        the buffer, since it may continue. Topics are sized by length only,
+        so their size does not depend on the size of the buffer; a
+        transcript that fits in the buffer is split exactly as by
+        _segment_transcript.
+        
+        Args:
+            root: Root segment of the document
+            chunks: Text chunks in document order
+            
+        Yields:
+            Transcript topic segments
+        """
+        buffer_length = settings.STREAM_TRANSCRIPT_BUFFER_TOPICS * self.max_segment_length
+        cues = []
+        length = 0
+        topic_number = 0
+        
+        for cue in self.webvtt_parser.iter_cues(chunks, root.start_position or 0):
+            if not cue.text:
+                continue
+            cues.append(cue)
+            length += len(cue.text)
+            
+            if length < buffer_length:
+                continue
+            
+            ranges = self._split_topics(cues, self._topics_by_length(length))
+            if len(ranges) == 1 and length < 2 * buffer_length:
+                continue
+            if len(ranges) == 1:
+                # No boundary found in a long stretch, emit it to bound memory
+                ranges.append((len(cues), len(cues)))
+            
+            for start, end in ranges[:-1]:
+                topic_number += 1
+                yield self._create_transcript_topic(root, cues[start:end], topic_number)
+            cues = cues[ranges[-1][0]:]
+            length = sum(len(cue.text) for cue in cues)
+        
+        # Add the remaining topics if any
+        if cues:
+            num_topics = self._topics_by_length(length) if topic_number else self._topic_count(cues)
+            for start, end in self._split_topics(cues, num_topics):
+                topic_number += 1
+                yield self._create_transcript_topic(root, cues[start:end], topic_number)
+    
+    def _topic_count(self, cues: List[WebVTTCue]) -> int:
+        """Get the number of topics to aim for in a whole transcript.
+        
+        Args:
+            cues: Transcript cues
+            
+        Returns:
+            About 5-20 topics, depending on the number of cues
+        """
+        return min(20, max(5, len(cues) // 25))
+    
+    def _topics_by_length(self, length: int) -> int:
+        """Get the number of topics to aim for in part of a long transcript.
+        
+        Args:
+            length: Characters of the utterances
+            
+        Returns:
+            One topic per max_segment_length characters
+        """
+        return max(1, -(-length // self.max_segment_length))
+    
+    def _split_topics(self, cues: List[WebVTTCue], num_topics: int) -> List[Tuple[int, int]]:
+        """Find topic ranges in a sequence of cues.
+        
+        Args:
+            cues: Transcript cues
+            num_topics: Number of topics to aim for
+            
+        Returns:
+            List of (start, end) cue index ranges
+        """
+        return self.topic_tiler.split(
+            [cue.text for cue in cues],
+            max_topics=num_topics,
+            max_topic_length=self.max_segment_length
+        )
+    
+    def _create_transcript_topic(self, segment: TextSegment,
+                               cues: List[WebVTTCue],
+                               topic_number: int) -> TextSegment:
+        """Create a topic segment from consecutive transcript cues.
+        
+        The topic text is the cue texts (with speaker labels) separated by
+        blank lines. Its positions span the cues in the document, and the
+        timing, speaker and position of every cue are kept in the metadata so
+        any part of the topic text can be traced back to the transcript.
+        
+        Args:
+            segment: Parent segment
+            cues: Cues of the topic
+            topic_number: Number of the topic in the transcript
+            
+        Returns:
+            Topic segment
+        """
+        utterances = []
+        cue_metadata = []
+        text_offset = 0
+        
+        for cue in cues:
+            utterance = f"{cue.speaker}: {cue.text}" if cue.speaker else cue.text
+            cue_metadata.append({
+                "start_time": cue.start_time,
+                "end_time": cue.end_time,
+                "speaker": cue.speaker,
+                "start_position": cue.start_position,
+                "end_position": cue.end_position,
+                "text_offset": text_offset,
+            })
+            utterances.append(utterance)
+            text_offset += len(utterance) + 2
+        
+        speakers = list(dict.fromkeys(cue.speaker for cue in cues if cue.speaker))
+        
+        return TextSegment(
+            document_id=segment.document_id,
+            text="\n\n".join(utterances),
+            start_position=cues[0].start_position,
+            end_position=cues[-1].end_position,
+            language=segment.language,
+            parent_id=segment.id,
+            metadata={
+                "segment_type": "transcript_topic",
+                "parent_segment": str(segment.id),
+                "topic_number": topic_number,
+                "topic_segmentation": "texttiling",
+                "start_time": cues[0].start_time,
+                "end_time": cues[-1].end_time,
+                "speakers": speakers,
+                "cues": cue_metadata
+            }
+        )
+    
+    def _create_child(self, segment: TextSegment,
+                    start_idx: int,
+                    end_idx: int,
+                    metadata: Dict[str, Any]) -> TextSegment:
+        """Create a child segment for a span of the parent's text.
+        
+        If the parent is a view into a document buffer, the child becomes a
+        view into the same buffer; otherwise it gets a copy of its text.
+        
+        Args:
+            segment: Parent segment
+            start_idx: Start index in the parent's text
+            end_idx: End index in the parent's text (exclusive)
+            metadata: Child segment metadata
+            
+        Returns:
+            Child segment
+        """
+        fields = dict(
+            document_id=segment.document_id,
+            language=segment.language,
+            parent_id=segment.id,
+            metadata=metadata
+        )
+        
+        if segment.buffer is not None and segment.start_position is not None:
+            return TextSegment.from_buffer(
+                segment.buffer,
+                segment.start_position + start_idx,
+                segment.start_position + end_idx,
+                **fields
+            )
+        
+        # Рассчитываем позиции только если родительский сегмент имеет действительные позиции
+        start_pos = None
+        end_pos = None
+        if segment.start_position is not None:
+            start_pos = segment.start_position + start_idx
+            end_pos = segment.start_position + end_idx
+        
+        return TextSegment(
+            text=segment.text[start_idx:end_idx],
+            start_position=start_pos,
+            end_position=end_pos,
+            **fields
+        )
+    
     def _segment_transcript(self, segment: TextSegment) -> List[TextSegment]:
         """Segment a transcript (WEBVTT format) by conversation topics.
         
@@ -75,57 +368,19 @@ class TextSegmenter:
         Returns:
             List of segmented transcript segments by topic
         """
-        text = segment.text
-        # Split by timestamp lines
-        lines = text.split('\n')
+        cues = [
+            cue for cue in self.webvtt_parser.parse(segment.text, segment.start_position or 0)
+            if cue.text
+        ]
         
-        # Collect utterances (speaker turns)
-        utterances = []
-        current_utterance = ""
-        timestamp_pattern = re.compile(r'\d{2}:\d{2}:\d{2}\.\d{3} --> \d{2}:\d{2}:\d{2}\.\d{3}')
-        
-        for line in lines:
-            if timestamp_pattern.match(line):
-                # New timestamp, if we have an utterance, add it
-                if current_utterance.strip():
-                    utterances.append(current_utterance.strip())
-                    current_utterance = ""
-            elif line.strip() and not line.startswith("WEBVTT"):
-                current_utterance += line + " "
-        
-        # Add the last utterance if any
-        if current_utterance.strip():
-            utterances.append(current_utterance.strip())
-        
-        # Group utterances into topic-based segments
-        # Using a simple approach of grouping every 5-10 utterances as a "topic"
-        # In a real system, this could use more sophisticated topic detection
-        topic_segments = []
-        current_topic = ""
-        num_topics = min(20, max(5, len(utterances) // 25))  # Aim for about 5-20 topics total
-        utterances_per_topic = max(5, len(utterances) // num_topics)  # At least 5 utterances per topic
+        # Group cues into topics at the lexical cohesion valleys of the transcript
+        ranges = self._split_topics(cues, self._topic_count(cues))
         
-        for i, utterance in enumerate(utterances):
-            current_topic += utterance + "\n\n"
-            
-            # When we reach the desired number of utterances or the end, create a segment
-            if (i + 1) % utterances_per_topic == 0 or i == len(utterances) - 1:
-                if current_topic.strip():
-                    # Важно: для транскриптов не устанавливаем позиции start_position и end_position,
-                    # так как они имеют другую структуру и нам не нужны точные позиции
-                    topic = TextSegment(
-                        document_id=segment.document_id,
-                        text=current_topic.strip(),
-                        language=segment.language,
-                        parent_id=segment.id,
-                        metadata={
-                            "segment_type": "transcript_topic",
-                            "parent_segment": str(segment.id),
-                            "topic_number": len(topic_segments) + 1
-                        }
-                    )
-                    topic_segments.append(topic)
-                    current_topic = ""
+        topic_segments = []
+        for start, end in ranges:
+            topic_segments.append(self._create_transcript_topic(
+                segment, cues[start:end], len(topic_segments) + 1
+            ))
         
         return topic_segments
     
@@ -155,67 +410,32 @@ class TextSegmenter:
                 start_idx = match.end()
                 continue
             
-            # Extract paragraph text
-            paragraph_text = text[start_idx:match.start()]
-            
-            # Create paragraph segment
-            start_pos = None
-            end_pos = None
-            
-            # Рассчитываем позиции только если родительский сегмент имеет действительные позиции
-            if segment.start_position is not None:
-                start_pos = segment.start_position + start_idx
-                end_pos = segment.start_position + match.start()
-                
-            paragraph = TextSegment(
-                document_id=segment.document_id,
-                text=paragraph_text,
-                start_position=start_pos,
-                end_position=end_pos,
-                language=segment.language,
-                parent_id=segment.id,
-                metadata={
-                    "segment_type": "paragraph",
-                    "parent_segment": str(segment.id)
-                }
-            )
+            paragraph = self._create_child(segment, start_idx, match.start(), {
+                "segment_type": "paragraph",
+                "parent_segment": str(segment.id)
+            })
             
             paragraphs.append(paragraph)
             start_idx = match.end()
         
         # Add the last paragraph
         if start_idx < len(text):
-            paragraph_text = text[start_idx:]
-            
-            start_pos = None
-            end_pos = None
-            
-            # Рассчитываем позиции только если родительский сегмент имеет действительные позиции
-            if segment.start_position is not None:
-                start_pos = segment.start_position + start_idx
-                end_pos = segment.start_position + len(text)
-                
-            paragraph = TextSegment(
-                document_id=segment.document_id,
-                text=paragraph_text,
-                start_position=start_pos,
-                end_position=end_pos,
-                language=segment.language,
-                parent_id=segment.id,
-                metadata={
-                    "segment_type": "paragraph",
-                    "parent_segment": str(segment.id)
-                }
-            )
+            paragraph = self._create_child(segment, start_idx, len(text), {
+                "segment_type": "paragraph",
+                "parent_segment": str(segment.id)
+            })
             paragraphs.append(paragraph)
         
         return paragraphs
     
-    def _segment_by_sentences(self, segment: TextSegment) -> List[TextSegment]:
+    def _segment_by_sentences(self, segment: TextSegment,
+                            sentence_endings: Optional[List[int]] = None) -> List[TextSegment]:
         """Split a segment into sentences.
         
         Args:
             segment: Text segment to split
+            sentence_endings: Sentence boundaries in the segment's text, if
+                already known (see SentenceSplitter.sentence_ends)
             
         Returns:
             List of sentence segments
@@ -223,11 +443,8 @@ class TextSegmenter:
         text = segment.text
         sentences = []
         
-        # Simple sentence splitting by common end punctuation
-        # This is a simplified approach - for production, use spaCy or similar
-        sentence_endings = []
-        for match in re.finditer(r'[.!?]\s+', text):
-            sentence_endings.append(match.end())
+        if sentence_endings is None:
+            sentence_endings = self.sentence_splitter.sentence_ends([text], segment.language)[0]
         
         # If no sentence breaks or only one sentence, handle overlapping chunks
         if not sentence_endings:
@@ -238,75 +455,27 @@ class TextSegmenter:
         for end_idx in sentence_endings:
             if end_idx - start_idx > self.max_segment_length:
                 # Sentence is too long, break it up by length
-                start_pos = None
-                end_pos = None
-                
-                # Рассчитываем позиции только если родительский сегмент имеет действительные позиции
-                if segment.start_position is not None:
-                    start_pos = segment.start_position + start_idx
-                    end_pos = segment.start_position + end_idx
-                
-                sub_segment = TextSegment(
-                    document_id=segment.document_id,
-                    text=text[start_idx:end_idx],
-                    start_position=start_pos,
-                    end_position=end_pos,
-                    language=segment.language,
-                    parent_id=segment.id,
-                    metadata={
-                        "segment_type": "long_sentence",
-                        "parent_segment": str(segment.id)
-                    }
-                )
+                sub_segment = self._create_child(segment, start_idx, end_idx, {
+                    "segment_type": "long_sentence",
+                    "parent_segment": str(segment.id)
+                })
                 sentences.extend(self._segment_by_length(sub_segment))
             else:
                 # Create sentence segment
-                start_pos = None
-                end_pos = None
-                
-                # Рассчитываем позиции только если родительский сегмент имеет действительные позиции
-                if segment.start_position is not None:
-                    start_pos = segment.start_position + start_idx
-                    end_pos = segment.start_position + end_idx
-                
-                sentence = TextSegment(
-                    document_id=segment.document_id,
-                    text=text[start_idx:end_idx],
-                    start_position=start_pos,
-                    end_position=end_pos,
-                    language=segment.language,
-                    parent_id=segment.id,
-                    metadata={
-                        "segment_type": "sentence",
-                        "parent_segment": str(segment.id)
-                    }
-                )
+                sentence = self._create_child(segment, start_idx, end_idx, {
+                    "segment_type": "sentence",
+                    "parent_segment": str(segment.id)
+                })
                 sentences.append(sentence)
             
             start_idx = end_idx
         
         # Add the last part if needed
         if start_idx < len(text):
-            start_pos = None
-            end_pos = None
-            
-            # Рассчитываем позиции только если родительский сегмент имеет действительные позиции
-            if segment.start_position is not None:
-                start_pos = segment.start_position + start_idx
-                end_pos = segment.start_position + len(text)
-            
-            sentence = TextSegment(
-                document_id=segment.document_id,
-                text=text[start_idx:],
-                start_position=start_pos,
-                end_position=end_pos,
-                language=segment.language,
-                parent_id=segment.id,
-                metadata={
-                    "segment_type": "sentence",
-                    "parent_segment": str(segment.id)
-                }
-            )
+            sentence = self._create_child(segment, start_idx, len(text), {
+                "segment_type": "sentence",
+                "parent_segment": str(segment.id)
+            })
             sentences.append(sentence)
         
         return sentences
@@ -342,27 +511,10 @@ class TextSegmenter:
                 if space_idx > start_idx:
                     end_idx = space_idx + 1  # Include the space
             
-            # Create chunk segment
-            start_pos = None
-            end_pos = None
-            
-            # Рассчитываем позиции только если родительский сегмент имеет действительные позиции
-            if segment.start_position is not None:
-                start_pos = segment.start_position + start_idx
-                end_pos = segment.start_position + end_idx
-            
-            chunk = TextSegment(
-                document_id=segment.document_id,
-                text=text[start_idx:end_idx],
-                start_position=start_pos,
-                end_position=end_pos,
-                language=segment.language,
-                parent_id=segment.id,
-                metadata={
-                    "segment_type": "chunk",
-                    "parent_segment": str(segment.id)
-                }
-            )
+            chunk = self._create_child(segment, start_idx, end_idx, {
+                "segment_type": "chunk",
+                "parent_segment": str(segment.id)
+            })
             chunks.append(chunk)
             
             # Move to next chunk with overlap
@@ -0,0 +1,115 @@
+"""Sentence boundary detection for the knowledge graph synthesis system."""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SentenceSplitter:
+    """Finds sentence boundaries with a regex or a spaCy pipeline.
+    
+    The regex backend splits after every ".", "!" or "?" followed by
+    whitespace. The spaCy backend loads a trimmed pipeline that only keeps
+    the statistical sentence recognizer ("senter") of the configured model,
+    or a rule-based sentencizer if the model is not installed. Pipelines are
+    loaded once per language and shared by all splitters, and texts are
+    processed in batches with nlp.pipe, optionally across several processes.
+    """
+    
+    # Loaded spaCy pipelines by language
+    _pipelines: Dict[str, Any] = {}
+    
+    # Components that are not needed for sentence boundaries
+    EXCLUDED_COMPONENTS = ["parser", "ner", "lemmatizer", "attribute_ruler",
+                           "tagger", "morphologizer", "entity_ruler"]
+    
+    def __init__(self,
+               backend: str = settings.SENTENCE_BACKEND,
+               batch_size: int = settings.SPACY_BATCH_SIZE,
+               n_process: int = settings.SPACY_N_PROCESS):
+        """Initialize the sentence splitter.
+        
+        Args:
+            backend: "regex" or "spacy"
+            batch_size: Texts per spaCy batch
+            n_process: Processes used by spaCy (1 to stay in this process)
+        """
+        self.backend = backend
+        self.batch_size = batch_size
+        self.n_process = n_process
+        
+        self.sentence_end_pattern = re.compile(r'[.!?]\s+')
+        
+        if backend == "spacy":
+            try:
+                import spacy  # noqa: F401
+            except ImportError:
+                logger.warning("spaCy is not available, falling back to regex sentence splitting")
+                self.backend = "regex"
+    
+    @classmethod
+    def get_pipeline(cls, language: Optional[str]):
+        """Get the spaCy pipeline for a language, loading it on first use.
+        
+        Args:
+            language: Language code ("en", "ru")
+        
+        Returns:
+            spaCy Language object
+        """
+        language = language if language in settings.SPACY_MODELS else settings.DEFAULT_LANGUAGE
+        
+        nlp = cls._pipelines.get(language)
+        if nlp is not None:
+            return nlp
+        
+        import spacy
+        
+        model = settings.SPACY_MODELS[language]
+        try:
+            nlp = spacy.load(model, exclude=cls.EXCLUDED_COMPONENTS)
+            if "senter" in nlp.disabled:
+                nlp.enable_pipe("senter")
+            if "senter" not in nlp.pipe_names:
+                nlp.add_pipe("sentencizer")
+        except OSError:
+            logger.warning(f"spaCy model {model} is not installed, using the rule-based sentencizer")
+            nlp = spacy.blank(language)
+            nlp.add_pipe("sentencizer")
+        
+        cls._pipelines[language] = nlp
+        return nlp
+    
+    def sentence_ends(self, texts: List[str], language: Optional[str] = None) -> List[List[int]]:
+        """Find the sentence boundaries of several texts.
+        
+        A boundary is the index where the next sentence starts, so the
+        whitespace after a sentence belongs to that sentence. The end of the
+        text itself is not included.
+        
+        Args:
+            texts: Texts to split
+            language: Language of the texts
+        
+        Returns:
+            Sorted boundary indices for each text
+        """
+        if self.backend != "spacy":
+            return [
+                [match.end() for match in self.sentence_end_pattern.finditer(text)
+                 if match.end() < len(text)]
+                for text in texts
+            ]
+        
+        nlp = self.get_pipeline(language)
+        nlp.max_length = max(nlp.max_length, max((len(text) for text in texts), default=0) + 1)
+        
+        result = []
+        docs = nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process)
+        for doc in docs:
+            result.append([sentence.start_char for sentence in doc.sents if sentence.start_char > 0])
+        return result
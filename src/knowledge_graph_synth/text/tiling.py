@@ -0,0 +1,216 @@
+"""Topic segmentation of transcripts for the knowledge graph synthesis system."""
+
+import re
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+
+class TopicTiler:
+    """Finds topic boundaries in a sequence of utterances (TextTiling).
+    
+    Each utterance becomes a hashed bag-of-words vector weighted by inverse
+    document frequency. For every gap between two utterances, the cosine
+    similarity of the windows before and after the gap measures lexical
+    cohesion. Window sums are taken from a cumulative sum, so all gaps are
+    scored with a few vectorized operations in linear time. Topic boundaries
+    are placed at the deepest valleys of the smoothed cohesion scores.
+    """
+    
+    def __init__(self,
+               window: int = settings.TILING_WINDOW,
+               smoothing: int = settings.TILING_SMOOTHING,
+               min_topic_size: int = settings.TILING_MIN_TOPIC_UTTERANCES,
+               dimensions: int = settings.TILING_DIMENSIONS):
+        """Initialize the topic tiler.
+        
+        Args:
+            window: Utterances on each side of a gap that are compared
+            smoothing: Half-width of the moving average over the scores
+            min_topic_size: Minimum number of utterances per topic
+            dimensions: Size of the hashed term vectors
+        """
+        self.window = window
+        self.smoothing = smoothing
+        self.min_topic_size = min_topic_size
+        self.dimensions = dimensions
+        
+        self.word_pattern = re.compile(r'\w{3,}')
+        self._buckets = {}
+    
+    def _vectorize(self, utterances: List[str]) -> np.ndarray:
+        """Build the term vectors of the utterances.
+        
+        Args:
+            utterances: Utterance texts
+        
+        Returns:
+            Matrix with one row per utterance
+        """
+        rows = []
+        columns = []
+        for i, utterance in enumerate(utterances):
+            for word in self.word_pattern.findall(utterance.lower()):
+                bucket = self._buckets.get(word)
+                if bucket is None:
+                    # crc32 is stable across runs, unlike hash()
+                    bucket = zlib.crc32(word.encode("utf-8")) % self.dimensions
+                    self._buckets[word] = bucket
+                rows.append(i)
+                columns.append(bucket)
+        
+        vectors = np.zeros((len(utterances), self.dimensions), dtype=np.float32)
+        np.add.at(vectors, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1.0)
+        
+        # Down-weight words that occur in most utterances (fillers, function words)
+        document_frequency = np.count_nonzero(vectors, axis=0)
+        idf = np.log((1.0 + len(utterances)) / (1.0 + document_frequency)).astype(np.float32)
+        return vectors * idf
+    
+    def cohesion_scores(self, utterances: List[str]) -> np.ndarray:
+        """Score the lexical cohesion at every gap between utterances.
+        
+        Args:
+            utterances: Utterance texts
+        
+        Returns:
+            Array of len(utterances) - 1 scores; score i belongs to the gap
+            before utterance i + 1
+        """
+        vectors = self._vectorize(utterances)
+        count = len(vectors)
+        
+        cumulative = np.zeros((count + 1, self.dimensions), dtype=np.float32)
+        np.cumsum(vectors, axis=0, out=cumulative[1:])
+        
+        gaps = np.arange(1, count)
+        left = cumulative[gaps] - cumulative[np.maximum(gaps - self.window, 0)]
+        right = cumulative[np.minimum(gaps + self.window, count)] - cumulative[gaps]
+        
+        dot = np.einsum("ij,ij->i", left, right)
+        norms = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+        scores = np.divide(dot, norms, out=np.zeros_like(dot), where=norms > 0)
+        
+        if self.smoothing and len(scores) > 2 * self.smoothing:
+            width = 2 * self.smoothing + 1
+            padded = np.pad(scores, self.smoothing, mode="edge")
+            scores = np.convolve(padded, np.ones(width, dtype=np.float32) / width, mode="valid")
+        
+        return scores
+    
+    def _depth_scores(self, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Compute how deep each valley of the cohesion scores is.
+        
+        Args:
+            scores: Cohesion scores
+        
+        Returns:
+            (valleys, depths) tuple with valley indices and their depth scores
+        """
+        valleys = np.flatnonzero((scores[1:-1] < scores[:-2]) & (scores[1:-1] <= scores[2:])) + 1
+        depths = np.zeros(len(valleys), dtype=np.float32)
+        
+        # Climb to the nearest peak on each side of the valley
+        last = len(scores) - 1
+        for i, valley in enumerate(valleys):
+            left = valley
+            while left > 0 and scores[left - 1] >= scores[left]:
+                left -= 1
+            right = valley
+            while right < last and scores[right + 1] >= scores[right]:
+                right += 1
+            depths[i] = (scores[left] - scores[valley]) + (scores[right] - scores[valley])
+        
+        return valleys, depths
+    
+    def boundaries(self, utterances: List[str],
+                 max_topics: Optional[int] = None,
+                 max_topic_length: Optional[int] = None) -> List[int]:
+        """Find the topic boundaries of a sequence of utterances.
+        
+        Args:
+            utterances: Utterance texts
+            max_topics: Maximum number of topics found by cohesion alone
+                (None for no limit)
+            max_topic_length: Maximum characters per topic; longer topics are
+                split further at their deepest valley (None for no limit)
+        
+        Returns:
+            Sorted indices of the utterances that start a new topic
+        """
+        count = len(utterances)
+        if count < 2 * self.min_topic_size:
+            return []
+        
+        scores = self.cohesion_scores(utterances)
+        valleys, depths = self._depth_scores(scores)
+        boundary_depths = {int(valley) + 1: float(depth) for valley, depth in zip(valleys, depths)}
+        
+        # Keep valleys deeper than the usual TextTiling cutoff, deepest first
+        chosen = []
+        if len(valleys) and max_topics != 1:
+            cutoff = depths.mean() - depths.std() / 2
+            for i in np.argsort(-depths, kind="stable"):
+                if depths[i] <= 0 or depths[i] < cutoff:
+                    break
+                if max_topics is not None and len(chosen) >= max_topics - 1:
+                    break
+                
+                boundary = int(valleys[i]) + 1
+                if boundary < self.min_topic_size or count - boundary < self.min_topic_size:
+                    continue
+                if any(abs(boundary - other) < self.min_topic_size for other in chosen):
+                    continue
+                chosen.append(boundary)
+        
+        if not max_topic_length:
+            return sorted(chosen)
+        
+        # Split topics that are still too long
+        offsets = np.cumsum([0] + [len(utterance) for utterance in utterances])
+        
+        def split_range(start: int, end: int) -> List[int]:
+            if offsets[end] - offsets[start] <= max_topic_length or end - start < 2 * self.min_topic_size:
+                return [start]
+            
+            low = start + self.min_topic_size
+            high = end - self.min_topic_size
+            candidates = [boundary for boundary in boundary_depths if low <= boundary <= high]
+            if candidates:
+                boundary = max(candidates, key=boundary_depths.get)
+            else:
+                # No valley in range, split in the middle
+                middle = (offsets[start] + offsets[end]) / 2
+                boundary = min(max(int(np.searchsorted(offsets, middle)), low), high)
+            
+            return split_range(start, boundary) + split_range(boundary, end)
+        
+        starts = [0] + sorted(chosen)
+        ends = starts[1:] + [count]
+        result = []
+        for start, end in zip(starts, ends):
+            result.extend(split_range(start, end))
+        return result[1:]
+    
+    def split(self, utterances: List[str],
+             max_topics: Optional[int] = None,
+             max_topic_length: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Split a sequence of utterances into topics.
+        
+        Args:
+            utterances: Utterance texts
+            max_topics: Maximum number of topics found by cohesion alone
+            max_topic_length: Maximum characters per topic
+        
+        Returns:
+            List of (start, end) utterance index ranges, end exclusive
+        """
+        if not utterances:
+            return []
+        
+        starts = [0] + self.boundaries(utterances, max_topics, max_topic_length)
+        ends = starts[1:] + [len(utterances)]
+        return list(zip(starts, ends))
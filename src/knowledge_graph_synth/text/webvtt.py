@@ -0,0 +1,223 @@
+"""WebVTT transcript parsing for the knowledge graph synthesis system."""
+
+import html
+import itertools
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Any
+
+
+class WebVTTCue:
+    """A single cue (utterance) of a WebVTT transcript.
+    
+    Positions are character offsets of the cue text (its payload lines) in
+    the document, so cues can be traced back to the source file.
+    """
+    
+    __slots__ = ("identifier", "start_time", "end_time", "speaker", "text",
+                 "start_position", "end_position")
+    
+    def __init__(self,
+               text: str,
+               start_time: float,
+               end_time: float,
+               start_position: int,
+               end_position: int,
+               speaker: Optional[str] = None,
+               identifier: Optional[str] = None):
+        """Initialize a cue.
+        
+        Args:
+            text: Cue text without markup
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            start_position: Document position of the first payload character
+            end_position: Document position after the last payload character
+            speaker: Speaker label, if any
+            identifier: Cue identifier, if any
+        """
+        self.text = text
+        self.start_time = start_time
+        self.end_time = end_time
+        self.start_position = start_position
+        self.end_position = end_position
+        self.speaker = speaker
+        self.identifier = identifier
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the cue to a dictionary representation.
+        
+        Returns:
+            Dictionary representation of the cue
+        """
+        return {
+            "identifier": self.identifier,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "speaker": self.speaker,
+            "text": self.text,
+            "start_position": self.start_position,
+            "end_position": self.end_position,
+        }
+
+
+class WebVTTParser:
+    """Parses WebVTT transcripts into cues.
+    
+    The parser works on a stream of text chunks, so transcripts larger than
+    memory can be parsed while they are read. Header, NOTE, STYLE and REGION
+    blocks are skipped; cue identifiers, timings and speaker labels (from
+    <v Speaker> voice tags or a "Speaker: " prefix) are kept.
+    """
+    
+    def __init__(self):
+        """Initialize the WebVTT parser."""
+        # Regex patterns for parsing
+        self.timing_pattern = re.compile(
+            r'^\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})'
+        )
+        self.voice_pattern = re.compile(r'<v(?:\.[^\s>]*)?\s+([^>]+)>')
+        self.tag_pattern = re.compile(r'</?[^>]*>')
+        self.speaker_prefix_pattern = re.compile(r'^([A-ZА-ЯЁ][\w .\'-]{0,40}?):\s+(?=\S)')
+    
+    def parse(self, text: str, offset: int = 0) -> List[WebVTTCue]:
+        """Parse a complete transcript.
+        
+        Args:
+            text: WebVTT text
+            offset: Document position of the start of the text
+        
+        Returns:
+            List of cues in document order
+        """
+        return list(self.iter_cues([text], offset))
+    
+    def clean(self, text: str) -> str:
+        """Get the spoken text of a transcript without headers and timings.
+        
+        Args:
+            text: WebVTT text
+        
+        Returns:
+            Cue texts, one cue per line
+        """
+        return "\n".join(cue.text for cue in self.iter_cues([text]))
+    
+    def iter_cues(self, chunks: Iterable[str], offset: int = 0) -> Iterator[WebVTTCue]:
+        """Parse a transcript that arrives in chunks.
+        
+        Args:
+            chunks: Text chunks in document order
+            offset: Document position of the start of the first chunk
+        
+        Yields:
+            Cues in document order
+        """
+        block = []  # (line, position) pairs of the current block
+        block_has_timing = False
+        partial_line = ""
+        position = offset  # Document position of partial_line
+        
+        for chunk in itertools.chain(chunks, ["\n"]):
+            lines = (partial_line + chunk).split("\n")
+            partial_line = lines.pop()
+            
+            for line in lines:
+                line_position = position
+                position += len(line) + 1
+                line = line.rstrip("\r")
+                
+                if not line.strip():
+                    if block:
+                        cue = self._parse_block(block)
+                        if cue is not None:
+                            yield cue
+                    block = []
+                    block_has_timing = False
+                    continue
+                
+                if self.timing_pattern.match(line):
+                    # Tolerate cues that are not separated by blank lines
+                    if block_has_timing:
+                        identifier = [block.pop()] if len(block) > 2 and block[-1][0].strip().isdigit() else []
+                        cue = self._parse_block(block)
+                        if cue is not None:
+                            yield cue
+                        block = identifier
+                    block_has_timing = True
+                
+                block.append((line, line_position))
+        
+        if block:
+            cue = self._parse_block(block)
+            if cue is not None:
+                yield cue
+    
+    def _parse_block(self, block: List[tuple]) -> Optional[WebVTTCue]:
+        """Parse a block of non-empty lines.
+        
+        Args:
+            block: (line, document_position) pairs
+        
+        Returns:
+            The cue, or None if the block is not a cue
+        """
+        # The timing line is the first line, or the second after a cue identifier
+        timing_index = None
+        for i, (line, _) in enumerate(block[:2]):
+            if self.timing_pattern.match(line):
+                timing_index = i
+                break
+        
+        if timing_index is None:
+            # Header, NOTE, STYLE or REGION block
+            return None
+        
+        payload = block[timing_index + 1:]
+        if not payload:
+            return None
+        
+        match = self.timing_pattern.match(block[timing_index][0])
+        identifier = block[0][0].strip() if timing_index == 1 else None
+        
+        speaker = None
+        voice = self.voice_pattern.search(payload[0][0])
+        if voice:
+            speaker = voice.group(1).strip()
+        
+        lines = []
+        for line, _ in payload:
+            line = html.unescape(self.tag_pattern.sub("", line)).strip()
+            if line:
+                lines.append(line)
+        text = " ".join(lines)
+        
+        if speaker is None:
+            prefix = self.speaker_prefix_pattern.match(text)
+            if prefix:
+                speaker = prefix.group(1).strip()
+                text = text[prefix.end():]
+        
+        last_line, last_position = payload[-1]
+        return WebVTTCue(
+            text=text,
+            start_time=self._parse_time(match.group(1)),
+            end_time=self._parse_time(match.group(2)),
+            start_position=payload[0][1],
+            end_position=last_position + len(last_line),
+            speaker=speaker,
+            identifier=identifier
+        )
+    
+    def _parse_time(self, timestamp: str) -> float:
+        """Convert a WebVTT timestamp to seconds.
+        
+        Args:
+            timestamp: Timestamp such as "01:02:03.456" or "02:03.456"
+        
+        Returns:
+            Time in seconds
+        """
+        seconds = 0.0
+        for part in timestamp.replace(",", ".").split(":"):
+            seconds = seconds * 60 + float(part)
+        return seconds
@@ -8,13 +8,16 @@ from uuid import UUID
 import networkx as nx
 
 from ..models import KnowledgeGraph, Entity, Relationship, SourceSpan, TextSegment, SegmentCollection
-from ..llm import LLMProviderFactory, prompt_manager
+from ..llm import LLMProviderFactory, prompt_manager, CachedContext
 from ..llm.schemas import get_hypothesis_generation_schema
 from ..config import settings
 from .evidence import EvidenceCollector
 
 logger = logging.getLogger(__name__)
 
+# Stands in for the graph overview in prompts that get it from the cached context
+OVERVIEW_IN_CONTEXT = "(see the knowledge graph summary above)\n\n"
+
 
 class HypothesisGenerator:
     """Generates and tests hypotheses based on knowledge graphs.
@@ -36,16 +39,74 @@ class HypothesisGenerator:
         self.confidence_threshold = confidence_threshold
         self.evidence_collector = EvidenceCollector()
     
+    async def generate_and_test_hypotheses(self, 
+                                       graph: KnowledgeGraph,
+                                       collection: Optional[SegmentCollection] = None,
+                                       focus_entities: Optional[List[Entity]] = None,
+                                       max_hypotheses: int = 5) -> List[Dict[str, Any]]:
+        """Generate hypotheses from a knowledge graph and test each of them.
+        
+        The graph summary is sent to the provider once, as a cached context
+        shared by all prompts of the stage, and released at the end.
+        
+        Args:
+            graph: Knowledge graph to analyze
+            collection: Optional segment collection for evidence
+            focus_entities: Optional list of entities to focus on
+            max_hypotheses: Maximum number of hypotheses to generate
+        
+        Returns:
+            List of hypotheses, each with its test results under "test"
+        """
+        provider, cached_context = await self._create_overview_context(graph)
+        try:
+            hypotheses = await self.generate_hypotheses(graph, focus_entities, max_hypotheses,
+                                                        cached_context=cached_context)
+            for hypothesis in hypotheses:
+                hypothesis["test"] = await self.test_hypothesis(hypothesis, graph, collection,
+                                                                cached_context=cached_context)
+        finally:
+            if cached_context is not None:
+                await provider.release_cached_context(cached_context)
+        
+        return hypotheses
+    
+    async def _create_overview_context(self, graph: KnowledgeGraph) -> Tuple[Any, Optional[CachedContext]]:
+        """Create the cached context holding the graph summary.
+        
+        Args:
+            graph: Knowledge graph to analyze
+        
+        Returns:
+            (provider, cached_context) tuple; the context is None if it could
+            not be created
+        """
+        try:
+            provider = LLMProviderFactory.get_reasoning_provider()
+            if not provider:
+                provider = LLMProviderFactory.get_provider(self.provider_name)
+            if not provider:
+                return None, None
+            
+            graph_summary = self._create_graph_summary(graph)
+            return provider, await provider.create_cached_context(f"Knowledge graph summary:\n{graph_summary}")
+        except Exception as e:
+            logger.warning(f"Error creating cached context, sending graph summary with each prompt: {str(e)}")
+            return None, None
+    
     async def generate_hypotheses(self, 
                              graph: KnowledgeGraph,
                              focus_entities: Optional[List[Entity]] = None,
-                             max_hypotheses: int = 5) -> List[Dict[str, Any]]:
+                             max_hypotheses: int = 5,
+                             cached_context: Optional[CachedContext] = None) -> List[Dict[str, Any]]:
         """Generate hypotheses from a knowledge graph.
         
         Args:
             graph: Knowledge graph to analyze
             focus_entities: Optional list of entities to focus on
             max_hypotheses: Maximum number of hypotheses to generate
+            cached_context: Cached graph summary (without it, the summary is
+                sent with the prompt)
             
         Returns:
             List of generated hypotheses
@@ -65,7 +126,7 @@ class HypothesisGenerator:
             return []
         
         # Create a summary of the graph with focus on specific entities if provided
-        graph_summary = self._create_graph_summary(graph, focus_entities)
+        graph_summary = self._create_prompt_summary(graph, focus_entities, cached_context)
         
         # Get the response schema
         schema = get_hypothesis_generation_schema()
@@ -98,7 +159,7 @@ Generate hypotheses that provide genuinely useful insights and could lead to mea
         
         # Generate the hypotheses
         try:
-            response = await provider.generate_structured(prompt, schema)
+            response = await provider.generate_structured(prompt, schema, cached_context=cached_context)
             hypotheses_data = response.get("hypotheses", [])
             
             # Process the hypotheses
@@ -126,13 +187,16 @@ Generate hypotheses that provide genuinely useful insights and could lead to mea
     async def test_hypothesis(self, 
                          hypothesis: Dict[str, Any],
                          graph: KnowledgeGraph,
-                         collection: Optional[SegmentCollection] = None) -> Dict[str, Any]:
+                         collection: Optional[SegmentCollection] = None,
+                         cached_context: Optional[CachedContext] = None) -> Dict[str, Any]:
         """Test a hypothesis against the knowledge graph and source text.
         
         Args:
             hypothesis: Hypothesis to test
             graph: Knowledge graph to test against
             collection: Optional segment collection for evidence
+            cached_context: Cached graph summary (without it, the summary is
+                sent with the prompt)
             
         Returns:
             Test results
@@ -167,7 +231,7 @@ Generate hypotheses that provide genuinely useful insights and could lead to mea
                     focus_entities.append(entity)
                     break
         
-        graph_summary = self._create_graph_summary(graph, focus_entities)
+        graph_summary = self._create_prompt_summary(graph, focus_entities, cached_context)
         
         # Create a prompt for hypothesis testing
         prompt = f"""
@@ -198,7 +262,7 @@ Format your response as follows:
         
         # Test the hypothesis
         try:
-            response = await provider.generate_text(prompt)
+            response = await provider.generate_text(prompt, cached_context=cached_context)
             
             # Parse the response
             supported = False
@@ -284,6 +348,68 @@ Format your response as follows:
             logger.error(f"Error testing hypothesis: {str(e)}")
             return {"supported": False, "confidence": 0, "evidence": [], "reasoning": f"Error: {str(e)}"}
     
+    def _create_prompt_summary(self, 
+                           graph: KnowledgeGraph, 
+                           focus_entities: Optional[List[Entity]],
+                           cached_context: Optional[CachedContext]) -> str:
+        """Create the graph summary to put in a prompt.
+        
+        Args:
+            graph: Knowledge graph to summarize
+            focus_entities: Optional list of entities to focus on
+            cached_context: Cached graph summary (or None)
+        
+        Returns:
+            Full graph summary, or only the focus entities if the rest of the
+            summary is in the cached context
+        """
+        if cached_context is None:
+            return self._create_graph_summary(graph, focus_entities)
+        return OVERVIEW_IN_CONTEXT + self._create_focus_summary(graph, focus_entities)
+    
+    def _create_focus_summary(self, 
+                          graph: KnowledgeGraph, 
+                          focus_entities: Optional[List[Entity]]) -> str:
+        """Describe the focus entities of a summary with their attributes and relationships.
+        
+        Args:
+            graph: Knowledge graph to summarize
+            focus_entities: Entities to focus on
+        
+        Returns:
+            Focus entities section ("" without focus entities)
+        """
+        if not focus_entities:
+            return ""
+        
+        summary = "Focus entities:\n"
+        for entity in focus_entities:
+            summary += f"- {entity.name} (Type: {entity.type})\n"
+            
+            # Add attributes
+            if entity.attributes:
+                summary += "  Attributes:\n"
+                for attr in entity.attributes:
+                    summary += f"  - {attr.key}: {attr.value}\n"
+            
+            # Add relationships
+            connections = graph.get_entity_relationships(entity.id)
+            if connections:
+                summary += "  Relationships:\n"
+                for rel in connections[:5]:  # Limit to 5 relationships
+                    source = graph.get_entity(rel.source_id)
+                    target = graph.get_entity(rel.target_id)
+                    
+                    if source and target:
+                        if source.id == entity.id:
+                            summary += f"  - {entity.name} → {rel.type} → {target.name}\n"
+                        else:
+                            summary += f"  - {source.name} → {rel.type} → {entity.name}\n"
+        
+        summary += "\n"
+        
+        return summary
+    
     def _create_graph_summary(self, 
                           graph: KnowledgeGraph, 
                           focus_entities: Optional[List[Entity]] = None) -> str:
@@ -320,32 +446,7 @@ Format your response as follows:
         summary = f"A knowledge graph with {len(graph.entities)} entities and {len(graph.relationships)} relationships.\n\n"
         
         # If focus entities are provided, include them prominently
-        if focus_entities:
-            summary += "Focus entities:\n"
-            for entity in focus_entities:
-                summary += f"- {entity.name} (Type: {entity.type})\n"
-                
-                # Add attributes
-                if entity.attributes:
-                    summary += "  Attributes:\n"
-                    for attr in entity.attributes:
-                        summary += f"  - {attr.key}: {attr.value}\n"
-                
-                # Add relationships
-                connections = graph.get_entity_relationships(entity.id)
-                if connections:
-                    summary += "  Relationships:\n"
-                    for rel in connections[:5]:  # Limit to 5 relationships
-                        source = graph.get_entity(rel.source_id)
-                        target = graph.get_entity(rel.target_id)
-                        
-                        if source and target:
-                            if source.id == entity.id:
-                                summary += f"  - {entity.name} → {rel.type} → {target.name}\n"
-                            else:
-                                summary += f"  - {source.name} → {rel.type} → {entity.name}\n"
-            
-            summary += "\n"
+        summary += self._create_focus_summary(graph, focus_entities)
         
         # Add entity type summary
         summary += "Entity types:\n"
@@ -2,12 +2,13 @@
 
 import logging
 import asyncio
+import math
 from typing import Dict, List, Optional, Any, Set, Tuple
 from uuid import UUID
 
-import networkx as nx
-
-from ..models import KnowledgeGraph, Entity, Relationship, SourceSpan
+from ..models import KnowledgeGraph, Entity, Relationship, SourceSpan, GraphCore
+from ..graph.analysis import graph_analyzer
+from ..graph.motifs import mine_motifs
 from ..llm import LLMProviderFactory, prompt_manager
 from ..llm.schemas import get_pattern_identification_schema
 from ..config import settings
@@ -49,8 +50,8 @@ class PatternFinder:
         structural_patterns = await self._find_structural_patterns(graph)
         patterns.extend(structural_patterns)
         
-        # Find semantic patterns using LLM
-        semantic_patterns = await self._find_semantic_patterns(graph)
+        # Find semantic patterns using LLM, guided by the structural ones
+        semantic_patterns = await self._find_semantic_patterns(graph, structural_patterns)
         patterns.extend(semantic_patterns)
         
         # Filter patterns by confidence
@@ -65,117 +66,97 @@ class PatternFinder:
     async def _find_structural_patterns(self, graph: KnowledgeGraph) -> List[Dict[str, Any]]:
         """Find structural patterns in a knowledge graph.
         
+        Mines stars, typed paths, chains and triangles within the motif time
+        and memory budget, keeping the most surprising motifs of each kind.
+        
         Args:
             graph: Knowledge graph to analyze
             
         Returns:
-            List of structural patterns
+            List of structural patterns, most surprising first
         """
-        patterns = []
-        nx_graph = graph.to_networkx()
-        
-        # Check for starlike patterns (nodes with many connections)
-        degrees = dict(nx_graph.degree())
-        high_degree_nodes = sorted(degrees.items(), key=lambda x: x[1], reverse=True)[:5]
+        # The memo key holds exactly the settings the motifs are mined with
+        params = (settings.MOTIF_TOP_N, settings.MOTIF_MAX_SECONDS, settings.MOTIF_MAX_PAIRS)
+        motifs = graph_analyzer.memoize(graph, "motifs", params, lambda: mine_motifs(graph.core, *params))
         
-        for node_id, degree in high_degree_nodes:
-            if degree >= 5:  # Only consider high-degree nodes
-                entity = graph.get_entity(node_id)
-                if entity:
-                    # Get connecting entities
-                    connections = graph.get_connected_entities(node_id)
-                    connected_names = [e.name for e, _ in connections[:5]]
-                    
-                    pattern = {
-                        "name": f"Hub: {entity.name}",
-                        "type": "structural",
-                        "subtype": "hub",
-                        "description": f"{entity.name} is a central entity connected to many others",
-                        "entities": [str(node_id)],
-                        "examples": [
-                            {
-                                "text": f"{entity.name} is connected to {', '.join(connected_names[:3])}",
-                                "explanation": f"{entity.name} serves as a hub connecting multiple entities"
-                            }
-                        ],
-                        "confidence": 0.8
-                    }
-                    patterns.append(pattern)
+        core = graph.core
+        patterns = [self._motif_to_pattern(graph, core, motif) for motif in motifs]
+        logger.info(f"Found {len(patterns)} structural patterns")
+        return patterns
+    
+    def _motif_to_pattern(self, graph: KnowledgeGraph, core: GraphCore, motif: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a mined motif to a pattern.
         
-        # Check for clusters (densely connected components)
-        components = list(nx.weakly_connected_components(nx_graph))
-        for i, component in enumerate(components):
-            if len(component) >= 5:  # Only consider larger components
-                component_subgraph = nx_graph.subgraph(component)
-                density = nx.density(component_subgraph)
-                
-                if density >= 0.4:  # Only consider dense components
-                    # Get entities in this component
-                    component_entities = [graph.get_entity(node_id) for node_id in component]
-                    component_entities = [e for e in component_entities if e]
-                    
-                    if component_entities:
-                        # Get entity names and types
-                        entity_names = [e.name for e in component_entities[:5]]
-                        entity_types = set(e.type for e in component_entities)
-                        common_type = max(entity_types, key=lambda t: sum(1 for e in component_entities if e.type == t))
-                        
-                        pattern = {
-                            "name": f"Cluster of {common_type}",
-                            "type": "structural",
-                            "subtype": "cluster",
-                            "description": f"A densely connected group of {len(component)} entities, mostly of type {common_type}",
-                            "entities": [str(e.id) for e in component_entities[:10]],
-                            "examples": [
-                                {
-                                    "text": f"The cluster includes {', '.join(entity_names[:3])}",
-                                    "explanation": f"These entities form a cohesive group with many interconnections"
-                                }
-                            ],
-                            "confidence": 0.7 + (density * 0.3)  # Higher confidence for denser clusters
-                        }
-                        patterns.append(pattern)
+        Args:
+            graph: Knowledge graph the motif was mined from
+            core: Array core of the graph
+            motif: Motif from mine_motifs()
+            
+        Returns:
+            Structural pattern
+        """
+        entities = [graph.get_entity(core.node_ids[node]) for node in motif["nodes"]]
+        names = [entity.name for entity in entities]
+        signature = motif["signature"]
+        ratio = motif["count"] / max(motif["expected"], 1e-9)
         
-        # Check for chains (path-like structures)
-        for source, target in nx.dfs_edges(nx_graph.to_undirected()):
-            # Find paths between these nodes
-            try:
-                paths = list(nx.all_simple_paths(nx_graph, source, target, cutoff=4))
-                for path in paths:
-                    if len(path) >= 4:  # Only consider longer paths
-                        # Get entities in this path
-                        path_entities = [graph.get_entity(node_id) for node_id in path]
-                        path_entities = [e for e in path_entities if e]
-                        
-                        if len(path_entities) >= 4:
-                            # Get entity names
-                            entity_names = [e.name for e in path_entities]
-                            
-                            pattern = {
-                                "name": f"Chain: {entity_names[0]} to {entity_names[-1]}",
-                                "type": "structural",
-                                "subtype": "chain",
-                                "description": f"A sequential path of {len(path)} entities",
-                                "entities": [str(e.id) for e in path_entities],
-                                "examples": [
-                                    {
-                                        "text": f"{' → '.join(entity_names)}",
-                                        "explanation": f"These entities form a sequential chain of relationships"
-                                    }
-                                ],
-                                "confidence": 0.7
-                            }
-                            patterns.append(pattern)
-            except nx.NetworkXNoPath:
-                continue
+        if motif["kind"] == "star":
+            name = f"Hub: {names[0]}"
+            subtype = "hub"
+            description = (f"{names[0]} ({signature[0]}) is connected to {motif['count']} entities, "
+                           f"{ratio:.1f} times the average, mostly of type {signature[1]}")
+            text = f"{names[0]} is connected to {', '.join(names[1:4])}"
+            explanation = f"{names[0]} serves as a hub connecting multiple entities"
+        elif motif["kind"] == "triangle":
+            name = f"Cluster of {', '.join(signature)}"
+            subtype = "cluster"
+            description = (f"{motif['count']} triangles connect entities of types {', '.join(signature)}, "
+                           f"{ratio:.1f} times as many as expected")
+            text = f"{names[0]}, {names[1]} and {names[2]} are all connected to each other"
+            explanation = "These entities form a cohesive group with many interconnections"
+        elif motif["kind"] == "chain":
+            name = f"Chain: {signature[0]} {signature[1]} {signature[2]} {signature[3]} {signature[4]}"
+            subtype = "chain"
+            description = (f"{motif['count']} sequences of a {signature[0]} that {signature[1]} a {signature[2]} "
+                           f"that {signature[3]} a {signature[4]}, {ratio:.1f} times as many as expected")
+            text = " → ".join(names)
+            explanation = "These entities form a sequential chain of relationships"
+        else:
+            name = f"Typed path: {signature[0]} {signature[1]} {signature[2]}"
+            subtype = "typed_path"
+            description = (f"{motif['count']} relationships of type {signature[1]} from {signature[0]} "
+                           f"to {signature[2]}, {ratio:.1f} times as many as expected")
+            text = f"{names[0]} {signature[1]} {names[1]}"
+            explanation = f"{signature[1]} relationships tend to connect {signature[0]} to {signature[2]}"
         
-        return patterns
+        return {
+            "name": name,
+            "type": "structural",
+            "subtype": subtype,
+            "description": description,
+            "entities": [str(entity.id) for entity in entities],
+            "examples": [
+                {
+                    "text": text,
+                    "explanation": explanation
+                }
+            ],
+            # Probability of a surprise this large or smaller under the random model
+            "confidence": 0.5 * (1 + math.erf(motif["surprise"] / math.sqrt(2))),
+            "surprise": motif["surprise"],
+            "count": motif["count"],
+            "expected_count": motif["expected"]
+        }
     
-    async def _find_semantic_patterns(self, graph: KnowledgeGraph) -> List[Dict[str, Any]]:
+    async def _find_semantic_patterns(self,
+                                   graph: KnowledgeGraph,
+                                   structural_patterns: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """Find semantic patterns in a knowledge graph using LLM.
         
         Args:
             graph: Knowledge graph to analyze
+            structural_patterns: Structural patterns to include in the prompt,
+                most surprising first
             
         Returns:
             List of semantic patterns
@@ -245,6 +226,13 @@ class PatternFinder:
                 if example_texts:
                     graph_summary += "  Examples: " + ", ".join(example_texts) + "\n"
         
+        # Add the most surprising structural patterns
+        if structural_patterns:
+            graph_summary += "\nStructural patterns (most surprising first):\n"
+            for pattern in structural_patterns[:settings.MOTIF_TOP_N]:
+                graph_summary += f"- {pattern['description']}\n"
+                graph_summary += f"  Example: {pattern['examples'][0]['text']}\n"
+        
         # Create a prompt for pattern identification
         prompt = f"""
 Analyze the following knowledge graph summary and identify meaningful patterns. These patterns can be semantic, narrative, or relational in nature.
@@ -6,14 +6,21 @@ from typing import Dict, List, Optional, Any, Set, Tuple
 from uuid import UUID
 
 from ..models import KnowledgeGraph, Entity, Relationship, SourceSpan, TextSegment, SegmentCollection
-from ..llm import LLMProviderFactory, prompt_manager
+from ..llm import LLMProviderFactory, prompt_manager, CachedContext
 from ..llm.schemas import get_theory_generation_schema
 from .pattern_finder import PatternFinder
 from ..config import settings
+from ..text.language import language_detector
 from .evidence import EvidenceCollector
 
 logger = logging.getLogger(__name__)
 
+# Stands in for the graph summary in prompts that get it from the cached context
+SUMMARY_IN_CONTEXT = {
+    "en": "(see the knowledge graph summary above)",
+    "ru": "(см. сводку графа знаний выше)",
+}
+
 
 class TheoryGenerator:
     """Generates theories from knowledge graphs.
@@ -54,8 +61,15 @@ class TheoryGenerator:
         # Find patterns in the graph
         patterns = await self.pattern_finder.find_patterns(graph)
         
+        # The graph summary is sent once and shared by all prompts of the stage
+        provider, cached_context = await self._create_summary_context(graph, patterns)
+        
         # Generate theories based on patterns
-        theories = await self._generate_theories_from_patterns(graph, patterns, collection)
+        try:
+            theories = await self._generate_theories_from_patterns(graph, patterns, collection, cached_context)
+        finally:
+            if cached_context is not None:
+                await provider.release_cached_context(cached_context)
         
         # Sort theories by confidence
         theories.sort(key=lambda t: t.get("confidence", 0), reverse=True)
@@ -69,16 +83,45 @@ class TheoryGenerator:
         # Limit to requested number
         return filtered_theories[:max_theories]
     
+    async def _create_summary_context(self, 
+                                  graph: KnowledgeGraph,
+                                  patterns: List[Dict[str, Any]]) -> Tuple[Any, Optional[CachedContext]]:
+        """Create the cached context holding the graph summary.
+        
+        Args:
+            graph: Knowledge graph to analyze
+            patterns: List of identified patterns
+        
+        Returns:
+            (provider, cached_context) tuple; the context is None if it could
+            not be created
+        """
+        try:
+            provider = LLMProviderFactory.get_reasoning_provider()
+            if not provider:
+                provider = LLMProviderFactory.get_provider(self.provider_name)
+            if not provider:
+                return None, None
+            
+            graph_summary = self._create_graph_summary(graph, patterns)
+            return provider, await provider.create_cached_context(f"Knowledge graph summary:\n{graph_summary}")
+        except Exception as e:
+            logger.warning(f"Error creating cached context, sending graph summary with each prompt: {str(e)}")
+            return None, None
+    
     async def _generate_theories_from_patterns(self,
                                          graph: KnowledgeGraph,
                                          patterns: List[Dict[str, Any]],
-                                         collection: Optional[SegmentCollection]) -> List[Dict[str, Any]]:
+                                         collection: Optional[SegmentCollection],
+                                         cached_context: Optional[CachedContext] = None) -> List[Dict[str, Any]]:
         """Generate theories based on identified patterns.
         
         Args:
             graph: Knowledge graph to analyze
             patterns: List of identified patterns
             collection: Optional segment collection for evidence
+            cached_context: Cached graph summary (without it, the summary is
+                sent with each prompt)
             
         Returns:
             List of generated theories
@@ -102,16 +145,16 @@ class TheoryGenerator:
             logger.error(f"Error getting LLM provider: {str(e)}")
             return []
         
-        # Create a summary of the graph
-        graph_summary = self._create_graph_summary(graph, patterns)
-        
         # Определяем язык для промпта по содержимому графа
-        prompt_language = "en"  # По умолчанию
         # Проверяем наличие русских символов в названиях сущностей
-        for entity in graph.entities.values():
-            if any(ord('а') <= ord(c) <= ord('я') or ord('А') <= ord(c) <= ord('Я') for c in entity.name):
-                prompt_language = "ru"
-                break
+        entity_names = "".join(entity.name for entity in graph.entities.values())
+        prompt_language = "ru" if language_detector.has_cyrillic(entity_names) else "en"
+        
+        # Create a summary of the graph
+        if cached_context is not None:
+            graph_summary = SUMMARY_IN_CONTEXT[prompt_language]
+        else:
+            graph_summary = self._create_graph_summary(graph, patterns)
         
         # Perform preliminary free-form analysis with thinking model if available
         preliminary_insights = ""
@@ -129,7 +172,8 @@ class TheoryGenerator:
                 """
                 
                 # Get free-form analysis from thinking model
-                preliminary_insights = await thinking_provider.generate_text(preliminary_prompt)
+                preliminary_insights = await thinking_provider.generate_text(preliminary_prompt,
+                                                                         cached_context=cached_context)
                 logger.info("Generated preliminary insights with thinking model")
             except Exception as e:
                 logger.warning(f"Error during preliminary analysis: {str(e)}")
@@ -227,7 +271,7 @@ IMPORTANT: Your theory should be deep, well-reasoned, and informative. It should
         
         # Generate the theory
         try:
-            response = await provider.generate_structured(prompt, schema)
+            response = await provider.generate_structured(prompt, schema, cached_context=cached_context)
             theory_data = response.get("theory", {})
             
             # Process the theory
@@ -259,7 +303,7 @@ IMPORTANT: Your theory should be deep, well-reasoned, and informative. It should
                 
                 # Generate alternative theories
                 alternative_theories = await self._generate_alternative_theories(
-                    graph, theory, patterns, collection
+                    graph, theory, patterns, collection, cached_context
                 )
                 
                 # Return all theories
@@ -275,7 +319,8 @@ IMPORTANT: Your theory should be deep, well-reasoned, and informative. It should
                                         graph: KnowledgeGraph,
                                         primary_theory: Dict[str, Any],
                                         patterns: List[Dict[str, Any]],
-                                        collection: Optional[SegmentCollection]) -> List[Dict[str, Any]]:
+                                        collection: Optional[SegmentCollection],
+                                        cached_context: Optional[CachedContext] = None) -> List[Dict[str, Any]]:
         """Generate alternative theories that explain the same evidence.
         
         Args:
@@ -283,6 +328,8 @@ IMPORTANT: Your theory should be deep, well-reasoned, and informative. It should
             primary_theory: The primary theory to provide alternatives to
             patterns: List of identified patterns
             collection: Optional segment collection for evidence
+            cached_context: Cached graph summary (without it, the summary is
+                sent with each prompt)
             
         Returns:
             List of alternative theories
@@ -305,16 +352,16 @@ IMPORTANT: Your theory should be deep, well-reasoned, and informative. It should
         title = primary_theory.get("title", "")
         summary = primary_theory.get("summary", "")
         
-        # Create a graph summary
-        graph_summary = self._create_graph_summary(graph, patterns)
-        
         # Определяем язык для промпта по содержимому графа
-        prompt_language = "en"  # По умолчанию
         # Проверяем наличие русских символов в названиях сущностей
-        for entity in graph.entities.values():
-            if any(ord('а') <= ord(c) <= ord('я') or ord('А') <= ord(c) <= ord('Я') for c in entity.name):
-                prompt_language = "ru"
-                break
+        entity_names = "".join(entity.name for entity in graph.entities.values())
+        prompt_language = "ru" if language_detector.has_cyrillic(entity_names) else "en"
+        
+        # Create a graph summary
+        if cached_context is not None:
+            graph_summary = SUMMARY_IN_CONTEXT[prompt_language]
+        else:
+            graph_summary = self._create_graph_summary(graph, patterns)
                 
         # Create a prompt for alternative theory generation with enhanced depth
         if prompt_language == "ru":
@@ -409,7 +456,7 @@ IMPORTANT: Develop a comprehensive alternative theory based solely on the inform
         
         # Generate the alternative theory
         try:
-            response = await provider.generate_structured(prompt, schema)
+            response = await provider.generate_structured(prompt, schema, cached_context=cached_context)
             theory_data = response.get("theory", {})
             
             # Process the theory
@@ -24,6 +24,7 @@ from src.knowledge_graph_synth.models.relationship import Relationship
 from src.knowledge_graph_synth.models.provenance import SourceSpan
 from src.knowledge_graph_synth.graph.expansion_report import ExpansionReportGenerator
 from src.knowledge_graph_synth.cli.fix_segment_links import ensure_segment_pages
+from src.knowledge_graph_synth.output.artifacts import find_artifact, read_artifacts
 
 # Test data for expansion report
 TEST_EXPANSION_DATA = {
@@ -95,9 +96,8 @@ TEST_EXPANSION_DATA = {
 }
 
 def load_entities(json_path):
-    """Load entities from JSON file."""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        entities_data = json.load(f)
+    """Load entities from a JSON Lines file."""
+    entities_data = list(read_artifacts(json_path))
     
     entities = []
     for entity_data in entities_data:
@@ -121,9 +121,8 @@ def load_entities(json_path):
     return entities
 
 def load_relationships(json_path):
-    """Load relationships from JSON file."""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        relationships_data = json.load(f)
+    """Load relationships from a JSON Lines file."""
+    relationships_data = list(read_artifacts(json_path))
     
     relationships = []
     for rel_data in relationships_data:
@@ -151,10 +150,10 @@ def load_relationships(json_path):
 def generate_report(output_dir):
     """Generate the main HTML report."""
     # Load entities and relationships
-    entities_path = os.path.join(output_dir, "entities", "all_entities.json")
-    relationships_path = os.path.join(output_dir, "relationships", "all_relationships.json")
+    entities_path = find_artifact(os.path.join(output_dir, "entities"), "all_entities")
+    relationships_path = find_artifact(os.path.join(output_dir, "relationships"), "all_relationships")
     
-    if not os.path.exists(entities_path) or not os.path.exists(relationships_path):
+    if not entities_path or not relationships_path:
         logger.error(f"Required files not found in {output_dir}")
         return False
     
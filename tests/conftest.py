@@ -0,0 +1,7 @@
+"""Test configuration for the knowledge graph synthesis system."""
+
+import os
+import sys
+
+# Make the package importable without installing it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
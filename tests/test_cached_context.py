@@ -0,0 +1,115 @@
+"""Tests for sharing cached contexts across the LLM calls of a stage."""
+
+import asyncio
+
+import pytest
+
+from knowledge_graph_synth.extraction import EntityExtractor, RelationshipExtractor
+from knowledge_graph_synth.graph.expansion import GraphExpander
+from knowledge_graph_synth.llm import CachedContext, LLMProvider, LLMProviderFactory
+from knowledge_graph_synth.models import Entity, KnowledgeGraph, Relationship, SourceSpan
+from knowledge_graph_synth.models.segment import SegmentCollection, TextSegment
+from knowledge_graph_synth.theory.hypothesis import HypothesisGenerator
+from knowledge_graph_synth.theory.theory_generator import TheoryGenerator
+
+
+class RecordingProvider(LLMProvider):
+    """Provider that records the cached contexts it creates and is called with."""
+    
+    def __init__(self):
+        super().__init__({})
+        self.created = []
+        self.released = []
+        self.calls = []
+    
+    def name(self) -> str:
+        return "recording"
+    
+    async def create_cached_context(self, content, model=None, ttl_seconds=None):
+        cached_context = CachedContext(content, model)
+        self.created.append(cached_context)
+        return cached_context
+    
+    async def release_cached_context(self, cached_context):
+        self.released.append(cached_context)
+    
+    async def generate_text(self, prompt, model=None, cached_context=None, **kwargs):
+        self.calls.append(cached_context)
+        return "1. What else?\nAnswer: Alice knows Bob.\nSupported: yes\nConfidence: 0.9"
+    
+    async def generate_structured(self, prompt, response_schema, model=None, cached_context=None, **kwargs):
+        self.calls.append(cached_context)
+        return {"hypotheses": [{"statement": "Alice trusts Bob", "confidence": 0.9}],
+                "theory": {"title": "Friends", "confidence": 0.9}}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = RecordingProvider()
+    monkeypatch.setattr(LLMProviderFactory, "get_reasoning_provider", classmethod(lambda cls: provider))
+    monkeypatch.setattr(LLMProviderFactory, "get_thinking_provider", classmethod(lambda cls: None))
+    return provider
+
+
+@pytest.fixture
+def story():
+    collection = SegmentCollection()
+    segment = TextSegment(text="Alice met Bob in Paris.", start_position=0, end_position=23)
+    collection.add_segment(segment)
+    
+    graph = KnowledgeGraph()
+    entities = [
+        Entity(name=name, type="person", confidence=0.9,
+               source_span=SourceSpan(segment_id=str(segment.id), start=0, end=5, text=name))
+        for name in ("Alice", "Bob", "Carol")
+    ]
+    for entity in entities:
+        graph.add_entity(entity)
+    for source, target in ((0, 1), (1, 2)):
+        graph.add_relationship(Relationship(source_id=entities[source].id, target_id=entities[target].id,
+                                            type="knows", confidence=0.9,
+                                            source_span=SourceSpan(start=0, end=5, text="x")))
+    return graph, collection
+
+
+def assert_one_context(provider, calls):
+    assert len(provider.created) == 1
+    assert provider.released == provider.created
+    assert len(calls) > 1
+    assert all(cached_context is provider.created[0] for cached_context in calls)
+
+
+def test_hypothesis_stage_shares_one_context(provider, story):
+    graph, collection = story
+    hypotheses = asyncio.run(HypothesisGenerator().generate_and_test_hypotheses(graph, collection))
+    
+    assert hypotheses and hypotheses[0]["test"]["supported"]
+    assert_one_context(provider, provider.calls)
+
+
+def test_theory_stage_shares_one_context(provider, story):
+    graph, collection = story
+    generator = TheoryGenerator()
+    
+    async def no_patterns(graph):
+        return []
+    
+    generator.pattern_finder.find_patterns = no_patterns
+    theories = asyncio.run(generator.generate_theories(graph, collection))
+    
+    assert theories
+    assert_one_context(provider, provider.calls)
+
+
+def test_expansion_iteration_shares_one_context(provider, story, monkeypatch):
+    async def extract_nothing(self, *args, **kwargs):
+        return []
+    
+    monkeypatch.setattr(EntityExtractor, "extract_from_segment", extract_nothing)
+    monkeypatch.setattr(RelationshipExtractor, "extract_from_segment", extract_nothing)
+    
+    graph, collection = story
+    asyncio.run(GraphExpander().expand_graph(graph, collection, max_iterations=1))
+    
+    assert_one_context(provider, provider.calls)
+    assert "Alice met Bob in Paris." in provider.created[0].content
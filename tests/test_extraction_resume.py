@@ -0,0 +1,267 @@
+"""Tests for resuming an interrupted extraction run."""
+
+import asyncio
+
+import pytest
+
+from knowledge_graph_synth.config import settings
+from knowledge_graph_synth.extraction.coreference import CoreferenceResolver
+from knowledge_graph_synth.extraction.entity_extractor import EntityExtractor
+from knowledge_graph_synth.extraction.grounding import Grounder
+from knowledge_graph_synth.extraction.pipeline import ExtractionPipeline
+from knowledge_graph_synth.extraction.relation_extractor import RelationshipExtractor
+from knowledge_graph_synth.llm import LLMProvider, LLMProviderFactory
+from knowledge_graph_synth.llm.budget import BudgetExceededError
+from knowledge_graph_synth.llm.cascade import model_cascade
+from knowledge_graph_synth.models import Entity, Relationship, SourceSpan
+from knowledge_graph_synth.models.segment import SegmentCollection, TextSegment
+from knowledge_graph_synth.output.artifacts import find_artifact, read_artifacts
+
+TEXTS = ["Alice met Bob.", "Bob works at Acme.", "Acme is in Paris.", "Paris is in France."]
+
+
+def segment_text(texts=TEXTS):
+    """Segment the test text; every call creates new segment IDs, as a new run does."""
+    collection = SegmentCollection()
+    position = 0
+    for text in texts:
+        collection.add_segment(TextSegment(text=text, document_id="doc", start_position=position,
+                                           end_position=position + len(text)))
+        position += len(text) + 1
+    return collection
+
+
+def entities_of(batch):
+    """Extract one entity per segment."""
+    return [
+        Entity(name=segment.text.split()[0], type="thing", confidence=0.9,
+               source_span=SourceSpan(document_id=segment.document_id, segment_id=str(segment.id),
+                                      start=0, end=len(segment.text), text=segment.text))
+        for segment in batch
+    ]
+
+
+@pytest.fixture(autouse=True)
+def one_segment_batches(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MEGA_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "LLM_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "LLM_DELAY_BETWEEN_REQUESTS", 0)
+
+
+def test_resume_extracts_remaining_segments(tmp_path, monkeypatch):
+    extracted = []
+    
+    async def interrupted(self, batch):
+        if extracted:
+            raise RuntimeError("connection lost")
+        extracted.extend(segment.text for segment in batch)
+        return entities_of(batch)
+    
+    monkeypatch.setattr(EntityExtractor, "extract_from_mega_batch", interrupted)
+    monkeypatch.setattr(EntityExtractor, "extract_from_batch", interrupted)
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(EntityExtractor().extract_from_collection(segment_text(), output_dir=str(tmp_path)))
+    assert extracted == TEXTS[:1]
+    
+    async def complete(self, batch):
+        extracted.extend(segment.text for segment in batch)
+        return entities_of(batch)
+    
+    monkeypatch.setattr(EntityExtractor, "extract_from_mega_batch", complete)
+    
+    collection = segment_text()
+    entities = asyncio.run(EntityExtractor().extract_from_collection(collection, output_dir=str(tmp_path),
+                                                                     resume=True))
+    
+    # Only the segments of the interrupted run that were not done are extracted again
+    assert extracted == TEXTS
+    assert sorted(entity.name for entity in entities) == sorted(text.split()[0] for text in TEXTS)
+    
+    # Restored entities point at the segments of the resumed run
+    segment_ids = {str(segment.id) for segment in collection.segments.values()}
+    assert {entity.source_span.segment_id for entity in entities} == segment_ids
+    
+    records = list(read_artifacts(find_artifact(str(tmp_path), "all_entities")))
+    assert len(records) == len(TEXTS)
+    assert {record["source_span"]["segment_id"] for record in records} == segment_ids
+
+
+def test_resume_extracts_changed_segments_again(tmp_path, monkeypatch):
+    async def extract(self, batch):
+        return entities_of(batch)
+    
+    monkeypatch.setattr(EntityExtractor, "extract_from_mega_batch", extract)
+    asyncio.run(EntityExtractor().extract_from_collection(segment_text(), output_dir=str(tmp_path)))
+    
+    changed = [text.upper() for text in TEXTS]
+    collection = segment_text(changed)
+    
+    entities = asyncio.run(EntityExtractor().extract_from_collection(collection, output_dir=str(tmp_path),
+                                                                     resume=True))
+    assert sorted(entity.name for entity in entities) == sorted(text.split()[0] for text in changed)
+
+
+class BudgetProvider(LLMProvider):
+    """Provider that answers a number of calls and then refuses as if the budget ran out."""
+    
+    def __init__(self, calls):
+        super().__init__({})
+        self.calls = calls
+        self.prompts = []
+    
+    def name(self) -> str:
+        return "budget"
+    
+    async def generate_text(self, prompt, model=None, cached_context=None, **kwargs):
+        raise NotImplementedError
+    
+    async def generate_structured(self, prompt, response_schema, model=None, cached_context=None, **kwargs):
+        if len(self.prompts) >= self.calls:
+            raise BudgetExceededError("Token budget exhausted")
+        self.prompts.append(prompt)
+        text = next(text for text in TEXTS if text in prompt)
+        return {"segments": [{"segment_id": "S1", "entities": [
+            {"name": text.split()[0], "type": "thing", "confidence": 0.9,
+             "source_span": {"start": 0, "end": len(text), "text": text}}
+        ]}]}
+
+
+def test_resume_extracts_segments_skipped_for_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cascade, "enabled", False)
+    provider = BudgetProvider(calls=2)
+    monkeypatch.setattr(LLMProviderFactory, "get_provider", classmethod(lambda cls, name=None: provider))
+    
+    entities = asyncio.run(EntityExtractor().extract_from_collection(segment_text(), output_dir=str(tmp_path)))
+    assert sorted(entity.name for entity in entities) == ["Alice", "Bob"]
+    
+    # The segments skipped when the budget ran out are extracted by the resumed run
+    provider.calls = len(TEXTS)
+    entities = asyncio.run(EntityExtractor().extract_from_collection(segment_text(), output_dir=str(tmp_path),
+                                                                     resume=True))
+    assert len(provider.prompts) == len(TEXTS)
+    assert sorted(entity.name for entity in entities) == sorted(text.split()[0] for text in TEXTS)
+
+
+STORY = ["Alice met Bob and Alice left.", "Bob hired Dave at Acme.", "Erin visited Acme in Paris.",
+         "Frank left Paris for France."]
+
+
+def mentions_of(batch):
+    """Extract every capitalized word of each segment as an entity."""
+    entities = []
+    for segment in batch:
+        position = 0
+        for word in segment.text.rstrip(".").split():
+            start = segment.text.index(word, position)
+            position = start + len(word)
+            if word[0].isupper():
+                entities.append(Entity(name=word, type="thing", confidence=0.9,
+                                       source_span=SourceSpan(document_id=segment.document_id,
+                                                              segment_id=str(segment.id), start=start,
+                                                              end=position, text=word)))
+    return entities
+
+
+def relationships_of(batch, entities_by_segment):
+    """Relate the first two entities of each segment."""
+    relationships = []
+    for segment in batch:
+        source, target = entities_by_segment[segment.id][:2]
+        relationships.append(Relationship(source_id=source.id, target_id=target.id, type="related_to",
+                                          confidence=0.9,
+                                          source_span=SourceSpan(document_id=segment.document_id,
+                                                                 segment_id=str(segment.id), start=0,
+                                                                 end=len(segment.text), text=segment.text)))
+    return relationships
+
+
+def run_extraction(tmp_path, resume):
+    """Run entity extraction, coreference resolution, grounding and relationship extraction like the CLI."""
+    collection = segment_text(STORY)
+    entities = asyncio.run(EntityExtractor().extract_from_collection(collection, output_dir=str(tmp_path / "entities"),
+                                                                     resume=resume))
+    grounder = Grounder()
+    grounded_entities = grounder.ground_entities(CoreferenceResolver().resolve_entities(entities), collection)
+    relationships = asyncio.run(RelationshipExtractor().extract_from_collection(
+        collection, grounded_entities, output_dir=str(tmp_path / "relationships"), resume=resume
+    ))
+    entity_map = {entity.id: entity for entity in grounded_entities}
+    return relationships, grounder.ground_relationships(relationships, entity_map, collection)
+
+
+def test_resumed_relationships_point_at_merged_entities(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MEGA_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "LLM_BATCH_SIZE", 2)
+    
+    async def extract_entities(self, batch):
+        return mentions_of(batch)
+    
+    related = []
+    
+    async def interrupted(self, batch, entities_by_segment):
+        if related:
+            raise RuntimeError("connection lost")
+        related.extend(batch)
+        return relationships_of(batch, entities_by_segment)
+    
+    monkeypatch.setattr(EntityExtractor, "extract_from_mega_batch", extract_entities)
+    monkeypatch.setattr(RelationshipExtractor, "extract_from_mega_batch", interrupted)
+    monkeypatch.setattr(RelationshipExtractor, "extract_from_batch", interrupted)
+    with pytest.raises(RuntimeError):
+        run_extraction(tmp_path, resume=False)
+    assert len(related) == 1
+    
+    async def complete(self, batch, entities_by_segment):
+        related.extend(batch)
+        return relationships_of(batch, entities_by_segment)
+    
+    monkeypatch.setattr(RelationshipExtractor, "extract_from_mega_batch", complete)
+    relationships, grounded = run_extraction(tmp_path, resume=True)
+    
+    # The relationship restored from the interrupted run is grounded like the new ones
+    assert len(related) == len(relationships) > 1
+    assert len(grounded) == len(relationships)
+
+
+def test_pipeline_resumes_from_completed_batches(tmp_path, monkeypatch):
+    extracted, related = [], []
+    
+    async def extract_entities(self, batch):
+        extracted.extend(segment.text for segment in batch)
+        return mentions_of(batch)
+    
+    async def interrupted(self, batch, entities_by_segment):
+        if related:
+            raise RuntimeError("connection lost")
+        related.extend(segment.text for segment in batch)
+        return relationships_of(batch, entities_by_segment)
+    
+    def run_pipeline(resume):
+        collection = segment_text(STORY)
+        leaf_segments = iter(list(collection.segments.values()))
+        pipeline = ExtractionPipeline(batch_size=1, queue_size=1, entity_workers=1)
+        return asyncio.run(pipeline.run(leaf_segments, collection, entities_dir=str(tmp_path / "entities"),
+                                        relationships_dir=str(tmp_path / "relationships"), resume=resume))
+    
+    monkeypatch.setattr(EntityExtractor, "extract_from_mega_batch", extract_entities)
+    monkeypatch.setattr(RelationshipExtractor, "extract_from_mega_batch", interrupted)
+    with pytest.raises(RuntimeError):
+        run_pipeline(resume=False)
+    assert len(related) == 1
+    interrupted_extractions = len(extracted)
+    
+    async def complete(self, batch, entities_by_segment):
+        related.extend(segment.text for segment in batch)
+        return relationships_of(batch, entities_by_segment)
+    
+    monkeypatch.setattr(RelationshipExtractor, "extract_from_mega_batch", complete)
+    entities, relationships = run_pipeline(resume=True)
+    
+    # Every segment is extracted once over both runs, and the relationships of both runs are kept
+    assert sorted(extracted) == sorted(STORY)
+    assert interrupted_extractions > 1
+    assert sorted(related) == sorted(STORY)
+    assert len(relationships) == len(STORY)
+    entity_ids = {entity.id for entity in entities}
+    assert all({rel.source_id, rel.target_id} <= entity_ids for rel in relationships)
@@ -0,0 +1,37 @@
+"""Tests for graph statistics on the NetworkX and sparse backends."""
+
+import random
+
+import pytest
+
+from knowledge_graph_synth.config import settings
+from knowledge_graph_synth.graph.analysis import GraphAnalyzer
+from knowledge_graph_synth.models import Entity, KnowledgeGraph, Relationship, SourceSpan
+
+
+def random_graph(seed, num_entities=300, num_relationships=901):
+    """Build a graph with parallel, reversed and self-referencing relationships."""
+    rng = random.Random(seed)
+    span = SourceSpan(document_id="doc", start=0, end=1, text="x")
+    entities = [Entity(name=f"Entity {index}", type=rng.choice(["person", "place"]), confidence=0.9,
+                       source_span=span)
+                for index in range(num_entities)]
+    pairs = [(rng.choice(entities), rng.choice(entities)) for _ in range(num_relationships - 1)]
+    pairs.append(pairs[0])
+    relationships = [Relationship(source_id=source.id, target_id=target.id, type="knows", confidence=0.8,
+                                  source_span=span)
+                     for source, target in pairs]
+    return KnowledgeGraph.from_records(entities, relationships)
+
+
+def test_backends_agree_on_statistics(monkeypatch):
+    graph = random_graph(0)
+    
+    monkeypatch.setattr(settings, "GRAPH_ANALYTICS_BACKEND", "networkx")
+    expected = GraphAnalyzer().get_graph_statistics(graph)
+    monkeypatch.setattr(settings, "GRAPH_ANALYTICS_BACKEND", "scipy")
+    statistics = GraphAnalyzer().get_graph_statistics(graph)
+    
+    assert expected["avg_clustering"] is not None
+    for key, value in expected.items():
+        assert statistics[key] == (pytest.approx(value) if isinstance(value, float) else value), key
@@ -0,0 +1,77 @@
+"""Tests for the adjacency index of knowledge graphs."""
+
+import random
+
+import numpy as np
+
+from knowledge_graph_synth.models import Entity, GraphCore, KnowledgeGraph, Relationship, SourceSpan
+
+SPAN = SourceSpan(document_id="doc", start=0, end=1, text="x")
+
+
+def entity(rng, index):
+    return Entity(name=f"Entity {index}", type=rng.choice(["person", "place", "event"]),
+                  confidence=rng.choice([0.5, 1.0]), source_span=SPAN)
+
+
+def relationship(rng, entities):
+    source, target = rng.choice(entities), rng.choice(entities)
+    return Relationship(source_id=source.id, target_id=target.id, type=rng.choice(["knows", "visits", "owns"]),
+                        confidence=rng.choice([0.5, 1.0]), source_span=SPAN)
+
+
+def structure(core):
+    """Describe a core by IDs and type names, independent of codes and capacity."""
+    nodes = [(node_id, name, core.type_names[code], float(confidence))
+             for node_id, name, code, confidence in zip(core.node_ids, core.node_names, core.node_types,
+                                                        core.node_confidence)]
+    edges = [(edge_id, core.node_ids[source], core.node_ids[target], core.edge_type_names[code], float(confidence))
+             for edge_id, source, target, code, confidence in zip(core.edge_ids, core.edge_sources,
+                                                                  core.edge_targets, core.edge_types,
+                                                                  core.edge_confidence)]
+    adjacency = [(core.out_edges(node).tolist(), core.in_edges(node).tolist()) for node in range(core.num_nodes)]
+    return nodes, edges, adjacency
+
+
+def test_core_is_updated_by_additions():
+    rng = random.Random(0)
+    graph = KnowledgeGraph()
+    entities = []
+    core = graph.core
+    
+    # Queries between additions see every addition without rebuilding the core
+    for index in range(300):
+        entities.append(entity(rng, index))
+        graph.add_entity(entities[-1])
+        for _ in range(3):
+            graph.add_relationship(relationship(rng, entities))
+        
+        probe = rng.choice(entities)
+        expected = [rel for rel in graph.relationships.values() if rel.source_id == probe.id] + \
+            [rel for rel in graph.relationships.values() if rel.target_id == probe.id]
+        assert graph.get_entity_relationships(probe.id) == expected
+        if index % 50 == 0:
+            assert len(core.out_csr[1]) == core.num_edges
+    
+    assert graph.core is core
+    assert structure(core) == structure(GraphCore.from_graph(graph))
+    for mine, fresh in zip(core.out_csr + core.in_csr, GraphCore.from_graph(graph).out_csr
+                           + GraphCore.from_graph(graph).in_csr):
+        assert np.array_equal(mine, fresh)
+
+
+def test_saved_graph_core_is_updated_by_additions(tmp_path):
+    rng = random.Random(1)
+    entities = [entity(rng, index) for index in range(20)]
+    graph = KnowledgeGraph.from_records(entities, [relationship(rng, entities) for _ in range(40)])
+    graph.save(str(tmp_path / "graph"))
+    
+    loaded = KnowledgeGraph.load(str(tmp_path / "graph"))
+    core = loaded.core
+    core.out_edges(0)
+    entities.append(entity(rng, 20))
+    loaded.add_entity(entities[-1])
+    loaded.add_relationship(relationship(rng, entities[-2:]))
+    
+    assert loaded.core is core
+    assert structure(core) == structure(GraphCore.from_graph(loaded))
@@ -0,0 +1,67 @@
+"""Tests for merging knowledge graphs."""
+
+import random
+
+import pytest
+
+from knowledge_graph_synth.graph.merge import GraphMerger
+from knowledge_graph_synth.models import Entity, EntityAttribute, KnowledgeGraph, Relationship, SourceSpan
+
+
+def chunk_graph(seed):
+    """Build a graph whose entities and relationships often collide and tie on confidence."""
+    rng = random.Random(seed)
+    graph = KnowledgeGraph()
+    entities = []
+    for _ in range(40):
+        attributes = [EntityAttribute(key="role", value=f"role {rng.randint(0, 3)}", confidence=rng.choice([0.5, 1.0]))]
+        if rng.random() < 0.3:
+            attributes.append(EntityAttribute(key="aliases", value=[f"Alias {rng.randint(0, 60)}"]))
+        entity = Entity(name=rng.choice(["", "the ", "THE "]) + f"Name {rng.randint(0, 50)}", type=rng.choice(["a", "b"]),
+                        confidence=rng.choice([0.5, 0.8, 1.0]), attributes=attributes,
+                        source_span=SourceSpan(document_id=f"doc {seed}", start=0, end=1, text="x"))
+        graph.add_entity(entity)
+        entities.append(entity)
+    
+    for _ in range(80):
+        source, target = rng.sample(entities, 2)
+        graph.add_relationship(Relationship(source_id=source.id, target_id=target.id, type=rng.choice(["x", "y"]),
+                                            directed=rng.random() < 0.7, confidence=rng.choice([0.5, 1.0]),
+                                            source_span=SourceSpan(document_id=f"doc {seed}", start=0, end=1,
+                                                                   text="x")))
+    return graph
+
+
+def dump(graph):
+    return [entity.to_dict() for entity in graph.entities.values()], \
+        [rel.to_dict() for rel in graph.relationships.values()], graph.metadata
+
+
+def test_merge_deduplicates_entities_and_relationships():
+    graph = chunk_graph(0)
+    merged = GraphMerger(max_workers=1).merge([graph, graph])
+    
+    assert dump(merged) == dump(GraphMerger(max_workers=1).merge([graph]))
+    assert len(merged.entities) < len(graph.entities)
+
+
+@pytest.mark.parametrize("fan_in", [2, 3, 7])
+def test_tree_reduction_matches_flat_merge(fan_in):
+    graphs = [chunk_graph(seed) for seed in range(12)]
+    flat = GraphMerger(max_workers=1).merge(graphs)
+    
+    # Merge the levels of the tree in-process
+    merger = GraphMerger(max_workers=1)
+    level = graphs
+    while len(level) > 1:
+        level = [merger.merge(level[start:start + fan_in]) for start in range(0, len(level), fan_in)]
+    
+    assert dump(level[0]) == dump(flat)
+
+
+def test_reduce_in_worker_processes_matches_flat_merge():
+    graphs = [chunk_graph(seed) for seed in range(12)]
+    flat = GraphMerger(max_workers=1).merge(graphs)
+    tree = GraphMerger(max_workers=2, fan_in=3, parallel_min_size=0).reduce(graphs)
+    
+    assert dump(tree) == dump(flat)
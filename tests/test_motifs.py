@@ -0,0 +1,73 @@
+"""Tests for structural motif mining."""
+
+import asyncio
+import itertools
+import random
+from collections import Counter
+
+import networkx as nx
+import pytest
+
+from knowledge_graph_synth.config import settings
+from knowledge_graph_synth.graph.motifs import mine_motifs
+from knowledge_graph_synth.models import Entity, KnowledgeGraph, Relationship, SourceSpan
+from knowledge_graph_synth.theory.pattern_finder import PatternFinder
+
+
+def clustered_graph(seed):
+    """Build a graph of small cliques joined by random edges, rich in triangles."""
+    rng = random.Random(seed)
+    span = SourceSpan(document_id="doc", start=0, end=1, text="x")
+    entities = [Entity(name=f"Entity {index}", type=rng.choice(["person", "place"]), confidence=0.9,
+                       source_span=span)
+                for index in range(100)]
+    pairs = [pair for start in range(0, 100, 5) for pair in itertools.combinations(entities[start:start + 5], 2)]
+    pairs.extend(rng.sample(entities, 2) for _ in range(60))
+    
+    # Repeated, reversed and self-referencing relationships must not change the counts
+    pairs.extend((target, source) for source, target in pairs[:20])
+    pairs.append((entities[0], entities[0]))
+    relationships = [Relationship(source_id=source.id, target_id=target.id, type=rng.choice(["knows", "visits"]),
+                                  confidence=0.8, source_span=span)
+                     for source, target in pairs]
+    return KnowledgeGraph.from_records(entities, relationships)
+
+
+def brute_force_triangles(graph):
+    """Count the triangles of a graph by the sorted types of their entities."""
+    simple = nx.Graph(graph.to_networkx().to_undirected())
+    simple.remove_edges_from(nx.selfloop_edges(simple))
+    triangles = Counter()
+    for first, second, third in itertools.combinations(simple.nodes, 3):
+        if simple.has_edge(first, second) and simple.has_edge(second, third) and simple.has_edge(first, third):
+            triangles[tuple(sorted(graph.entities[node].type for node in (first, second, third)))] += 1
+    
+    assert sum(triangles.values()) == sum(nx.triangles(simple).values()) // 3
+    return triangles
+
+
+@pytest.mark.parametrize("max_pairs", [1, 7, 1_000_000])
+def test_triangle_counts_match_brute_force(max_pairs):
+    graph = clustered_graph(0)
+    motifs = mine_motifs(graph.core, top_n=100, max_seconds=60, max_pairs=max_pairs)
+    triangles = [motif for motif in motifs if motif["kind"] == "triangle"]
+    
+    expected = brute_force_triangles(graph)
+    assert {tuple(sorted(motif["signature"])): motif["count"] for motif in triangles} == dict(expected)
+    assert all(motif["exact"] for motif in triangles)
+    
+    for motif in triangles:
+        nodes = [graph.core.node_ids[node] for node in motif["nodes"]]
+        assert sorted(graph.entities[node].type for node in nodes) == sorted(motif["signature"])
+
+
+def test_structural_patterns_follow_current_settings(monkeypatch):
+    graph = clustered_graph(1)
+    finder = PatternFinder()
+    
+    monkeypatch.setattr(settings, "MOTIF_TOP_N", 1)
+    patterns = asyncio.run(finder._find_structural_patterns(graph))
+    assert 0 < len(patterns) <= 4
+    
+    monkeypatch.setattr(settings, "MOTIF_TOP_N", 100)
+    assert len(asyncio.run(finder._find_structural_patterns(graph))) > len(patterns)
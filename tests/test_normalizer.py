@@ -0,0 +1,52 @@
+"""Tests for normalizing memory-mapped and streamed documents."""
+
+import gc
+import os
+
+from knowledge_graph_synth.text.loader import TextLoader
+from knowledge_graph_synth.text.normalizer import TextNormalizer
+from knowledge_graph_synth.text.segmenter import TextSegmenter
+
+
+def normalize_file(tmp_path, text):
+    path = tmp_path / "story.txt"
+    path.write_bytes(text.encode("utf-8"))
+    root = next(iter(TextLoader(use_mmap=True).load(str(path)).segments.values()))
+    return root, TextNormalizer().normalize(root)
+
+
+def test_unchanged_text_keeps_mapped_buffer(tmp_path):
+    root, normalized = normalize_file(tmp_path, "Alice met Bob.\n\nBob works at Acme.")
+    
+    assert normalized.buffer is root.buffer
+    assert normalized.buffer.is_mapped
+
+
+def test_normalized_text_is_mapped_from_temporary_file(tmp_path):
+    root, normalized = normalize_file(tmp_path, "Alice  met\tBob.\r\n\n\n\nBob works at Acme.")
+    
+    assert normalized.buffer.is_mapped
+    assert normalized.text == "Alice met Bob.\n\nBob works at Acme."
+    
+    path = normalized.buffer.path
+    del normalized
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_streamed_segments_keep_source_spans(tmp_path):
+    text = "Alice  met\tBob   at noon.\n\n\n\n  Bob works\x07 at Acme.  \n\nCarol   called Alice."
+    path = tmp_path / "story.txt"
+    path.write_bytes(text.encode("utf-8"))
+    
+    normalizer = TextNormalizer()
+    root, chunks = TextLoader().stream(str(path), chunk_size=8)
+    segments = [normalizer.normalize(segment, keep_span=True)
+                for segment in TextSegmenter().iter_segments(root, chunks)]
+    
+    assert [segment.text for segment in segments] == ["Alice met Bob at noon.", "Bob works at Acme.",
+                                                      "Carol called Alice."]
+    for segment in segments:
+        source = text[segment.start_position:segment.end_position]
+        assert normalizer.normalize(segment.model_copy(update={"inline_text": source})).text == segment.text
+        assert segment.metadata["original_length"] == len(source)
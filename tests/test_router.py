@@ -0,0 +1,145 @@
+"""Tests for failover and circuit breaking in the router provider."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from knowledge_graph_synth.llm.router import RouterProvider
+
+COOLDOWN = 0.2
+
+
+class StubEndpoint:
+    """Local HTTP endpoint answering generateContent calls like the Gemini API."""
+    
+    def __init__(self, status=200, delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.hits = 0
+        endpoint = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("content-length", 0)))
+                endpoint.hits += 1
+                time.sleep(endpoint.delay)
+                status = endpoint.status
+                if status == 200:
+                    body = {"candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]},
+                                            "finishReason": "STOP"}],
+                            "usageMetadata": {"promptTokenCount": 1, "candidatesTokenCount": 1}}
+                else:
+                    body = {"error": {"code": status, "message": "stub error", "status": "UNAVAILABLE"}}
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+
+@pytest.fixture
+def endpoints():
+    created = []
+    
+    def make(status=200, delay=0.0):
+        endpoint = StubEndpoint(status, delay)
+        created.append(endpoint)
+        return endpoint
+    
+    yield make
+    for endpoint in created:
+        endpoint.server.shutdown()
+        endpoint.server.server_close()
+
+
+def make_router(**endpoints):
+    return RouterProvider({
+        "backends": [
+            {"name": name, "provider": "gemini", "api_key": "test", "base_url": endpoint.url}
+            for name, endpoint in endpoints.items()
+        ],
+        "failure_threshold": 2,
+        "cooldown_seconds": COOLDOWN,
+        "quota_cooldown_seconds": COOLDOWN,
+    })
+
+
+def backend(router, name):
+    return next(backend for backend in router.backends if backend.name == name)
+
+
+def generate(router, count=1):
+    async def run():
+        return await asyncio.gather(*(router.generate_text("hi", "fast") for _ in range(count)))
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("status", [429, 500])
+def test_failover_to_healthy_backend(endpoints, status):
+    down, up = endpoints(status), endpoints()
+    router = make_router(down=down, up=up)
+    
+    assert generate(router, 6) == ["ok"] * 6
+    assert up.hits == 6
+    assert backend(router, "up").state == "closed"
+
+
+def test_circuit_opens_and_closes(endpoints):
+    down, up = endpoints(500), endpoints()
+    router = make_router(down=down, up=up)
+    flaky = backend(router, "down")
+    
+    # Requests only fail over, so the circuit opens after the threshold
+    while flaky.state == "closed":
+        assert generate(router) == ["ok"]
+    assert flaky.state == "open"
+    assert down.hits == 2
+    
+    # An open circuit receives no requests
+    assert generate(router, 5) == ["ok"] * 5
+    assert down.hits == 2
+    
+    # After the cooldown one trial request is sent, and its failure reopens the circuit
+    time.sleep(COOLDOWN + 0.05)
+    assert flaky.state == "half_open"
+    assert generate(router) == ["ok"]
+    assert down.hits == 3
+    assert flaky.state == "open"
+    
+    # A successful trial request closes it again
+    down.status = 200
+    time.sleep(COOLDOWN + 0.05)
+    assert generate(router) == ["ok"]
+    assert down.hits == 4
+    assert flaky.state == "closed"
+    assert not flaky.probing
+
+
+def test_half_open_backend_takes_one_probe(endpoints):
+    slow, up = endpoints(200, delay=0.3), endpoints()
+    router = make_router(slow=slow, up=up)
+    flaky = backend(router, "slow")
+    flaky.consecutive_failures = flaky.failure_threshold
+    flaky.open_until = time.time() - 1
+    assert flaky.state == "half_open"
+    
+    # Concurrent requests while the trial request is in flight go elsewhere
+    assert generate(router, 8) == ["ok"] * 8
+    assert slow.hits == 1
+    assert up.hits == 7
+    assert flaky.state == "closed"
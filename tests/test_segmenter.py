@@ -0,0 +1,63 @@
+"""Tests for segmenting streamed transcripts."""
+
+import random
+
+from knowledge_graph_synth.text.loader import TextLoader
+from knowledge_graph_synth.text.segmenter import TextSegmenter
+
+THEMES = [
+    "garden tomato soil water seeds harvest compost",
+    "engine piston fuel gearbox clutch exhaust brakes",
+    "violin melody chord rhythm orchestra tempo concert",
+    "glacier snow ice mountain climber rope summit",
+    "budget invoice revenue taxes payroll audit ledger",
+    "planet orbit telescope comet galaxy asteroid nebula",
+]
+
+
+def write_transcript(path, cues_per_theme=300, rounds=3, seed=0):
+    """Write a WEBVTT transcript that moves through the themes several times."""
+    rng = random.Random(seed)
+    lines = ["WEBVTT", ""]
+    number = 0
+    for _ in range(rounds):
+        for theme in THEMES:
+            words = theme.split()
+            for _ in range(cues_per_theme):
+                start, end = divmod(number, 60), divmod(number + 1, 60)
+                lines.append(f"00:{start[0]:02d}:{start[1]:02d}.000 --> 00:{end[0]:02d}:{end[1]:02d}.000")
+                lines.append(" ".join(rng.choice(words) for _ in range(8)).capitalize() + ".")
+                lines.append("")
+                number += 1
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def topic_lengths(segmenter, path, stream):
+    if stream:
+        root, chunks = TextLoader().stream(str(path), chunk_size=4096)
+        topics = list(segmenter.iter_segments(root, chunks))
+    else:
+        collection = segmenter.segment(TextLoader().load(str(path)))
+        topics = [segment for segment in collection.segments.values()
+                  if segment.parent_id and not segment.child_ids]
+    return [len(topic.text) for topic in topics]
+
+
+def test_streamed_topics_match_regular_topics(tmp_path):
+    path = tmp_path / "meeting.vtt"
+    write_transcript(path)
+    segmenter = TextSegmenter(max_segment_length=20000)
+    
+    streamed = topic_lengths(segmenter, path, stream=True)
+    regular = topic_lengths(segmenter, path, stream=False)
+    
+    assert 2 * len(regular) / 3 <= len(streamed) <= 3 * len(regular) / 2
+    assert max(streamed) <= segmenter.max_segment_length
+
+
+def test_short_streamed_transcript_is_split_like_regular(tmp_path):
+    path = tmp_path / "meeting.vtt"
+    write_transcript(path, cues_per_theme=40, rounds=1)
+    segmenter = TextSegmenter()
+    
+    assert topic_lengths(segmenter, path, stream=True) == topic_lengths(segmenter, path, stream=False)